@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+Daemon de análise com API HTTP local
+
+Cada ajuste num gráfico ou tabela paga a inicialização do interpretador, os
+imports (pandas, matplotlib, seaborn, scipy) e a carga dos caches. O daemon
+é um processo de longa duração que mantém uma DataSession (data_session.py)
+instalada, com os frames por requisição, rollups e histogramas em memória,
+e responde a consultas por HTTP local (127.0.0.1 ou socket Unix, sem rede
+externa):
+
+    GET /health                                     uptime e uso da sessão
+    GET /runs                                       execuções disponíveis
+    GET /phases?scenario=rajadas                    fases do cenário
+    GET /status_mix?scenario=rajadas&version=V2&start=120&end=300
+    GET /latency?scenario=rajadas&version=V2&phase=failure&q=0.5,0.95,0.99
+    GET /rollups?scenario=rajadas&version=V2&bucket=5&start=0&end=600
+    GET /cb_state?scenario=rajadas&version=V2
+    GET /render/timeline?scenario=rajadas&versions=V1,V2&metric=mean_ms   (PNG)
+    GET /render/status_mix?scenario=rajadas&start=120&end=300             (PNG)
+    GET /render/report?scenario=rajadas                                    (HTML interativo)
+    POST /reload                                    descarta a sessão
+
+Janelas são dadas em segundos desde o início da execução (`start`/`end`)
+ou pelo nome/tipo de uma fase (`phase=failure`; fases repetidas entram como
+a união dos seus intervalos). A primeira consulta a uma execução paga a
+carga; as seguintes respondem em milissegundos.
+
+    python3 analysis/scripts/analysis_daemon.py serve --preload
+    python3 analysis/scripts/analysis_daemon.py query status_mix scenario=rajadas version=V2 start=120 end=300
+    python3 analysis/scripts/analysis_daemon.py query render/timeline scenario=rajadas --out timeline.png
+"""
+
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cb_state_analysis import reconstruct_timeline
+from data_session import DataSession, install
+from phases import Phase, get_phase_registry
+from rollups import K6_RESULTS_DIR, discover_runs
+
+# Só a interface de loopback: o daemon não é exposto na rede
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+# Resolução das figuras renderizadas sob demanda
+RENDER_DPI = 100
+
+Response = Tuple[int, str, bytes]
+# Intervalos [início, fim) em segundos desde o início da execução
+Windows = List[Tuple[float, float]]
+
+
+class QueryError(ValueError):
+    """Consulta inválida (400) ou execução/endpoint inexistente (404)."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisService:
+    """Consultas sobre as execuções k6, respondidas a partir de uma DataSession quente."""
+
+    def __init__(self, results_dir: str = K6_RESULTS_DIR):
+        self.results_dir = results_dir
+        self.session = DataSession()
+        self.started = time.time()
+        self.queries = 0
+        # Sessão e matplotlib não são thread-safe: uma consulta por vez
+        self.lock = threading.Lock()
+        self._runs: Dict[Tuple[str, str], Path] = {}
+        install(self.session)
+
+    # ------------------------------------------------------------------
+    # Resolução de parâmetros
+    # ------------------------------------------------------------------
+
+    def runs(self, refresh: bool = False) -> Dict[Tuple[str, str], Path]:
+        if refresh or not self._runs:
+            self._runs = {(s, v): path for s, v, path in discover_runs(self.results_dir)}
+        return self._runs
+
+    def run_path(self, scenario: str, version: str) -> Path:
+        path = self.runs().get((scenario, version)) or self.runs(refresh=True).get((scenario, version))
+        if path is None:
+            raise QueryError(f"execução inexistente: {scenario} / {version}", 404)
+        return path
+
+    def requests(self, scenario: str, version: str) -> pd.DataFrame:
+        requests = self.session.requests(self.run_path(scenario, version))
+        if requests is None:
+            raise QueryError(f"execução sem requisições: {scenario} / {version}", 404)
+        return requests
+
+    def versions_of(self, scenario: str) -> List[str]:
+        return sorted(v for s, v in self.runs() if s == scenario)
+
+    def window(self, params: Dict[str, str]) -> Tuple[Windows, Optional[str]]:
+        """
+        Intervalos [início, fim) e fase, a partir de start/end ou de phase=<nome ou tipo>.
+
+        Uma fase pode aparecer várias vezes (as rajadas de `rajadas` são três
+        janelas 'failure' separadas por fases normais): a janela é a união dos
+        intervalos que casam, não o trecho do primeiro início ao último fim.
+        """
+        phase = params.get("phase")
+        if phase:
+            phases = get_phase_registry().phases(_required(params, "scenario").lower())
+            matches = [p for p in phases if phase in (p.name, p.kind)]
+            if not matches:
+                names = ", ".join(p.name for p in phases) or "nenhuma"
+                raise QueryError(f"fase '{phase}' não encontrada (fases: {names})", 404)
+            return _merge_windows((p.start, p.end) for p in matches), phase
+        start, end = _number(params, "start", 0.0), _number(params, "end", np.inf)
+        if end <= start:
+            raise QueryError("end deve ser maior que start")
+        return [(start, end)], None
+
+    @staticmethod
+    def sliced(requests: pd.DataFrame, windows: Windows) -> pd.DataFrame:
+        """Requisições dentro dos intervalos (frame ordenado por seconds: busca binária por intervalo)."""
+        seconds = requests["seconds"].to_numpy()
+        bounds = np.searchsorted(seconds, np.asarray(windows, dtype=float).ravel(), side="left")
+        positions = np.concatenate([np.arange(lo, hi) for lo, hi in bounds.reshape(-1, 2)])
+        return requests.iloc[positions]
+
+    # ------------------------------------------------------------------
+    # Endpoints JSON
+    # ------------------------------------------------------------------
+
+    def health(self, params: Dict[str, str]) -> Dict:
+        return {"uptime_s": round(time.time() - self.started, 1), "queries": self.queries,
+                "runs": len(self.runs()), "session": self.session.report()}
+
+    def list_runs(self, params: Dict[str, str]) -> Dict:
+        return {"runs": [{"scenario": s, "version": v, "path": str(p)}
+                         for (s, v), p in sorted(self.runs(refresh=True).items())]}
+
+    def phases(self, params: Dict[str, str]) -> Dict:
+        phases = get_phase_registry().phases(_required(params, "scenario").lower())
+        return {"phases": [_phase_dict(p) for p in phases]}
+
+    def status_mix(self, params: Dict[str, str]) -> Dict:
+        scenario, version = _required(params, "scenario"), _required(params, "version")
+        windows, phase = self.window(params)
+        window = self.sliced(self.requests(scenario, version), windows)
+        counts = window["status"].fillna("none").value_counts()
+        total = int(counts.sum())
+        available = int(counts.get("200", 0) + counts.get("202", 0))
+        return {
+            "scenario": scenario, "version": version, "windows": _windows_json(windows), "phase": phase,
+            "requests": total,
+            "counts": {status: int(n) for status, n in counts.sort_index().items()},
+            "percent": {status: round(100 * n / total, 3) for status, n in counts.sort_index().items()} if total else {},
+            "availability_pct": round(100 * available / total, 3) if total else None,
+        }
+
+    def latency(self, params: Dict[str, str]) -> Dict:
+        scenario, version = _required(params, "scenario"), _required(params, "version")
+        windows, phase = self.window(params)
+        quantiles = _quantiles(params)
+        window = self.sliced(self.requests(scenario, version), windows)
+        status = params.get("status")
+        if status:
+            window = window[window["status"] == status]
+        latency = window["latency_ms"].to_numpy()
+        result = {"scenario": scenario, "version": version, "windows": _windows_json(windows),
+                  "phase": phase, "status": status, "n": int(latency.size)}
+        if latency.size:
+            result.update(mean_ms=round(float(latency.mean()), 3), max_ms=round(float(latency.max()), 3),
+                          quantiles={str(q): round(float(v), 3)
+                                     for q, v in zip(quantiles, np.quantile(latency, quantiles))})
+        return result
+
+    def rollups(self, params: Dict[str, str]) -> Dict:
+        scenario, version = _required(params, "scenario"), _required(params, "version")
+        bucket = _bucket(params)
+        windows, _ = self.window(params)
+        rollups = self.session.rollups(self.run_path(scenario, version), bucket)
+        if rollups is None:
+            raise QueryError(f"execução sem requisições: {scenario} / {version}", 404)
+        rows = rollups[_window_mask(rollups["start_s"].to_numpy(), windows)]
+        return {"scenario": scenario, "version": version, "bucket_s": bucket,
+                "columns": list(rows.columns), "rows": rows.round(3).to_numpy().tolist()}
+
+    def cb_state(self, params: Dict[str, str]) -> Dict:
+        scenario, version = _required(params, "scenario"), params.get("version", "V2")
+        rollups = self.session.rollups(self.run_path(scenario, version), 1.0)
+        if rollups is None:
+            raise QueryError(f"execução sem requisições: {scenario} / {version}", 404)
+        timeline = reconstruct_timeline(rollups, scenario, version, 1.0)
+        return {"summary": timeline.summary(),
+                "spans": timeline.spans.to_dict(orient="records")}
+
+    def reload(self, params: Dict[str, str]) -> Dict:
+        self.session = DataSession()
+        install(self.session)
+        self._runs = {}
+        return {"reloaded": True, "runs": len(self.runs())}
+
+    # ------------------------------------------------------------------
+    # Renderização (matplotlib já importado e quente no processo)
+    # ------------------------------------------------------------------
+
+    def render_timeline(self, params: Dict[str, str]) -> Tuple[str, bytes]:
+        import matplotlib.pyplot as plt
+        from downsample import plot_downsampled
+
+        scenario = _required(params, "scenario")
+        versions = params.get("versions", "").split(",") if params.get("versions") else self.versions_of(scenario)
+        metric = params.get("metric", "mean_ms")
+        bucket = _bucket(params)
+        windows, _ = self.window(params)
+        start, end = windows[0][0], windows[-1][1]
+
+        fig, ax = plt.subplots(figsize=(12, 4))
+        try:
+            for version in versions:
+                rollups = self.session.rollups(self.run_path(scenario, version), bucket)
+                if rollups is None:
+                    continue
+                # Um traço por intervalo: janelas disjuntas não são ligadas por uma reta
+                for i, (low, high) in enumerate(windows):
+                    rows = rollups[(rollups["start_s"] >= low) & (rollups["start_s"] < high)]
+                    plot_downsampled(ax, rows["start_s"], _rollup_metric(rows, metric),
+                                     label=version if i == 0 else None, linewidth=1.2,
+                                     color=_PALETTE.get(version), dpi=RENDER_DPI)
+        except QueryError:
+            plt.close(fig)
+            raise
+        for phase in get_phase_registry().phases(scenario.lower()):
+            if phase.kind == "failure" and phase.end > start and phase.start < end:
+                ax.axvspan(max(phase.start, start), min(phase.end, end), color="red", alpha=0.08)
+        ax.set_title(f"{scenario}: {metric} (janela {bucket:g}s)")
+        ax.set_xlabel("Tempo desde o início (s)")
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc="upper right")
+        return "image/png", _png(fig)
+
+    def render_status_mix(self, params: Dict[str, str]) -> Tuple[str, bytes]:
+        import matplotlib.pyplot as plt
+
+        scenario = _required(params, "scenario")
+        versions = params.get("versions", "").split(",") if params.get("versions") else self.versions_of(scenario)
+        mixes = [self.status_mix({**params, "version": v}) for v in versions]
+        if not mixes:
+            raise QueryError(f"nenhuma execução de {scenario}", 404)
+        statuses = sorted({s for mix in mixes for s in mix["percent"]})
+        fig, ax = plt.subplots(figsize=(8, 4))
+        bottom = np.zeros(len(versions))
+        for status in statuses:
+            values = np.array([mix["percent"].get(status, 0.0) for mix in mixes])
+            ax.bar(versions, values, bottom=bottom, label=status, color=_STATUS_COLORS.get(status))
+            bottom += values
+        low, high = mixes[0]["windows"][0]
+        window = mixes[0]["phase"] or f"{low:g}–{'fim' if high is None else f'{high:g}'} s"
+        ax.set_title(f"{scenario}: status por versão ({window})")
+        ax.set_ylabel("% das requisições")
+        ax.legend(title="status", bbox_to_anchor=(1.01, 1), loc="upper left")
+        return "image/png", _png(fig)
+
+    def render_report(self, params: Dict[str, str]) -> Tuple[str, bytes]:
+        from interactive_report import build_report_data, render_interactive_section
+
+        scenario = _required(params, "scenario")
+        versions = params.get("versions", "").split(",") if params.get("versions") else self.versions_of(scenario)
+        data = build_report_data(
+            {v: self.session.requests(self.run_path(scenario, v)) for v in versions},
+            scenario,
+            histograms={v: self.session.histogram(self.run_path(scenario, v)) for v in versions},
+            phases=get_phase_registry().phases(scenario.lower()),
+            colors=_PALETTE,
+        )
+        html = (f"<!DOCTYPE html><html lang=\"pt-BR\"><head><meta charset=\"UTF-8\">"
+                f"<title>{scenario}</title></head><body style=\"font-family:sans-serif;margin:30px\">"
+                f"<h1>{scenario}</h1>{render_interactive_section(data)}</body></html>")
+        return "text/html; charset=utf-8", html.encode("utf-8")
+
+    # ------------------------------------------------------------------
+
+    def routes(self) -> Dict[Tuple[str, str], Callable]:
+        return {
+            ("GET", "/health"): self.health,
+            ("GET", "/runs"): self.list_runs,
+            ("GET", "/phases"): self.phases,
+            ("GET", "/status_mix"): self.status_mix,
+            ("GET", "/latency"): self.latency,
+            ("GET", "/rollups"): self.rollups,
+            ("GET", "/cb_state"): self.cb_state,
+            ("GET", "/render/timeline"): self.render_timeline,
+            ("GET", "/render/status_mix"): self.render_status_mix,
+            ("GET", "/render/report"): self.render_report,
+            ("POST", "/reload"): self.reload,
+        }
+
+    def handle(self, method: str, target: str) -> Response:
+        """Executa uma consulta: (status HTTP, content-type, corpo)."""
+        url = urlparse(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = self.routes().get((method, url.path.rstrip("/") or "/"))
+        if route is None:
+            return _json_response(404, {"error": f"endpoint desconhecido: {method} {url.path}"})
+        start = time.perf_counter()
+        try:
+            with self.lock:
+                self.queries += 1
+                result = route(params)
+        except QueryError as e:
+            return _json_response(e.status, {"error": str(e)})
+        except Exception as e:
+            return _json_response(500, {"error": f"{type(e).__name__}: {e}"})
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+        if isinstance(result, tuple):
+            content_type, body = result
+            return 200, content_type, body
+        return _json_response(200, {**result, "elapsed_ms": elapsed_ms})
+
+    def preload(self):
+        """Carrega todas as execuções e os rollups de 1 s (a primeira consulta já sai quente)."""
+        for (scenario, version), path in sorted(self.runs(refresh=True).items()):
+            self.session.rollups(path, 1.0)
+        print(f"  {self.session.report()}")
+
+
+_PALETTE = {"V1": "#d62728", "V2": "#2ca02c", "V3": "#1f77b4"}
+_STATUS_COLORS = {"200": "#2ca02c", "202": "#17becf", "500": "#d62728", "503": "#ff7f0e"}
+
+
+def _required(params: Dict[str, str], name: str) -> str:
+    if not params.get(name):
+        raise QueryError(f"parâmetro obrigatório ausente: {name}")
+    return params[name]
+
+
+def _number(params: Dict[str, str], name: str, default: float) -> float:
+    """Parâmetro numérico; texto inválido é erro do cliente (400), não do daemon."""
+    if name not in params:
+        return default
+    try:
+        value = float(params[name])
+    except ValueError:
+        raise QueryError(f"{name} deve ser um número: {params[name]!r}")
+    if np.isnan(value):
+        raise QueryError(f"{name} deve ser um número: {params[name]!r}")
+    return value
+
+
+def _bucket(params: Dict[str, str]) -> float:
+    bucket = _number(params, "bucket", 1.0)
+    if not 0 < bucket < np.inf:
+        raise QueryError("bucket deve ser um número positivo (segundos)")
+    return bucket
+
+
+def _quantiles(params: Dict[str, str]) -> List[float]:
+    """Lista `q` de quantis em [0, 1]; fora disso (ou NaN) é erro do cliente (400)."""
+    try:
+        quantiles = [float(q) for q in params.get("q", "").split(",") if q] or list(DEFAULT_QUANTILES)
+    except ValueError:
+        raise QueryError("q deve ser uma lista de quantis (ex.: 0.5,0.95)")
+    invalid = [q for q in quantiles if not 0 <= q <= 1]
+    if invalid:
+        raise QueryError(f"quantis devem estar em [0, 1]: {', '.join(map(str, invalid))}")
+    return quantiles
+
+
+def _merge_windows(intervals) -> Windows:
+    """Intervalos ordenados, com os sobrepostos ou contíguos unidos."""
+    merged: Windows = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _window_mask(seconds: np.ndarray, windows: Windows) -> np.ndarray:
+    mask = np.zeros(len(seconds), dtype=bool)
+    for start, end in windows:
+        mask |= (seconds >= start) & (seconds < end)
+    return mask
+
+
+def _windows_json(windows: Windows) -> List[List[Optional[float]]]:
+    return [[start, None if np.isinf(end) else end] for start, end in windows]
+
+
+def _phase_dict(phase: Phase) -> Dict:
+    return {"name": phase.name, "kind": phase.kind, "start": phase.start, "end": phase.end}
+
+
+def _rollup_metric(rows: pd.DataFrame, metric: str) -> np.ndarray:
+    """Série de um rollup: coluna direta ou derivada (mean_ms, availability)."""
+    requests = rows["requests"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if metric == "mean_ms":
+            return np.where(requests > 0, rows["latency_sum"].to_numpy() / requests, np.nan)
+        if metric == "availability":
+            available = (rows["status_200"] + rows["status_202"]).to_numpy(dtype=float)
+            return np.where(requests > 0, 100 * available / requests, np.nan)
+    if metric not in rows.columns:
+        choices = ", ".join(["mean_ms", "availability", *rows.columns.drop("start_s")])
+        raise QueryError(f"métrica desconhecida: {metric} (opções: {choices})")
+    return rows[metric].to_numpy(dtype=float)
+
+
+def _png(fig) -> bytes:
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buffer, format="png", dpi=RENDER_DPI)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def _json_response(status: int, payload: Dict) -> Response:
+    body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+    return status, "application/json; charset=utf-8", body
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} não serializável")
+
+
+# ----------------------------------------------------------------------
+# Servidor
+# ----------------------------------------------------------------------
+
+def _handler_for(service: AnalysisService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self):
+            status, content_type, body = service.handle(self.command, self.path)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _reply
+
+        def address_string(self):
+            # Socket Unix: client_address é uma string vazia
+            return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+        def log_message(self, format, *args):
+            print(f"  {self.address_string()} {format % args}")
+
+    return Handler
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service: AnalysisService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                unix_socket: Optional[str] = None):
+    """Servidor HTTP local (TCP em host:port ou socket Unix em unix_socket)."""
+    handler = _handler_for(service)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        return _UnixHTTPServer(unix_socket, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(results_dir: str = K6_RESULTS_DIR, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          unix_socket: Optional[str] = None, preload: bool = False):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401  (import único; as renderizações saem quentes)
+
+    service = AnalysisService(results_dir)
+    if preload:
+        service.preload()
+    server = make_server(service, host, port, unix_socket)
+    where = unix_socket or f"http://{host}:{server.server_address[1]}"
+    print(f"🔥 Daemon de análise em {where} ({len(service.runs())} execuções em {results_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Encerrando")
+    finally:
+        server.server_close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+
+
+# ----------------------------------------------------------------------
+# Cliente
+# ----------------------------------------------------------------------
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def query(endpoint: str, params: Optional[Dict] = None, method: str = "GET",
+          host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: Optional[str] = None,
+          timeout: float = 300.0):
+    """
+    Consulta o daemon.
+
+    Returns:
+        dict para respostas JSON, bytes para PNG/HTML.
+
+    Raises:
+        RuntimeError com a mensagem do daemon em respostas de erro.
+    """
+    connection = (_UnixHTTPConnection(unix_socket, timeout) if unix_socket
+                  else HTTPConnection(host, port, timeout=timeout))
+    target = "/" + endpoint.lstrip("/")
+    if params:
+        target += "?" + urlencode(params)
+    try:
+        connection.request(method, target)
+        response = connection.getresponse()
+        body = response.read()
+        content_type = response.getheader("Content-Type", "")
+    finally:
+        connection.close()
+    if content_type.startswith("application/json"):
+        payload = json.loads(body)
+        if response.status != 200:
+            raise RuntimeError(f"{response.status}: {payload.get('error')}")
+        return payload
+    return body
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Daemon de análise com API HTTP local")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", dest="unix_socket", help="Socket Unix (em vez de TCP)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Inicia o daemon")
+    serve_parser.add_argument("--results-dir", default=K6_RESULTS_DIR)
+    serve_parser.add_argument("--preload", action="store_true", help="Carrega todas as execuções na partida")
+
+    query_parser = commands.add_parser("query", help="Consulta um daemon em execução")
+    query_parser.add_argument("endpoint", help="Ex.: status_mix, latency, render/timeline")
+    query_parser.add_argument("params", nargs="*", help="chave=valor")
+    query_parser.add_argument("--post", action="store_true", help="Usa POST (ex.: reload)")
+    query_parser.add_argument("--out", help="Arquivo de saída para PNG/HTML")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args.results_dir, args.host, args.port, args.unix_socket, args.preload)
+    else:
+        params = dict(item.split("=", 1) for item in args.params)
+        try:
+            result = query(args.endpoint, params, "POST" if args.post else "GET",
+                           args.host, args.port, args.unix_socket)
+        except (OSError, RuntimeError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        if isinstance(result, dict):
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        elif args.out:
+            Path(args.out).write_bytes(result)
+            print(f"✅ {args.out} ({len(result) / 1024:,.0f} KB)")
+        else:
+            sys.stdout.buffer.write(result)
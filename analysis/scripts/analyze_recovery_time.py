@@ -1,88 +1,233 @@
 #!/usr/bin/env python3
+"""
+Análise de tempo de recuperação
+
+Para cada cenário, versão (V1, V2, V3 e perfis V2_*) e janela de falha
+(incluindo cada rajada de `rajadas`), calcula:
+
+- Time to First Success: segundos entre o fim da falha e o primeiro 200
+- Time to Steady State: segundos até a taxa de sucesso (média móvel) voltar
+  ao patamar pré-falha e permanecer nele até o fim do horizonte observado
+- Curva de recuperação: throughput de sucessos por segundo após a falha,
+  relativo ao baseline pré-falha
+
+Execuções paradas pelo monitor sequencial (EARLY_STOP, ver
+phases.early_stop_cutoff) não têm a recuperação completa: o horizonte termina
+no corte e a janela sai com Status "Truncated (early stop)".
+
+As janelas vêm do registro de fases (phases.py, lido dos scripts k6); janelas
+de falha contíguas (ex.: degrade → critical) são tratadas como uma só. Tudo é
+vetorizado sobre a coluna de tempo ordenada e os rollups por segundo, e os
+cenários são processados em paralelo (um processo por cenário).
+"""
+
 import os
-import pandas as pd
-import numpy as np
 import sys
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 # Add current scripts directory to path to import fast_loader
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from fast_loader import FastK6Loader
+    from phases import SCRIPTS_DIR, Phase, early_stop_cutoff, get_phase_registry
+    from rollups import K6_RESULTS_DIR, build_rollups, discover_runs, load_run
+    from data_session import get_session
 except ImportError:
-    print("Error: fast_loader.py not found.")
+    print("Error: phases.py/rollups.py not found.")
     sys.exit(1)
 
-RESULTS_DIR = "k6/results"
+RESULTS_DIR = K6_RESULTS_DIR
 OUTPUT_FILE = "analysis_results/csv/recovery_analysis.csv"
+CURVES_FILE = "analysis_results/csv/recovery_curves.csv"
 
-# Configuration of failure windows for recovery analysis (in seconds from start)
-# This matches the k6 scripts behavior
-SCENARIO_CONFIG = {
-    "catastrofe": {"fail_start": 30, "fail_end": 330}, # 5 min failure starting at 30s
-    "rajadas": {"fail_start": 30, "fail_end": 150},    # First burst end
-}
-
-def analyze_recovery(scenario_name, loader):
-    print(f"Analyzing recovery for {scenario_name}...")
-    
-    data = loader.load_scenario(scenario_name, versions=["V2"])
-    if "V2" not in data:
-        print(f"  No V2 data for {scenario_name}")
-        return None
-    
-    df = data["V2"]
-    if 'time' not in df.columns or 'metric' not in df.columns:
-        print(f"  Incomplete columns for {scenario_name}")
-        return None
-    
-    # Get configuration
-    config = SCENARIO_CONFIG.get(scenario_name)
-    if not config:
-        print(f"  No recovery config for {scenario_name}, using default.")
+# Segundos antes da falha usados como baseline
+BASELINE_WINDOW_S = 60
+# Média móvel (s) aplicada à taxa de sucesso antes de testar o steady state
+STEADY_SMOOTHING_S = 5
+# Fração do baseline considerada "recuperada"
+STEADY_RATIO = 0.95
+# Marcos da curva de recuperação reportados no resumo
+CURVE_MILESTONES_S = (10, 30, 60)
+
+
+def merge_failure_windows(windows: List[Phase]) -> List[Phase]:
+    """Une janelas de falha contíguas (fim de uma == início da próxima)."""
+    merged: List[Phase] = []
+    for window in windows:
+        if merged and merged[-1].end == window.start:
+            last = merged.pop()
+            window = Phase(f"{last.name}+{window.name}", "failure", last.start, window.end)
+        merged.append(window)
+    return merged
+
+
+def first_success_after(success_seconds: np.ndarray, moments: np.ndarray) -> np.ndarray:
+    """Primeiro sucesso em/apos cada instante (NaN se não houver), via searchsorted."""
+    idx = np.searchsorted(success_seconds, moments, side="left")
+    found = idx < len(success_seconds)
+    result = np.full(len(moments), np.nan)
+    result[found] = success_seconds[idx[found]]
+    return result
+
+
+def _steady_offset(rate: np.ndarray, target: float) -> Optional[int]:
+    """Primeiro índice a partir do qual `rate` fica >= target até o fim."""
+    if rate.size == 0:
         return None
+    stays = np.logical_and.accumulate((rate >= target)[::-1])[::-1]
+    hits = np.flatnonzero(stays)
+    return int(hits[0]) if hits.size else None
+
+
+def recovery_for_run(requests: pd.DataFrame, windows: List[Phase], scenario: str,
+                     version: str, test_end: Optional[float] = None,
+                     cutoff: Optional[float] = None) -> Tuple[List[Dict], pd.DataFrame]:
+    """
+    Calcula as métricas de recuperação de uma execução para todas as janelas.
+
+    Args:
+        cutoff: Segundo da parada antecipada da execução (None: rodou até o fim).
+            Janelas que começam depois dele são ignoradas; as que têm o
+            horizonte cortado saem marcadas em "Truncated At (s)" e no Status.
+
+    Returns:
+        (linhas do resumo, curva de recuperação em formato longo)
+    """
+    rollups = build_rollups(requests)
+    seconds = requests["seconds"].to_numpy()
+    success_seconds = seconds[requests["status"].to_numpy() == "200"]
 
-    # Filter for successes
-    # Convert 'time' to seconds from start
-    df['timestamp'] = pd.to_datetime(df['time'])
-    start_time = df['timestamp'].min()
-    df['seconds'] = (df['timestamp'] - start_time).dt.total_seconds()
-    
-    # Successes (200) after failure end
-    successes = df[(df['metric'] == 'http_reqs') & 
-                   (df['tags'].apply(lambda x: str(x.get('status')) == '200')) &
-                   (df['seconds'] >= config['fail_end'])]
-    
-    if successes.empty:
-        print(f"  No successes found after failure end for {scenario_name}")
-        recovery_delta = 999 # Indicator of no recovery within test
+    total = rollups["requests"].to_numpy(dtype=float)
+    success = rollups["status_200"].to_numpy(dtype=float)
+    smoothing = np.ones(STEADY_SMOOTHING_S)
+    smooth_total = np.convolve(total, smoothing, mode="full")[:len(total)]
+    smooth_success = np.convolve(success, smoothing, mode="full")[:len(success)]
+    success_rate = np.divide(smooth_success, smooth_total,
+                             out=np.zeros(len(total)), where=smooth_total > 0)
+
+    data_end = len(rollups) if cutoff is None else min(len(rollups), int(cutoff))
+    ends = np.array([w.end for w in windows], dtype=float)
+    first_success = first_success_after(success_seconds, ends)
+
+    rows, curves = [], []
+    for i, window in enumerate(windows):
+        if cutoff is not None and window.start >= cutoff:
+            continue
+        start_s, end_s = int(window.start), int(window.end)
+        scheduled_end = int(windows[i + 1].start) if i + 1 < len(windows) else int(test_end or data_end)
+        horizon_end = min(scheduled_end, data_end)
+        truncated = cutoff is not None and cutoff < scheduled_end
+
+        base_from = max(0, start_s - BASELINE_WINDOW_S)
+        base_total = total[base_from:start_s].sum()
+        baseline_rate = success[base_from:start_s].sum() / base_total if base_total else np.nan
+        baseline_rps = success[base_from:start_s].mean() if start_s > base_from else np.nan
+
+        steady = None
+        if not np.isnan(baseline_rate):
+            steady = _steady_offset(success_rate[end_s:horizon_end], STEADY_RATIO * baseline_rate)
+
+        offsets = np.arange(max(horizon_end - end_s, 0))
+        success_rps = success[end_s:horizon_end]
+        ratio = success_rps / baseline_rps if baseline_rps else np.full(len(offsets), np.nan)
+        curves.append(pd.DataFrame({
+            "scenario": scenario, "version": version, "window": window.name,
+            "offset_s": offsets,
+            "throughput_rps": total[end_s:horizon_end],
+            "success_rps": success_rps,
+            "recovery_ratio": ratio,
+        }))
+
+        ttfs = first_success[i] - window.end
+        row = {
+            "Scenario": scenario,
+            "Version": version,
+            "Window": window.name,
+            "Failure Start (s)": window.start,
+            "Failure End (s)": window.end,
+            "Horizon (s)": horizon_end - end_s,
+            "First Success (s)": first_success[i],
+            "Time to First Success (s)": round(ttfs, 3) if not np.isnan(ttfs) else np.nan,
+            "Time to Steady State (s)": steady,
+            "Baseline Success Rate (%)": baseline_rate * 100 if not np.isnan(baseline_rate) else np.nan,
+            "Baseline Success (req/s)": baseline_rps,
+            "Status": ("Truncated (early stop)" if truncated
+                       else "Recovered" if steady is not None else "Failed to Recover"),
+            "Truncated At (s)": cutoff if truncated else np.nan,
+        }
+        for milestone in CURVE_MILESTONES_S:
+            value = ratio[:milestone].mean() * 100 if len(ratio) >= milestone else np.nan
+            row[f"Throughput Recovery @{milestone}s (%)"] = value
+        rows.append(row)
+
+    curve = pd.concat(curves, ignore_index=True) if curves else pd.DataFrame()
+    return rows, curve
+
+
+def _analyze_scenario(task: Tuple[str, List[Tuple[str, str]], str]) -> Tuple[List[Dict], pd.DataFrame]:
+    """Worker: processa todas as versões de um cenário (em processo separado ou na sessão ativa)."""
+    scenario, runs, scripts_dir = task
+    registry = get_phase_registry(scripts_dir)
+    key = scenario.lower()
+    windows = merge_failure_windows(registry.failure_windows(key))
+    if not windows:
+        return [], pd.DataFrame()
+
+    session = get_session()
+    rows, curves = [], []
+    for version, path in runs:
+        requests = load_run(path, session)
+        if requests is None:
+            continue
+        run_rows, curve = recovery_for_run(requests, windows, scenario, version, registry.duration(key),
+                                           early_stop_cutoff(path))
+        rows.extend(run_rows)
+        curves.append(curve)
+    return rows, (pd.concat(curves, ignore_index=True) if curves else pd.DataFrame())
+
+
+def analyze_all(results_dir: str = RESULTS_DIR, scripts_dir: str = SCRIPTS_DIR,
+                max_workers: Optional[int] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Matriz de recuperação completa (cenário × versão × janela), em paralelo (max_workers=1: no processo atual)."""
+    by_scenario: Dict[str, List[Tuple[str, str]]] = {}
+    for scenario, version, path in discover_runs(results_dir):
+        by_scenario.setdefault(scenario, []).append((version, str(path)))
+
+    tasks = [(scenario, runs, scripts_dir) for scenario, runs in by_scenario.items()]
+    if not tasks:
+        return pd.DataFrame(), pd.DataFrame()
+
+    workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    if workers <= 1:
+        print(f"🔄 Analisando recuperação de {len(tasks)} cenário(s)...")
+        results = [_analyze_scenario(task) for task in tasks]
     else:
-        first_success_time = successes['seconds'].min()
-        recovery_delta = first_success_time - config['fail_end']
-        print(f"  Recovery delta for {scenario_name}: {recovery_delta:.2f}s")
-
-    return {
-        'Scenario': scenario_name,
-        'Failure End (s)': config['fail_end'],
-        'First Success (s)': first_success_time if not successes.empty else None,
-        'V2 Recovery Delta (s)': round(recovery_delta, 2),
-        'Status': 'Recovered' if not successes.empty else 'Failed to Recover'
-    }
+        print(f"🔄 Analisando recuperação de {len(tasks)} cenário(s) em paralelo...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_analyze_scenario, tasks))
 
-if __name__ == "__main__":
-    loader = FastK6Loader(results_dir=RESULTS_DIR, use_cache=True)
-    scenarios = ["catastrofe", "rajadas"]
-    all_results = []
-    
-    for s in scenarios:
-        res = analyze_recovery(s, loader)
-        if res:
-            all_results.append(res)
-        
-    if all_results:
-        df = pd.DataFrame(all_results)
+    rows = [row for run_rows, _ in results for row in run_rows]
+    curves = [curve for _, curve in results if not curve.empty]
+    return pd.DataFrame(rows), (pd.concat(curves, ignore_index=True) if curves else pd.DataFrame())
+
+
+def main(results_dir: str = RESULTS_DIR, max_workers: Optional[int] = None):
+    summary, curves = analyze_all(results_dir, max_workers=max_workers)
+
+    if not summary.empty:
         os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-        df.to_csv(OUTPUT_FILE, index=False)
+        summary.to_csv(OUTPUT_FILE, index=False)
+        curves.to_csv(CURVES_FILE, index=False)
         print(f"\nRecovery analysis saved to {OUTPUT_FILE}")
-        print(df.to_string(index=False))
+        print(f"Recovery curves saved to {CURVES_FILE}")
+        print(summary.to_string(index=False))
+    else:
+        print("No failure windows with data found.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,6 @@ import json
 import time
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from jinja2 import Template
-from scipy import stats
 from datetime import datetime
 import warnings
 
@@ -14,12 +10,24 @@ warnings.filterwarnings('ignore')
 
 # Import do loader otimizado
 try:
-    from fast_loader import FastK6Loader, fast_bootstrap_ci, fast_cliffs_delta
+    from fast_loader import to_request_frame
+    from data_session import get_session
     USE_FAST_LOADER = True
 except ImportError:
     USE_FAST_LOADER = False
     print("⚠️  fast_loader não encontrado. Usando carregamento padrão.")
 
+from bootstrap import bootstrap_diff_ci
+from distribution_plots import boxplot, ecdf, std, violinplot
+from downsample import axes_pixel_width, fill_between_downsampled, plot_downsampled
+from histogram_stats import LatencyHistogram, compare_histograms, ks_2samp_histograms
+from interactive_report import build_report_data, render_interactive_section
+from latency_profile import LatencyProfile
+from phases import get_phase_registry
+from quantile_ci import format_with_ci, order_statistic_ci, quantile_diff_ci
+from rank_stats import compare_ranks, mann_whitney_p
+from rolling_effects import DEFAULT_STEP_S, DEFAULT_WINDOW_S, rolling_effects
+
 # --- Configurações ---
 RESULTS_DIR = "k6/results"
 OUTPUT_DIR = "analysis_results"
@@ -30,14 +38,28 @@ MARKDOWN_DIR = os.path.join(OUTPUT_DIR, "markdown")
 
 # --- Cores e Estilos para Gráficos ---
 PALETTE = {"V1": "#d62728", "V2": "#2ca02c", "V3": "#1f77b4"}
-sns.set_style("whitegrid")
+# DPI dos timelines; as séries são reduzidas (downsample.py) à largura em pixels
+TIMELINE_DPI = 150
+
+
+def _pyplot():
+    """pyplot com o estilo dos gráficos (import tardio: o modo interativo não carrega matplotlib/seaborn)."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_style("whitegrid")
+    return plt
 
 class K6Analyzer:
     """
     Analisa os resultados de testes de carga do k6, gera gráficos e um relatório HTML.
     """
-    def __init__(self, results_dir, output_dir):
+    def __init__(self, results_dir, output_dir, interactive=False, session=None):
         self.results_dir = results_dir
+        # Sessão de dados compartilhada (data_session); default: a ativa no processo
+        self.session = session or (get_session() if USE_FAST_LOADER else None)
+        # interactive=True: relatório com JSON + gráficos no navegador, sem PNGs
+        self.interactive = interactive
         self.output_dir = output_dir
         self.plots_dir = os.path.join(output_dir, "plots")
         self.csv_dir = os.path.join(output_dir, "csv")
@@ -45,6 +67,8 @@ class K6Analyzer:
         self.markdown_dir = os.path.join(output_dir, "markdown")
         self.data = {}
         self.response_times = {}  # Para análise estatística
+        self.latency_profiles = {}  # Buffers ordenados (uma ordenação por versão)
+        self.latency_histograms = {}  # Histogramas da execução completa (sem amostragem)
 
         # Cria diretórios de saída se não existirem
         os.makedirs(self.plots_dir, exist_ok=True)
@@ -56,7 +80,7 @@ class K6Analyzer:
         """
         Carrega os dados dos arquivos de resultado do k6 (JSON) de forma eficiente.
         
-        Usa FastK6Loader para:
+        Usa FastK6Loader (via sessão de dados compartilhada) para:
         - Parsing JSON com orjson (3-10x mais rápido)
         - Processamento paralelo com multiprocessing
         - Cache Parquet para reutilização instantânea
@@ -73,13 +97,17 @@ class K6Analyzer:
         
         if USE_FAST_LOADER:
             print("🚀 Usando FastK6Loader (otimizado)")
-            loader = FastK6Loader(
-                results_dir=self.results_dir,
-                use_cache=True
-            )
-            self.data = loader.load_all_versions(
+            self.data = self.session.versions(
+                self.results_dir,
                 max_sample_size=max_sample_size
             )
+            # Histogramas acumulados na ingestão cobrem todos os pontos, mesmo com amostragem
+            for version in self.data:
+                histogram = self.session.histogram(
+                    os.path.join(self.results_dir, f"{version}_Completo.json")
+                )
+                if histogram is not None and histogram.bins:
+                    self.latency_histograms[version] = histogram
         else:
             print("⚠️  Usando carregamento padrão (mais lento)")
             self._load_data_legacy(max_sample_size)
@@ -172,8 +200,9 @@ class K6Analyzer:
                 print(f"Aviso: Coluna 'tags' não encontrada para a versão {version}. Pulando.")
                 continue
 
-            # Normaliza o status para string para evitar comparações problemáticas
-            df['status'] = df['tags'].apply(lambda x: str(x.get('status')) if isinstance(x, dict) and x.get('status') is not None else None)
+            # Normaliza o status para string (a sessão de dados já entrega a coluna)
+            if 'status' not in df.columns:
+                df['status'] = df['tags'].apply(lambda x: str(x.get('status')) if isinstance(x, dict) and x.get('status') is not None else None)
 
             req_duration_df = df[df['metric'] == 'http_req_duration']
             http_reqs_df = df[df['metric'] == 'http_reqs']
@@ -192,6 +221,11 @@ class K6Analyzer:
             # Total real de requisições registrado pelo http_reqs (evita omitir códigos inesperados)
             total_requests = http_reqs_df['value'].sum()
             
+            profile = LatencyProfile(req_duration_df['value'].to_numpy())
+            self.latency_profiles[version] = profile
+            # IC 95% exato do P95 (estatísticas de ordem sobre o buffer ordenado)
+            p95_low, p95_high = order_statistic_ci(profile, 0.95)
+            
             # Debug: mostrar contagens brutas
             print(f"\n{version} - Contagens brutas:")
             print(f"  Status 200 (Sucesso): {success_count}")
@@ -203,8 +237,10 @@ class K6Analyzer:
             summary = {
                 "Version": version,
                 "Total Requests": total_requests,
-                "Avg Response Time (ms)": req_duration_df['value'].mean(),
-                "P95 Response Time (ms)": req_duration_df['value'].quantile(0.95),
+                "Avg Response Time (ms)": profile.mean,
+                "P95 Response Time (ms)": profile.quantile(0.95),
+                "P95 CI Low (ms)": p95_low,
+                "P95 CI High (ms)": p95_high,
                 "Success Rate (%)": (success_count / total_requests) * 100 if total_requests > 0 else 0,
                 "Fallback Rate (%)": (fallback_count / total_requests) * 100 if total_requests > 0 else 0,
                 "Circuit Breaker Open Rate (%)": (cb_open_count / total_requests) * 100 if total_requests > 0 else 0,
@@ -228,6 +264,7 @@ class K6Analyzer:
         """
         Gera gráficos comparativos a partir dos dados processados.
         """
+        plt = _pyplot()
         print("Gerando gráficos comparativos...")
 
         # Gráfico 1: Tempo de Resposta (Médio e P95)
@@ -272,6 +309,8 @@ class K6Analyzer:
         """
         Gera um relatório HTML consolidado com os resultados e gráficos.
         """
+        from jinja2 import Template
+
         print("Gerando relatório HTML...")
         template_str = """
         <!DOCTYPE html>
@@ -303,11 +342,15 @@ class K6Analyzer:
                 
                 <div class="section">
                     <h2>Gráficos Comparativos</h2>
+                    {% if interactive_section %}
+                    {{ interactive_section }}
+                    {% else %}
                     <h3>Tempo de Resposta (Médio e P95)</h3>
                     <img src="plots/response_times.png" alt="Gráfico de Tempo de Resposta">
                     
                     <h3>Composição das Respostas: Sucesso, Fallback e Falha</h3>
                     <img src="plots/success_failure_rate.png" alt="Gráfico de Composição das Respostas">
+                    {% endif %}
                 </div>
             </div>
         </body>
@@ -316,7 +359,8 @@ class K6Analyzer:
         
         template = Template(template_str)
         html_content = template.render(
-            summary_table=self.summary_df.to_html(index=False, classes='table table-striped')
+            summary_table=self.summary_df.to_html(index=False, classes='table table-striped'),
+            interactive_section=self._interactive_section() if self.interactive else None
         )
         
         report_path = os.path.join(self.output_dir, "analysis_report.html")
@@ -324,6 +368,27 @@ class K6Analyzer:
             f.write(html_content)
         print(f"Relatório HTML gerado em: {report_path}")
 
+    def _requests(self, version):
+        """Frame por requisição da versão (memorizado na sessão de dados)."""
+        requests = self.session.requests(os.path.join(self.results_dir, f"{version}_Completo.json"))
+        return requests if requests is not None else to_request_frame(self.data[version])
+
+    def _interactive_section(self):
+        """Rollups, histogramas, fases e spans do CB do teste completo embutidos no HTML."""
+        versions = [v for v, df in self.data.items() if 'time' in df.columns]
+        if not USE_FAST_LOADER or not versions:
+            print("⚠️  Modo interativo requer o FastK6Loader; usando os gráficos estáticos")
+            self.generate_plots()
+            return None
+        data = build_report_data(
+            {v: self._requests(v) for v in versions},
+            "completo",
+            histograms={v: self.latency_histograms.get(v) for v in versions},
+            phases=get_phase_registry().phases("completo"),
+            colors=PALETTE,
+        )
+        return render_interactive_section(data)
+
     def plot_timeline(self, window_size='5s'):
         """
         Gera gráficos de série temporal para análise do comportamento ao longo do teste.
@@ -331,6 +396,9 @@ class K6Analyzer:
         
         Args:
             window_size: Janela de agregação para suavização (ex: '5s', '10s', '30s')
+        
+        No modo interativo só os CSVs (timeline_V*.csv, rolling_effects.csv) são
+        gravados; os PNGs ficam de fora.
         """
         print(f"Gerando análise de séries temporais (janela: {window_size})...")
         
@@ -362,18 +430,29 @@ class K6Analyzer:
             resampled['P95'] = req_duration['value'].resample(window_size).quantile(0.95)
             resampled['P99'] = req_duration['value'].resample(window_size).quantile(0.99)
             
+            # Salva dados da série temporal
+            resampled.to_csv(os.path.join(self.csv_dir, f"timeline_{version}.csv"))
+            if self.interactive:
+                continue
+            
             # Plot 1: Tempo de resposta ao longo do tempo
+            plt = _pyplot()
             fig, axes = plt.subplots(3, 1, figsize=(14, 12), sharex=True)
             
             # Subplot 1: Média e Percentis
             ax1 = axes[0]
-            ax1.plot(resampled.index, resampled['Média'], label='Média', color=PALETTE[version], linewidth=2)
-            ax1.fill_between(resampled.index, 
-                            resampled['Média'] - resampled['Desvio Padrão'],
-                            resampled['Média'] + resampled['Desvio Padrão'],
-                            alpha=0.3, color=PALETTE[version], label='±1 Desvio Padrão')
-            ax1.plot(resampled.index, resampled['P95'], '--', label='P95', color='orange', linewidth=1.5)
-            ax1.plot(resampled.index, resampled['P99'], ':', label='P99', color='red', linewidth=1.5)
+            plot_downsampled(ax1, resampled.index, resampled['Média'], label='Média',
+                             color=PALETTE[version], linewidth=2, dpi=TIMELINE_DPI)
+            fill_between_downsampled(ax1, resampled.index,
+                                     resampled['Média'] - resampled['Desvio Padrão'],
+                                     resampled['Média'] + resampled['Desvio Padrão'],
+                                     alpha=0.3, color=PALETTE[version], label='±1 Desvio Padrão',
+                                     dpi=TIMELINE_DPI)
+            # P95/P99: min/max por pixel para não perder picos
+            plot_downsampled(ax1, resampled.index, resampled['P95'], '--', label='P95', color='orange',
+                             linewidth=1.5, method='minmax', dpi=TIMELINE_DPI)
+            plot_downsampled(ax1, resampled.index, resampled['P99'], ':', label='P99', color='red',
+                             linewidth=1.5, method='minmax', dpi=TIMELINE_DPI)
             ax1.set_ylabel('Tempo de Resposta (ms)')
             ax1.set_title(f'{version} - Tempo de Resposta ao Longo do Teste')
             ax1.legend(loc='upper right')
@@ -381,8 +460,14 @@ class K6Analyzer:
             
             # Subplot 2: Throughput (requisições por janela)
             ax2 = axes[1]
-            ax2.bar(resampled.index, resampled['Contagem'], width=pd.Timedelta(window_size)*0.8,
-                   color=PALETTE[version], alpha=0.7, label='Requisições')
+            if len(resampled) > axes_pixel_width(ax2, TIMELINE_DPI) // 2:
+                # Mais janelas que pixels: envelope min/max em vez de uma barra por janela
+                fill_between_downsampled(ax2, resampled.index, resampled['Contagem'],
+                                         color=PALETTE[version], alpha=0.7, label='Requisições',
+                                         dpi=TIMELINE_DPI)
+            else:
+                ax2.bar(resampled.index, resampled['Contagem'], width=pd.Timedelta(window_size)*0.8,
+                       color=PALETTE[version], alpha=0.7, label='Requisições')
             ax2.set_ylabel('Requisições por Janela')
             ax2.set_title(f'{version} - Throughput')
             ax2.grid(True, alpha=0.3)
@@ -399,10 +484,12 @@ class K6Analyzer:
                 if '200' in success_rate.columns:
                     total_per_window = success_rate.sum(axis=1)
                     success_pct = (success_rate.get('200', 0) / total_per_window * 100).fillna(0)
-                    ax3.plot(success_pct.index, success_pct.values, color=PALETTE[version], linewidth=2)
+                    plot_downsampled(ax3, success_pct.index, success_pct.values, color=PALETTE[version],
+                                     linewidth=2, method='minmax', dpi=TIMELINE_DPI)
                     ax3.axhline(y=95, color='green', linestyle='--', alpha=0.5, label='SLA 95%')
                     ax3.axhline(y=99, color='blue', linestyle=':', alpha=0.5, label='SLA 99%')
-                    ax3.fill_between(success_pct.index, success_pct.values, alpha=0.3, color=PALETTE[version])
+                    fill_between_downsampled(ax3, success_pct.index, success_pct.values, alpha=0.3,
+                                             color=PALETTE[version], dpi=TIMELINE_DPI)
             
             ax3.set_ylabel('Taxa de Sucesso (%)')
             ax3.set_xlabel('Tempo')
@@ -412,14 +499,13 @@ class K6Analyzer:
             ax3.grid(True, alpha=0.3)
             
             plt.tight_layout()
-            plt.savefig(os.path.join(self.plots_dir, f"timeline_{version}.png"), dpi=150)
+            plt.savefig(os.path.join(self.plots_dir, f"timeline_{version}.png"), dpi=TIMELINE_DPI)
             plt.close()
-            
-            # Salva dados da série temporal
-            resampled.to_csv(os.path.join(self.csv_dir, f"timeline_{version}.csv"))
         
         # Gera plot comparativo V1 vs V2
-        self._plot_comparative_timeline(window_size)
+        if not self.interactive:
+            self._plot_comparative_timeline(window_size)
+        self.plot_rolling_effects()
         
         print("Análise de séries temporais concluída.")
 
@@ -427,6 +513,7 @@ class K6Analyzer:
         """
         Gera gráfico comparativo de V1 vs V2 ao longo do tempo.
         """
+        plt = _pyplot()
         fig, axes = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
         
         for version, df in self.data.items():
@@ -444,10 +531,10 @@ class K6Analyzer:
             resampled = req_duration['value'].resample(window_size).agg(['mean', 'median'])
             
             # Plot média
-            axes[0].plot(resampled.index, resampled['mean'], label=f'{version} - Média', 
-                        color=PALETTE[version], linewidth=2)
-            axes[1].plot(resampled.index, resampled['median'], label=f'{version} - Mediana', 
-                        color=PALETTE[version], linewidth=2)
+            plot_downsampled(axes[0], resampled.index, resampled['mean'], label=f'{version} - Média',
+                             color=PALETTE[version], linewidth=2, dpi=TIMELINE_DPI)
+            plot_downsampled(axes[1], resampled.index, resampled['median'], label=f'{version} - Mediana',
+                             color=PALETTE[version], linewidth=2, dpi=TIMELINE_DPI)
         
         axes[0].set_ylabel('Tempo Médio (ms)')
         axes[0].set_title('Comparação V1 vs V2 - Tempo de Resposta Médio')
@@ -461,7 +548,65 @@ class K6Analyzer:
         axes[1].grid(True, alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig(os.path.join(self.plots_dir, "timeline_comparison.png"), dpi=150)
+        plt.savefig(os.path.join(self.plots_dir, "timeline_comparison.png"), dpi=TIMELINE_DPI)
+        plt.close()
+
+    def plot_rolling_effects(self, window_s=DEFAULT_WINDOW_S, step_s=DEFAULT_STEP_S):
+        """
+        Effect sizes em janelas móveis (V1 vs cada versão): Cliff's delta,
+        diferença de medianas e de disponibilidade ao longo do teste.
+        
+        Complementa o Mann-Whitney/Cliff's delta global, que dilui efeitos
+        concentrados nas janelas de falha.
+        """
+        if not USE_FAST_LOADER or 'V1' not in self.data:
+            return
+        print(f"Calculando effect sizes em janelas móveis ({window_s:.0f}s, passo {step_s:.0f}s)...")
+        
+        frames = {version: self._requests(version) for version, df in self.data.items() if 'time' in df.columns}
+        reference = frames.get('V1')
+        if reference is None or reference.empty:
+            return
+        
+        timelines = []
+        for version, frame in frames.items():
+            if version == 'V1' or frame.empty:
+                continue
+            # Colunas genéricas (V1-Vx) para empilhar as comparações num só CSV
+            timeline = rolling_effects(reference, frame, window_s, step_s, labels=('V1', 'Vx'))
+            timeline.insert(0, 'Comparison', f'V1 vs {version}')
+            timelines.append(timeline)
+        if not timelines:
+            return
+        
+        timeline = pd.concat(timelines, ignore_index=True)
+        timeline.to_csv(os.path.join(self.csv_dir, "rolling_effects.csv"), index=False)
+        if self.interactive:
+            return
+        
+        plt = _pyplot()
+        fig, axes = plt.subplots(3, 1, figsize=(14, 12), sharex=True)
+        metrics = [
+            ("Cliff's Delta", "Cliff's Delta (V1 vs Vx)"),
+            ('Median Diff V1-Vx (ms)', 'Diferença de Mediana V1 - Vx (ms)'),
+            ('Availability Diff V1-Vx (pp)', 'Diferença de Disponibilidade V1 - Vx (p.p.)'),
+        ]
+        for comparison, group in timeline.groupby('Comparison', sort=False):
+            version = comparison.split(' vs ')[1]
+            center = (group['Window Start (s)'] + group['Window End (s)']) / 2
+            for ax, (column, _) in zip(axes, metrics):
+                plot_downsampled(ax, center.to_numpy(), group[column].to_numpy(), label=comparison,
+                                 color=PALETTE.get(version), linewidth=2, dpi=TIMELINE_DPI)
+        for ax, (_, title) in zip(axes, metrics):
+            ax.axhline(0, color='gray', linewidth=1, alpha=0.6)
+            ax.set_title(title)
+            ax.legend(loc='upper right')
+            ax.grid(True, alpha=0.3)
+        axes[0].set_ylim(-1.05, 1.05)
+        axes[-1].set_xlabel('Tempo desde o início do teste (s)')
+        
+        plt.tight_layout()
+        plt.savefig(os.path.join(self.plots_dir, "rolling_effects.png"), dpi=TIMELINE_DPI)
         plt.close()
 
     def statistical_analysis(self):
@@ -485,30 +630,43 @@ class K6Analyzer:
             print("Aviso: Dados insuficientes para análise estatística comparativa.")
             return
         
-        v1_times = self.response_times['V1']
-        v2_times = self.response_times['V2']
+        # Todas as linhas saem da mesma população: o histograma da ingestão
+        # (execução completa) quando o loader o gravou, senão o buffer ordenado
+        # (amostrado por reservoir acima de 100 MB). Nunca se misturam as duas.
+        v1_histogram = self._latency_histogram('V1')
+        v2_histogram = self._latency_histogram('V2')
+        full_run = all(v in self.latency_histograms for v in ('V1', 'V2'))
+        population = 'Execução completa (histograma da ingestão)' if full_run else 'Amostra (buffer carregado)'
         
-        # Teste de Mann-Whitney U (não paramétrico)
-        statistic_mw, p_value_mw = stats.mannwhitneyu(v1_times, v2_times, alternative='two-sided')
+        # Mann-Whitney U, KS e Cliff's Delta sobre histogramas alinhados (O(bins))
+        ranks = compare_histograms(v1_histogram, v2_histogram)
+        statistic_mw = ranks.u_statistic
+        p_value_mw = mann_whitney_p(v1_histogram, v2_histogram, ranks, 'two-sided')
         
         # Teste de Kolmogorov-Smirnov
-        statistic_ks, p_value_ks = stats.ks_2samp(v1_times, v2_times)
+        statistic_ks, p_value_ks = ks_2samp_histograms(v1_histogram, v2_histogram)
         
         # Effect Size: Cliff's Delta
-        cliffs_delta = self._cliffs_delta(v1_times, v2_times)
+        cliffs_delta = ranks.cliffs_delta
+        
+        # Bootstrap (multinomial sobre as contagens) da diferença de médias
+        ci_low, ci_high = self._bootstrap_ci(v1_histogram, v2_histogram, n_bootstrap=10000)
         
-        # Bootstrap para intervalo de confiança da diferença de médias
-        ci_low, ci_high = self._bootstrap_ci(v1_times, v2_times, n_bootstrap=10000)
+        # Diferença de cauda (P95/P99) com IC bootstrap sobre as estatísticas de ordem
+        tail_diffs = [quantile_diff_ci(v1_histogram, v2_histogram, q) for q in (0.95, 0.99)]
+        histograms = (v1_histogram, v2_histogram)
         
         # Estatísticas descritivas
         stats_results = {
             'Métrica': [
+                'População',
                 'N (V1)', 'N (V2)',
                 'Média (V1)', 'Média (V2)',
                 'Mediana (V1)', 'Mediana (V2)',
                 'Desvio Padrão (V1)', 'Desvio Padrão (V2)',
                 'P95 (V1)', 'P95 (V2)',
                 'P99 (V1)', 'P99 (V2)',
+                'Diferença P95 (V1-V2)', 'Diferença P99 (V1-V2)',
                 'Mann-Whitney U', 'p-valor (MW)',
                 'Kolmogorov-Smirnov', 'p-valor (KS)',
                 "Cliff's Delta", 'Interpretação Effect Size',
@@ -516,12 +674,14 @@ class K6Analyzer:
                 'Diferença Significativa (α=0.05)'
             ],
             'Valor': [
-                len(v1_times), len(v2_times),
-                f'{np.mean(v1_times):.2f} ms', f'{np.mean(v2_times):.2f} ms',
-                f'{np.median(v1_times):.2f} ms', f'{np.median(v2_times):.2f} ms',
-                f'{np.std(v1_times):.2f} ms', f'{np.std(v2_times):.2f} ms',
-                f'{np.percentile(v1_times, 95):.2f} ms', f'{np.percentile(v2_times, 95):.2f} ms',
-                f'{np.percentile(v1_times, 99):.2f} ms', f'{np.percentile(v2_times, 99):.2f} ms',
+                population,
+                v1_histogram.n, v2_histogram.n,
+                *(f'{h.mean:.2f} ms' for h in histograms),
+                *(f'{h.quantile(0.5):.2f} ms' for h in histograms),
+                *(f'{std(h):.2f} ms' for h in histograms),
+                *(f'{format_with_ci(h.quantile(q), *order_statistic_ci(h, q), decimals=2)} ms'
+                  for q in (0.95, 0.99) for h in histograms),
+                *(f'{format_with_ci(*diff, decimals=2)} ms' for diff in tail_diffs),
                 f'{statistic_mw:.2f}', f'{p_value_mw:.2e}',
                 f'{statistic_ks:.4f}', f'{p_value_ks:.2e}',
                 f'{cliffs_delta:.4f}', self._interpret_cliffs_delta(cliffs_delta),
@@ -533,8 +693,9 @@ class K6Analyzer:
         self.stats_df = pd.DataFrame(stats_results)
         self.stats_df.to_csv(os.path.join(self.csv_dir, "statistical_analysis.csv"), index=False)
         
-        # Gera visualização das distribuições
-        self._plot_distributions(v1_times, v2_times)
+        # Gera visualização das distribuições (no modo interativo o histograma vai no HTML)
+        if not self.interactive:
+            self._plot_distributions(v1_histogram, v2_histogram)
         
         print(f"\n=== Resultados da Análise Estatística ===")
         print(f"Mann-Whitney U: {statistic_mw:.2f}, p-valor: {p_value_mw:.2e}")
@@ -544,10 +705,26 @@ class K6Analyzer:
         
         return self.stats_df
 
+    def _latency_profile(self, version):
+        """Perfil de latência da versão (ordenado uma única vez e reaproveitado)."""
+        times = self.response_times[version]
+        profile = self.latency_profiles.get(version)
+        if profile is None or len(profile) != np.count_nonzero(~np.isnan(times)):
+            profile = LatencyProfile(times)
+            self.latency_profiles[version] = profile
+        return profile
+    
+    def _latency_histogram(self, version):
+        """Histograma da versão: o da ingestão (execução completa) ou o do perfil ordenado."""
+        histogram = self.latency_histograms.get(version)
+        if histogram is None:
+            histogram = LatencyHistogram.from_sorted(self._latency_profile(version).sorted)
+        return histogram
+    
     def _cliffs_delta(self, x, y):
         """
         Calcula Cliff's Delta - medida de effect size não paramétrica.
-        Usa versão vetorizada quando FastK6Loader está disponível.
+        Exato em O(n log n) via ranks (rank_stats), sem amostragem.
         
         Valores: [-1, 1], onde:
         - |d| < 0.147: negligível
@@ -555,14 +732,7 @@ class K6Analyzer:
         - |d| < 0.474: médio
         - |d| >= 0.474: grande
         """
-        if USE_FAST_LOADER:
-            return fast_cliffs_delta(x, y)
-        
-        # Fallback para implementação legada
-        n_x, n_y = len(x), len(y)
-        more = np.sum([np.sum(xi > y) for xi in x])
-        less = np.sum([np.sum(xi < y) for xi in x])
-        return (more - less) / (n_x * n_y)
+        return compare_ranks(x, y).cliffs_delta
 
     def _interpret_cliffs_delta(self, d):
         """Interpreta o valor de Cliff's Delta."""
@@ -579,34 +749,31 @@ class K6Analyzer:
     def _bootstrap_ci(self, x, y, n_bootstrap=10000, ci=0.95):
         """
         Calcula intervalo de confiança bootstrap para a diferença de médias.
-        Usa versão vetorizada quando FastK6Loader está disponível (~10x mais rápido).
+        Usa o motor em blocos (bootstrap.py): memória limitada, multi-processo
+        e determinístico pela semente. Histogramas são reamostrados por pesos
+        multinomiais sobre as contagens (equivalente a reamostrar os valores).
         """
-        if USE_FAST_LOADER:
-            return fast_bootstrap_ci(x, y, n_bootstrap=n_bootstrap, ci=ci)
-        
-        # Fallback para implementação legada
-        np.random.seed(42)
-        diff_means = []
-        for _ in range(n_bootstrap):
-            x_sample = np.random.choice(x, size=len(x), replace=True)
-            y_sample = np.random.choice(y, size=len(y), replace=True)
-            diff_means.append(np.mean(x_sample) - np.mean(y_sample))
-        
-        alpha = 1 - ci
-        lower = np.percentile(diff_means, alpha / 2 * 100)
-        upper = np.percentile(diff_means, (1 - alpha / 2) * 100)
-        return lower, upper
-
-    def _plot_distributions(self, v1_times, v2_times):
+        if isinstance(x, LatencyHistogram):
+            return bootstrap_diff_ci((x.values, x.counts), (y.values, y.counts), 'mean',
+                                     n_resamples=n_bootstrap, ci=ci, method='multinomial', seed=42)
+        return bootstrap_diff_ci(x, y, 'mean', n_resamples=n_bootstrap, ci=ci, seed=42)
+
+    def _plot_distributions(self, v1_histogram, v2_histogram):
         """
         Gera visualizações das distribuições de tempo de resposta.
+        
+        Tudo sai dos histogramas da execução completa (O(bins)): as caixas via
+        Axes.bxp, os violinos com KDE por FFT e o ECDF das contagens acumuladas.
         """
+        plt = _pyplot()
         fig, axes = plt.subplots(2, 2, figsize=(14, 10))
         
         # Histograma comparativo
         ax1 = axes[0, 0]
-        ax1.hist(v1_times, bins=50, alpha=0.5, label='V1', color=PALETTE['V1'], density=True)
-        ax1.hist(v2_times, bins=50, alpha=0.5, label='V2', color=PALETTE['V2'], density=True)
+        ax1.hist(v1_histogram.values, bins=50, weights=v1_histogram.counts, alpha=0.5, label='V1',
+                 color=PALETTE['V1'], density=True)
+        ax1.hist(v2_histogram.values, bins=50, weights=v2_histogram.counts, alpha=0.5, label='V2',
+                 color=PALETTE['V2'], density=True)
         ax1.set_xlabel('Tempo de Resposta (ms)')
         ax1.set_ylabel('Densidade')
         ax1.set_title('Distribuição de Tempos de Resposta')
@@ -614,8 +781,7 @@ class K6Analyzer:
         
         # Box plot
         ax2 = axes[0, 1]
-        data_bp = [v1_times, v2_times]
-        bp = ax2.boxplot(data_bp, labels=['V1', 'V2'], patch_artist=True)
+        bp = boxplot(ax2, [v1_histogram, v2_histogram], ['V1', 'V2'], patch_artist=True)
         bp['boxes'][0].set_facecolor(PALETTE['V1'])
         bp['boxes'][1].set_facecolor(PALETTE['V2'])
         for box in bp['boxes']:
@@ -625,7 +791,8 @@ class K6Analyzer:
         
         # Violin plot
         ax3 = axes[1, 0]
-        parts = ax3.violinplot([v1_times, v2_times], positions=[1, 2], showmeans=True, showmedians=True)
+        parts = violinplot(ax3, [v1_histogram, v2_histogram], positions=[1, 2],
+                           showmeans=True, showmedians=True)
         for i, pc in enumerate(parts['bodies']):
             pc.set_facecolor([PALETTE['V1'], PALETTE['V2']][i])
             pc.set_alpha(0.7)
@@ -636,12 +803,9 @@ class K6Analyzer:
         
         # ECDF (Empirical Cumulative Distribution Function)
         ax4 = axes[1, 1]
-        v1_sorted = np.sort(v1_times)
-        v2_sorted = np.sort(v2_times)
-        ax4.plot(v1_sorted, np.arange(1, len(v1_sorted)+1) / len(v1_sorted), 
-                label='V1', color=PALETTE['V1'], linewidth=2)
-        ax4.plot(v2_sorted, np.arange(1, len(v2_sorted)+1) / len(v2_sorted), 
-                label='V2', color=PALETTE['V2'], linewidth=2)
+        for version, histogram in (('V1', v1_histogram), ('V2', v2_histogram)):
+            plot_downsampled(ax4, *ecdf(histogram), label=version, color=PALETTE[version],
+                             linewidth=2, dpi=TIMELINE_DPI)
         ax4.set_xlabel('Tempo de Resposta (ms)')
         ax4.set_ylabel('Proporção Cumulativa')
         ax4.set_title('ECDF - Distribuição Cumulativa Empírica')
@@ -753,6 +917,7 @@ Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 - `plots/success_failure_rate.png`: Composição das respostas
 - `plots/timeline_V1.png` / `timeline_V2.png`: Séries temporais por versão
 - `plots/timeline_comparison.png`: Comparação temporal V1 vs V2
+- `plots/rolling_effects.png`: Cliff's delta, diferença de mediana e de disponibilidade em janelas móveis
 - `plots/distributions.png`: Análise de distribuições
 
 ## Interpretação
@@ -779,7 +944,9 @@ Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         Executa o pipeline completo de análise.
         
         Args:
-            include_timeline: Se True, gera análise de séries temporais
+            include_timeline: Se True, gera análise de séries temporais (CSVs sempre;
+                PNGs só fora do modo interativo, em que as linhas do tempo vão no
+                próprio relatório)
             include_stats: Se True, realiza análise estatística robusta
             export_latex: Se True, exporta resultados para LaTeX
         """
@@ -788,7 +955,8 @@ Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             print("Nenhum dado foi carregado. Abortando a análise.")
             return
         self.process_data()
-        self.generate_plots()
+        if not self.interactive:
+            self.generate_plots()
         
         if include_timeline:
             self.plot_timeline(window_size='5s')
@@ -804,5 +972,9 @@ Gerado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         print("\nAnálise concluída com sucesso!")
 
 if __name__ == "__main__":
-    analyzer = K6Analyzer(results_dir=RESULTS_DIR, output_dir=OUTPUT_DIR)
+    import sys
+
+    # --interactive: relatório com gráficos interativos (JSON embutido), sem PNGs
+    analyzer = K6Analyzer(results_dir=RESULTS_DIR, output_dir=OUTPUT_DIR,
+                          interactive='--interactive' in sys.argv[1:])
     analyzer.run_analysis()
@@ -0,0 +1,449 @@
+/*
+ * mini_charts.js — gráficos em <canvas> para os relatórios interativos
+ *
+ * Sem dependências e embutido no próprio HTML (interactive_report.py), então
+ * o relatório abre offline. Recursos:
+ *   - séries de linha/área com redução min/max por coluna de pixel no desenho;
+ *   - faixas de fundo (fases do cenário, estados do CB) com rótulo;
+ *   - zoom no eixo x arrastando o mouse, sincronizado entre gráficos do mesmo
+ *     grupo; duplo clique volta ao intervalo completo;
+ *   - tooltip com o valor de cada série na posição do mouse e legenda clicável.
+ */
+(function (global) {
+  'use strict';
+
+  var MARGIN = { left: 62, right: 16, top: 12, bottom: 30 };
+  var groups = {};
+
+  function niceStep(span, count) {
+    var raw = span / Math.max(count, 1);
+    var mag = Math.pow(10, Math.floor(Math.log(raw) / Math.LN10));
+    var norm = raw / mag;
+    return (norm < 1.5 ? 1 : norm < 3 ? 2 : norm < 7 ? 5 : 10) * mag;
+  }
+
+  function linearTicks(lo, hi, count) {
+    if (!(hi > lo)) return [lo];
+    var step = niceStep(hi - lo, count), out = [];
+    for (var v = Math.ceil(lo / step) * step; v <= hi + step * 1e-9; v += step) {
+      out.push(+v.toPrecision(12));
+    }
+    return out;
+  }
+
+  function logTicks(lo, hi) {
+    var out = [];
+    for (var e = Math.floor(Math.log(lo) / Math.LN10); e <= Math.ceil(Math.log(hi) / Math.LN10); e++) {
+      [1, 2, 5].forEach(function (m) {
+        var v = m * Math.pow(10, e);
+        if (v >= lo && v <= hi) out.push(v);
+      });
+    }
+    return out;
+  }
+
+  function formatTime(s) {
+    var sign = s < 0 ? '-' : '';
+    s = Math.abs(Math.round(s));
+    var m = Math.floor(s / 60), r = s % 60;
+    return sign + m + ':' + (r < 10 ? '0' : '') + r;
+  }
+
+  function formatNumber(v) {
+    if (v === null || v === undefined || isNaN(v)) return '–';
+    var a = Math.abs(v);
+    if (a >= 1e6) return (v / 1e6).toFixed(1) + 'M';
+    if (a >= 1e4) return (v / 1e3).toFixed(0) + 'k';
+    if (a >= 1e3) return (v / 1e3).toFixed(1) + 'k';
+    if (a >= 100 || a === 0) return v.toFixed(0);
+    if (a >= 1) return v.toFixed(1);
+    return v.toPrecision(2);
+  }
+
+  // Primeiro índice com x[i] >= value (x crescente)
+  function lowerBound(x, value) {
+    var lo = 0, hi = x.length;
+    while (lo < hi) {
+      var mid = (lo + hi) >> 1;
+      if (x[mid] < value) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+  }
+
+  function el(tag, style, text) {
+    var node = document.createElement(tag);
+    if (style) node.style.cssText = style;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  /*
+   * spec: { title, x, series: [{name, y, color, area}], bands: [{start, end, color, label}],
+   *         group, height, logX, xFormat: 'time'|'number', yLabel, yMin, yMax, unit }
+   */
+  function Chart(container, spec) {
+    var self = this;
+    this.spec = spec;
+    this.x = spec.x;
+    this.hidden = {};
+    this.full = [spec.x[0], spec.x[spec.x.length - 1]];
+    if (spec.bands) {
+      spec.bands.forEach(function (b) {
+        self.full[0] = Math.min(self.full[0], b.start);
+        self.full[1] = Math.max(self.full[1], b.end);
+      });
+    }
+    if (this.full[1] <= this.full[0]) this.full[1] = this.full[0] + 1;
+    this.view = this.full.slice();
+
+    this.root = el('div', 'position:relative;margin:18px 0 28px 0;');
+    this.root.appendChild(el('div', 'font-weight:600;color:#2c3e50;margin-bottom:4px;', spec.title));
+    this.canvas = el('canvas', 'width:100%;display:block;cursor:crosshair;');
+    this.root.appendChild(this.canvas);
+    this.tooltip = el('div', 'position:absolute;pointer-events:none;display:none;background:rgba(255,255,255,.95);' +
+      'border:1px solid #bbb;border-radius:4px;padding:4px 8px;font-size:12px;white-space:nowrap;z-index:5;');
+    this.root.appendChild(this.tooltip);
+    this.legend = el('div', 'font-size:12px;margin-top:4px;');
+    this.root.appendChild(this.legend);
+    container.appendChild(this.root);
+
+    this.buildLegend();
+    this.bindEvents();
+    if (spec.group) (groups[spec.group] = groups[spec.group] || []).push(this);
+    this.resize();
+    global.addEventListener('resize', function () { self.resize(); });
+  }
+
+  Chart.prototype.buildLegend = function () {
+    var self = this;
+    var items = this.spec.series.map(function (s) { return { name: s.name, color: s.color, series: true }; });
+    var seen = {};
+    (this.spec.bands || []).forEach(function (b) {
+      if (b.label && !seen[b.label]) {
+        seen[b.label] = true;
+        items.push({ name: b.label, color: b.color, series: false });
+      }
+    });
+    items.forEach(function (item) {
+      var entry = el('span', 'margin-right:14px;cursor:' + (item.series ? 'pointer' : 'default') + ';');
+      entry.appendChild(el('span', 'display:inline-block;width:12px;height:' + (item.series ? '3px' : '10px') +
+        ';vertical-align:middle;margin-right:4px;background:' + item.color + ';'));
+      entry.appendChild(document.createTextNode(item.name));
+      if (item.series) {
+        entry.addEventListener('click', function () {
+          self.hidden[item.name] = !self.hidden[item.name];
+          entry.style.opacity = self.hidden[item.name] ? 0.35 : 1;
+          self.draw();
+        });
+      }
+      self.legend.appendChild(entry);
+    });
+  };
+
+  Chart.prototype.resize = function () {
+    var ratio = global.devicePixelRatio || 1;
+    this.width = this.canvas.clientWidth || 800;
+    this.height = this.spec.height || 240;
+    this.canvas.style.height = this.height + 'px';
+    this.canvas.width = Math.round(this.width * ratio);
+    this.canvas.height = Math.round(this.height * ratio);
+    this.ctx = this.canvas.getContext('2d');
+    this.ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    this.draw();
+  };
+
+  Chart.prototype.tx = function (v) { return this.spec.logX ? Math.log(v) : v; };
+
+  Chart.prototype.sx = function (v) {
+    var lo = this.tx(this.view[0]), hi = this.tx(this.view[1]);
+    return MARGIN.left + (this.tx(v) - lo) / (hi - lo) * (this.width - MARGIN.left - MARGIN.right);
+  };
+
+  Chart.prototype.invertX = function (px) {
+    var lo = this.tx(this.view[0]), hi = this.tx(this.view[1]);
+    var t = lo + (px - MARGIN.left) / (this.width - MARGIN.left - MARGIN.right) * (hi - lo);
+    return this.spec.logX ? Math.exp(t) : t;
+  };
+
+  Chart.prototype.sy = function (v) {
+    var plot = this.height - MARGIN.top - MARGIN.bottom;
+    return MARGIN.top + plot - (v - this.yRange[0]) / (this.yRange[1] - this.yRange[0]) * plot;
+  };
+
+  Chart.prototype.visibleRange = function () {
+    return [Math.max(0, lowerBound(this.x, this.view[0]) - 1),
+            Math.min(this.x.length, lowerBound(this.x, this.view[1]) + 1)];
+  };
+
+  Chart.prototype.computeYRange = function (range) {
+    var lo = this.spec.yMin !== undefined ? this.spec.yMin : 0;
+    var hi = -Infinity, self = this;
+    this.spec.series.forEach(function (s) {
+      if (self.hidden[s.name]) return;
+      for (var i = range[0]; i < range[1]; i++) {
+        var v = s.y[i];
+        if (v !== null && v > hi) hi = v;
+      }
+    });
+    if (this.spec.yMax !== undefined) hi = this.spec.yMax;
+    if (!(hi > lo)) hi = lo + 1;
+    this.yRange = [lo, hi + (this.spec.yMax !== undefined ? 0 : (hi - lo) * 0.05)];
+  };
+
+  Chart.prototype.draw = function () {
+    var ctx = this.ctx, spec = this.spec, self = this;
+    if (!ctx) return;
+    var left = MARGIN.left, right = this.width - MARGIN.right;
+    var top = MARGIN.top, bottom = this.height - MARGIN.bottom;
+    var range = this.visibleRange();
+    this.computeYRange(range);
+    ctx.clearRect(0, 0, this.width, this.height);
+
+    ctx.save();
+    ctx.beginPath();
+    ctx.rect(left, top, right - left, bottom - top);
+    ctx.clip();
+
+    // Faixas de fundo (no mínimo 1 px, para spans curtos continuarem visíveis)
+    (spec.bands || []).forEach(function (b) {
+      if (b.end < self.view[0] || b.start > self.view[1]) return;
+      var x0 = self.sx(b.start), x1 = self.sx(b.end);
+      ctx.fillStyle = b.color;
+      ctx.fillRect(x0, top, Math.max(1, x1 - x0), bottom - top);
+      if (b.text && x1 - x0 > 40) {
+        ctx.fillStyle = '#555';
+        ctx.font = '11px sans-serif';
+        ctx.fillText(b.text, Math.max(x0, left) + 4, top + 12);
+      }
+    });
+
+    // Grade
+    ctx.strokeStyle = '#e5e5e5';
+    ctx.lineWidth = 1;
+    var xTicks = spec.logX ? logTicks(this.view[0], this.view[1])
+                           : linearTicks(this.view[0], this.view[1], Math.max(2, (right - left) / 90));
+    var yTicks = linearTicks(this.yRange[0], this.yRange[1], Math.max(2, (bottom - top) / 40));
+    ctx.beginPath();
+    xTicks.forEach(function (t) { var px = Math.round(self.sx(t)) + 0.5; ctx.moveTo(px, top); ctx.lineTo(px, bottom); });
+    yTicks.forEach(function (t) { var py = Math.round(self.sy(t)) + 0.5; ctx.moveTo(left, py); ctx.lineTo(right, py); });
+    ctx.stroke();
+
+    // Séries: min/max de cada coluna de pixel (o traço é o mesmo da série completa)
+    spec.series.forEach(function (s) {
+      if (self.hidden[s.name]) return;
+      var columns = [], column = null;
+      for (var i = range[0]; i < range[1]; i++) {
+        var v = s.y[i];
+        if (v === null) { column = null; columns.push(null); continue; }
+        var px = Math.round(self.sx(self.x[i]));
+        if (column && column.px === px) {
+          column.min = Math.min(column.min, v);
+          column.max = Math.max(column.max, v);
+          column.last = v;
+        } else {
+          column = { px: px, first: v, min: v, max: v, last: v };
+          columns.push(column);
+        }
+      }
+      ctx.strokeStyle = s.color;
+      ctx.lineWidth = 1.4;
+      var runs = [], run = [];
+      columns.forEach(function (c) {
+        if (c === null) { if (run.length) runs.push(run); run = []; } else run.push(c);
+      });
+      if (run.length) runs.push(run);
+      runs.forEach(function (points) {
+        ctx.beginPath();
+        points.forEach(function (c, k) {
+          if (k === 0) ctx.moveTo(c.px, self.sy(c.first)); else ctx.lineTo(c.px, self.sy(c.first));
+          if (c.min !== c.max) { ctx.lineTo(c.px, self.sy(c.min)); ctx.lineTo(c.px, self.sy(c.max)); }
+          ctx.lineTo(c.px, self.sy(c.last));
+        });
+        ctx.stroke();
+        if (s.area) {
+          ctx.lineTo(points[points.length - 1].px, self.sy(Math.max(self.yRange[0], 0)));
+          ctx.lineTo(points[0].px, self.sy(Math.max(self.yRange[0], 0)));
+          ctx.closePath();
+          ctx.globalAlpha = 0.18;
+          ctx.fillStyle = s.color;
+          ctx.fill();
+          ctx.globalAlpha = 1;
+        }
+      });
+    });
+
+    if (this.selection) {
+      ctx.fillStyle = 'rgba(52, 152, 219, 0.2)';
+      var a = Math.min(this.selection[0], this.selection[1]);
+      ctx.fillRect(a, top, Math.abs(this.selection[1] - this.selection[0]), bottom - top);
+    }
+    ctx.restore();
+
+    // Eixos
+    ctx.strokeStyle = '#888';
+    ctx.strokeRect(left + 0.5, top + 0.5, right - left, bottom - top);
+    ctx.fillStyle = '#444';
+    ctx.font = '11px sans-serif';
+    ctx.textAlign = 'center';
+    xTicks.forEach(function (t) {
+      ctx.fillText(spec.xFormat === 'time' ? formatTime(t) : formatNumber(t), self.sx(t), bottom + 14);
+    });
+    ctx.textAlign = 'right';
+    yTicks.forEach(function (t) { ctx.fillText(formatNumber(t), left - 6, self.sy(t) + 4); });
+    if (spec.yLabel) {
+      ctx.save();
+      ctx.translate(12, (top + bottom) / 2);
+      ctx.rotate(-Math.PI / 2);
+      ctx.textAlign = 'center';
+      ctx.fillText(spec.yLabel, 0, 0);
+      ctx.restore();
+    }
+    if (spec.xLabel) {
+      ctx.textAlign = 'right';
+      ctx.fillText(spec.xLabel, right, this.height - 3);
+    }
+    ctx.textAlign = 'left';
+  };
+
+  Chart.prototype.setView = function (view) {
+    this.view = [Math.max(this.full[0], view[0]), Math.min(this.full[1], view[1])];
+    this.draw();
+  };
+
+  Chart.prototype.broadcast = function (view) {
+    var peers = this.spec.group ? groups[this.spec.group] : [this];
+    peers.forEach(function (chart) { chart.setView(view); });
+  };
+
+  Chart.prototype.showTooltip = function (px, py) {
+    var spec = this.spec, self = this;
+    var value = this.invertX(px);
+    var i = Math.min(this.x.length - 1, lowerBound(this.x, value));
+    if (i > 0 && Math.abs(this.x[i - 1] - value) < Math.abs(this.x[i] - value)) i -= 1;
+    var lines = [(spec.xFormat === 'time' ? 't = ' + formatTime(this.x[i]) : formatNumber(this.x[i]) + (spec.xUnit || ''))];
+    (spec.bands || []).forEach(function (b) {
+      if (b.label && self.x[i] >= b.start && self.x[i] < b.end) lines.push(b.label + (b.text ? ': ' + b.text : ''));
+    });
+    spec.series.forEach(function (s) {
+      if (!self.hidden[s.name]) {
+        lines.push('<span style="color:' + s.color + '">■</span> ' + s.name + ': ' +
+                   formatNumber(s.y[i]) + (spec.unit || ''));
+      }
+    });
+    this.tooltip.innerHTML = lines.join('<br>');
+    this.tooltip.style.display = 'block';
+    var left = px + 14;
+    if (left + this.tooltip.offsetWidth > this.width) left = px - this.tooltip.offsetWidth - 14;
+    this.tooltip.style.left = left + 'px';
+    this.tooltip.style.top = (py + 24) + 'px';
+  };
+
+  Chart.prototype.bindEvents = function () {
+    var self = this, canvas = this.canvas, dragStart = null;
+    function position(event) {
+      var rect = canvas.getBoundingClientRect();
+      return [event.clientX - rect.left, event.clientY - rect.top];
+    }
+    canvas.addEventListener('mousedown', function (event) {
+      dragStart = position(event)[0];
+      self.selection = [dragStart, dragStart];
+    });
+    canvas.addEventListener('mousemove', function (event) {
+      var p = position(event);
+      if (dragStart !== null) {
+        self.selection[1] = p[0];
+        self.tooltip.style.display = 'none';
+        self.draw();
+      } else if (p[0] >= MARGIN.left && p[0] <= self.width - MARGIN.right) {
+        self.showTooltip(p[0], p[1]);
+      } else {
+        self.tooltip.style.display = 'none';
+      }
+    });
+    global.addEventListener('mouseup', function () {
+      if (dragStart === null) return;
+      var a = Math.min(self.selection[0], self.selection[1]);
+      var b = Math.max(self.selection[0], self.selection[1]);
+      dragStart = null;
+      self.selection = null;
+      if (b - a > 5) self.broadcast([self.invertX(a), self.invertX(b)]); else self.draw();
+    });
+    canvas.addEventListener('mouseleave', function () { self.tooltip.style.display = 'none'; });
+    canvas.addEventListener('dblclick', function () { self.broadcast(self.full); });
+  };
+
+  /* ------------------------------------------------------------------ */
+  /* Relatório: monta os gráficos a partir do JSON de interactive_report */
+  /* ------------------------------------------------------------------ */
+
+  var PHASE_COLORS = {
+    warmup: 'rgba(149, 165, 166, 0.10)', normal: 'rgba(46, 204, 113, 0.07)',
+    failure: 'rgba(231, 76, 60, 0.10)', recovery: 'rgba(52, 152, 219, 0.10)',
+    cooldown: 'rgba(149, 165, 166, 0.10)'
+  };
+  var CB_COLORS = { OPEN: 'rgba(230, 126, 34, 0.35)', HALF_OPEN: 'rgba(241, 196, 15, 0.35)' };
+
+  // Alinha as séries das versões num eixo x comum (janelas têm o mesmo tamanho)
+  function alignedSeries(data, field, transform) {
+    var versions = Object.keys(data.versions), length = 0;
+    versions.forEach(function (v) { length = Math.max(length, data.versions[v].requests.length); });
+    var x = [];
+    for (var i = 0; i < length; i++) x.push(i * data.bucket_s);
+    var series = versions.map(function (v) {
+      var run = data.versions[v], y = new Array(length);
+      for (var k = 0; k < length; k++) y[k] = k < run.requests.length ? transform(run, k, field) : null;
+      return { name: v, color: data.colors[v] || '#7f8c8d', y: y };
+    });
+    return { x: x, series: series };
+  }
+
+  function field(run, k, name) { return run[name][k]; }
+
+  function renderReport(root, data) {
+    var phaseBands = (data.phases || []).map(function (p) {
+      return { start: p.start, end: p.end, color: PHASE_COLORS[p.kind] || PHASE_COLORS.normal,
+               label: 'Fase', text: p.name };
+    });
+    var cbBands = [];
+    Object.keys(data.cb_spans || {}).forEach(function (version) {
+      data.cb_spans[version].forEach(function (span) {
+        cbBands.push({ start: span[1], end: span[2], color: CB_COLORS[span[0]],
+                       label: 'CB ' + span[0] + ' (' + version + ')' });
+      });
+    });
+    var bucket = data.bucket_s === 1 ? 'por segundo' : 'por janela de ' + data.bucket_s + ' s';
+    var timelines = [
+      { title: 'Requisições ' + bucket, field: 'requests', yLabel: 'requisições', bands: phaseBands },
+      { title: 'Latência média ' + bucket + ' (ms)', field: 'mean_ms', yLabel: 'ms', unit: ' ms', bands: phaseBands },
+      { title: 'Latência máxima ' + bucket + ' (ms)', field: 'max_ms', yLabel: 'ms', unit: ' ms', bands: phaseBands },
+      { title: 'Disponibilidade (200 + 202) ' + bucket, field: 'availability', yLabel: '%', unit: ' %',
+        yMax: 100, bands: phaseBands.concat(cbBands) },
+      { title: 'Rejeições rápidas do CB (202/503) ' + bucket, field: 'rejected', yLabel: 'requisições',
+        bands: cbBands }
+    ];
+    root.appendChild(el('p', 'font-size:13px;color:#666;',
+      'Arraste sobre um gráfico para ampliar um trecho (todas as linhas do tempo acompanham); ' +
+      'duplo clique volta ao teste completo. Clique na legenda para ocultar uma versão.'));
+    timelines.forEach(function (t) {
+      var aligned = alignedSeries(data, t.field, field);
+      new Chart(root, { title: t.title, x: aligned.x, series: aligned.series, bands: t.bands,
+                        group: 'timeline', xFormat: 'time', xLabel: 'tempo (min:s)', yLabel: t.yLabel,
+                        unit: t.unit, yMax: t.yMax });
+    });
+
+    var withHistogram = Object.keys(data.versions).filter(function (v) { return data.versions[v].hist; });
+    if (withHistogram.length && data.hist_edges) {
+      var edges = data.hist_edges, centers = [];
+      for (var i = 0; i + 1 < edges.length; i++) centers.push(Math.sqrt(edges[i] * edges[i + 1]));
+      new Chart(root, {
+        title: 'Distribuição de latência (% das requisições por faixa, escala log)',
+        x: centers, logX: true, xFormat: 'number', xUnit: ' ms', xLabel: 'latência (ms)', yLabel: '%', unit: ' %',
+        series: withHistogram.map(function (v) {
+          return { name: v, color: data.colors[v] || '#7f8c8d', y: data.versions[v].hist, area: true };
+        })
+      });
+    }
+  }
+
+  global.MiniCharts = { Chart: Chart, renderReport: renderReport };
+})(window);
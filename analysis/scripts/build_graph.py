@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Build incremental dos artefatos da análise
+
+O run_everything.sh reexecuta todos os analisadores, gráficos e relatórios
+mesmo quando só o NDJSON de um cenário mudou. Aqui cada artefato (cache
+Parquet, `<cenário>_status.csv`, PNGs, relatório HTML, tabelas LaTeX) é um
+alvo declarado com as suas entradas e saídas:
+
+- as dependências entre alvos saem das próprias declarações (um alvo depende
+  de quem produz uma das suas entradas);
+- cada entrada é identificada pela impressão digital (mtime, tamanho), gravada
+  em `analysis_results/.build_state.json` ao fim de cada alvo;
+- um alvo é reconstruído só se for novo, se alguma saída faltar, se a receita
+  (comando) mudou ou se alguma entrada mudou — o que inclui saídas de alvos
+  reconstruídos antes dele;
+- alvos independentes rodam em paralelo (cada comando é um subprocesso; a
+  saída vai para `analysis_results/.build_logs/<alvo>.log`).
+
+Adicionar um cenário reconstrói só o cache e a análise dele e os agregados
+(gráficos finais, tabelas, estatística), não o pipeline inteiro.
+
+    python3 analysis/scripts/build_graph.py              # tudo o que estiver desatualizado
+    python3 analysis/scripts/build_graph.py --dry-run    # só lista o que seria reconstruído
+    python3 analysis/scripts/build_graph.py final_charts --jobs 4
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from load_amplification_analysis import ACQUIRER_FILE, PROMETHEUS_EXPORT_DIR
+from load_amplification_analysis import SCENARIOS as FAILURE_SCENARIOS
+from phases import MONITOR_SUFFIX, SCENARIO_SCRIPTS
+from phases import SCRIPTS_DIR as K6_SCRIPTS_DIR
+from rollups import K6_RESULTS_DIR, VERSION_PATTERN
+
+SCRIPTS_DIR = "analysis/scripts"
+SCENARIO_RESULTS_DIR = os.path.join(K6_RESULTS_DIR, "scenarios")
+ANALYSIS_DIR = "analysis_results"
+SCENARIO_CSV_DIR = os.path.join(ANALYSIS_DIR, "scenarios", "csv")
+STATE_FILE = os.path.join(ANALYSIS_DIR, ".build_state.json")
+LOG_DIR = os.path.join(ANALYSIS_DIR, ".build_logs")
+STATE_VERSION = 1
+# Linhas finais do log exibidas quando um alvo falha
+FAILURE_LOG_LINES = 15
+
+Action = Union[Sequence[str], Callable[[], None]]
+Fingerprint = Optional[Tuple[int, int]]
+
+
+@dataclass(frozen=True)
+class Target:
+    """Um artefato (ou grupo de artefatos gerados juntos) e como produzi-lo."""
+    name: str
+    action: Action
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+    @property
+    def recipe(self) -> str:
+        if callable(self.action):
+            return f"{self.action.__module__}.{self.action.__qualname__}"
+        return " ".join(str(part) for part in self.action)
+
+
+@dataclass(frozen=True)
+class TargetResult:
+    name: str
+    status: str              # 'atualizado', 'reconstruído', 'desatualizado', 'falhou', 'ignorado'
+    reason: str = ""
+    elapsed_s: float = 0.0
+
+
+def fingerprint(path: Path) -> Fingerprint:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class BuildGraph:
+    """Grafo de alvos com detecção de alvos desatualizados por impressão digital."""
+
+    def __init__(self, targets: List[Target], root: str = ".", state_file: str = STATE_FILE,
+                 log_dir: str = LOG_DIR):
+        self.root = Path(root)
+        self.targets = {t.name: t for t in targets}
+        if len(self.targets) != len(targets):
+            raise ValueError("nomes de alvo duplicados")
+        self.state_path = self.root / state_file
+        self.log_dir = self.root / log_dir
+
+        producers: Dict[str, str] = {}
+        for target in targets:
+            for output in target.outputs:
+                if output in producers:
+                    raise ValueError(f"{output} é produzido por {producers[output]} e {target.name}")
+                producers[output] = target.name
+        self.deps = {t.name: sorted({producers[i] for i in t.inputs if i in producers} - {t.name})
+                     for t in targets}
+        self.order = self._topological_order()
+        self._lock = threading.Lock()
+
+    def _topological_order(self) -> List[str]:
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"ciclo de dependências: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.deps[name]:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.targets:
+            visit(name, [])
+        return order
+
+    def closure(self, names: Optional[List[str]] = None) -> List[str]:
+        """Alvos pedidos e todas as suas dependências, em ordem topológica."""
+        if not names:
+            return list(self.order)
+        unknown = [n for n in names if n not in self.targets]
+        if unknown:
+            raise KeyError(f"alvos desconhecidos: {', '.join(unknown)}")
+        wanted: Set[str] = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name not in wanted:
+                wanted.add(name)
+                stack.extend(self.deps[name])
+        return [name for name in self.order if name in wanted]
+
+    # --- Estado ---------------------------------------------------------
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            return state["targets"] if state.get("version") == STATE_VERSION else {}
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _save_state(self, state: Dict):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": STATE_VERSION, "targets": state}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def _input_fingerprints(self, target: Target) -> Dict[str, Fingerprint]:
+        return {path: fingerprint(self.root / path) for path in target.inputs}
+
+    def stale_reason(self, target: Target, state: Dict) -> Optional[str]:
+        """Motivo para reconstruir o alvo, ou None se está atualizado."""
+        previous = state.get(target.name)
+        if previous is None:
+            return "novo"
+        missing = [o for o in target.outputs if not (self.root / o).exists()]
+        if missing:
+            return f"saída ausente: {missing[0]}"
+        if previous.get("recipe") != target.recipe:
+            return "receita alterada"
+        recorded = {path: tuple(fp) if fp else None for path, fp in previous.get("inputs", {}).items()}
+        for path, current in self._input_fingerprints(target).items():
+            if recorded.get(path, "ausente") != current:
+                return f"entrada alterada: {path}"
+        return None
+
+    # --- Execução -------------------------------------------------------
+
+    def _run_action(self, target: Target) -> Optional[str]:
+        """Executa a ação; devolve a mensagem de erro ou None."""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', target.name)}.log"
+        if callable(target.action):
+            try:
+                target.action()
+                return None
+            except Exception as e:
+                return f"{type(e).__name__}: {e}"
+        with open(log_path, "w") as log:
+            process = subprocess.run(list(target.action), cwd=self.root, stdout=log,
+                                     stderr=subprocess.STDOUT)
+        if process.returncode != 0:
+            tail = log_path.read_text(errors="replace").splitlines()[-FAILURE_LOG_LINES:]
+            return f"código de saída {process.returncode} ({log_path})\n    " + "\n    ".join(tail)
+        return None
+
+    def _build_one(self, target: Target, state: Dict, force: bool) -> TargetResult:
+        missing = [i for i in target.inputs if not (self.root / i).exists()]
+        if missing:
+            return TargetResult(target.name, "ignorado", f"entrada ausente: {missing[0]}")
+        reason = "forçado" if force else self.stale_reason(target, state)
+        if reason is None:
+            return TargetResult(target.name, "atualizado")
+
+        start = time.time()
+        inputs = self._input_fingerprints(target)
+        error = self._run_action(target)
+        if error is None:
+            absent = [o for o in target.outputs if not (self.root / o).exists()]
+            if absent:
+                error = f"saída não gerada: {absent[0]}"
+        elapsed = time.time() - start
+        if error is not None:
+            return TargetResult(target.name, "falhou", error, elapsed)
+
+        with self._lock:
+            state[target.name] = {"recipe": target.recipe, "inputs": inputs, "built_at": time.time()}
+            self._save_state(state)
+        return TargetResult(target.name, "reconstruído", reason, elapsed)
+
+    def build(self, names: Optional[List[str]] = None, jobs: Optional[int] = None,
+              force: bool = False, dry_run: bool = False) -> List[TargetResult]:
+        """
+        Reconstrói os alvos desatualizados (e as dependências), em paralelo.
+
+        Args:
+            names: Alvos a construir (default: todos)
+            jobs: Alvos simultâneos (default: os.cpu_count())
+            force: Reconstrói mesmo os atualizados
+            dry_run: Só informa o que seria reconstruído
+        """
+        order = self.closure(names)
+        state = self._load_state()
+        if dry_run:
+            return self._plan(order, state, force)
+
+        results: Dict[str, TargetResult] = {}
+        pending = list(order)
+        running = {}
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = self.deps[name]
+                    if any(d in pending or d in running.values() for d in deps if d in order):
+                        continue
+                    pending.remove(name)
+                    failed = [d for d in deps if d in results and results[d].status in ("falhou", "ignorado")]
+                    if failed:
+                        results[name] = TargetResult(name, "ignorado", f"dependência falhou: {failed[0]}")
+                        print(f"  ⏭️  {name} (dependência falhou: {failed[0]})")
+                        continue
+                    running[pool.submit(self._build_one, self.targets[name], state, force)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results[running.pop(future)] = result
+                    _print_result(result)
+        return [results[name] for name in order]
+
+    def _plan(self, order: List[str], state: Dict, force: bool) -> List[TargetResult]:
+        """Dry-run: alvos desatualizados e os que dependem deles."""
+        stale: Set[str] = set()
+        results = []
+        for name in order:
+            target = self.targets[name]
+            reason = "forçado" if force else self.stale_reason(target, state)
+            upstream = [d for d in self.deps[name] if d in stale]
+            if reason is None and upstream:
+                reason = f"dependência reconstruída: {upstream[0]}"
+            if reason is None:
+                results.append(TargetResult(name, "atualizado"))
+            else:
+                stale.add(name)
+                results.append(TargetResult(name, "desatualizado", reason))
+        return results
+
+
+def _print_result(result: TargetResult):
+    icons = {"reconstruído": "🔨", "atualizado": "✅", "falhou": "❌", "ignorado": "⏭️ "}
+    detail = f" ({result.reason})" if result.reason else ""
+    timing = f" em {result.elapsed_s:.1f}s" if result.elapsed_s else ""
+    print(f"  {icons.get(result.status, '•')} {result.name}: {result.status}{timing}{detail}")
+
+
+# --- Alvos do pipeline --------------------------------------------------
+
+def _python(script: str, *args: str) -> Tuple[str, ...]:
+    return (sys.executable, os.path.join(SCRIPTS_DIR, script), *args)
+
+
+def _cache_outputs(json_path: str) -> Tuple[str, ...]:
+    directory, stem = os.path.dirname(json_path), Path(json_path).stem
+    cache = os.path.join(directory, ".cache", stem)
+    return (f"{cache}.parquet", f"{cache}.stats.json", f"{cache}.hist.npz")
+
+
+def _consolidate_benefits(root: str = "."):
+    """consolidated_benefits.csv a partir dos benefits de cada cenário."""
+    import pandas as pd
+    from results_registry import get_registry
+
+    registry = get_registry(os.path.join(root, SCENARIO_CSV_DIR))
+    tables = [registry.table(s, "benefits") for s in registry.scenarios("benefits")]
+    pd.concat(tables, ignore_index=True).to_csv(
+        os.path.join(root, SCENARIO_CSV_DIR, "consolidated_benefits.csv"), index=False)
+
+
+def pipeline_targets(root: str = ".") -> List[Target]:
+    """Alvos do pipeline de análise a partir dos resultados k6 presentes."""
+    base = Path(root)
+    scenario_re = re.compile(rf"^(?P<scenario>.+?)_(?P<version>{VERSION_PATTERN})$")
+    complete_re = re.compile(rf"^(?P<version>{VERSION_PATTERN})_Completo$")
+
+    targets: List[Target] = []
+    caches: Dict[str, Tuple[str, ...]] = {}
+    scenarios: Dict[str, Dict[str, str]] = {}
+    complete: Dict[str, str] = {}
+
+    json_files = sorted(base.glob(f"{K6_RESULTS_DIR}/*.json")) + sorted(base.glob(f"{SCENARIO_RESULTS_DIR}/*.json"))
+    for path in json_files:
+        rel = path.relative_to(base).as_posix()
+        stem = path.stem
+        if stem.endswith(("_summary", MONITOR_SUFFIX)):
+            continue
+        match = complete_re.match(stem) if path.parent == base / K6_RESULTS_DIR else None
+        if match:
+            complete[match.group("version")] = rel
+        else:
+            match = scenario_re.match(stem) if path.parent == base / SCENARIO_RESULTS_DIR else None
+            if not match:
+                continue
+            scenarios.setdefault(match.group("scenario"), {})[match.group("version")] = rel
+        caches[rel] = _cache_outputs(rel)
+        targets.append(Target(f"cache:{stem}", _python("fast_loader.py", rel),
+                              (rel, f"{SCRIPTS_DIR}/fast_loader.py"), caches[rel]))
+
+    all_caches = tuple(o for outputs in caches.values() for o in outputs)
+    scenario_tables: Dict[str, Dict[str, str]] = {}
+    for scenario, runs in sorted(scenarios.items()):
+        kinds = ["status", "response"] + (["benefits"] if {"V1", "V2"} <= set(runs) else [])
+        tables = {kind: f"{SCENARIO_CSV_DIR}/{scenario}_{kind}.csv" for kind in kinds}
+        scenario_tables[scenario] = tables
+        inputs = tuple(o for rel in runs.values() for o in (rel, *caches[rel]))
+        targets.append(Target(
+            f"scenario:{scenario}", _python("scenario_analyzer.py", scenario, "--no-consolidated"),
+            inputs + (f"{SCRIPTS_DIR}/scenario_analyzer.py",),
+            tuple(tables.values()) + (f"{ANALYSIS_DIR}/scenarios/{scenario}_report.html",),
+        ))
+
+    all_tables = tuple(t for tables in scenario_tables.values() for t in tables.values())
+    benefits = tuple(tables["benefits"] for tables in scenario_tables.values() if "benefits" in tables)
+    if benefits:
+        targets.append(Target("consolidated_benefits", lambda: _consolidate_benefits(root), benefits,
+                              (f"{SCENARIO_CSV_DIR}/consolidated_benefits.csv",)))
+        targets.append(Target(
+            "final_charts", _python("generate_final_charts.py"),
+            all_tables + (f"{SCRIPTS_DIR}/generate_final_charts.py",),
+            tuple(f"{ANALYSIS_DIR}/final_charts/{name}" for name in (
+                "01_success_rates_comparison.png", "02_failure_reduction.png",
+                "03_response_time_percentiles.png", "04_throughput_comparison.png",
+                "05_status_distribution.png", "06_consolidated_metrics_radar.png",
+                "07_catastrofe_timeline.png", "08_fallback_contribution.png",
+                "09_avg_response_times.png", "10_error_rates.png",
+                "11_downtime_availability.png", "summary_table.csv", "summary_table.md")),
+        ))
+    if all(scenario_tables.get(s, {}).get("benefits") for s in ("rajadas", "catastrofe")):
+        targets.append(Target(
+            "comparison_charts", _python("generate_comparison_charts.py"),
+            tuple(scenario_tables["rajadas"].values()) + tuple(scenario_tables["catastrofe"].values())
+            + (f"{SCRIPTS_DIR}/generate_comparison_charts.py",),
+            tuple(f"{ANALYSIS_DIR}/comparison_charts/{name}" for name in (
+                "01_v1_v2_success_rate_comparison.png", "02_response_composition.png",
+                "03_failure_reduction.png", "04_downtime_comparison.png",
+                "05_combined_summary.png", "README.md")),
+        ))
+    latex_scenarios = [s for s in ("catastrofe", "degradacao", "indisponibilidade", "rajadas")
+                       if s in scenario_tables]
+    if latex_scenarios:
+        targets.append(Target(
+            "latex_tables", _python("export_latex_tables.py"),
+            tuple(t for s in latex_scenarios for t in scenario_tables[s].values())
+            + (f"{SCRIPTS_DIR}/export_latex_tables.py",),
+            ("artigo_latex/tables/comprehensive_results.tex", "artigo_latex/tables/tail_latency.tex"),
+        ))
+
+    if complete:
+        inputs = tuple(o for rel in complete.values() for o in (rel, *caches[rel]))
+        targets.append(Target(
+            "complete_analysis", _python("analyzer.py"), inputs + (f"{SCRIPTS_DIR}/analyzer.py",),
+            (f"{ANALYSIS_DIR}/analysis_report.html", f"{ANALYSIS_DIR}/csv/summary_analysis.csv"),
+        ))
+
+    if caches:
+        targets.append(Target(
+            "statistics", _python("statistical_analysis.py", "--results-dir", K6_RESULTS_DIR,
+                                  "--output-dir", f"{ANALYSIS_DIR}/statistics"),
+            all_caches + (f"{SCRIPTS_DIR}/statistical_analysis.py",),
+            (f"{ANALYSIS_DIR}/statistics/csv/statistical_tests_results.csv",
+             f"{ANALYSIS_DIR}/statistics/statistical_summary.md"),
+        ))
+    if any(v.startswith("V2") for runs in [*scenarios.values(), complete] for v in runs):
+        targets.append(Target(
+            "cb_state", _python("cb_state_analysis.py"),
+            all_caches + (f"{SCRIPTS_DIR}/cb_state_analysis.py",),
+            tuple(f"{ANALYSIS_DIR}/csv/cb_state_{name}.csv"
+                  for name in ("spans", "transitions", "episodes", "summary")),
+        ))
+    failure_runs = {s: runs for s, runs in scenarios.items() if s in FAILURE_SCENARIOS}
+    # Janelas de falha e fases vêm dos scripts k6 de cada cenário
+    phase_scripts = tuple(f"{K6_SCRIPTS_DIR}/{SCENARIO_SCRIPTS[s]}" for s in sorted(failure_runs))
+    if failure_runs:
+        targets.append(Target(
+            "recovery", _python("analyze_recovery_time.py"),
+            all_caches + phase_scripts + (f"{SCRIPTS_DIR}/analyze_recovery_time.py",),
+            (f"{ANALYSIS_DIR}/csv/recovery_analysis.csv", f"{ANALYSIS_DIR}/csv/recovery_curves.csv"),
+        ))
+    amplified = [s for s, runs in failure_runs.items() if {"V1", "V3"} <= set(runs)]
+    if amplified:
+        exports = tuple(
+            path for s in amplified for v in ("V1", "V3")
+            for path in [f"{PROMETHEUS_EXPORT_DIR}/{ACQUIRER_FILE.format(scenario=s, version=v)}"]
+            if (base / path).exists())
+        targets.append(Target(
+            "load_amplification", _python("load_amplification_analysis.py"),
+            all_caches + phase_scripts + exports + (f"{SCRIPTS_DIR}/load_amplification_analysis.py",),
+            tuple(f"{ANALYSIS_DIR}/csv/load_amplification{suffix}.csv"
+                  for suffix in ("", "_windows", "_phases")),
+        ))
+    return targets
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build incremental dos artefatos da análise")
+    parser.add_argument("targets", nargs="*", help="Alvos a construir (default: todos)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Alvos simultâneos (default: CPUs)")
+    parser.add_argument("--force", action="store_true", help="Reconstrói mesmo os alvos atualizados")
+    parser.add_argument("--dry-run", action="store_true", help="Só lista o que seria reconstruído")
+    parser.add_argument("--list", action="store_true", help="Lista alvos, entradas e saídas")
+    args = parser.parse_args()
+
+    graph = BuildGraph(pipeline_targets())
+    if args.list:
+        for name in graph.order:
+            target = graph.targets[name]
+            deps = ", ".join(graph.deps[name]) or "-"
+            print(f"{name}\n  depende de: {deps}\n  saídas: {', '.join(target.outputs)}")
+        return 0
+
+    print("=" * 60)
+    print(f"  BUILD INCREMENTAL - {len(graph.targets)} alvos")
+    print("=" * 60)
+    start = time.time()
+    results = graph.build(args.targets or None, args.jobs, args.force, args.dry_run)
+    if args.dry_run:
+        for result in results:
+            _print_result(result)
+
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    print("\n" + " | ".join(f"{status}: {n}" for status, n in sorted(counts.items()))
+          + f" | {time.time() - start:.1f}s")
+    return 1 if counts.get("falhou") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Reconstrução do estado do Circuit Breaker (V2) a partir das respostas
+
+Em vez de adivinhar períodos OPEN pela latência média agregada em 5 s, o
+estado é inferido por janela de 1 s a partir do status e da latência de cada
+requisição (rollups.build_rollups):
+
+- OPEN:      (quase) todas as respostas são rejeições rápidas do CB
+             (202 do fallback ou 503, com latência ~0)
+- HALF_OPEN: janela mista logo após um período OPEN (chamadas de teste
+             liberadas enquanto as demais continuam sendo rejeitadas)
+- CLOSED:    nenhuma rejeição rápida
+
+Janelas mistas que não sucedem um OPEN são tratadas como a abertura do
+circuito no meio do segundo; janelas sem requisições herdam o estado anterior.
+A série de estados é compactada com run-length encoding vetorizado, gerando
+transições, tempo total em cada estado e duração dos episódios de abertura,
+todos em milissegundos, para cada cenário e perfil de CB (V2, V2_equilibrado,
+V2_conservador, ...).
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from rollups import K6_RESULTS_DIR, NEAR_ZERO_MS, discover_runs
+
+OUTPUT_DIR = "analysis_results/csv"
+
+STATES = ("CLOSED", "OPEN", "HALF_OPEN")
+CLOSED, OPEN, HALF_OPEN = range(3)
+_UNKNOWN = -1
+
+# Fração de rejeições rápidas a partir da qual a janela é considerada OPEN
+OPEN_REJECTION_RATIO = 0.95
+
+# Apenas execuções com Circuit Breaker (V2 e perfis V2_*)
+CB_VERSION_PATTERN = r"V2(?:_[a-z]+)?"
+
+
+@dataclass(frozen=True)
+class CBStateTimeline:
+    """Timeline reconstruída de um cenário/perfil."""
+    scenario: str
+    version: str
+    spans: pd.DataFrame        # state, start_ms, end_ms, duration_ms
+    transitions: pd.DataFrame  # timestamp_ms, from_state, to_state
+    episodes: pd.DataFrame     # episode, start_ms, end_ms, duration_ms, open_ms, half_open_ms
+
+    def time_in_state(self) -> Dict[str, float]:
+        """Tempo total (ms) em cada estado."""
+        totals = self.spans.groupby("state")["duration_ms"].sum()
+        return {state: float(totals.get(state, 0.0)) for state in STATES}
+
+    def summary(self) -> Dict:
+        durations = self.episodes["duration_ms"].to_numpy()
+        totals = self.time_in_state()
+        return {
+            "Scenario": self.scenario,
+            "Version": self.version,
+            "Transitions": len(self.transitions),
+            "Open Episodes": len(self.episodes),
+            "CLOSED (ms)": totals["CLOSED"],
+            "OPEN (ms)": totals["OPEN"],
+            "HALF_OPEN (ms)": totals["HALF_OPEN"],
+            "Mean Episode (ms)": float(durations.mean()) if durations.size else 0.0,
+            "Max Episode (ms)": float(durations.max()) if durations.size else 0.0,
+        }
+
+
+def classify_windows(rollups: pd.DataFrame,
+                     open_ratio: float = OPEN_REJECTION_RATIO) -> np.ndarray:
+    """
+    Classifica cada janela do rollup em CLOSED/OPEN/HALF_OPEN (códigos inteiros).
+
+    Totalmente vetorizado: estados "puros" são definidos pela fração de
+    rejeições rápidas; janelas mistas e vazias são resolvidas por forward-fill
+    do último estado puro.
+    """
+    requests = rollups["requests"].to_numpy()
+    rejected = rollups["rejected_fast"].to_numpy()
+    ratio = np.divide(rejected, requests, out=np.zeros(len(requests)), where=requests > 0)
+
+    raw = np.full(len(requests), _UNKNOWN, dtype=np.int8)
+    raw[(requests > 0) & (rejected == 0)] = CLOSED
+    raw[(requests > 0) & (ratio >= open_ratio)] = OPEN
+    mixed = (requests > 0) & (rejected > 0) & (ratio < open_ratio)
+
+    # Último estado puro até cada janela (anterior, para as mistas)
+    pure_idx = np.where(raw != _UNKNOWN, np.arange(len(raw)), -1)
+    last_pure = np.maximum.accumulate(pure_idx)
+    prev_pure = np.concatenate(([-1], last_pure[:-1]))
+    prev_state = np.where(prev_pure >= 0, raw[np.maximum(prev_pure, 0)], CLOSED)
+
+    states = raw.copy()
+    states[mixed] = np.where(prev_state[mixed] == OPEN, HALF_OPEN, OPEN)
+
+    # Janelas vazias herdam o estado (já resolvido) anterior
+    known_idx = np.where(states != _UNKNOWN, np.arange(len(states)), -1)
+    last_known = np.maximum.accumulate(known_idx)
+    states = np.where(last_known >= 0, states[np.maximum(last_known, 0)], CLOSED)
+    return states.astype(np.int8)
+
+
+def run_length_encode(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run-length encoding vetorizado: (inícios, comprimentos, valores)."""
+    if codes.size == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+    lengths = np.diff(np.concatenate((starts, [codes.size])))
+    return starts, lengths, codes[starts]
+
+
+def reconstruct_timeline(rollups: pd.DataFrame, scenario: str, version: str,
+                         bucket_seconds: float = 1.0) -> CBStateTimeline:
+    """Reconstrói spans, transições e episódios de abertura a partir do rollup."""
+    codes = classify_windows(rollups)
+    starts, lengths, values = run_length_encode(codes)
+    bucket_ms = bucket_seconds * 1000.0
+    names = np.array(STATES)
+
+    spans = pd.DataFrame({
+        "state": names[values] if values.size else np.array([], dtype=object),
+        "start_ms": starts * bucket_ms,
+        "end_ms": (starts + lengths) * bucket_ms,
+        "duration_ms": lengths * bucket_ms,
+    })
+
+    transitions = pd.DataFrame({
+        "timestamp_ms": spans["start_ms"].to_numpy()[1:],
+        "from_state": spans["state"].to_numpy()[:-1],
+        "to_state": spans["state"].to_numpy()[1:],
+    })
+
+    # Episódio = sequência máxima de spans fora de CLOSED (OPEN ⇄ HALF_OPEN)
+    not_closed = values != CLOSED
+    previous = np.concatenate(([False], not_closed[:-1]))
+    episode_id = np.cumsum(not_closed & ~previous)
+    in_episode = spans[not_closed].assign(episode=episode_id[not_closed])
+    episodes = (
+        in_episode.groupby("episode")
+        .agg(start_ms=("start_ms", "min"), end_ms=("end_ms", "max"))
+        .reset_index()
+    )
+    episodes["duration_ms"] = episodes["end_ms"] - episodes["start_ms"]
+    by_state = in_episode.pivot_table(index="episode", columns="state",
+                                      values="duration_ms", aggfunc="sum")
+    for state, column in (("OPEN", "open_ms"), ("HALF_OPEN", "half_open_ms")):
+        episodes[column] = (by_state[state].reindex(episodes["episode"]).fillna(0.0).to_numpy()
+                            if state in by_state.columns else 0.0)
+
+    return CBStateTimeline(scenario, version, spans, transitions, episodes)
+
+
+def analyze_run(path: Path, scenario: str, version: str, bucket_seconds: float = 1.0,
+                session=None) -> Optional[CBStateTimeline]:
+    """Carrega uma execução (via DataSession) e reconstrói a timeline de estados do CB."""
+    from data_session import get_session
+
+    rollups = (session or get_session()).rollups(path, bucket_seconds)
+    if rollups is None:
+        return None
+    return reconstruct_timeline(rollups, scenario, version, bucket_seconds)
+
+
+def analyze_all(results_dir: str = K6_RESULTS_DIR, output_dir: str = OUTPUT_DIR,
+                bucket_seconds: float = 1.0) -> List[CBStateTimeline]:
+    """Reconstrói o estado do CB para todos os cenários/perfis e salva os CSVs."""
+    from data_session import get_session
+
+    session = get_session()
+    timelines = []
+    for scenario, version, path in discover_runs(results_dir, CB_VERSION_PATTERN):
+        print(f"\n🔌 {scenario} / {version}")
+        timeline = analyze_run(path, scenario, version, bucket_seconds, session)
+        if timeline is None:
+            print("  ⚠️  Sem dados de requisição")
+            continue
+        totals = timeline.time_in_state()
+        print(f"  Transições: {len(timeline.transitions)} | "
+              f"Episódios OPEN: {len(timeline.episodes)} | "
+              f"OPEN: {totals['OPEN']:.0f} ms | HALF_OPEN: {totals['HALF_OPEN']:.0f} ms")
+        timelines.append(timeline)
+
+    if timelines:
+        save_timelines(timelines, output_dir)
+    return timelines
+
+
+def _tagged(timeline: CBStateTimeline, frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.assign(scenario=timeline.scenario, version=timeline.version)
+
+
+def save_timelines(timelines: List[CBStateTimeline], output_dir: str = OUTPUT_DIR):
+    """Salva spans, transições, episódios e resumo consolidados."""
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {
+        "cb_state_spans.csv": pd.concat([_tagged(t, t.spans) for t in timelines]),
+        "cb_state_transitions.csv": pd.concat([_tagged(t, t.transitions) for t in timelines]),
+        "cb_state_episodes.csv": pd.concat([_tagged(t, t.episodes) for t in timelines]),
+        "cb_state_summary.csv": pd.DataFrame([t.summary() for t in timelines]),
+    }
+    for name, frame in outputs.items():
+        frame.to_csv(os.path.join(output_dir, name), index=False)
+        print(f"  ✅ {os.path.join(output_dir, name)}")
+
+
+def load_spans(scenario: str, version: str = "V2",
+               output_dir: str = OUTPUT_DIR) -> Optional[pd.DataFrame]:
+    """Lê os spans salvos de um cenário/perfil (None se ainda não gerados)."""
+    path = os.path.join(output_dir, "cb_state_spans.csv")
+    if not os.path.exists(path):
+        return None
+    spans = pd.read_csv(path)
+    spans = spans[(spans["scenario"] == scenario) & (spans["version"] == version)]
+    return spans if not spans.empty else None
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("  RECONSTRUÇÃO DO ESTADO DO CIRCUIT BREAKER (V2)")
+    print("=" * 60)
+    print(f"  Rejeição rápida: 202/503 com latência < {NEAR_ZERO_MS:.0f} ms")
+
+    results_dir = sys.argv[1] if len(sys.argv) > 1 else K6_RESULTS_DIR
+    timelines = analyze_all(results_dir)
+    if timelines:
+        print("\n" + pd.DataFrame([t.summary() for t in timelines]).to_string(index=False))
+    else:
+        print("\n⚠️  Nenhuma execução V2 encontrada")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Sessão de dados compartilhada pelas análises
+
+analyzer.py, scenario_analyzer.py, analyze_recovery_time.py,
+load_amplification_analysis.py e cb_state_analysis.py criavam cada um o seu
+FastK6Loader e reidratavam os mesmos caches Parquet (inclusive a coluna
+`tags`, a mais cara) várias vezes por execução do run_everything.sh. A
+sessão carrega cada execução (arquivo NDJSON) uma única vez e guarda:
+
+- o frame bruto tipado, com a coluna `status` já extraída das tags;
+- o frame por requisição (`to_request_frame`) e os rollups por janela;
+- recortes de colunas (`time`/`metric`), servidos do frame já carregado
+  quando possível;
+- as estatísticas suficientes e o histograma da ingestão.
+
+Cada entrada é revalidada pela impressão digital (mtime, tamanho) do NDJSON,
+como no results_registry. `install(session)` torna a sessão ativa no
+processo; sem sessão instalada, `get_session()` devolve uma sessão nova e
+local ao chamador, então os scripts continuam funcionando sozinhos.
+run_analyses.py instala uma sessão e roda todas as análises no mesmo
+processo, pagando a carga uma vez.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from fast_loader import FastK6Loader, source_path, status_column, to_request_frame
+from histogram_stats import LatencyHistogram
+from rollups import build_rollups
+
+DEFAULT_VERSIONS = ["V1", "V2", "V3"]
+
+Fingerprint = Tuple[int, int]
+
+
+def _fingerprint(path: Path) -> Optional[Fingerprint]:
+    """(mtime, tamanho) do NDJSON; sem ele, do cache Parquet que restou."""
+    for candidate in (path, path.parent / ".cache" / f"{path.stem}.parquet"):
+        try:
+            stat = candidate.stat()
+        except OSError:
+            continue
+        return stat.st_mtime_ns, stat.st_size
+    return None
+
+
+def run_exists(path: Path) -> bool:
+    """O NDJSON ou, sem ele, o cache Parquet da execução existe."""
+    return _fingerprint(source_path(path)) is not None
+
+
+def scenario_path(scenario: str, version: str, results_dir) -> Path:
+    """NDJSON de um cenário/versão: <results_dir>/ ou, senão, <results_dir>/scenarios/."""
+    path = Path(results_dir) / f"{scenario}_{version}.json"
+    return path if run_exists(path) else Path(results_dir) / "scenarios" / path.name
+
+
+class DataSession:
+    """Execuções k6 carregadas uma vez por processo, com derivados memorizados."""
+
+    def __init__(self, use_cache: bool = True):
+        self.use_cache = use_cache
+        self._loaders: Dict[Path, FastK6Loader] = {}
+        self._fingerprints: Dict[Path, Fingerprint] = {}
+        self._frames: Dict[Path, Optional[pd.DataFrame]] = {}
+        self._columns: Dict[Tuple[Path, Tuple[str, ...]], Optional[pd.DataFrame]] = {}
+        self._requests: Dict[Path, Optional[pd.DataFrame]] = {}
+        self._rollups: Dict[Tuple[Path, float], pd.DataFrame] = {}
+        self.loads = 0
+        self.hits = 0
+        self.load_seconds = 0.0
+
+    def loader(self, directory) -> FastK6Loader:
+        """Um FastK6Loader por diretório (o cache Parquet fica em <diretório>/.cache)."""
+        directory = Path(directory).resolve()
+        if directory not in self._loaders:
+            self._loaders[directory] = FastK6Loader(str(directory), use_cache=self.use_cache)
+        return self._loaders[directory]
+
+    def _key(self, path) -> Path:
+        """NDJSON resolvido (também para um cache em .cache/); descarta os derivados se ele mudou."""
+        path = source_path(path).resolve()
+        fingerprint = _fingerprint(path)
+        if self._fingerprints.get(path) != fingerprint:
+            self._forget(path)
+            self._fingerprints[path] = fingerprint
+        return path
+
+    def _forget(self, path: Path):
+        for cache in (self._frames, self._requests):
+            cache.pop(path, None)
+        for cache in (self._columns, self._rollups):
+            for key in [k for k in cache if k[0] == path]:
+                del cache[key]
+        loader = self._loaders.get(path.parent)
+        if loader is not None:
+            loader.ingest_stats.pop(path.name, None)
+            loader.ingest_histograms.pop(path.name, None)
+
+    def frame(self, path, **kwargs) -> Optional[pd.DataFrame]:
+        """
+        Frame bruto da execução (time, metric, value, tags + status).
+
+        O frame é compartilhado entre as análises: trate-o como somente leitura.
+        kwargs vão para FastK6Loader.load_file na primeira carga.
+        """
+        key = self._key(path)
+        if key in self._frames:
+            self.hits += 1
+            return self._frames[key]
+        start = time.time()
+        df = self.loader(key.parent).load_file(str(key), **kwargs)
+        if df is not None and 'tags' in df.columns and 'status' not in df.columns:
+            df['status'] = status_column(df)
+        self._frames[key] = df
+        self.loads += 1
+        self.load_seconds += time.time() - start
+        return df
+
+    def columns(self, path, columns: List[str]) -> Optional[pd.DataFrame]:
+        """Só algumas colunas: recorte do frame já carregado ou leitura parcial do Parquet."""
+        key = self._key(path)
+        if key in self._frames:
+            df = self._frames[key]
+            self.hits += 1
+            return None if df is None else df[[c for c in columns if c in df.columns]]
+        column_key = (key, tuple(columns))
+        if column_key in self._columns:
+            self.hits += 1
+        else:
+            start = time.time()
+            self._columns[column_key] = self.loader(key.parent).load_columns(str(key), list(columns))
+            self.loads += 1
+            self.load_seconds += time.time() - start
+        return self._columns[column_key]
+
+    def requests(self, path) -> Optional[pd.DataFrame]:
+        """Frame por requisição (seconds, latency_ms, status) ou None se a execução não tem dados."""
+        key = self._key(path)
+        if key not in self._requests:
+            df = self.frame(key)
+            requests = None
+            if df is not None and not df.empty and 'time' in df.columns:
+                requests = to_request_frame(df)
+                requests = requests if not requests.empty else None
+            self._requests[key] = requests
+        return self._requests[key]
+
+    def rollups(self, path, bucket_seconds: float = 1.0) -> Optional[pd.DataFrame]:
+        """Rollups por janela (rollups.build_rollups) do frame por requisição."""
+        key = self._key(path)
+        rollup_key = (key, float(bucket_seconds))
+        if rollup_key not in self._rollups:
+            requests = self.requests(key)
+            if requests is None:
+                return None
+            self._rollups[rollup_key] = build_rollups(requests, bucket_seconds)
+        return self._rollups[rollup_key]
+
+    def stats(self, path) -> Optional[Dict]:
+        key = self._key(path)
+        return self.loader(key.parent).load_stats(str(key))
+
+    def histogram(self, path) -> Optional[LatencyHistogram]:
+        key = self._key(path)
+        return self.loader(key.parent).load_histogram(str(key))
+
+    def scenario(self, scenario: str, results_dir,
+                 versions: Optional[List[str]] = None, **kwargs) -> Dict[str, pd.DataFrame]:
+        """Frames das versões de um cenário (como FastK6Loader.load_scenario)."""
+        data = {}
+        print(f"\n📂 Carregando cenário: {scenario}")
+        for version in versions or DEFAULT_VERSIONS:
+            path = scenario_path(scenario, version, results_dir)
+            df = self.frame(path, **kwargs) if run_exists(path) else None
+            if df is not None:
+                data[version] = df
+                print(f"  ✅ {version}: {len(df):,} pontos")
+        return data
+
+    def versions(self, results_dir, pattern: str = "{version}_Completo.json",
+                 versions: Optional[List[str]] = None, **kwargs) -> Dict[str, pd.DataFrame]:
+        """Frames de várias versões (como FastK6Loader.load_all_versions)."""
+        data = {}
+        for version in versions or DEFAULT_VERSIONS:
+            path = Path(results_dir) / pattern.format(version=version)
+            df = self.frame(path, **kwargs) if run_exists(path) else None
+            if df is not None:
+                data[version] = df
+            else:
+                print(f"  ⚠️  Arquivo não encontrado: {path}")
+        return data
+
+    def memory_mb(self) -> float:
+        """Memória ocupada pelos frames e derivados, incluindo as strings/objetos de `tags` (deep)."""
+        frames = [df for df in (*self._frames.values(), *self._columns.values(),
+                                *self._requests.values(), *self._rollups.values()) if df is not None]
+        return sum(df.memory_usage(deep=True).sum() for df in frames) / 2 ** 20
+
+    def report(self) -> str:
+        return (f"📦 Sessão de dados: {self.loads} carga(s) em {self.load_seconds:.1f}s, "
+                f"{self.hits} reaproveitamento(s), {self.memory_mb():,.0f} MB em memória")
+
+
+_ACTIVE: Optional[DataSession] = None
+
+
+def get_session() -> DataSession:
+    """Sessão instalada no processo ou, sem ela, uma sessão nova (local ao chamador)."""
+    return _ACTIVE if _ACTIVE is not None else DataSession()
+
+
+def install(session: Optional[DataSession]):
+    """Torna `session` a sessão ativa do processo (None desinstala)."""
+    global _ACTIVE
+    _ACTIVE = session
+
+
+if __name__ == "__main__":
+    import sys
+
+    from rollups import K6_RESULTS_DIR, discover_runs
+
+    results_dir = sys.argv[1] if len(sys.argv) > 1 else K6_RESULTS_DIR
+    session = DataSession()
+    runs = discover_runs(results_dir)
+    for label in ("primeira passada", "segunda passada"):
+        start = time.time()
+        for scenario, version, path in runs:
+            session.rollups(path)
+            session.columns(path, ["time", "metric"])
+        print(f"  {label}: {len(runs)} execução(ões) em {time.time() - start:.2f}s")
+    print(f"  {session.report()}")
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import argparse
+import importlib.util
 import json
 import os
 import re
@@ -9,12 +10,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-try:
-    import pyarrow.parquet as pq
-
-    HAS_PYARROW = True
-except Exception:
-    HAS_PYARROW = False
+# Só verifica se o pyarrow existe: o import (numpy + pyarrow) fica para quando há Parquet a ler
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
 
 
 # Observação: não usamos \b (word-boundary) porque '_' conta como caractere de palavra.
@@ -93,6 +90,8 @@ def _parquet_metadata(path: Path) -> Tuple[Optional[int], Optional[int]]:
         return None, None
 
     try:
+        import pyarrow.parquet as pq
+
         pf = pq.ParquetFile(str(path))
         meta = pf.metadata
         if meta is None:
@@ -143,7 +142,7 @@ def generate_report(project_root: Path, k6_results_dir: Path, analysis_results_d
 
     # Arquivos relevantes
     ndjson_files = sorted(
-        [p for p in _iter_files(k6_results_dir, ["*.json"]) if p.name.endswith(".json") and not p.name.endswith("_summary.json")]
+        [p for p in _iter_files(k6_results_dir, ["*.json"]) if p.name.endswith(".json") and not p.name.endswith(("_summary.json", "_monitor.json"))]
     )
     summary_files = sorted(list(_iter_files(k6_results_dir, ["*_summary.json"])))
 
@@ -349,7 +348,7 @@ def generate_report(project_root: Path, k6_results_dir: Path, analysis_results_d
     return "\n".join(rel) + "\n"
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(
         description="Gera um relatório Markdown com volume de dados (tamanho/linhas/rows/requests) do pipeline k6 + análise."
     )
@@ -374,7 +373,7 @@ def main() -> int:
         help="Arquivo Markdown de saída (default: analysis_results/markdown/RELATORIO_VOLUME_DADOS.md)",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     project_root = Path(args.project_root).resolve()
     k6_results_dir = Path(args.k6_results_dir).resolve() if args.k6_results_dir else _detect_k6_results_dir(project_root)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Downsampling visual de séries temporais (LTTB e min/max por pixel)
+
+Com janelas de 1 s (ou séries por requisição) os timelines passam dezenas de
+milhares de pontos ao matplotlib, mas um eixo de 14" a 150 DPI só tem ~1700
+colunas de pixel. Aqui cada série é reduzida, antes do plot, para
+POINTS_PER_PIXEL pontos por coluna de pixel do eixo:
+
+- 'lttb' (Largest-Triangle-Three-Buckets): um ponto por bucket, o que forma
+  o maior triângulo com o ponto anterior escolhido e a média do próximo
+  bucket — preserva a forma da curva e os picos;
+- 'minmax': mínimo e máximo de cada coluna de pixel — o traço desenhado é
+  idêntico ao da série completa (usado em bandas e picos como aberturas do CB).
+
+Valores NaN (janelas vazias) não entram na seleção; o início de cada trecho
+NaN é mantido para o gap continuar aparecendo. Intervalos (ex.: spans de
+estado do CB) mais próximos que um pixel são fundidos, nunca descartados.
+O custo de plotar fica proporcional à largura da figura, não à duração do teste.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Pontos mantidos por coluna de pixel do eixo (min + max)
+POINTS_PER_PIXEL = 2
+# Séries abaixo deste tamanho são plotadas sem redução
+MIN_POINTS = 500
+
+
+def _numeric(x) -> np.ndarray:
+    """Eixo x como float (datetimes, inclusive com fuso, viram ns desde a época)."""
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return pd.DatetimeIndex(x).asi8.astype(float)
+    if pd.api.types.is_timedelta64_dtype(x):
+        return pd.TimedeltaIndex(x).asi8.astype(float)
+    return np.asarray(x, dtype=float)
+
+
+def _take(values, index: np.ndarray):
+    if isinstance(values, pd.Series):
+        return values.iloc[index]
+    return values[index] if isinstance(values, (np.ndarray, pd.Index)) else np.asarray(values)[index]
+
+
+def _gap_starts(y: np.ndarray) -> np.ndarray:
+    """Índice do primeiro NaN de cada trecho NaN."""
+    missing = np.isnan(y)
+    return np.flatnonzero(missing & ~np.concatenate(([False], missing[:-1])))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Índices escolhidos pelo Largest-Triangle-Three-Buckets (x crescente, sem NaN).
+
+    O primeiro e o último ponto são sempre mantidos; os demais são divididos
+    em n_out - 2 buckets de mesmo número de pontos.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Índices do mínimo e do máximo de cada bucket de x (sem NaN), em ordem."""
+    n = len(x)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+    span = x[-1] - x[0]
+    bucket = (np.zeros(n, dtype=np.int64) if span <= 0
+              else np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1))
+    # x crescente: cada bucket é um trecho contíguo
+    starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+    sizes = np.diff(np.append(starts, n))
+    group = np.repeat(np.arange(len(starts)), sizes)
+    keep = [[0, n - 1]]
+    for reduce in (np.minimum, np.maximum):
+        hits = np.flatnonzero(y == np.repeat(reduce.reduceat(y, starts), sizes))
+        first = np.unique(group[hits], return_index=True)[1]
+        keep.append(hits[first])
+    keep = np.concatenate(keep)
+    return np.unique(keep)
+
+
+def downsample_indices(x, y, n_out: int, method: str = "lttb") -> np.ndarray:
+    """
+    Índices (ordenados) que representam a série com ~n_out pontos.
+
+    Args:
+        x: Eixo x crescente (números, datetimes ou timedeltas)
+        y: Valores; NaN marca janelas vazias
+        n_out: Pontos desejados
+        method: 'lttb' ou 'minmax'
+    """
+    x_values, y_values = _numeric(x), np.asarray(y, dtype=float)
+    finite = np.flatnonzero(~np.isnan(y_values))
+    if len(y_values) <= max(n_out, MIN_POINTS):
+        return np.arange(len(y_values))
+    if method == "lttb":
+        chosen = lttb_indices(x_values[finite], y_values[finite], n_out)
+    elif method == "minmax":
+        chosen = minmax_indices(x_values[finite], y_values[finite], max(1, n_out // 2))
+    else:
+        raise ValueError(f"método de downsampling desconhecido: {method}")
+    return np.union1d(finite[chosen], _gap_starts(y_values))
+
+
+def axes_pixel_width(ax, dpi: Optional[float] = None) -> int:
+    """Largura do eixo em pixels na imagem salva (dpi default: o da figura)."""
+    fig = ax.figure
+    return max(1, int(round(fig.get_figwidth() * ax.get_position().width * (dpi or fig.dpi))))
+
+
+def target_points(ax, dpi: Optional[float] = None) -> int:
+    return POINTS_PER_PIXEL * axes_pixel_width(ax, dpi)
+
+
+def plot_downsampled(ax, x, y, *args, method: str = "lttb", dpi: Optional[float] = None, **kwargs):
+    """ax.plot(x, y, ...) com a série reduzida à resolução do eixo."""
+    index = downsample_indices(x, y, target_points(ax, dpi), method)
+    return ax.plot(_take(x, index), _take(y, index), *args, **kwargs)
+
+
+def fill_between_downsampled(ax, x, y1, y2=0, dpi: Optional[float] = None, **kwargs):
+    """ax.fill_between com min/max por pixel das duas bordas (a área desenhada não encolhe)."""
+    n_out = target_points(ax, dpi)
+    index = downsample_indices(x, y1, n_out, "minmax")
+    if np.ndim(y2):
+        index = np.union1d(index, downsample_indices(x, y2, n_out, "minmax"))
+        y2 = _take(y2, index)
+    return ax.fill_between(_take(x, index), _take(y1, index), y2, **kwargs)
+
+
+def merge_spans(starts, ends, min_gap: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Funde intervalos [start, end) separados por menos de min_gap.
+
+    Nenhum intervalo é descartado: um span de 1 s num teste de 1 h continua
+    visível (o axvspan desenha pelo menos um pixel), só vizinhos colados viram um.
+    """
+    starts, ends = np.asarray(starts, dtype=float), np.asarray(ends, dtype=float)
+    if len(starts) == 0:
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    new_group = np.concatenate(([True], starts[1:] - reach[:-1] >= min_gap))
+    group = np.cumsum(new_group) - 1
+    merged_ends = np.full(group[-1] + 1, -np.inf)
+    np.maximum.at(merged_ends, group, ends)
+    return starts[new_group], merged_ends
+
+
+def pixel_span(ax, x_min: float, x_max: float, dpi: Optional[float] = None) -> float:
+    """Largura de um pixel em unidades de x, para um eixo cobrindo [x_min, x_max]."""
+    return (x_max - x_min) / axes_pixel_width(ax, dpi)
+
+
+if __name__ == "__main__":
+    import io
+    import time
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    rng = np.random.default_rng(3)
+    seconds = np.arange(0, 24 * 3600, 0.1)       # 24 h, 10 pontos/s
+    latency = rng.lognormal(4.0, 0.3, seconds.size)
+    latency[rng.choice(seconds.size, 20, replace=False)] *= 40   # picos isolados
+    latency[50000:51000] = np.nan                                 # janelas vazias
+
+    for label, plot in (("completo", lambda ax: ax.plot(seconds, latency, linewidth=1)),
+                        ("lttb", lambda ax: plot_downsampled(ax, seconds, latency, linewidth=1)),
+                        ("minmax", lambda ax: plot_downsampled(ax, seconds, latency,
+                                                               method="minmax", linewidth=1))):
+        fig, ax = plt.subplots(figsize=(14, 4))
+        start = time.time()
+        lines = plot(ax)
+        fig.savefig(io.BytesIO(), format="png", dpi=150)
+        elapsed = time.time() - start
+        points = len(lines[0].get_xdata())
+        peak = np.nanmax(lines[0].get_ydata())
+        plt.close(fig)
+        print(f"  {label:<9} {points:>7,} pontos | pico {peak:8.1f} ms | {elapsed:.2f}s")
+    print(f"  (pico real: {np.nanmax(latency):.1f} ms)")
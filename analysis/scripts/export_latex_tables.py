@@ -2,6 +2,9 @@
 import os
 import pandas as pd
 
+from quantile_ci import format_with_ci
+from results_registry import get_registry
+
 RESULTS_DIR = "analysis_results/csv"
 SCENARIO_RESULTS_DIR = "analysis_results/scenarios/csv"
 OUTPUT_DIR = "artigo_latex/tables"
@@ -10,16 +13,14 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 def export_comprehensive_results():
     """Generates a single comprehensive table for the article spanning two columns."""
     scenarios = ["catastrofe", "degradacao", "indisponibilidade", "rajadas"]
+    results = get_registry(SCENARIO_RESULTS_DIR)
     rows = []
     
     for s in scenarios:
-        path = os.path.join(SCENARIO_RESULTS_DIR, f"{s}_benefits.csv")
-        status_path = os.path.join(SCENARIO_RESULTS_DIR, f"{s}_status.csv")
+        df_ben = results.table(s, "benefits")
+        df_stat = results.table(s, "status")
         
-        if os.path.exists(path) and os.path.exists(status_path):
-            df_ben = pd.read_csv(path)
-            df_stat = pd.read_csv(status_path)
-            
+        if df_ben is not None and df_stat is not None:
             v1_avail = df_stat[df_stat['Version'] == 'V1']['Total Success Rate (%)'].values[0]
             v2_avail = df_stat[df_stat['Version'] == 'V2']['Total Success Rate (%)'].values[0]
             v3_avail = df_stat[df_stat['Version'] == 'V3']['Total Success Rate (%)'].values[0]
@@ -61,5 +62,55 @@ def export_comprehensive_results():
         f.write("\n".join(latex_content) + "\n")
     print("Generated: comprehensive_results.tex")
 
+def _latex_ci(row, label):
+    """'P95 [low, high]' cell; falls back to the point value when the CSV predates CIs."""
+    low = row.get(f"{label} CI Low (ms)", float("nan"))
+    high = row.get(f"{label} CI High (ms)", float("nan"))
+    return format_with_ci(row[f"{label} (ms)"], low, high)
+
+def export_tail_latency_table():
+    """Generates the P95/P99 table (95% CIs) for each scenario and version."""
+    scenarios = ["catastrofe", "degradacao", "indisponibilidade", "rajadas"]
+    results = get_registry(SCENARIO_RESULTS_DIR)
+    rows = []
+    
+    for s in scenarios:
+        df_resp = results.table(s, "response")
+        if df_resp is None:
+            continue
+        name = s.capitalize() if s != 'indisponibilidade' else 'Unavailability'
+        
+        for _, row in df_resp.iterrows():
+            diff = "--"
+            if "P95 Diff vs V1 (ms)" in row and not pd.isna(row["P95 Diff vs V1 (ms)"]):
+                diff = _latex_ci(row, "P95 Diff vs V1")
+            rows.append([name, row['Version'], _latex_ci(row, "P95"), _latex_ci(row, "P99"), diff])
+            name = ""
+
+    latex_content = [
+        "\\begin{table*}[!t]",
+        "\\centering",
+        "\\caption{Tail Latency per Scenario (ms, 95\\% confidence intervals)}",
+        "\\label{tab:tail-latency}",
+        "\\begin{tabular}{llccc}",
+        "\\toprule",
+        "Scenario & Version & P95 & P99 & P95 $-$ V1 \\\\",
+        "\\midrule"
+    ]
+    
+    for r in rows:
+        latex_content.append(" & ".join(r) + " \\\\")
+        
+    latex_content.extend([
+        "\\bottomrule",
+        "\\end{tabular}",
+        "\\end{table*}"
+    ])
+    
+    with open(os.path.join(OUTPUT_DIR, "tail_latency.tex"), 'w') as f:
+        f.write("\n".join(latex_content) + "\n")
+    print("Generated: tail_latency.tex")
+
 if __name__ == "__main__":
     export_comprehensive_results()
+    export_tail_latency_table()
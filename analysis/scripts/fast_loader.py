@@ -13,6 +13,7 @@ Performance esperada:
 
 import os
 import gc
+import re
 import random
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -49,6 +50,12 @@ try:
 except ImportError:
     USE_TQDM = False
 
+from histogram_stats import HISTOGRAM_RESOLUTION_MS, LatencyHistogram, StreamingHistogram
+from sufficient_stats import StreamingStats, grouped_stats, load_stats, merge_all, save_stats
+
+# Métrica cujas estatísticas suficientes (n, média, M2) e histograma são acumulados na ingestão
+INGEST_STATS_METRIC = 'http_req_duration'
+
 
 def _parse_line(line: str) -> Optional[dict]:
     """Parse uma linha JSON de forma otimizada."""
@@ -117,17 +124,36 @@ class FastK6Loader:
         self.max_workers = max_workers or min(os.cpu_count() or 4, 8)
         self.use_cache = use_cache and USE_PARQUET
         
+        # Estatísticas suficientes por arquivo: {nome: {'all' | status: SufficientStats}}
+        self.ingest_stats = {}
+        # Histograma completo da latência por arquivo (MW/KS sem amostragem)
+        self.ingest_histograms = {}
+        
         if self.use_cache:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
     
+    def _get_stats_path(self, file_name: str) -> Path:
+        """Arquivo com as estatísticas suficientes gravadas na ingestão."""
+        return self.cache_dir / f"{Path(file_name).stem}.stats.json"
+    
+    def _get_histogram_path(self, file_name: str) -> Path:
+        """Arquivo com o histograma de latência gravado na ingestão."""
+        return self.cache_dir / f"{Path(file_name).stem}.hist.npz"
+    
     def _get_cache_path(self, file_name: str) -> Path:
         """Retorna caminho do arquivo de cache para um dado arquivo JSON."""
         return self.cache_dir / f"{Path(file_name).stem}.parquet"
     
+    def _has_data(self, path: Path) -> bool:
+        """O NDJSON existe ou, sem ele, o cache Parquet é a cópia que restou."""
+        return path.exists() or (self.use_cache and self._get_cache_path(path.name).exists())
+    
     def _is_cache_valid(self, json_path: Path, cache_path: Path) -> bool:
-        """Verifica se cache é válido (existe e mais recente que JSON)."""
+        """Verifica se cache é válido (existe e mais recente que JSON, ou o JSON não existe mais)."""
         if not cache_path.exists():
             return False
+        if not json_path.exists():
+            return True
         return cache_path.stat().st_mtime > json_path.stat().st_mtime
     
     def _save_to_cache(self, df: pd.DataFrame, cache_path: Path):
@@ -181,8 +207,8 @@ class FastK6Loader:
         Returns:
             DataFrame com os dados processados ou None se arquivo não existe
         """
-        path = Path(file_path)
-        if not path.exists():
+        path = source_path(file_path)
+        if not self._has_data(path):
             return None
         
         cache_path = self._get_cache_path(path.name)
@@ -194,6 +220,8 @@ class FastK6Loader:
             if df is not None:
                 print(f"  ✅ {len(df):,} pontos carregados do cache")
                 return df
+        if not path.exists():
+            return None
         
         # Carrega do JSON
         file_size_mb = path.stat().st_size / (1024 * 1024)
@@ -204,9 +232,16 @@ class FastK6Loader:
         
         if use_sampling:
             print(f"  🎲 Usando reservoir sampling (máx. {max_sample_size:,} pontos)")
-            all_points = self._load_with_sampling(path, max_sample_size)
+            # Estatísticas suficientes acumuladas sobre TODOS os pontos, não só a amostra
+            stream = StreamingStats()
+            histogram = StreamingHistogram()
+            all_points = self._load_with_sampling(path, max_sample_size, stream, histogram)
+            stats_by_key = stream.result()
+            latency_histogram = histogram.result()
         else:
             all_points = self._load_parallel(path, chunk_size)
+            stats_by_key = None
+            latency_histogram = None
         
         if not all_points:
             return None
@@ -214,6 +249,12 @@ class FastK6Loader:
         df = pd.DataFrame(all_points)
         print(f"  ✅ {len(df):,} pontos carregados")
         
+        if stats_by_key is None:
+            stats_by_key = self._frame_stats(df)
+            latency_histogram = self._frame_histogram(df)
+        self._store_stats(path, stats_by_key)
+        self._store_histogram(path, latency_histogram)
+        
         # Salva no cache
         self._save_to_cache(df, cache_path)
         
@@ -223,10 +264,147 @@ class FastK6Loader:
         
         return df
     
+    def load_columns(
+        self,
+        file_path: str,
+        columns: List[str],
+        **kwargs
+    ) -> Optional[pd.DataFrame]:
+        """
+        Carrega apenas algumas colunas de um arquivo k6.
+        
+        Com cache válido, lê só as colunas pedidas do Parquet (sem reidratar
+        `tags`, a coluna mais cara); caso contrário faz o parsing completo via
+        load_file() (que grava o cache) e seleciona as colunas.
+        
+        Args:
+            file_path: Caminho para o arquivo JSON
+            columns: Colunas desejadas (ex: ['time', 'metric'])
+            **kwargs: Argumentos passados para load_file()
+        
+        Returns:
+            DataFrame só com as colunas pedidas ou None se arquivo não existe
+        """
+        path = source_path(file_path)
+        if not self._has_data(path):
+            return None
+        
+        cache_path = self._get_cache_path(path.name)
+        if self.use_cache and self._is_cache_valid(path, cache_path):
+            try:
+                return pd.read_parquet(cache_path, engine='pyarrow', columns=columns)
+            except Exception as e:
+                print(f"  ⚠️  Erro ao ler colunas do cache: {e}")
+        
+        df = self.load_file(str(path), **kwargs)
+        if df is None:
+            return None
+        return df[[c for c in columns if c in df.columns]]
+    
+    def _frame_stats(self, df: pd.DataFrame) -> Dict:
+        """Estatísticas suficientes da métrica de latência, total e por status."""
+        if 'metric' not in df.columns or 'value' not in df.columns:
+            return {}
+        mask = (df['metric'] == INGEST_STATS_METRIC).to_numpy()
+        values = df['value'].to_numpy(dtype=float)[mask]
+        status = status_series(df['tags'][mask]).fillna('none').to_numpy() if 'tags' in df.columns \
+            else np.full(len(values), 'none')
+        stats_by_key = grouped_stats(status, values)
+        if stats_by_key:
+            stats_by_key['all'] = merge_all(stats_by_key.values())
+        return stats_by_key
+    
+    def _frame_histogram(self, df: pd.DataFrame) -> LatencyHistogram:
+        """Histograma da métrica de latência (bins de HISTOGRAM_RESOLUTION_MS)."""
+        values = np.empty(0)
+        if 'metric' in df.columns and 'value' in df.columns:
+            values = df.loc[df['metric'] == INGEST_STATS_METRIC, 'value'].to_numpy(dtype=float)
+        return LatencyHistogram.from_values(values, HISTOGRAM_RESOLUTION_MS)
+    
+    def _store_histogram(self, path: Path, histogram: LatencyHistogram):
+        """Guarda o histograma em memória e ao lado do cache Parquet (vazio também:
+        uma execução sem latências tem os mesmos sidecars que as demais)."""
+        self.ingest_histograms[path.name] = histogram
+        if self.use_cache:
+            histogram.save(self._get_histogram_path(path.name))
+    
+    def _store_stats(self, path: Path, stats_by_key: Dict):
+        """Guarda as estatísticas em memória e ao lado do cache Parquet (vazias também)."""
+        self.ingest_stats[path.name] = stats_by_key
+        if self.use_cache:
+            save_stats(self._get_stats_path(path.name), stats_by_key)
+    
+    def load_stats(self, file_path: str, **kwargs) -> Optional[Dict]:
+        """
+        Estatísticas suficientes (n, média, M2) da latência de um arquivo.
+        
+        Calculadas durante a ingestão sobre todos os pontos (inclusive quando o
+        DataFrame é uma amostra), sem precisar manter o array em memória.
+        
+        Returns:
+            Dict {'all' | status: SufficientStats} ou None se arquivo não existe
+        """
+        path = source_path(file_path)
+        if not self._has_data(path):
+            return None
+        if path.name in self.ingest_stats:
+            return self.ingest_stats[path.name]
+        
+        stats_path = self._get_stats_path(path.name)
+        if self._is_cache_valid(path, stats_path):
+            stats_by_key = load_stats(stats_path)
+            if stats_by_key is not None:
+                self.ingest_stats[path.name] = stats_by_key
+                return stats_by_key
+        
+        # Cache Parquet anterior a esta funcionalidade: calcula a partir do frame
+        if not self._ingest_from_cache(path, **kwargs):
+            return None
+        return self.ingest_stats[path.name]
+    
+    def load_histogram(self, file_path: str, **kwargs) -> Optional[LatencyHistogram]:
+        """
+        Histograma de latência de um arquivo inteiro (todos os pontos, não a amostra).
+        
+        Histogramas de arquivos diferentes podem ser somados (`h1 + h2`).
+        
+        Returns:
+            LatencyHistogram ou None se arquivo não existe
+        """
+        path = source_path(file_path)
+        if not self._has_data(path):
+            return None
+        if path.name in self.ingest_histograms:
+            return self.ingest_histograms[path.name]
+        
+        histogram_path = self._get_histogram_path(path.name)
+        if self._is_cache_valid(path, histogram_path):
+            histogram = LatencyHistogram.load(histogram_path)
+            if histogram is not None:
+                self.ingest_histograms[path.name] = histogram
+                return histogram
+        
+        if not self._ingest_from_cache(path, **kwargs):
+            return None
+        return self.ingest_histograms[path.name]
+    
+    def _ingest_from_cache(self, path: Path, **kwargs) -> bool:
+        """Estatísticas e histograma a partir do frame (uma leitura para os dois)."""
+        df = self.load_file(str(path), **kwargs)
+        if df is None:
+            return False
+        if path.name not in self.ingest_stats:
+            self._store_stats(path, self._frame_stats(df))
+        if path.name not in self.ingest_histograms:
+            self._store_histogram(path, self._frame_histogram(df))
+        return True
+    
     def _load_with_sampling(
         self,
         file_path: Path,
-        max_sample_size: int
+        max_sample_size: int,
+        stream: Optional[StreamingStats] = None,
+        histogram: Optional[StreamingHistogram] = None
     ) -> List[dict]:
         """Carrega arquivo grande com reservoir sampling."""
         all_points = []
@@ -242,6 +420,13 @@ class FastK6Loader:
                 parsed = _parse_line(line)
                 if parsed:
                     line_count += 1
+                    if parsed.get('metric') == INGEST_STATS_METRIC:
+                        value = parsed.get('value')
+                        if stream is not None:
+                            stream.push('all', value)
+                            stream.push(_status_of(parsed.get('tags')) or 'none', value)
+                        if histogram is not None:
+                            histogram.push(value)
                     # Reservoir sampling
                     if len(all_points) < max_sample_size:
                         all_points.append(parsed)
@@ -362,77 +547,144 @@ class FastK6Loader:
             return
         
         count = 0
-        for f in self.cache_dir.glob("*.parquet"):
-            f.unlink()
-            count += 1
+        # Parquet e os sidecars por stem (<stem>.stats.json, <stem>.hist.npz)
+        for pattern in ("*.parquet", "*.stats.json", "*.hist.npz"):
+            for f in self.cache_dir.glob(pattern):
+                f.unlink()
+                count += 1
         
         print(f"🗑️  Cache limpo: {count} arquivos removidos")
 
 
+_STATUS_RE = re.compile(r'"status":"?(\d+)')
+
+
+def _status_of(tags) -> Optional[str]:
+    """Extrai o status HTTP das tags (dict ou string JSON vinda do cache)."""
+    if isinstance(tags, dict):
+        status = tags.get('status')
+        return str(status) if status is not None else None
+    if isinstance(tags, str):
+        match = _STATUS_RE.search(tags)
+        return match.group(1) if match else None
+    return None
+
+
+def status_series(tags: pd.Series) -> pd.Series:
+    """
+    Status HTTP de cada ponto como string (None sem tag), vetorizado.
+    
+    As tags chegam como string JSON (cache Parquet) ou dict (NDJSON recém
+    lido): `str.extract` cobre as strings e `str.get` os dicts.
+    """
+    if tags.dtype != object:
+        status = tags.str.extract(_STATUS_RE, expand=False).astype(object)
+        return status.where(status.notna(), None)
+    status = tags.str.get('status').astype(object)
+    present = status.notna()
+    status[present] = status[present].astype(str)
+    pending = ~present & tags.notna()
+    if pending.any():
+        status[pending] = tags[pending].str.extract(_STATUS_RE, expand=False)
+    return status.where(status.notna(), None)
+
+
+def status_column(df: pd.DataFrame) -> pd.Series:
+    """Status HTTP de cada ponto como string (None sem tag), extraído uma vez das tags."""
+    return status_series(df['tags'])
+
+
+def to_request_frame(df: pd.DataFrame, metric: str = 'http_req_duration') -> pd.DataFrame:
+    """
+    Converte o DataFrame bruto do k6 em um frame com uma linha por requisição.
+    
+    Args:
+        df: DataFrame retornado por FastK6Loader (colunas time, metric, value, tags)
+        metric: Métrica usada como registro da requisição (default: http_req_duration)
+    
+    Returns:
+        DataFrame ordenado por tempo com as colunas:
+        - seconds: segundos desde o primeiro ponto do arquivo
+        - latency_ms: valor da métrica (latência em ms)
+        - status: código HTTP como string ('200', '202', '500', '503'...)
+    """
+    timestamps = pd.to_datetime(df['time'], utc=True, format='ISO8601')
+    start = timestamps.min()
+    mask = (df['metric'] == metric).to_numpy()
+    
+    requests = pd.DataFrame({
+        'seconds': (timestamps[mask] - start).dt.total_seconds().to_numpy(),
+        'latency_ms': df['value'].to_numpy(dtype=float)[mask],
+        'status': status_series(df['tags'][mask]).to_numpy(),
+    })
+    return requests.sort_values('seconds', kind='stable', ignore_index=True)
+
+
 # Funções otimizadas para estatísticas
 def fast_bootstrap_ci(
     x: np.ndarray,
     y: np.ndarray,
     n_bootstrap: int = 10000,
     ci: float = 0.95,
-    seed: int = 42
+    seed: int = 42,
+    **kwargs
 ) -> Tuple[float, float]:
     """
-    Calcula intervalo de confiança bootstrap de forma vetorizada.
-    
-    Usa operações NumPy vetorizadas para ~10x speedup vs loop Python.
-    """
-    np.random.seed(seed)
-    
-    # Pré-aloca arrays para amostras
-    n_x, n_y = len(x), len(y)
+    Calcula intervalo de confiança bootstrap da diferença de médias.
     
-    # Gera todos os índices de uma vez
-    x_indices = np.random.randint(0, n_x, size=(n_bootstrap, n_x))
-    y_indices = np.random.randint(0, n_y, size=(n_bootstrap, n_y))
+    Delegado ao motor em blocos (bootstrap.py): memória limitada por bloco,
+    blocos distribuídos entre processos e resultado determinístico pela semente.
     
-    # Calcula médias de forma vetorizada
-    x_means = x[x_indices].mean(axis=1)
-    y_means = y[y_indices].mean(axis=1)
-    
-    # Diferenças
-    diff_means = x_means - y_means
-    
-    # Percentis
-    alpha = 1 - ci
-    lower = np.percentile(diff_means, alpha / 2 * 100)
-    upper = np.percentile(diff_means, (1 - alpha / 2) * 100)
-    
-    return lower, upper
+    Args:
+        **kwargs: method ('resample', 'multinomial', 'poisson'), n_workers, memory_mb
+    """
+    from bootstrap import bootstrap_diff_ci
+    return bootstrap_diff_ci(x, y, 'mean', n_resamples=n_bootstrap, ci=ci, seed=seed, **kwargs)
 
 
-def fast_cliffs_delta(x: np.ndarray, y: np.ndarray, max_sample: int = 10000) -> float:
+def fast_cliffs_delta(x: np.ndarray, y: np.ndarray, max_sample: Optional[int] = None) -> float:
     """
-    Calcula Cliff's Delta de forma otimizada.
+    Calcula Cliff's Delta exato em O(n log n) (ver rank_stats.compare_ranks).
     
-    Para amostras muito grandes, usa amostragem para evitar explosão de memória.
+    Não há mais amostragem: `max_sample` é mantido só por compatibilidade.
     """
-    # Amostra se arrays forem muito grandes (evita O(n*m) memória)
-    if len(x) > max_sample:
-        x = np.random.choice(x, max_sample, replace=False)
-    if len(y) > max_sample:
-        y = np.random.choice(y, max_sample, replace=False)
-    
-    # Usa broadcasting para comparação vetorizada
-    # Conta quantas vezes x[i] > y[j] e x[i] < y[j]
-    diff = x[:, np.newaxis] - y[np.newaxis, :]
-    
-    n_greater = (diff > 0).sum()
-    n_less = (diff < 0).sum()
-    n_total = len(x) * len(y)
-    
-    return (n_greater - n_less) / n_total
+    from rank_stats import cliffs_delta
+    return cliffs_delta(x, y)
+
+
+def source_path(file_path) -> Path:
+    """
+    NDJSON de uma execução a partir do NDJSON ou do próprio cache.
+
+    `rollups.discover_runs` devolve `<dir>/.cache/<stem>.parquet` para as
+    execuções que só existem em cache; o loader trabalha sempre com
+    `<dir>/<stem>.json` (que pode não existir mais).
+    """
+    path = Path(file_path)
+    if path.suffix == '.parquet' and path.parent.name == '.cache':
+        return path.parent.parent / f"{path.stem}.json"
+    return path
+
+
+def warm_cache(file_path: str) -> bool:
+    """Gera cache Parquet, estatísticas e histograma de um arquivo (alvo do build_graph)."""
+    file_path = source_path(file_path)
+    loader = FastK6Loader(str(file_path.parent), use_cache=True)
+    return loader.load_stats(file_path) is not None and loader.load_histogram(file_path) is not None
 
 
 if __name__ == "__main__":
-    # Exemplo de uso
+    import sys
     import time
     
+    # python fast_loader.py <arquivo.json>...: só prepara os caches
+    if len(sys.argv) > 1:
+        failed = [path for path in sys.argv[1:] if not warm_cache(path)]
+        for path in failed:
+            print(f"❌ Não foi possível carregar {path}")
+        sys.exit(1 if failed else 0)
+    
+    # Exemplo de uso
     print("=" * 60)
     print("  FAST K6 LOADER - Teste de Performance")
     print("=" * 60)
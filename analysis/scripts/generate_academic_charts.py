@@ -16,6 +16,7 @@ Uso:
 import argparse
 import json
 import os
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -25,6 +26,9 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 
+from distribution_plots import Distribution, as_histogram, boxplot, std, violinplot
+from render_farm import ChartTask, print_render_report, render_charts
+
 # Configuração acadêmica
 plt.style.use('seaborn-v0_8-whitegrid')
 ACADEMIC_CONFIG = {
@@ -70,13 +74,13 @@ class AcademicChartGenerator:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
-    def boxplot_comparison(self, data: Dict[str, np.ndarray], title: str,
+    def boxplot_comparison(self, data: Dict[str, Distribution], title: str,
                            ylabel: str, filename: str, horizontal: bool = False):
         """
         Gera box plot comparativo com anotações estatísticas.
         
         Args:
-            data: Dict {versão: array de valores}
+            data: Dict {versão: array de valores ou LatencyHistogram}
             title: Título do gráfico
             ylabel: Label do eixo Y
             filename: Nome do arquivo de saída
@@ -85,15 +89,15 @@ class AcademicChartGenerator:
         fig, ax = plt.subplots(figsize=(12, 7))
         
         versions = list(data.keys())
-        values = [data[v] for v in versions]
+        # Quartis, whiskers e fliers saem do histograma (Axes.bxp), sem ordenar os arrays
+        values = [as_histogram(data[v]) for v in versions]
         labels = [VERSION_LABELS.get(v, v) for v in versions]
         colors = [COLORS.get(v, '#333333') for v in versions]
         
+        bp = boxplot(ax, values, labels, horizontal=horizontal, patch_artist=True)
         if horizontal:
-            bp = ax.boxplot(values, vert=False, labels=labels, patch_artist=True)
             ax.set_xlabel(ylabel)
         else:
-            bp = ax.boxplot(values, labels=labels, patch_artist=True)
             ax.set_ylabel(ylabel)
             plt.xticks(rotation=15, ha='right')
         
@@ -109,7 +113,7 @@ class AcademicChartGenerator:
             median.set(color='black', linewidth=2)
         
         # Adicionar pontos de média
-        means = [np.mean(v) for v in values]
+        means = [v.mean for v in values]
         if horizontal:
             ax.scatter(means, range(1, len(versions)+1), color='white', 
                       marker='D', s=50, zorder=3, edgecolors='black', linewidths=1)
@@ -120,7 +124,7 @@ class AcademicChartGenerator:
         # Adicionar estatísticas
         stats_text = []
         for v, name in zip(values, labels):
-            stats_text.append(f"{name}: μ={np.mean(v):.1f}, σ={np.std(v):.1f}")
+            stats_text.append(f"{name}: μ={v.mean:.1f}, σ={std(v, ddof=0):.1f}")
         
         ax.set_title(title, fontweight='bold', pad=15)
         
@@ -133,20 +137,22 @@ class AcademicChartGenerator:
         plt.close()
         print(f"✅ Box plot salvo: {filename}")
     
-    def violin_plot(self, data: Dict[str, np.ndarray], title: str,
+    def violin_plot(self, data: Dict[str, Distribution], title: str,
                     ylabel: str, filename: str):
         """
         Gera violin plot para mostrar distribuição completa.
+        
+        O KDE é calculado sobre o histograma (binning + FFT), não sobre os arrays.
         """
         fig, ax = plt.subplots(figsize=(12, 7))
         
         versions = list(data.keys())
-        values = [data[v] for v in versions]
+        values = [as_histogram(data[v]) for v in versions]
         labels = [VERSION_LABELS.get(v, v) for v in versions]
         colors = [COLORS.get(v, '#333333') for v in versions]
         
-        parts = ax.violinplot(values, positions=range(1, len(versions)+1),
-                              showmeans=True, showmedians=True)
+        parts = violinplot(ax, values, positions=range(1, len(versions)+1),
+                           showmeans=True, showmedians=True)
         
         # Colorir violins
         for i, pc in enumerate(parts['bodies']):
@@ -290,36 +296,33 @@ class AcademicChartGenerator:
     
     def generate_comparison_summary(self, scenarios: List[str],
                                     versions: List[str],
-                                    metrics: Dict[str, pd.DataFrame]):
+                                    metrics: Dict[str, pd.DataFrame],
+                                    max_workers: Optional[int] = None) -> bool:
         """
-        Gera conjunto completo de gráficos comparativos.
+        Gera conjunto completo de gráficos comparativos (renderizados em paralelo).
         """
         print("\n📊 Gerando conjunto de gráficos acadêmicos...\n")
         
+        tasks = []
         for metric_name, df in metrics.items():
-            # Heatmap
-            self.heatmap_performance(
-                df, f'{metric_name} por Cenário e Versão',
-                f'heatmap_{metric_name.lower().replace(" ", "_")}.png'
-            )
-            
-            # Barras agrupadas
-            self.grouped_bar_chart(
-                df, f'Comparação de {metric_name}',
-                metric_name,
-                f'bars_{metric_name.lower().replace(" ", "_")}.png'
-            )
+            slug = metric_name.lower().replace(" ", "_")
+            tasks.append(ChartTask(f'heatmap_{slug}', self.heatmap_performance,
+                                   (df, f'{metric_name} por Cenário e Versão', f'heatmap_{slug}.png')))
+            tasks.append(ChartTask(f'bars_{slug}', self.grouped_bar_chart,
+                                   (df, f'Comparação de {metric_name}', metric_name, f'bars_{slug}.png')))
         
+        all_ok = print_render_report(render_charts(tasks, max_workers=max_workers))
         print(f"\n✅ Gráficos salvos em: {self.output_dir}/")
+        return all_ok
 
-
-def main():
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description='Gerador de gráficos acadêmicos')
     parser.add_argument('--data-dir', default='analysis_results', help='Diretório com dados')
     parser.add_argument('--output-dir', default='analysis_results/academic_charts', help='Diretório de saída')
     parser.add_argument('--demo', action='store_true', help='Gerar gráficos de demonstração')
+    parser.add_argument('--jobs', type=int, default=None, help='Processos de renderização (default: CPUs)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     generator = AcademicChartGenerator(args.output_dir)
     
@@ -336,44 +339,12 @@ def main():
             'V3': np.random.normal(550, 120, 500),
         }
         
-        # Box plot
-        generator.boxplot_comparison(
-            demo_data,
-            'Distribuição de Latência por Versão',
-            'Latência (ms)',
-            'demo_boxplot_latency.png'
-        )
-        
-        # Violin plot
-        generator.violin_plot(
-            demo_data,
-            'Distribuição de Latência (Violin Plot)',
-            'Latência (ms)',
-            'demo_violin_latency.png'
-        )
-        
-        # Heatmap de performance
         perf_data = pd.DataFrame({
             'V1': [90.0, 94.7, 94.9, 10.1],
             'V2 (CB)': [94.5, 94.9, 95.2, 97.1],
             'V3 (Retry)': [85.0, 94.5, 88.0, 5.0],
         }, index=['Catástrofe', 'Degradação', 'Rajadas', 'Indisponibilidade'])
         
-        generator.heatmap_performance(
-            perf_data,
-            'Taxa de Sucesso (%) por Cenário',
-            'demo_heatmap_success_rate.png'
-        )
-        
-        # Barras agrupadas
-        generator.grouped_bar_chart(
-            perf_data,
-            'Comparação de Taxa de Sucesso por Cenário',
-            'Taxa de Sucesso (%)',
-            'demo_bars_success_rate.png'
-        )
-        
-        # Heatmap de correlação
         corr_data = pd.DataFrame({
             'Taxa Sucesso': np.random.random(100),
             'Latência Média': np.random.random(100) * 500,
@@ -382,20 +353,32 @@ def main():
             'Taxa Erro': np.random.random(100) * 10,
         })
         
-        generator.heatmap_correlation(
-            corr_data,
-            'Correlação entre Métricas',
-            'demo_heatmap_correlation.png'
-        )
+        tasks = [
+            ChartTask('demo_boxplot_latency', generator.boxplot_comparison,
+                      (demo_data, 'Distribuição de Latência por Versão', 'Latência (ms)',
+                       'demo_boxplot_latency.png')),
+            ChartTask('demo_violin_latency', generator.violin_plot,
+                      (demo_data, 'Distribuição de Latência (Violin Plot)', 'Latência (ms)',
+                       'demo_violin_latency.png')),
+            ChartTask('demo_heatmap_success_rate', generator.heatmap_performance,
+                      (perf_data, 'Taxa de Sucesso (%) por Cenário', 'demo_heatmap_success_rate.png')),
+            ChartTask('demo_bars_success_rate', generator.grouped_bar_chart,
+                      (perf_data, 'Comparação de Taxa de Sucesso por Cenário', 'Taxa de Sucesso (%)',
+                       'demo_bars_success_rate.png')),
+            ChartTask('demo_heatmap_correlation', generator.heatmap_correlation,
+                      (corr_data, 'Correlação entre Métricas', 'demo_heatmap_correlation.png')),
+        ]
+        all_ok = print_render_report(render_charts(tasks, max_workers=args.jobs))
         
         print(f"\n✅ Gráficos de demonstração salvos em: {args.output_dir}/")
-        return
+        return 0 if all_ok else 1
     
     print(f"\n📊 Gerador de gráficos acadêmicos")
     print(f"📁 Dados: {args.data_dir}")
     print(f"📁 Saída: {args.output_dir}")
     print("\nℹ️ Use --demo para gerar gráficos de demonstração")
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
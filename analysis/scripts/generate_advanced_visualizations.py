@@ -6,6 +6,10 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 
+from cb_state_analysis import load_spans
+from downsample import merge_spans, pixel_span, plot_downsampled
+from results_registry import get_registry
+
 # Style configuration
 plt.style.use('seaborn-v0_8-whitegrid')
 plt.rcParams.update({
@@ -20,37 +24,46 @@ RESULTS_DIR = "analysis_results/csv"
 OUTPUT_DIR = "analysis_results/academic_charts"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def generate_cb_state_chart():
-    """Generates a timeline showing V2 success rate and inferred CB state."""
-    file_path = os.path.join(RESULTS_DIR, "timeline_V2.csv")
-    if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
+CB_STATE_COLORS = {'OPEN': 'orange', 'HALF_OPEN': 'gold'}
+
+def generate_cb_state_chart(scenario: str = "Completo", version: str = "V2"):
+    """Generates a timeline showing V2 latency and the reconstructed CB state."""
+    df = get_registry(RESULTS_DIR).read("timeline_V2.csv")
+    if df is None:
+        print(f"File not found: {os.path.join(RESULTS_DIR, 'timeline_V2.csv')}")
         return
 
-    df = pd.read_csv(file_path)
     df['timestamp'] = pd.to_datetime(df['timestamp'])
-    
-    # We infer CB state: if latencies are very low (< 5ms) and count is high, it's likely OPEN
-    # Realistically, we should use the 503 vs 202 vs 200 counts if available per window.
-    # Since timeline_V2.csv only has latency stats, we look for 'valleys' in latency 
-    # that correspond to high fallback rates.
-    
-    # For a better plot, let's load the consolidated benefits to see scenario timings if possible
-    # or just use the latency drops.
-    
+
+    # CB state comes from the per-request reconstruction (cb_state_analysis.py):
+    # 202/503 bursts with near-zero latency, run-length encoded per second.
+    spans = load_spans(scenario, version, RESULTS_DIR)
+    if spans is None:
+        print(f"CB state spans not found for {scenario}/{version}; "
+              f"run cb_state_analysis.py first")
+
     fig, ax1 = plt.subplots(figsize=(12, 6))
 
     color_latency = '#1f77b4'
     ax1.set_xlabel('Time (min)')
     ax1.set_ylabel('Latency (ms)', color=color_latency)
-    ax1.plot(df.index * 5 / 60, df['Média'], color=color_latency, label='Avg Latency', linewidth=1.5)
+    minutes = df.index.to_numpy() * 5 / 60
+    plot_downsampled(ax1, minutes, df['Média'].to_numpy(), color=color_latency, label='Avg Latency',
+                     linewidth=1.5, dpi=plt.rcParams['savefig.dpi'])
     ax1.tick_params(axis='y', labelcolor=color_latency)
     ax1.set_yscale('log')
 
-    # Shade areas where latency is extremely low (Open/Fallback active)
-    cb_open = df['Média'] < 10
-    ax1.fill_between(df.index * 5 / 60, 0, df['Média'].max(), where=cb_open, 
-                    color='orange', alpha=0.2, label='CB Open/Fallback')
+    if spans is not None:
+        # Spans closer than one pixel are merged (never dropped): short OPEN bursts stay visible
+        x_max = max(minutes[-1] if len(minutes) else 0, spans['end_ms'].max() / 60000)
+        min_gap = pixel_span(ax1, 0, x_max, dpi=plt.rcParams['savefig.dpi'])
+        for state, color in CB_STATE_COLORS.items():
+            state_spans = spans[spans['state'] == state]
+            starts, ends = merge_spans(state_spans['start_ms'] / 60000, state_spans['end_ms'] / 60000, min_gap)
+            for i, (start, end) in enumerate(zip(starts, ends)):
+                ax1.axvspan(start, end, color=color, alpha=0.2,
+                            label=f'CB {state}' if i == 0 else None)
+        ax1.legend(loc='upper right')
 
     plt.title('V2: Latency and Circuit Breaker State Transitions')
     plt.tight_layout()
@@ -61,11 +74,10 @@ def generate_cb_state_chart():
 def generate_correlation_heatmap():
     """Generates a heatmap showing correlations between metrics."""
     # We use the summary analysis per version or scenario
-    summary_path = os.path.join(RESULTS_DIR, "summary_analysis.csv")
-    if not os.path.exists(summary_path):
+    df = get_registry(RESULTS_DIR).read("summary_analysis.csv")
+    if df is None:
         return
 
-    df = pd.read_csv(summary_path)
     # Filter numeric cols
     numeric_df = df.select_dtypes(include=[np.number])
     
@@ -11,6 +11,9 @@ import matplotlib.patches as mpatches
 import seaborn as sns
 import numpy as np
 
+from render_farm import ChartTask, print_render_report, render_charts
+from results_registry import get_registry
+
 # Configurações
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
@@ -35,11 +38,16 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 TARGET_SCENARIOS = ['rajadas', 'catastrofe']
 
 
+def results():
+    """Registry of the scenario tables (loaded once per process)"""
+    return get_registry(CSV_DIR)
+
+
 def load_scenario_data(scenario):
     """Load data from a specific scenario"""
-    status = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
-    response = pd.read_csv(f"{CSV_DIR}/{scenario}_response.csv")
-    benefits = pd.read_csv(f"{CSV_DIR}/{scenario}_benefits.csv")
+    status = results().table(scenario, 'status')
+    response = results().table(scenario, 'response')
+    benefits = results().table(scenario, 'benefits')
     
     return {
         'status': status,
@@ -63,7 +71,7 @@ def plot_1_success_rate_comparison():
     data = []
     
     for scenario in TARGET_SCENARIOS:
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        df = results().table(scenario, 'status')
         v1 = df[df['Version'] == 'V1'].iloc[0]
         v2 = df[df['Version'] == 'V2'].iloc[0]
         
@@ -126,7 +134,7 @@ def plot_2_response_composition():
     fig, axes = plt.subplots(1, 2, figsize=(16, 7))
     
     for idx, scenario in enumerate(TARGET_SCENARIOS):
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        df = results().table(scenario, 'status')
         ax = axes[idx]
         
         v1 = df[df['Version'] == 'V1'].iloc[0]
@@ -189,7 +197,7 @@ def plot_3_failure_reduction():
     data = []
     
     for scenario in TARGET_SCENARIOS:
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        df = results().table(scenario, 'status')
         v1 = df[df['Version'] == 'V1'].iloc[0]
         v2 = df[df['Version'] == 'V2'].iloc[0]
         
@@ -264,7 +272,7 @@ def plot_4_downtime_comparison():
     data = []
     
     for scenario in TARGET_SCENARIOS:
-        benefits = pd.read_csv(f"{CSV_DIR}/{scenario}_benefits.csv").iloc[0]
+        benefits = results().table(scenario, 'benefits').iloc[0]
         
         v1_downtime = benefits.get('V1 Downtime (s)', 0) / 60 if pd.notna(benefits.get('V1 Downtime (s)', np.nan)) else 0
         v2_downtime = benefits.get('V2 Downtime (s)', 0) / 60 if pd.notna(benefits.get('V2 Downtime (s)', np.nan)) else 0
@@ -437,8 +445,13 @@ The **Intermittent Bursts** and **Catastrophic Failure** scenarios compellingly
     print("✅ README.md generated with data summary")
 
 
-def main():
-    """Generate all comparative charts"""
+def main(max_workers=None) -> int:
+    """
+    Generate all comparative charts (in parallel; max_workers=None uses all CPUs).
+    
+    Returns:
+        Exit code: 0 if every chart was rendered, 1 otherwise
+    """
     print("\n" + "="*60)
     print("  V1 vs V2 COMPARATIVE CHART GENERATION")
     print("  Scenarios: Intermittent Bursts and Catastrophic Failure")
@@ -446,38 +459,40 @@ def main():
     
     # Check if data exists
     for scenario in TARGET_SCENARIOS:
-        status_path = f"{CSV_DIR}/{scenario}_status.csv"
-        if not os.path.exists(status_path):
-            print(f"❌ File not found: {status_path}")
+        if not results().has(scenario, 'status'):
+            print(f"❌ File not found: {CSV_DIR}/{scenario}_status.csv")
             print("   Run the scenario analysis script first.")
-            return
-    
-    try:
-        plot_1_success_rate_comparison()
-        plot_2_response_composition()
-        plot_3_failure_reduction()
-        plot_4_downtime_comparison()
-        plot_5_combined_summary()
-        generate_summary_markdown()
-        
-        print("\n" + "="*60)
+            return 1
+    
+    # Tables are read once (registry); charts are rendered in parallel
+    chart_results = render_charts([
+        ChartTask('01_v1_v2_success_rate_comparison', plot_1_success_rate_comparison),
+        ChartTask('02_response_composition', plot_2_response_composition),
+        ChartTask('03_failure_reduction', plot_3_failure_reduction),
+        ChartTask('04_downtime_comparison', plot_4_downtime_comparison),
+        ChartTask('05_combined_summary', plot_5_combined_summary),
+        ChartTask('README', generate_summary_markdown),
+    ], registries=[results()], max_workers=max_workers)
+    
+    all_ok = print_render_report(chart_results)
+    print("\n" + "="*60)
+    if all_ok:
         print(f"✅ ALL CHARTS GENERATED SUCCESSFULLY!")
-        print(f"📁 Location: {OUTPUT_DIR}/")
-        print("="*60 + "\n")
-        
-        print("Generated files:")
-        print("  01_v1_v2_success_rate_comparison.png")
-        print("  02_response_composition.png")
-        print("  03_failure_reduction.png")
-        print("  04_downtime_comparison.png")
-        print("  05_combined_summary.png")
-        print("  README.md")
-        
-    except Exception as e:
-        print(f"\n❌ Error generating charts: {e}")
-        import traceback
-        traceback.print_exc()
-
+    else:
+        print(f"⚠️  CHARTS GENERATED WITH FAILURES (see above)")
+    print(f"📁 Location: {OUTPUT_DIR}/")
+    print("="*60 + "\n")
+    
+    print("Generated files:")
+    for result in chart_results:
+        if result.ok:
+            print(f"  {result.name}.md" if result.name == 'README' else f"  {result.name}.png")
+    return 0 if all_ok else 1
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    import sys
+    
+    parser = argparse.ArgumentParser(description="V1 vs V2 comparative charts")
+    parser.add_argument("--jobs", type=int, default=None, help="Rendering processes (default: CPUs)")
+    sys.exit(main(parser.parse_args().jobs))
@@ -10,6 +10,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
+from render_farm import ChartTask, print_render_report, render_charts
+from results_registry import get_registry
+
 # Configurações
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
@@ -30,18 +33,21 @@ CSV_DIR = "analysis_results/scenarios/csv"
 OUTPUT_DIR = "analysis_results/final_charts"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+def results():
+    """Registro das tabelas de cenário (carregado uma vez por processo)"""
+    return get_registry(CSV_DIR)
+
 def get_available_scenarios():
-    files = [f for f in os.listdir(CSV_DIR) if f.endswith('_status.csv')]
-    return sorted({f.replace('_status.csv', '') for f in files})
+    return results().scenarios('status')
 
 def scenario_label(name):
     return name.replace('_', ' ').title()
 
 def load_scenario_data(scenario):
     """Carrega dados de um cenário específico"""
-    status = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
-    response = pd.read_csv(f"{CSV_DIR}/{scenario}_response.csv")
-    benefits = pd.read_csv(f"{CSV_DIR}/{scenario}_benefits.csv")
+    status = results().table(scenario, 'status')
+    response = results().table(scenario, 'response')
+    benefits = results().table(scenario, 'benefits')
     
     return {
         'status': status,
@@ -58,7 +64,7 @@ def plot_1_success_rates_comparison(scenarios):
     data = []
     
     for scenario in scenarios:
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        df = results().table(scenario, 'status')
         data.append({
             'Cenário': scenario_label(scenario),
             'V1': df[df['Version'] == 'V1']['Total Success Rate (%)'].values[0],  # Total Success = 200 + 202
@@ -105,7 +111,7 @@ def plot_2_failure_reduction(scenarios):
     data = []
     
     for scenario in scenarios:
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        df = results().table(scenario, 'status')
         v1_failures = df[df['Version'] == 'V1']['API Failure Rate (%)'].values[0]
         v2_failures = df[df['Version'] == 'V2']['API Failure Rate (%)'].values[0]
         reduction = ((v1_failures - v2_failures) / v1_failures * 100) if v1_failures > 0 else 0
@@ -175,7 +181,7 @@ def plot_3_response_time_percentiles(scenarios):
         axes = [axes]
     
     for idx, scenario in enumerate(scenarios):
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_response.csv")
+        df = results().table(scenario, 'response')
         
         metrics = ['P50 (ms)', 'P95 (ms)', 'P99 (ms)']
         v1_values = df[df['Version'] == 'V1'][metrics].values[0]
@@ -220,7 +226,7 @@ def plot_4_throughput_comparison(scenarios):
     data = []
     
     for scenario in scenarios:
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        df = results().table(scenario, 'status')
         v1_total = df[df['Version'] == 'V1']['Total Requests'].values[0]
         v2_total = df[df['Version'] == 'V2']['Total Requests'].values[0]
         variation = ((v2_total - v1_total) / v1_total * 100)
@@ -277,7 +283,7 @@ def plot_5_status_distribution(scenarios):
     fig, axes = plt.subplots(2, len(scenarios), figsize=(6 * len(scenarios), 10))
     
     for idx, scenario in enumerate(scenarios):
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        df = results().table(scenario, 'status')
         
         # V1
         ax_v1 = axes[0, idx]
@@ -329,8 +335,8 @@ def plot_6_consolidated_metrics(scenarios):
     }
     
     for scenario in scenarios:
-        status = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
-        response = pd.read_csv(f"{CSV_DIR}/{scenario}_response.csv")
+        status = results().table(scenario, 'status')
+        response = results().table(scenario, 'response')
         
         for version in ['V1', 'V2']:
             st = status[status['Version'] == version].iloc[0]
@@ -426,7 +432,7 @@ def plot_8_fallback_contribution(scenarios):
     data = []
     
     for scenario in scenarios:
-        df = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        df = results().table(scenario, 'status')
         v2 = df[df['Version'] == 'V2'].iloc[0]
         
         data.append({
@@ -522,11 +528,10 @@ def plot_9_avg_response_times(scenarios):
 
     records = []
     for scenario in scenarios:
-        path = f"{CSV_DIR}/{scenario}_response.csv"
-        if not os.path.exists(path):
+        df = results().table(scenario, 'response')
+        if df is None:
             print(f"⚠️  Sem response.csv para {scenario}")
             continue
-        df = pd.read_csv(path)
         for version in ['V1', 'V2']:
             value = df[df['Version'] == version]['Avg Response (ms)'].values[0]
             records.append({
@@ -578,11 +583,10 @@ def plot_10_error_rates(scenarios):
 
     data = []
     for scenario in scenarios:
-        path = f"{CSV_DIR}/{scenario}_status.csv"
-        if not os.path.exists(path):
+        df = results().table(scenario, 'status')
+        if df is None:
             print(f"⚠️  Sem status.csv para {scenario}")
             continue
-        df = pd.read_csv(path)
         for version in ['V1', 'V2']:
             value = df[df['Version'] == version]['API Failure Rate (%)'].values[0]
             data.append({
@@ -636,11 +640,10 @@ def plot_11_downtime_availability(scenarios):
     availability_records = []
 
     for scenario in scenarios:
-        path = f"{CSV_DIR}/{scenario}_benefits.csv"
-        if not os.path.exists(path):
+        df = results().table(scenario, 'benefits')
+        if df is None:
             print(f"⚠️  Sem benefits.csv para {scenario}")
             continue
-        df = pd.read_csv(path)
         row = df.iloc[0]
         downtime_records.append({
             'Cenário': scenario_label(scenario),
@@ -697,7 +700,7 @@ def generate_summary_table(scenarios):
     summary = []
     
     for scenario in scenarios:
-        status = pd.read_csv(f"{CSV_DIR}/{scenario}_status.csv")
+        status = results().table(scenario, 'status')
         
         v1 = status[status['Version'] == 'V1'].iloc[0]
         v2 = status[status['Version'] == 'V2'].iloc[0]
@@ -728,54 +731,68 @@ def generate_summary_table(scenarios):
     print("✅ Tabela resumo gerada")
     print(df.to_string(index=False))
 
-def main():
-    """Gera todos os gráficos"""
+def main(max_workers=None) -> int:
+    """
+    Gera todos os gráficos (em paralelo; max_workers=None usa todos os CPUs).
+    
+    Returns:
+        Código de saída: 0 se todos os gráficos e a tabela resumo foram gerados, 1 caso contrário
+    """
     print("\n" + "="*60)
     print("  GERAÇÃO DE GRÁFICOS - ANÁLISE FINAL TCC")
     print("="*60 + "\n")
     scenarios = get_available_scenarios()
     if not scenarios:
         print("❌ Nenhum cenário encontrado em analysis_results/scenarios/csv")
-        return
-    
+        return 1
+    
+    # Tabelas lidas uma vez (registro); os gráficos são renderizados em paralelo
+    tasks = [
+        ChartTask('01_success_rates_comparison', plot_1_success_rates_comparison, (scenarios,)),
+        ChartTask('02_failure_reduction', plot_2_failure_reduction, (scenarios,)),
+        ChartTask('03_response_time_percentiles', plot_3_response_time_percentiles, (scenarios,)),
+        ChartTask('04_throughput_comparison', plot_4_throughput_comparison, (scenarios,)),
+        ChartTask('05_status_distribution', plot_5_status_distribution, (scenarios,)),
+        ChartTask('06_consolidated_metrics_radar', plot_6_consolidated_metrics, (scenarios,)),
+        ChartTask('07_catastrofe_timeline', plot_7_catastrofe_timeline),
+        ChartTask('08_fallback_contribution', plot_8_fallback_contribution, (scenarios,)),
+        ChartTask('09_avg_response_times', plot_9_avg_response_times, (scenarios,)),
+        ChartTask('10_error_rates', plot_10_error_rates, (scenarios,)),
+        ChartTask('11_downtime_availability', plot_11_downtime_availability, (scenarios,)),
+    ]
+    chart_results = render_charts(tasks, registries=[results()], max_workers=max_workers)
+    
+    table_ok = True
     try:
-        plot_1_success_rates_comparison(scenarios)
-        plot_2_failure_reduction(scenarios)
-        plot_3_response_time_percentiles(scenarios)
-        plot_4_throughput_comparison(scenarios)
-        plot_5_status_distribution(scenarios)
-        plot_6_consolidated_metrics(scenarios)
-        plot_7_catastrofe_timeline()
-        plot_8_fallback_contribution(scenarios)
-        plot_9_avg_response_times(scenarios)
-        plot_10_error_rates(scenarios)
-        plot_11_downtime_availability(scenarios)
         generate_summary_table(scenarios)
-        
-        print("\n" + "="*60)
-        print(f"✅ TODOS OS GRÁFICOS GERADOS COM SUCESSO!")
-        print(f"📁 Localização: {OUTPUT_DIR}/")
-        print("="*60 + "\n")
-        
-        print("Arquivos gerados:")
-        print("  01_success_rates_comparison.png")
-        print("  02_failure_reduction.png")
-        print("  03_response_time_percentiles.png")
-        print("  04_throughput_comparison.png")
-        print("  05_status_distribution.png")
-        print("  06_consolidated_metrics_radar.png")
-        print("  07_catastrofe_timeline.png")
-        print("  08_fallback_contribution.png")
-        print("  09_avg_response_times.png")
-        print("  10_error_rates.png")
-        print("  11_downtime_availability.png")
-        print("  summary_table.csv")
-        print("  summary_table.md")
-        
     except Exception as e:
-        print(f"\n❌ Erro ao gerar gráficos: {e}")
+        table_ok = False
+        print(f"\n❌ Erro ao gerar tabela resumo: {e}")
         import traceback
         traceback.print_exc()
+    
+    all_ok = print_render_report(chart_results) and table_ok
+    print("\n" + "="*60)
+    if all_ok:
+        print(f"✅ TODOS OS GRÁFICOS GERADOS COM SUCESSO!")
+    else:
+        print(f"⚠️  GRÁFICOS GERADOS COM FALHAS (veja acima)")
+    print(f"📁 Localização: {OUTPUT_DIR}/")
+    print("="*60 + "\n")
+    
+    print("Arquivos gerados:")
+    for result in chart_results:
+        if result.ok:
+            print(f"  {result.name}.png")
+    if table_ok:
+        print("  summary_table.csv")
+        print("  summary_table.md")
+    return 0 if all_ok else 1
 
 if __name__ == "__main__":
-    main()
+    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Gráficos consolidados da análise final")
+    parser.add_argument("--jobs", type=int, default=None, help="Processos de renderização (default: CPUs)")
+    sys.exit(main(parser.parse_args().jobs))
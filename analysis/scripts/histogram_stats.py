@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Mann-Whitney U e Kolmogorov-Smirnov sobre histogramas de latência
+
+As latências do k6 têm resolução finita (e muitos empates), então uma
+execução inteira cabe num vetor de contagens por valor/bin. Com dois
+histogramas alinhados na mesma grade:
+
+- U de Mann-Whitney: pares x > y = Σ cx_i · (contagem de y abaixo do bin i);
+  empates = Σ cx_i · cy_i; correção de empates = Σ (t³ - t), t = cx_i + cy_i
+- KS: D = max |F_x - F_y| sobre as contagens acumuladas
+
+Tudo em O(bins), sem materializar nem ordenar os arrays. Os histogramas são
+somáveis (`merge`/`+`), então arquivos e repetições podem ser combinados e
+os testes cobrem a execução completa, sem reservoir sampling. O FastK6Loader
+acumula o histograma de `http_req_duration` durante a ingestão
+(`FastK6Loader.load_histogram`).
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from bootstrap import histogram_counts
+from rank_stats import RankComparison, mann_whitney_p
+from sufficient_stats import STREAM_BUFFER_SIZE
+
+# Largura do bin usada na ingestão (ms); o k6 grava latências com resolução de µs
+HISTOGRAM_RESOLUTION_MS = 0.01
+
+
+@dataclass(frozen=True)
+class LatencyHistogram:
+    """Contagens por valor distinto (ou bin), ordenadas por valor."""
+    values: np.ndarray
+    counts: np.ndarray
+    resolution: Optional[float] = None
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, resolution: Optional[float] = None) -> "LatencyHistogram":
+        """
+        Histograma de um array (resolution=None: um bin por valor distinto, exato).
+        """
+        uniques, counts = histogram_counts(values, resolution)
+        return cls(uniques, counts.astype(np.int64), resolution)
+
+    @classmethod
+    def from_sorted(cls, sorted_values: np.ndarray) -> "LatencyHistogram":
+        """Histograma exato de um buffer já ordenado (ex.: LatencyProfile.sorted), em O(n)."""
+        sorted_values = np.asarray(sorted_values, dtype=float)
+        if sorted_values.size == 0:
+            return cls(np.empty(0), np.empty(0, dtype=np.int64))
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_values)) + 1))
+        counts = np.diff(np.concatenate((starts, [sorted_values.size])))
+        return cls(sorted_values[starts], counts.astype(np.int64))
+
+    @property
+    def n(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def bins(self) -> int:
+        return len(self.values)
+
+    @property
+    def mean(self) -> float:
+        return float(self.values @ self.counts / self.n) if self.n else float("nan")
+
+    def value_at_rank(self, ranks) -> np.ndarray:
+        """Estatística(s) de ordem (ranks 0-based) a partir das contagens acumuladas."""
+        cumulative = np.cumsum(self.counts)
+        return self.values[np.searchsorted(cumulative, np.asarray(ranks), side="right")]
+
+    def quantile(self, q: float) -> float:
+        """Quantil com interpolação linear (mesma definição de np.quantile)."""
+        if self.n == 0:
+            return float("nan")
+        position = q * (self.n - 1)
+        lower = int(np.floor(position))
+        low, high = self.value_at_rank([lower, min(lower + 1, self.n - 1)])
+        return float(low + (high - low) * (position - lower))
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Soma de histogramas (ex.: vários arquivos ou repetições)."""
+        if other.bins == 0:
+            return self
+        if self.bins == 0:
+            return other
+        if self.resolution != other.resolution:
+            raise ValueError("histogramas com resoluções diferentes não podem ser combinados")
+        grid, counts_a, counts_b = align(self, other)
+        return LatencyHistogram(grid, counts_a + counts_b, self.resolution)
+
+    __add__ = merge
+
+    def save(self, path: Path):
+        np.savez_compressed(path, values=self.values, counts=self.counts,
+                            resolution=np.nan if self.resolution is None else self.resolution)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["LatencyHistogram"]:
+        try:
+            with np.load(path) as data:
+                resolution = float(data["resolution"])
+                return cls(data["values"], data["counts"].astype(np.int64),
+                           None if np.isnan(resolution) else resolution)
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+class StreamingHistogram:
+    """Acumula um histograma valor a valor (buffer + merge em blocos)."""
+
+    def __init__(self, resolution: Optional[float] = HISTOGRAM_RESOLUTION_MS,
+                 buffer_size: int = STREAM_BUFFER_SIZE):
+        self.resolution = resolution
+        self.buffer_size = buffer_size
+        self._histogram = LatencyHistogram(np.empty(0), np.empty(0, dtype=np.int64), resolution)
+        self._buffer: List[float] = []
+
+    def push(self, value: float):
+        self._buffer.append(value)
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            block = LatencyHistogram.from_values(np.asarray(self._buffer, dtype=float), self.resolution)
+            self._histogram = self._histogram.merge(block)
+            self._buffer.clear()
+
+    def result(self) -> LatencyHistogram:
+        self._flush()
+        return self._histogram
+
+
+def align(x: LatencyHistogram, y: LatencyHistogram) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Grade comum (união dos valores) e as contagens de x e y sobre ela."""
+    grid, inverse = np.unique(np.concatenate((x.values, y.values)), return_inverse=True)
+    counts_x = np.bincount(inverse[:x.bins], weights=x.counts, minlength=len(grid))
+    counts_y = np.bincount(inverse[x.bins:], weights=y.counts, minlength=len(grid))
+    return grid, counts_x.astype(np.int64), counts_y.astype(np.int64)
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> int:
+    """Produto interno exato (inteiros Python; evita overflow de int64 com bilhões de pares)."""
+    return int(np.dot(a.astype(object), b.astype(object)))
+
+
+def compare_histograms(x: LatencyHistogram, y: LatencyHistogram) -> RankComparison:
+    """
+    Contagens de dominância (as mesmas de rank_stats.compare_ranks) em O(bins).
+
+    O RankComparison resultante dá U, p-valor de Mann-Whitney e Cliff's delta.
+    """
+    _, counts_x, counts_y = align(x, y)
+    cum_y = np.cumsum(counts_y)
+    y_below = cum_y - counts_y
+    y_above = cum_y[-1] - cum_y if cum_y.size else cum_y
+    ties = (counts_x + counts_y).astype(float)
+    tie_term = float((ties ** 3 - ties).sum())
+    return RankComparison(x.n, y.n, _dot(counts_x, y_below), _dot(counts_x, y_above), tie_term)
+
+
+def mann_whitney_histograms(x: LatencyHistogram, y: LatencyHistogram,
+                            alternative: str = "two-sided") -> Tuple[float, float]:
+    """(U, p-valor) de Mann-Whitney a partir de histogramas (exato para amostras pequenas sem empates)."""
+    comparison = compare_histograms(x, y)
+    return comparison.u_statistic, mann_whitney_p(x, y, comparison, alternative)
+
+
+def ks_2samp_histograms(x: LatencyHistogram, y: LatencyHistogram,
+                        alternative: str = "two-sided") -> Tuple[float, float]:
+    """
+    (D, p-valor) de Kolmogorov-Smirnov a partir das distribuições acumuladas.
+
+    D é idêntico a stats.ks_2samp; o p-valor usa a fórmula assintótica de
+    Smirnov (a mesma do método 'asymp' do scipy, padrão para n > 10.000).
+    """
+    n_x, n_y = x.n, y.n
+    if n_x == 0 or n_y == 0:
+        return float("nan"), float("nan")
+    _, counts_x, counts_y = align(x, y)
+    diffs = np.cumsum(counts_x) / n_x - np.cumsum(counts_y) / n_y
+    d_plus = float(max(diffs.max(), 0.0))
+    d_minus = float(max(-diffs.min(), 0.0))
+
+    m, n = sorted([float(n_x), float(n_y)], reverse=True)
+    en = m * n / (m + n)
+    if alternative == "two-sided":
+        # scipy.stats só aqui: importá-lo no topo custa ~0,7 s a todo consumidor do fast_loader
+        from scipy import stats
+
+        d = max(d_plus, d_minus)
+        p = stats.kstwo.sf(d, np.round(en))
+    elif alternative in ("greater", "less"):
+        d = d_plus if alternative == "greater" else d_minus
+        z = np.sqrt(en) * d
+        # Aproximação de Hodges (eq. 5.3), como no scipy
+        p = np.exp(-2 * z ** 2 - 2 * z * (m + 2 * n) / np.sqrt(m * n * (m + n)) / 3.0)
+    else:
+        raise ValueError(f"alternative inválida: {alternative}")
+    return d, float(np.clip(p, 0, 1))
+
+
+if __name__ == "__main__":
+    import time
+
+    from scipy import stats
+
+    rng = np.random.default_rng(3)
+    x = np.round(rng.lognormal(4.6, 0.7, 2_000_000), 1)
+    y = np.round(rng.lognormal(4.598, 0.7, 1_800_000), 1)
+
+    # Dois "arquivos" por versão, combinados depois
+    hx = LatencyHistogram.from_values(x[:1_000_000]) + LatencyHistogram.from_values(x[1_000_000:])
+    hy = LatencyHistogram.from_values(y)
+
+    start = time.time()
+    u, p_mw = mann_whitney_histograms(hx, hy)
+    d, p_ks = ks_2samp_histograms(hx, hy)
+    elapsed = time.time() - start
+
+    u_ref, p_mw_ref = stats.mannwhitneyu(x, y, method="asymptotic")
+    d_ref, p_ks_ref = stats.ks_2samp(x, y)
+    print("=" * 60)
+    print(f"  HISTOGRAMAS - 2M x 1.8M ({hx.bins:,} / {hy.bins:,} bins)")
+    print("=" * 60)
+    print(f"  Tempo dos testes: {elapsed * 1000:.1f} ms")
+    print(f"  U: {u:.1f} (scipy: {u_ref:.1f}) | p: {p_mw:.3e} (scipy: {p_mw_ref:.3e})")
+    print(f"  D: {d:.6f} (scipy: {d_ref:.6f}) | p: {p_ks:.3e} (scipy: {p_ks_ref:.3e})")
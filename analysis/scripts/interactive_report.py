@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Relatórios HTML interativos a partir de dados pré-agregados
+
+Os relatórios estáticos (`K6Analyzer.generate_html_report`,
+`ScenarioAnalyzer.generate_report`) apontam para PNGs de 150–300 DPI, e
+gerá-los é a etapa mais lenta do pipeline. No modo interativo o HTML leva
+embutidos:
+
+- um JSON compacto por versão: rollups por janela de tempo (requisições,
+  latência média/máxima, disponibilidade 200 + 202, rejeições rápidas), o
+  histograma de latência em bins logarítmicos comuns a todas as versões e os
+  spans OPEN/HALF_OPEN do CB reconstruídos por cb_state_analysis;
+- as fases do cenário (phases.py);
+- a biblioteca de gráficos em canvas `assets/mini_charts.js` (sem
+  dependências, embutida para o relatório abrir offline), com zoom por
+  arraste sincronizado entre as linhas do tempo.
+
+Nada aqui chama o matplotlib. A janela começa em 1 s e só cresce quando o
+teste passaria de MAX_WINDOWS janelas, então o relatório fica em poucos MB
+mesmo para testes longos.
+"""
+
+import json
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from cb_state_analysis import CB_VERSION_PATTERN, reconstruct_timeline
+from histogram_stats import LatencyHistogram
+from phases import Phase
+from rollups import build_rollups
+
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+CHART_LIBRARY = ASSETS_DIR / "mini_charts.js"
+
+# Janelas por versão no JSON (a janela de 1 s cresce acima disso)
+MAX_WINDOWS = 20_000
+# Bins logarítmicos do histograma de latência
+HISTOGRAM_BINS = 80
+# Casas decimais das séries no JSON
+DECIMALS = 2
+
+DEFAULT_COLORS = {"V1": "#d62728", "V2": "#2ca02c", "V3": "#1f77b4"}
+
+
+def bucket_seconds_for(duration_s: float, max_windows: int = MAX_WINDOWS) -> float:
+    """Janela (s) que mantém o teste em até max_windows janelas: 1 s sempre que possível."""
+    return float(max(1, math.ceil(duration_s / max_windows)))
+
+
+def _compact(values, decimals: int = DECIMALS) -> List[Optional[float]]:
+    """Array → lista JSON arredondada (NaN vira null); inteiros saem sem casas decimais."""
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, decimals)
+    if decimals == 0:
+        return [None if np.isnan(v) else int(v) for v in rounded]
+    return [None if np.isnan(v) else float(v) for v in rounded]
+
+
+def timeline_payload(requests: pd.DataFrame, bucket_seconds: float) -> Dict:
+    """Séries por janela de uma versão (frame por requisição: seconds, latency_ms, status)."""
+    rollups = build_rollups(requests, bucket_seconds)
+    total = rollups["requests"].to_numpy(dtype=float)
+    served = total > 0
+    available = (rollups["status_200"] + rollups["status_202"]).to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_ms = np.where(served, rollups["latency_sum"].to_numpy() / total, np.nan)
+        availability = np.where(served, available / total * 100, np.nan)
+    return {
+        "requests": _compact(total, 0),
+        "mean_ms": _compact(mean_ms),
+        "max_ms": _compact(np.where(served, rollups["latency_max"].to_numpy(), np.nan)),
+        "availability": _compact(availability),
+        "rejected": _compact(rollups["rejected_fast"].to_numpy(), 0),
+    }
+
+
+def histogram_edges(histograms: Sequence[LatencyHistogram], bins: int = HISTOGRAM_BINS) -> np.ndarray:
+    """Bordas logarítmicas comuns cobrindo todas as distribuições (latências > 0)."""
+    positives = [h.values[(h.values > 0) & (h.counts > 0)] for h in histograms]
+    positives = [p for p in positives if len(p)]
+    if not positives:
+        return np.empty(0)
+    low = min(p[0] for p in positives)
+    high = max(p[-1] for p in positives)
+    if high <= low:
+        high = low * 1.01
+    return np.geomspace(low, high * (1 + 1e-9), bins + 1)
+
+
+def histogram_percentages(histogram: LatencyHistogram, edges: np.ndarray) -> List[Optional[float]]:
+    """% das requisições em cada faixa de edges (latências ≤ 0 entram na primeira)."""
+    values = np.clip(histogram.values, edges[0], edges[-1])
+    counts, _ = np.histogram(values, bins=edges, weights=histogram.counts)
+    return _compact(counts / max(histogram.n, 1) * 100, 3)
+
+
+def cb_spans(requests: pd.DataFrame, scenario: str, version: str) -> List[List]:
+    """Spans OPEN/HALF_OPEN (estado, início_s, fim_s), reconstruídos em janelas de 1 s."""
+    timeline = reconstruct_timeline(build_rollups(requests, 1.0), scenario, version, 1.0)
+    spans = timeline.spans[timeline.spans["state"] != "CLOSED"]
+    return [[state, round(start / 1000.0, 1), round(end / 1000.0, 1)]
+            for state, start, end in zip(spans["state"], spans["start_ms"], spans["end_ms"])]
+
+
+def build_report_data(requests: Dict[str, pd.DataFrame], scenario: str,
+                      histograms: Optional[Dict[str, LatencyHistogram]] = None,
+                      phases: Sequence[Phase] = (), colors: Optional[Dict[str, str]] = None,
+                      max_windows: int = MAX_WINDOWS) -> Dict:
+    """
+    Monta o JSON do relatório interativo.
+
+    Args:
+        requests: Frame por requisição de cada versão (fast_loader.to_request_frame)
+        scenario: Nome do cenário (para os spans do CB e o título)
+        histograms: LatencyHistogram por versão (as que faltarem saem do frame)
+        phases: Fases do cenário
+        colors: Cor por versão
+        max_windows: Máximo de janelas por versão
+
+    Returns:
+        Dicionário serializável em JSON consumido por MiniCharts.renderReport.
+    """
+    requests = {v: frame for v, frame in requests.items() if frame is not None and not frame.empty}
+    duration = max((float(frame["seconds"].max()) for frame in requests.values()), default=0.0)
+    bucket = bucket_seconds_for(duration, max_windows)
+
+    histograms = dict(histograms or {})
+    for version, frame in requests.items():
+        if histograms.get(version) is None:
+            histograms[version] = LatencyHistogram.from_values(frame["latency_ms"].to_numpy(dtype=float))
+    histograms = {v: h for v, h in histograms.items() if v in requests and h.n}
+    edges = histogram_edges(list(histograms.values()))
+
+    versions = {}
+    for version, frame in requests.items():
+        payload = timeline_payload(frame, bucket)
+        if version in histograms and len(edges):
+            payload["hist"] = histogram_percentages(histograms[version], edges)
+        versions[version] = payload
+
+    return {
+        "scenario": scenario,
+        "bucket_s": bucket,
+        "colors": {**DEFAULT_COLORS, **(colors or {})},
+        "versions": versions,
+        "hist_edges": _compact(edges, 3),
+        "phases": [{"name": p.name, "kind": p.kind, "start": p.start, "end": p.end} for p in phases],
+        "cb_spans": {v: cb_spans(frame, scenario, v) for v, frame in requests.items()
+                     if re.fullmatch(CB_VERSION_PATTERN, v)},
+    }
+
+
+@lru_cache(maxsize=1)
+def chart_library() -> str:
+    return CHART_LIBRARY.read_text(encoding="utf-8")
+
+
+def _script_safe(text: str) -> str:
+    """
+    Evita que '</script>' (ou '<!--') dentro do conteúdo feche o bloco <script>.
+    
+    `\\u003c` é um escape válido tanto em JSON quanto em strings JavaScript
+    (`<\\!` não é JSON válido).
+    """
+    return text.replace("<!--", "\\u003c!--").replace("</", "\\u003c/")
+
+
+def render_interactive_section(data: Dict, element_id: str = "interactive-charts") -> str:
+    """Trecho HTML (div + JSON + biblioteca) que substitui os <img> dos relatórios."""
+    payload = _script_safe(json.dumps(data, separators=(",", ":"), allow_nan=False))
+    return (
+        f'<div id="{element_id}"></div>\n'
+        f'<script type="application/json" id="{element_id}-data">{payload}</script>\n'
+        f'<script>{_script_safe(chart_library())}</script>\n'
+        f'<script>MiniCharts.renderReport(document.getElementById("{element_id}"), '
+        f'JSON.parse(document.getElementById("{element_id}-data").textContent));</script>'
+    )
+
+
+def report_size_kb(html: str) -> float:
+    return len(html.encode("utf-8")) / 1024
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from phases import get_phase_registry
+
+    # Demo: cenário sintético de 2 h, 50 req/s, com uma janela de falha
+    rng = np.random.default_rng(5)
+    frames = {}
+    for version, cb in (("V1", False), ("V2", True)):
+        seconds = np.sort(rng.uniform(0, 7200, 360_000))
+        latency = rng.lognormal(4.0, 0.4, seconds.size)
+        status = np.full(seconds.size, "200", dtype=object)
+        failing = (seconds > 1800) & (seconds < 2700)
+        if cb:
+            status[failing] = "202"
+            latency[failing] = rng.uniform(1, 5, failing.sum())
+        else:
+            status[failing] = "500"
+            latency[failing] = 3000.0
+        frames[version] = pd.DataFrame({"seconds": seconds, "latency_ms": latency, "status": status})
+
+    scenario = sys.argv[1] if len(sys.argv) > 1 else "catastrofe"
+    start = time.time()
+    data = build_report_data(frames, scenario, phases=get_phase_registry().phases(scenario))
+    html = render_interactive_section(data)
+    print(f"  Janela: {data['bucket_s']:.0f}s | spans do CB (V2): {len(data['cb_spans'].get('V2', []))}")
+    print(f"  Seção interativa: {report_size_kb(html):,.0f} KB em {time.time() - start:.2f}s")
+    out = Path("interactive_report_demo.html")
+    out.write_text(f"<!DOCTYPE html><html><body>{html}</body></html>", encoding="utf-8")
+    print(f"  ✅ {out}")
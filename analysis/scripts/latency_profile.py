@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Perfil de latência com buffer ordenado único
+
+Cada chamada a `.quantile()`, `np.percentile()` ou `np.median()` ordena (ou
+particiona) o array de novo. O `LatencyProfile` ordena cada array de
+latências uma única vez, guarda o buffer ordenado e responde a partir dele:
+
+- quantis/percentis (interpolação linear, igual a pandas/numpy): O(1)
+- ranks, ECDF e frações abaixo/acima de limiares (< 500 ms, > 2000 ms): O(log n)
+- média, desvio padrão, mínimo e máximo: O(1) (calculados uma vez)
+
+`group_profiles` monta perfis de vários grupos (fases, janelas) com um único
+`np.lexsort`, e `partition_quantiles` cobre o caso de poucos quantis de um
+array usado uma única vez (np.partition, O(n)).
+"""
+
+from functools import cached_property
+from typing import Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+
+# Limiares usados nos relatórios (requisições rápidas/lentas)
+FAST_THRESHOLD_MS = 500.0
+SLOW_THRESHOLD_MS = 2000.0
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+class LatencyProfile:
+    """
+    Estatísticas de ordem de um array de latências, ordenado uma vez.
+
+    Args:
+        values: Latências (ms); NaN são descartados
+        presorted: Se True, assume que `values` já está ordenado (sem cópia)
+    """
+
+    def __init__(self, values: ArrayLike, presorted: bool = False):
+        values = np.asarray(values, dtype=float)
+        if not presorted:
+            values = np.sort(values[~np.isnan(values)])
+        self.sorted = values
+        self.n = len(values)
+
+    @classmethod
+    def from_sorted(cls, sorted_values: ArrayLike) -> "LatencyProfile":
+        """Cria o perfil a partir de um buffer já ordenado (ex.: fatia de um lexsort)."""
+        return cls(sorted_values, presorted=True)
+
+    def __len__(self) -> int:
+        return self.n
+
+    # --- Momentos (calculados uma vez) ---
+
+    @cached_property
+    def mean(self) -> float:
+        return float(self.sorted.mean()) if self.n else float("nan")
+
+    @cached_property
+    def _variance(self) -> float:
+        return float(self.sorted.var()) if self.n else float("nan")
+
+    def std(self, ddof: int = 0) -> float:
+        """Desvio padrão (ddof=0 como np.std; ddof=1 como pandas)."""
+        if self.n <= ddof:
+            return float("nan")
+        return float(np.sqrt(self._variance * self.n / (self.n - ddof)))
+
+    @property
+    def min(self) -> float:
+        return float(self.sorted[0]) if self.n else float("nan")
+
+    @property
+    def max(self) -> float:
+        return float(self.sorted[-1]) if self.n else float("nan")
+
+    # --- Quantis: O(1) por quantil ---
+
+    def quantile(self, q: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        """Quantil(is) com interpolação linear (mesmo resultado de np.quantile)."""
+        q_arr = np.asarray(q, dtype=float)
+        if self.n == 0:
+            result = np.full(q_arr.shape, np.nan)
+        else:
+            position = q_arr * (self.n - 1)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.minimum(lower + 1, self.n - 1)
+            weight = position - lower
+            result = self.sorted[lower] * (1 - weight) + self.sorted[upper] * weight
+        return float(result) if result.ndim == 0 else result
+
+    def percentile(self, p: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        """Percentil(is) em 0–100 (mesmo resultado de np.percentile)."""
+        return self.quantile(np.asarray(p, dtype=float) / 100.0)
+
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[float, float]:
+        """Vários quantis de uma vez: {q: valor}."""
+        qs = list(qs)
+        return dict(zip(qs, np.atleast_1d(self.quantile(qs)).tolist()))
+
+    # --- Ranks e limiares: O(log n) ---
+
+    def count_below(self, threshold: float, inclusive: bool = False) -> int:
+        """Quantidade de latências < threshold (ou <= se inclusive)."""
+        side = "right" if inclusive else "left"
+        return int(np.searchsorted(self.sorted, threshold, side=side))
+
+    def count_above(self, threshold: float, inclusive: bool = False) -> int:
+        """Quantidade de latências > threshold (ou >= se inclusive)."""
+        side = "left" if inclusive else "right"
+        return self.n - int(np.searchsorted(self.sorted, threshold, side=side))
+
+    def fraction_below(self, threshold: float, inclusive: bool = False) -> float:
+        return self.count_below(threshold, inclusive) / self.n if self.n else float("nan")
+
+    def fraction_above(self, threshold: float, inclusive: bool = False) -> float:
+        return self.count_above(threshold, inclusive) / self.n if self.n else float("nan")
+
+    def rank(self, values: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        """Rank médio (1-based, empates pela média) de valores frente ao perfil."""
+        left = np.searchsorted(self.sorted, values, side="left")
+        right = np.searchsorted(self.sorted, values, side="right")
+        return (left + right + 1) / 2.0
+
+    def ecdf(self, values: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        """Função de distribuição empírica F(x) = P(X <= x)."""
+        return np.searchsorted(self.sorted, values, side="right") / self.n
+
+    def describe(self, qs: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        """Resumo padrão usado pelos analisadores."""
+        summary = {"count": self.n, "mean": self.mean, "std": self.std(), "min": self.min}
+        summary.update({f"p{round(q * 100):d}": v for q, v in self.quantiles(qs).items()})
+        summary.update({
+            "max": self.max,
+            "fast_fraction": self.fraction_below(FAST_THRESHOLD_MS),
+            "slow_fraction": self.fraction_above(SLOW_THRESHOLD_MS),
+        })
+        return summary
+
+
+def group_profiles(codes: ArrayLike, values: ArrayLike, n_groups: int) -> List[LatencyProfile]:
+    """
+    Perfis por grupo com um único lexsort (grupo, latência).
+
+    Args:
+        codes: Código inteiro do grupo de cada valor (0..n_groups-1; negativos ignorados)
+        values: Latências
+        n_groups: Número de grupos
+
+    Returns:
+        Lista com um LatencyProfile por código (vazio se o grupo não tiver dados).
+    """
+    codes = np.asarray(codes)
+    values = np.asarray(values, dtype=float)
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    bounds = np.searchsorted(codes, np.arange(n_groups + 1), side="left")
+    return [LatencyProfile.from_sorted(values[bounds[i]:bounds[i + 1]]) for i in range(n_groups)]
+
+
+def partition_quantiles(values: ArrayLike, qs: Iterable[float]) -> np.ndarray:
+    """
+    Poucos quantis de um array usado uma vez, via np.partition (O(n)).
+
+    Mesmo resultado de np.quantile (interpolação linear), sem ordenar tudo.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    qs = np.asarray(list(qs), dtype=float)
+    if values.size == 0:
+        return np.full(qs.shape, np.nan)
+    position = qs * (values.size - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, values.size - 1)
+    part = np.partition(values, np.unique(np.concatenate((lower, upper))))
+    weight = position - lower
+    return part[lower] * (1 - weight) + part[upper] * weight
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(42)
+    data = rng.lognormal(mean=4.5, sigma=0.8, size=1_000_000)
+
+    start = time.time()
+    profile = LatencyProfile(data)
+    built = time.time() - start
+
+    start = time.time()
+    summary = profile.describe()
+    answered = time.time() - start
+
+    print("=" * 60)
+    print("  LATENCY PROFILE - 1M amostras")
+    print("=" * 60)
+    print(f"  Ordenação única: {built * 1000:.1f} ms | consultas: {answered * 1000:.3f} ms")
+    for key, value in summary.items():
+        print(f"  {key:>14}: {value:,.4f}")
+    assert np.allclose(profile.quantile([0.5, 0.95, 0.99]), np.quantile(data, [0.5, 0.95, 0.99]))
+    assert np.allclose(partition_quantiles(data, [0.95]), np.quantile(data, [0.95]))
+    print("\n✅ Quantis idênticos a np.quantile")
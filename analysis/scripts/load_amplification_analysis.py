@@ -1,54 +1,222 @@
 #!/usr/bin/env python3
+"""
+Análise de amplificação de carga (V3 - Retry com backoff exponencial)
+
+O Retry do V3 amplifica a carga principalmente durante as falhas, o que some
+quando se compara só o total de requisições do teste inteiro. Aqui a razão
+V3/V1 é calculada:
+
+- por janela de tempo (WINDOW_S segundos)
+- por fase do cenário (registro de fases lido dos scripts k6)
+- no total, como antes
+
+As contagens vêm de rollups por segundo montados a partir só das colunas
+time/metric do cache Parquet (sem reidratar `tags`). Quando existe export do
+Prometheus com o volume de chamadas recebidas pelo adquirente
+(monitoring/exports/<cenario>_<versão>_acquirer.csv), o volume do lado do
+adquirente também é somado por janela/fase — é ali que as tentativas extras
+do Retry aparecem. Os cenários são processados em paralelo.
+"""
+
 import os
-import pandas as pd
-import numpy as np
-from pathlib import Path
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 # Add current scripts directory to path to import fast_loader
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from fast_loader import FastK6Loader
+    from phases import SCRIPTS_DIR, assign_phases, get_phase_registry
+    from rollups import K6_RESULTS_DIR, count_rollup, discover_runs, load_request_times
+    from data_session import get_session
 except ImportError:
-    print("Error: fast_loader.py not found in the same directory.")
+    print("Error: phases.py/rollups.py not found in the same directory.")
     sys.exit(1)
 
-RESULTS_DIR = "k6/results"
+RESULTS_DIR = K6_RESULTS_DIR
 OUTPUT_DIR = "analysis_results/csv"
 SCENARIOS = ["catastrofe", "degradacao", "rajadas", "indisponibilidade"]
 
-def calculate_amplification():
-    loader = FastK6Loader(results_dir=RESULTS_DIR, use_cache=True)
-    results = []
-    
-    for scenario in SCENARIOS:
-        print(f"Analyzing Load Amplification for scenario: {scenario}")
-        data = loader.load_scenario(scenario, versions=["V1", "V3"])
-        
-        if "V1" in data and "V3" in data:
-            v1_reqs = data["V1"][data["V1"]['metric'] == 'http_reqs']['value'].sum()
-            v3_reqs = data["V3"][data["V3"]['metric'] == 'http_reqs']['value'].sum()
-            
-            amplification = v3_reqs / v1_reqs if v1_reqs > 0 else 0
-            
-            results.append({
-                'Scenario': scenario,
-                'V1 Total Requests': v1_reqs,
-                'V3 Total Requests': v3_reqs,
-                'Amplification Factor': amplification,
-                'Additional Load (%)': (amplification - 1) * 100 if amplification > 0 else 0
-            })
+# Tamanho da janela (s) da série de amplificação
+WINDOW_S = 10
+
+# Export do Prometheus: CSV com colunas timestamp (epoch, s) e value (req/s) de
+# sum(rate(http_server_requests_seconds_count{uri="/autorizar"}[15s]))
+PROMETHEUS_EXPORT_DIR = "monitoring/exports"
+ACQUIRER_FILE = "{scenario}_{version}_acquirer.csv"
+
+
+def _ratio(numerator, denominator):
+    """Razão elemento a elemento (NaN quando o denominador é zero)."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan),
+                     where=denominator > 0)
+
+
+def load_acquirer_calls(scenario: str, version: str, start: pd.Timestamp, size: int,
+                        export_dir: str = PROMETHEUS_EXPORT_DIR) -> Optional[np.ndarray]:
+    """
+    Chamadas recebidas pelo adquirente por segundo de teste, a partir do export.
+
+    A taxa (req/s) amostrada pelo Prometheus é interpolada no centro de cada
+    segundo do teste (alinhado pelo primeiro ponto do k6).
+    """
+    path = Path(export_dir) / ACQUIRER_FILE.format(scenario=scenario, version=version)
+    if not path.exists():
+        return None
+    export = pd.read_csv(path).sort_values("timestamp")
+    grid = start.timestamp() + np.arange(size) + 0.5
+    return np.interp(grid, export["timestamp"].to_numpy(dtype=float),
+                     export["value"].to_numpy(dtype=float), left=0.0, right=0.0)
+
+
+def amplification_for_scenario(scenario: str, counts: Dict[str, np.ndarray],
+                               acquirer: Dict[str, Optional[np.ndarray]],
+                               phases) -> Tuple[Dict, pd.DataFrame, pd.DataFrame]:
+    """
+    Calcula a amplificação V3/V1 por janela, por fase e total.
+
+    Args:
+        counts: Requisições por segundo de V1 e V3 (mesmo comprimento)
+        acquirer: Chamadas ao adquirente por segundo (ou None, por versão)
+        phases: Fases do cenário (lista de Phase)
+    """
+    size = len(counts["V1"])
+    seconds = np.arange(size)
+    has_acquirer = all(acquirer.get(v) is not None for v in ("V1", "V3"))
+
+    # Por janela: soma dos segundos de cada janela via bincount
+    window_idx = seconds // WINDOW_S
+    n_windows = int(window_idx.max()) + 1 if size else 0
+    windows = pd.DataFrame({
+        "Scenario": scenario,
+        "Window Start (s)": np.arange(n_windows) * WINDOW_S,
+        "V1 Requests": np.bincount(window_idx, weights=counts["V1"], minlength=n_windows),
+        "V3 Requests": np.bincount(window_idx, weights=counts["V3"], minlength=n_windows),
+    })
+    windows["Amplification"] = _ratio(windows["V3 Requests"], windows["V1 Requests"])
+    if phases:
+        windows["Phase"] = np.asarray(assign_phases(windows["Window Start (s)"].to_numpy(float), phases))
+    if has_acquirer:
+        for version in ("V1", "V3"):
+            windows[f"{version} Acquirer Calls"] = np.bincount(
+                window_idx, weights=acquirer[version], minlength=n_windows)
+        windows["Acquirer Amplification"] = _ratio(windows["V3 Acquirer Calls"],
+                                                   windows["V1 Acquirer Calls"])
+
+    # Por fase: somas acumuladas avaliadas nas fronteiras
+    phase_rows = []
+    cumulative = {v: np.concatenate(([0.0], np.cumsum(c))) for v, c in counts.items()}
+    acq_cumulative = ({v: np.concatenate(([0.0], np.cumsum(acquirer[v]))) for v in ("V1", "V3")}
+                      if has_acquirer else {})
+    for phase in phases:
+        lo, hi = min(int(phase.start), size), min(int(phase.end), size)
+        row = {
+            "Scenario": scenario,
+            "Phase": phase.name,
+            "Kind": phase.kind,
+            "Start (s)": phase.start,
+            "End (s)": phase.end,
+            "V1 Requests": cumulative["V1"][hi] - cumulative["V1"][lo],
+            "V3 Requests": cumulative["V3"][hi] - cumulative["V3"][lo],
+        }
+        row["Amplification"] = float(_ratio(row["V3 Requests"], row["V1 Requests"]))
+        for version, cum in acq_cumulative.items():
+            row[f"{version} Acquirer Calls"] = cum[hi] - cum[lo]
+        if has_acquirer:
+            row["Acquirer Amplification"] = float(_ratio(row["V3 Acquirer Calls"], row["V1 Acquirer Calls"]))
+        phase_rows.append(row)
+    phase_df = pd.DataFrame(phase_rows)
+
+    v1_reqs, v3_reqs = float(counts["V1"].sum()), float(counts["V3"].sum())
+    amplification = v3_reqs / v1_reqs if v1_reqs > 0 else 0
+    summary = {
+        'Scenario': scenario,
+        'V1 Total Requests': v1_reqs,
+        'V3 Total Requests': v3_reqs,
+        'Amplification Factor': amplification,
+        'Additional Load (%)': (amplification - 1) * 100 if amplification > 0 else 0,
+        'Peak Window Amplification': float(np.nanmax(windows["Amplification"])) if n_windows else np.nan,
+    }
+    if not phase_df.empty:
+        failure = phase_df[phase_df["Kind"] == "failure"]
+        summary['Failure Amplification Factor'] = float(
+            _ratio(failure["V3 Requests"].sum(), failure["V1 Requests"].sum()))
+    if has_acquirer:
+        v1_calls, v3_calls = float(acquirer["V1"].sum()), float(acquirer["V3"].sum())
+        summary['V1 Acquirer Calls'] = v1_calls
+        summary['V3 Acquirer Calls'] = v3_calls
+        summary['Acquirer Amplification Factor'] = float(_ratio(v3_calls, v1_calls))
+        summary['V3 Acquirer Calls per Request'] = float(_ratio(v3_calls, v3_reqs))
+    return summary, windows, phase_df
+
+
+def _analyze_scenario(task: Tuple[str, Dict[str, str], str]):
+    """Worker: lê V1/V3 de um cenário (só time/metric) e calcula a amplificação."""
+    scenario, paths, scripts_dir = task
+    session = get_session()
+    times = {version: load_request_times(path, session) for version, path in paths.items()}
+    if any(t is None for t in times.values()):
+        return None
+
+    last_second = max((seconds[-1] for _, seconds in times.values() if len(seconds)), default=None)
+    if last_second is None:
+        print(f"  No requests recorded for {scenario} (empty V1/V3 runs), skipping")
+        return None
+    size = int(last_second) + 1
+    counts = {version: count_rollup(seconds, size) for version, (_, seconds) in times.items()}
+    acquirer = {version: load_acquirer_calls(scenario, version, start, size)
+                for version, (start, _) in times.items()}
+    phases = get_phase_registry(scripts_dir).phases(scenario.lower())
+    return amplification_for_scenario(scenario, counts, acquirer, phases)
+
+
+def calculate_amplification(results_dir: str = RESULTS_DIR, scripts_dir: str = SCRIPTS_DIR,
+                            scenarios: Optional[List[str]] = None,
+                            max_workers: Optional[int] = None):
+    scenarios = scenarios or SCENARIOS
+    runs: Dict[str, Dict[str, str]] = {}
+    for scenario, version, path in discover_runs(results_dir, r"V[13]"):
+        if scenario in scenarios:
+            runs.setdefault(scenario, {})[version] = str(path)
+
+    tasks = []
+    for scenario in scenarios:
+        if set(runs.get(scenario, {})) >= {"V1", "V3"}:
+            tasks.append((scenario, runs[scenario], scripts_dir))
         else:
             print(f"  Missing data for {scenario}")
 
+    results = []
+    if tasks:
+        workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+        if workers <= 1:
+            print(f"Analyzing Load Amplification for {len(tasks)} scenario(s)...")
+            results = [r for r in map(_analyze_scenario, tasks) if r is not None]
+        else:
+            print(f"Analyzing Load Amplification for {len(tasks)} scenario(s) in parallel...")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = [r for r in pool.map(_analyze_scenario, tasks) if r is not None]
+
     if results:
-        df = pd.DataFrame(results)
         os.makedirs(OUTPUT_DIR, exist_ok=True)
-        output_path = os.path.join(OUTPUT_DIR, "load_amplification.csv")
-        df.to_csv(output_path, index=False)
-        print(f"\nSaved load amplification analysis to {output_path}")
-        print(df.to_string(index=False))
+        outputs = {
+            "load_amplification.csv": pd.DataFrame([summary for summary, _, _ in results]),
+            "load_amplification_windows.csv": pd.concat([w for _, w, _ in results], ignore_index=True),
+            "load_amplification_phases.csv": pd.concat([p for _, _, p in results], ignore_index=True),
+        }
+        for name, df in outputs.items():
+            output_path = os.path.join(OUTPUT_DIR, name)
+            df.to_csv(output_path, index=False)
+            print(f"\nSaved {name} to {output_path}")
+        print(outputs["load_amplification.csv"].to_string(index=False))
+        print(outputs["load_amplification_phases.csv"].to_string(index=False))
     else:
         print("No results to save.")
 
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Meta-análise de repetições do experimento
+
+Cada repetição é um diretório com o mesmo layout de k6/results
+(k6/results/repetitions/01/scenarios/<cenário>_<versão>.json, ...). As
+repetições são ingeridas em paralelo (um processo por repetição) e cada
+execução é reduzida a um resumo pequeno — estatísticas suficientes da
+latência, P95 com erro padrão (IC por estatística de ordem sobre o
+histograma de ingestão) e disponibilidade (200 + 202) —, então só os
+resumos se acumulam entre repetições. O pico de memória cresce com o número
+de processos simultâneos (`--jobs`; default: um por repetição, até o número
+de CPUs), pois cada um faz uma ingestão completa; use `--jobs` menor se a
+RAM for curta.
+
+Para cada cenário e versão, as diferenças frente a V1 (média, P95,
+disponibilidade) de cada repetição são combinadas por meta-análise de
+efeitos aleatórios (DerSimonian-Laird): efeito combinado com IC, variância
+entre execuções (tau²), heterogeneidade (I², Q de Cochran).
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add current scripts directory to path to import fast_loader
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from fast_loader import FastK6Loader, source_path
+    from quantile_ci import order_statistic_ci
+    from rollups import K6_RESULTS_DIR, discover_runs
+    from sufficient_stats import SufficientStats
+except ImportError:
+    print("Error: fast_loader.py/quantile_ci.py/rollups.py not found.")
+    sys.exit(1)
+
+REPETITIONS_DIR = os.path.join(K6_RESULTS_DIR, "repetitions")
+OUTPUT_DIR = "analysis_results/csv"
+RUNS_FILE = "meta_analysis_runs.csv"
+SUMMARY_FILE = "meta_analysis.csv"
+
+REFERENCE_VERSION = "V1"
+# Status contados como sucesso (202 = fallback da V2)
+SUCCESS_STATUSES = ("200", "202")
+CONFIDENCE = 0.95
+_Z = NormalDist().inv_cdf(1 - (1 - CONFIDENCE) / 2)
+
+
+@dataclass(frozen=True)
+class RunSummary:
+    """Resumo de uma execução (repetição × cenário × versão)."""
+    repetition: str
+    scenario: str
+    version: str
+    latency: SufficientStats
+    p95: float
+    p95_se: float
+    availability: float
+    n_requests: int
+
+    @property
+    def availability_se(self) -> float:
+        """
+        Erro padrão da disponibilidade com correção de continuidade:
+        p̃ = (x + 0,5) / (n + 1). Com 0% ou 100% o SE de Wald seria 0 e a
+        repetição levaria quase todo o peso da meta-análise.
+        """
+        if self.n_requests == 0:
+            return float("nan")
+        successes = self.availability * self.n_requests
+        smoothed = (successes + 0.5) / (self.n_requests + 1)
+        return float(np.sqrt(smoothed * (1 - smoothed) / self.n_requests))
+
+
+@dataclass(frozen=True)
+class MetaResult:
+    """Efeito combinado por efeitos aleatórios (DerSimonian-Laird)."""
+    k: int
+    pooled: float
+    se: float
+    ci_low: float
+    ci_high: float
+    p_value: float
+    tau2: float
+    i2: float
+    q: float
+    q_p_value: float
+
+
+def discover_repetitions(base_dir: str = REPETITIONS_DIR) -> List[Tuple[str, Path]]:
+    """(nome, diretório) de cada repetição, em ordem."""
+    base = Path(base_dir)
+    if not base.is_dir():
+        return []
+    return [(path.name, path) for path in sorted(base.iterdir())
+            if path.is_dir() and not path.name.startswith(".")]
+
+
+def summarize_run(loader: FastK6Loader, repetition: str, scenario: str,
+                  version: str, path: Path) -> Optional[RunSummary]:
+    """Resumo de uma execução a partir das estatísticas e do histograma de ingestão."""
+    stats_by_key = loader.load_stats(str(path))
+    histogram = loader.load_histogram(str(path))
+    if not stats_by_key or histogram is None or histogram.n == 0:
+        return None
+
+    n_requests = sum(s.n for key, s in stats_by_key.items() if key != "all")
+    successes = sum(stats_by_key[key].n for key in SUCCESS_STATUSES if key in stats_by_key)
+    low, high = order_statistic_ci(histogram, 0.95, CONFIDENCE)
+    return RunSummary(
+        repetition=repetition,
+        scenario=scenario,
+        version=version,
+        latency=stats_by_key["all"],
+        p95=histogram.quantile(0.95),
+        p95_se=(high - low) / (2 * _Z),
+        availability=successes / n_requests if n_requests else float("nan"),
+        n_requests=n_requests,
+    )
+
+
+def summarize_repetition(task: Tuple[str, str]) -> List[RunSummary]:
+    """Worker: resume todas as execuções de uma repetição (roda em processo separado)."""
+    repetition, directory = task
+    loaders: Dict[Path, FastK6Loader] = {}
+    summaries = []
+    for scenario, version, path in discover_runs(directory):
+        path = source_path(path)
+        if path.parent not in loaders:
+            loaders[path.parent] = FastK6Loader(str(path.parent))
+        loader = loaders[path.parent]
+        summary = summarize_run(loader, repetition, scenario, version, path)
+        # Libera o que o loader reteve do arquivo; só o resumo segue adiante
+        loader.ingest_stats.pop(path.name, None)
+        loader.ingest_histograms.pop(path.name, None)
+        if summary is not None:
+            summaries.append(summary)
+    return summaries
+
+
+def random_effects(effects: np.ndarray, variances: np.ndarray) -> MetaResult:
+    """Meta-análise de efeitos aleatórios (DerSimonian-Laird) sobre efeitos por repetição."""
+    effects = np.asarray(effects, dtype=float)
+    variances = np.asarray(variances, dtype=float)
+    valid = ~(np.isnan(effects) | np.isnan(variances))
+    effects, variances = effects[valid], np.maximum(variances[valid], 1e-12)
+    k = len(effects)
+    if k == 0:
+        return MetaResult(0, *[float("nan")] * 9)
+
+    weights = 1 / variances
+    fixed = float(weights @ effects / weights.sum())
+    q = float(weights @ (effects - fixed) ** 2)
+    df = k - 1
+    c = weights.sum() - (weights ** 2).sum() / weights.sum()
+    tau2 = max(0.0, (q - df) / c) if df > 0 else 0.0
+
+    from scipy import stats  # import tardio: o módulo é importado por quem só precisa de RunSummary
+
+    re_weights = 1 / (variances + tau2)
+    pooled = float(re_weights @ effects / re_weights.sum())
+    se = float(np.sqrt(1 / re_weights.sum()))
+    p_value = float(2 * stats.norm.sf(abs(pooled) / se)) if se > 0 else float("nan")
+    i2 = max(0.0, (q - df) / q) if df > 0 and q > 0 else float("nan")
+    q_p_value = float(stats.chi2.sf(q, df)) if df > 0 else float("nan")
+    return MetaResult(k, pooled, se, pooled - _Z * se, pooled + _Z * se,
+                      p_value, tau2, i2, q, q_p_value)
+
+
+# Métrica -> (valor, erro padrão) de um RunSummary
+METRICS = {
+    "Mean Latency (ms)": lambda s: (s.latency.mean, s.latency.sem),
+    "P95 Latency (ms)": lambda s: (s.p95, s.p95_se),
+    "Availability (%)": lambda s: (s.availability * 100, s.availability_se * 100),
+}
+
+
+def runs_frame(summaries: List[RunSummary]) -> pd.DataFrame:
+    """Uma linha por execução (repetição × cenário × versão)."""
+    return pd.DataFrame([{
+        "Repetition": s.repetition,
+        "Scenario": s.scenario,
+        "Version": s.version,
+        "Requests": s.n_requests,
+        "Mean Latency (ms)": s.latency.mean,
+        "Std Latency (ms)": s.latency.std(),
+        "P95 Latency (ms)": s.p95,
+        "P95 SE (ms)": s.p95_se,
+        "Availability (%)": s.availability * 100,
+    } for s in summaries])
+
+
+def meta_analyze(summaries: List[RunSummary],
+                 reference: str = REFERENCE_VERSION) -> pd.DataFrame:
+    """
+    Diferenças frente à referência combinadas entre repetições.
+
+    Uma linha por cenário × versão × métrica, com o efeito combinado, IC,
+    tau² (variância entre execuções) e heterogeneidade.
+    """
+    by_run = {(s.repetition, s.scenario, s.version): s for s in summaries}
+    rows = []
+    for scenario in sorted({s.scenario for s in summaries}):
+        versions = sorted({s.version for s in summaries if s.scenario == scenario and s.version != reference})
+        for version in versions:
+            pairs = [(by_run[(rep, scenario, reference)], by_run[(rep, scenario, version)])
+                     for rep, sc, ver in by_run
+                     if sc == scenario and ver == version and (rep, scenario, reference) in by_run]
+            if not pairs:
+                continue
+            for metric, extract in METRICS.items():
+                effects, variances = [], []
+                for ref, other in pairs:
+                    (ref_value, ref_se), (value, se) = extract(ref), extract(other)
+                    effects.append(value - ref_value)
+                    variances.append(se ** 2 + ref_se ** 2)
+                result = random_effects(np.array(effects), np.array(variances))
+                rows.append({
+                    "Scenario": scenario,
+                    "Version": version,
+                    "Metric": metric,
+                    "Repetitions": result.k,
+                    f"Diff vs {reference}": result.pooled,
+                    "CI Low": result.ci_low,
+                    "CI High": result.ci_high,
+                    "SE": result.se,
+                    "p-value": result.p_value,
+                    "Tau² (between-run)": result.tau2,
+                    "Tau (between-run)": np.sqrt(result.tau2),
+                    "I² (%)": result.i2 * 100,
+                    "Q": result.q,
+                    "Q p-value": result.q_p_value,
+                    "Diff Min": float(np.nanmin(effects)),
+                    "Diff Max": float(np.nanmax(effects)),
+                })
+    return pd.DataFrame(rows)
+
+
+def analyze_repetitions(base_dir: str = REPETITIONS_DIR, output_dir: str = OUTPUT_DIR,
+                        max_workers: Optional[int] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Resume as repetições em paralelo, combina e grava os CSVs."""
+    tasks = [(name, str(path)) for name, path in discover_repetitions(base_dir)]
+    if not tasks:
+        print(f"⚠️ Nenhuma repetição encontrada em {base_dir}")
+        return pd.DataFrame(), pd.DataFrame()
+
+    print(f"🔄 Resumindo {len(tasks)} repetição(ões) em paralelo...")
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(tasks), os.cpu_count() or 1)) as pool:
+        summaries = [summary for batch in pool.map(summarize_repetition, tasks) for summary in batch]
+
+    runs = runs_frame(summaries)
+    meta = meta_analyze(summaries)
+
+    os.makedirs(output_dir, exist_ok=True)
+    runs.to_csv(os.path.join(output_dir, RUNS_FILE), index=False)
+    meta.to_csv(os.path.join(output_dir, SUMMARY_FILE), index=False)
+    print(f"✅ Resumos por execução: {os.path.join(output_dir, RUNS_FILE)}")
+    print(f"✅ Meta-análise: {os.path.join(output_dir, SUMMARY_FILE)}")
+    return runs, meta
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Meta-análise de repetições do experimento")
+    parser.add_argument("--repetitions-dir", default=REPETITIONS_DIR,
+                        help="Diretório com uma subpasta por repetição (layout de k6/results)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--jobs", type=int, default=None, help="Processos (default: um por repetição, até o nº de CPUs; memória cresce com ele)")
+    args = parser.parse_args()
+
+    _, meta = analyze_repetitions(args.repetitions_dir, args.output_dir, args.jobs)
+    if not meta.empty:
+        columns = ["Scenario", "Version", "Metric", "Repetitions", f"Diff vs {REFERENCE_VERSION}",
+                   "CI Low", "CI High", "Tau (between-run)", "I² (%)"]
+        print(meta[columns].to_string(index=False, float_format=lambda v: f"{v:.3f}"))
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Teste de permutação vetorizado, com parada antecipada (Monte Carlo sequencial)
+
+p-valores livres de distribuição para diferenças de média e de quantis
+(P95, P99, mediana) entre versões. Em vez de embaralhar rótulos sobre os
+arrays brutos (O(n) por permutação), as duas amostras são agrupadas uma vez
+na grade de valores distintos (ranks da amostra combinada, com empates).
+Uma permutação de rótulos equivale a sortear quantos elementos de cada bin
+vão para x — uma hipergeométrica multivariada —, então cada permutação custa
+O(bins) e um bloco inteiro sai de uma única chamada vetorizada.
+
+Os blocos (cada um com sua semente derivada de uma SeedSequence) são
+distribuídos entre processos; após cada bloco, na ordem, o intervalo de
+Clopper-Pearson do p-valor é comparado com alpha e a execução para assim que
+a decisão estiver clara. O resultado é determinístico pela semente,
+independente do número de processos.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from bootstrap import DEFAULT_MEMORY_MB, DEFAULT_SEED, PARALLEL_MIN_WORK, block_size_for
+from histogram_stats import LatencyHistogram, align
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_MAX_PERMUTATIONS = 10_000
+DEFAULT_MIN_PERMUTATIONS = 500
+# Confiança do intervalo do p-valor usado na regra de parada
+STOPPING_CONFIDENCE = 0.99
+# Permutações por bloco (limitado também por memória)
+MAX_BLOCK_SIZE = 500
+
+Sample = Union[np.ndarray, LatencyHistogram]
+
+
+@dataclass(frozen=True)
+class PermutationResult:
+    """Resultado de um teste de permutação bilateral."""
+    statistic: str
+    observed: float          # statistic(x) - statistic(y)
+    p_value: float           # (excedências + 1) / (permutações + 1)
+    p_lower: float           # intervalo de Clopper-Pearson do p-valor de Monte Carlo
+    p_upper: float
+    n_permutations: int
+    stopped_early: bool
+    elapsed_s: float
+    alpha: float = DEFAULT_ALPHA
+
+    @property
+    def significant(self) -> bool:
+        return self.p_value < self.alpha
+
+    @property
+    def decided(self) -> bool:
+        """O intervalo do p-valor não contém alpha (decisão estável)."""
+        return self.p_upper < self.alpha or self.p_lower > self.alpha
+
+
+def _quantile_of(statistic: str) -> Optional[float]:
+    """'median' -> 0.5, 'p95' -> 0.95; None para 'mean'."""
+    if statistic == "mean":
+        return None
+    if statistic == "median":
+        return 0.5
+    if statistic.startswith("p") and statistic[1:].replace(".", "", 1).isdigit():
+        return float(statistic[1:]) / 100.0
+    raise ValueError(f"estatística inválida: {statistic} (use 'mean', 'median' ou 'p95', 'p99', ...)")
+
+
+def _grouped_statistic(values: np.ndarray, counts: np.ndarray, n: int,
+                       q: Optional[float]) -> np.ndarray:
+    """Estatística por linha de uma matriz de contagens (blocos × bins)."""
+    counts = np.atleast_2d(counts)
+    if q is None:
+        return counts @ values / n
+    # Quantil com interpolação linear (mesma definição de np.quantile/LatencyProfile)
+    position = q * (n - 1)
+    lower = int(np.floor(position))
+    upper = min(lower + 1, n - 1)
+    weight = position - lower
+    cumulative = np.cumsum(counts, axis=1)
+    low_idx = (cumulative <= lower).sum(axis=1)
+    high_idx = (cumulative <= upper).sum(axis=1)
+    return values[low_idx] * (1 - weight) + values[high_idx] * weight
+
+
+def _permutation_block(task) -> int:
+    """Worker: número de permutações do bloco com |diferença| >= |observada|."""
+    values, pooled, n_x, n_y, q, threshold, seed_seq, size = task
+    rng = np.random.default_rng(seed_seq)
+    counts_x = rng.multivariate_hypergeometric(pooled, n_x, size=size, method="marginals")
+    diffs = (_grouped_statistic(values, counts_x, n_x, q)
+             - _grouped_statistic(values, pooled - counts_x, n_y, q))
+    return int((np.abs(diffs) >= threshold).sum())
+
+
+def _p_interval(hits: int, n: int, confidence: float = STOPPING_CONFIDENCE) -> Tuple[float, float]:
+    """Clopper-Pearson para a proporção de excedências."""
+    from scipy import stats  # import tardio: só o teste adaptativo precisa da beta
+
+    alpha = 1 - confidence
+    lower = stats.beta.ppf(alpha / 2, hits, n - hits + 1) if hits > 0 else 0.0
+    upper = stats.beta.ppf(1 - alpha / 2, hits + 1, n - hits) if hits < n else 1.0
+    return float(lower), float(upper)
+
+
+def _histogram(sample: Sample) -> LatencyHistogram:
+    return sample if isinstance(sample, LatencyHistogram) else LatencyHistogram.from_values(sample)
+
+
+def permutation_test(x: Sample, y: Sample, statistic: str = "mean",
+                     alpha: float = DEFAULT_ALPHA,
+                     max_permutations: int = DEFAULT_MAX_PERMUTATIONS,
+                     min_permutations: int = DEFAULT_MIN_PERMUTATIONS,
+                     seed: int = DEFAULT_SEED,
+                     n_workers: Optional[int] = None,
+                     memory_mb: float = DEFAULT_MEMORY_MB) -> PermutationResult:
+    """
+    Teste de permutação bilateral para statistic(x) - statistic(y).
+
+    Args:
+        x, y: Arrays de latência ou LatencyHistogram (ex.: da ingestão completa)
+        statistic: 'mean', 'median' ou quantil 'p95', 'p99', ...
+        alpha: Nível de significância usado na regra de parada
+        max_permutations: Limite de permutações
+        min_permutations: Permutações antes de permitir a parada antecipada
+        seed: Semente (resultado independe de n_workers)
+        n_workers: Processos (default: os.cpu_count())
+        memory_mb: Memória máxima por bloco
+    """
+    start = time.time()
+    q = _quantile_of(statistic)
+    hx, hy = _histogram(x), _histogram(y)
+    n_x, n_y = hx.n, hy.n
+    if n_x == 0 or n_y == 0:
+        return PermutationResult(statistic, float("nan"), float("nan"), float("nan"),
+                                 float("nan"), 0, False, 0.0, alpha)
+
+    values, counts_x, counts_y = align(hx, hy)
+    pooled = counts_x + counts_y
+    observed = float(_grouped_statistic(values, counts_x, n_x, q)[0]
+                     - _grouped_statistic(values, counts_y, n_y, q)[0])
+    # Tolerância relativa para empates numéricos com a diferença observada
+    threshold = abs(observed) - 1e-9 * max(1.0, abs(observed))
+
+    block = min(MAX_BLOCK_SIZE, block_size_for(len(values), memory_mb))
+    n_blocks = int(np.ceil(max_permutations / block))
+    sizes = [min(block, max_permutations - i * block) for i in range(n_blocks)]
+    tasks = [(values, pooled, n_x, n_y, q, threshold, seed_seq, size)
+             for seed_seq, size in zip(np.random.SeedSequence(seed).spawn(n_blocks), sizes)]
+
+    n_workers = min(n_workers or os.cpu_count() or 1, n_blocks)
+    pool = None
+    if n_workers > 1 and max_permutations * len(values) >= PARALLEL_MIN_WORK:
+        pool = ProcessPoolExecutor(max_workers=n_workers)
+
+    hits = done = 0
+    stopped_early = False
+    try:
+        # Janela de n_workers blocos em voo; os resultados são consumidos em ordem
+        pending = [pool.submit(_permutation_block, task) for task in tasks[:n_workers]] if pool else []
+        for i, task in enumerate(tasks):
+            if pool:
+                block_hits = pending.pop(0).result()
+                if i + n_workers < n_blocks:
+                    pending.append(pool.submit(_permutation_block, tasks[i + n_workers]))
+            else:
+                block_hits = _permutation_block(task)
+            hits += block_hits
+            done += task[-1]
+
+            if done >= min_permutations and done < max_permutations:
+                lower, upper = _p_interval(hits, done)
+                if upper < alpha or lower > alpha:
+                    stopped_early = True
+                    break
+    finally:
+        if pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    lower, upper = _p_interval(hits, done)
+    return PermutationResult(statistic, observed, (hits + 1) / (done + 1), lower, upper,
+                             done, stopped_early, time.time() - start, alpha)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(11)
+    v1 = np.round(rng.lognormal(4.6, 0.7, 400_000), 1)
+    v2 = np.round(rng.lognormal(4.58, 0.7, 380_000), 1)
+    v3 = np.round(rng.lognormal(4.6, 0.7, 390_000), 1)
+
+    print("=" * 60)
+    print("  TESTE DE PERMUTAÇÃO - ~400k por versão")
+    print("=" * 60)
+    for label, other in (("V1 vs V2", v2), ("V1 vs V3", v3)):
+        for statistic in ("mean", "p95"):
+            result = permutation_test(v1, other, statistic)
+            print(f"  {label} {statistic:>4}: diff={result.observed:+.3f} ms | p={result.p_value:.4f} "
+                  f"[{result.p_lower:.4f}, {result.p_upper:.4f}] | {result.n_permutations:,} permutações "
+                  f"({'parada antecipada' if result.stopped_early else 'limite'}) | {result.elapsed_s:.2f}s")
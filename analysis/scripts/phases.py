@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Phase Registry - Fases dos cenários k6
+
+Centraliza as fases de cada cenário (aquecimento, operação normal, falha,
+recuperação e cooldown) lendo-as diretamente dos scripts k6:
+- o bloco `options.stages` define a duração total, o aquecimento e o cooldown;
+- as constantes de segmento (`TEST_SEGMENTS`, `PHASES`, `BURSTS`,
+  `EXTREME_OUTAGE`) definem as janelas de falha e recuperação.
+
+O motor de fatiamento rotula cada ponto com a sua fase usando `searchsorted`
+sobre a coluna de tempo ordenada, de modo que todas as estatísticas por fase
+saem de uma única passada agrupada.
+
+Uso:
+    python phases.py            # lista as fases de todos os cenários
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from latency_profile import FAST_THRESHOLD_MS, SLOW_THRESHOLD_MS, group_profiles
+
+SCRIPTS_DIR = "k6/scripts"
+# Registro da parada antecipada (sequential_monitor.py): <execução>_monitor.json
+MONITOR_SUFFIX = "_monitor"
+
+# Nome do cenário (prefixo dos arquivos de resultado) -> script k6
+SCENARIO_SCRIPTS = {
+    "catastrofe": "cenario-falha-catastrofica.js",
+    "degradacao": "cenario-degradacao-gradual.js",
+    "rajadas": "cenario-rajadas-intermitentes.js",
+    "indisponibilidade": "cenario-indisponibilidade-extrema.js",
+    "normal": "cenario-operacao-normal.js",
+    "recuperacao": "cenario-recuperacao-rapida.js",
+    "timeout": "cenario-timeout-variavel.js",
+    "multi_versao": "cenario-multi-versao.js",
+    "completo": "cenario-completo.js",
+}
+
+PHASE_KINDS = ("warmup", "normal", "failure", "recovery", "cooldown")
+
+# Palavras-chave (pt/en) usadas para classificar o tipo de cada fase
+_KIND_KEYWORDS = (
+    ("cooldown", ("cool",)),
+    ("warmup", ("warm", "aquec", "baseline")),
+    ("recovery", ("recover", "recuper")),
+    ("failure", ("catastro", "falha", "fail", "burst", "rajada", "outage",
+                 "critic", "degrad", "stress", "slow")),
+)
+
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_STAGE_RE = re.compile(r"\{\s*duration\s*:\s*['\"]([^'\"]+)['\"]\s*,\s*target\s*:\s*(\d+)\s*\}")
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_CONST_RE = re.compile(r"^const\s+([A-Z][A-Z0-9_]*)\s*=\s*([\[{])", re.MULTILINE)
+_NAMED_INTERVAL_RE = re.compile(r"(\w+)\s*:\s*\{\s*start\s*:\s*" + _NUMBER + r"\s*,\s*end\s*:\s*" + _NUMBER)
+_INTERVAL_RE = re.compile(r"\{\s*start\s*:\s*" + _NUMBER + r"\s*,\s*end\s*:\s*" + _NUMBER + r"\s*\}")
+_BOUNDARY_RE = re.compile(r"(\w+(?:Start|End))\s*:\s*" + _NUMBER)
+
+
+@dataclass(frozen=True)
+class Phase:
+    name: str
+    kind: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def classify_phase(name: str) -> str:
+    """Classifica o nome de uma fase em um dos PHASE_KINDS."""
+    lowered = name.lower()
+    for kind, keywords in _KIND_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return kind
+    return "normal"
+
+
+def parse_duration(text: str) -> float:
+    """Converte durações do k6 ('30s', '4m', '1m30s', '500ms') em segundos."""
+    factors = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(value) * factors[unit] for value, unit in _DURATION_RE.findall(text))
+
+
+def _extract_literal(text: str, start: int) -> str:
+    """Retorna o literal JS ({...} ou [...]) que começa em `start`, respeitando aninhamento."""
+    opening = text[start]
+    closing = "}" if opening == "{" else "]"
+    depth = 0
+    for pos in range(start, len(text)):
+        if text[pos] == opening:
+            depth += 1
+        elif text[pos] == closing:
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    return text[start:]
+
+
+def _parse_stages(source: str) -> List[Tuple[float, int]]:
+    match = re.search(r"stages\s*:\s*\[", source)
+    if not match:
+        return []
+    block = _extract_literal(source, match.end() - 1)
+    return [(parse_duration(duration), int(target)) for duration, target in _STAGE_RE.findall(block)]
+
+
+def _boundaries_to_segments(points: List[Tuple[str, float]]) -> List[Tuple[str, float, float]]:
+    """
+    Converte constantes de fronteira (`catastropheStart`, `recoveryEnd`...) em
+    intervalos: `xStart` abre a fase x; `xEnd` fecha a fase aberta ou, se não
+    houver nenhuma, cria a fase x a partir da fronteira anterior.
+    """
+    segments = []
+    open_name, open_start, previous = None, None, 0.0
+    for key, value in sorted(points, key=lambda item: item[1]):
+        if key.endswith("Start"):
+            if open_name is not None:
+                segments.append((open_name, open_start, value))
+            open_name, open_start = key[:-len("Start")], value
+        else:
+            if open_name is not None:
+                segments.append((open_name, open_start, value))
+                open_name = None
+            else:
+                segments.append((key[:-len("End")], previous, value))
+        previous = value
+    return [segment for segment in segments if segment[2] > segment[1]]
+
+
+def _parse_segments(source: str) -> List[Tuple[str, float, float]]:
+    """Lê as constantes de segmento do script (intervalos nomeados, listas e fronteiras)."""
+    segments = []
+    for match in _CONST_RE.finditer(source):
+        const_name = match.group(1)
+        literal = _extract_literal(source, match.end() - 1)
+
+        named = _NAMED_INTERVAL_RE.findall(literal)
+        if named:
+            segments.extend((name, float(start), float(end)) for name, start, end in named)
+            continue
+
+        intervals = _INTERVAL_RE.findall(literal)
+        if intervals:
+            base = const_name.lower()
+            if len(intervals) == 1:
+                segments.append((base, float(intervals[0][0]), float(intervals[0][1])))
+            else:
+                segments.extend(
+                    (f"{base}_{idx}", float(start), float(end))
+                    for idx, (start, end) in enumerate(intervals, start=1)
+                )
+            continue
+
+        boundaries = _BOUNDARY_RE.findall(literal)
+        if boundaries:
+            segments.extend(_boundaries_to_segments([(key, float(value)) for key, value in boundaries]))
+    return segments
+
+
+def build_phases(stages: List[Tuple[float, int]], segments: List[Tuple[str, float, float]]) -> List[Phase]:
+    """
+    Monta a linha do tempo contígua de fases.
+
+    A base vem dos stages (primeiro stage = warmup, último stage com target 0 =
+    cooldown, o restante = normal); os segmentos declarados no script são
+    sobrepostos à base e fases adjacentes de mesmo nome são fundidas.
+    """
+    ends = np.cumsum([duration for duration, _ in stages]) if stages else np.array([])
+    total = float(ends[-1]) if len(ends) else max((end for _, _, end in segments), default=0.0)
+    if total <= 0:
+        return []
+
+    base = []
+    if len(ends) > 1:
+        base.append(("warmup", 0.0, float(ends[0])))
+        normal_end = float(ends[-2]) if stages[-1][1] == 0 else total
+        if normal_end > ends[0]:
+            base.append(("normal", float(ends[0]), normal_end))
+        if normal_end < total:
+            base.append(("cooldown", normal_end, total))
+    else:
+        base.append(("normal", 0.0, total))
+
+    overlay = [(name, max(start, 0.0), min(end, total)) for name, start, end in segments if start < total]
+    cuts = sorted({0.0, total, *(b for _, s, e in base + overlay for b in (s, e))})
+
+    phases: List[Phase] = []
+    for left, right in zip(cuts[:-1], cuts[1:]):
+        middle = (left + right) / 2
+        name = next((n for n, s, e in reversed(overlay) if s <= middle < e), None)
+        if name is None:
+            name = next(n for n, s, e in base if s <= middle < e)
+        if phases and phases[-1].name == name:
+            phases[-1] = Phase(name, phases[-1].kind, phases[-1].start, right)
+        else:
+            phases.append(Phase(name, classify_phase(name), left, right))
+    return phases
+
+
+class PhaseRegistry:
+    """
+    Registro de fases por cenário, derivado dos scripts k6.
+
+    As fases são parseadas sob demanda e memorizadas por cenário.
+    """
+
+    def __init__(self, scripts_dir: str = SCRIPTS_DIR, scenario_scripts: Optional[Dict[str, str]] = None):
+        self.scripts_dir = Path(scripts_dir)
+        self.scenario_scripts = dict(scenario_scripts or SCENARIO_SCRIPTS)
+        self._cache: Dict[str, List[Phase]] = {}
+
+    def scenarios(self) -> List[str]:
+        return sorted(self.scenario_scripts)
+
+    def script_path(self, scenario: str) -> Optional[Path]:
+        script = self.scenario_scripts.get(scenario) or self.scenario_scripts.get(scenario.lower())
+        return self.scripts_dir / script if script else None
+
+    def phases(self, scenario: str) -> List[Phase]:
+        """Fases contíguas do cenário (lista vazia se o script não existir)."""
+        if scenario not in self._cache:
+            path = self.script_path(scenario)
+            if path is None or not path.exists():
+                self._cache[scenario] = []
+            else:
+                source = path.read_text(encoding="utf-8")
+                self._cache[scenario] = build_phases(_parse_stages(source), _parse_segments(source))
+        return self._cache[scenario]
+
+    def duration(self, scenario: str) -> Optional[float]:
+        """Duração total planejada do cenário em segundos."""
+        phases = self.phases(scenario)
+        return phases[-1].end if phases else None
+
+    def failure_windows(self, scenario: str) -> List[Phase]:
+        """Janelas de falha do cenário, em ordem cronológica."""
+        return [phase for phase in self.phases(scenario) if phase.kind == "failure"]
+
+    def as_frame(self, scenarios: Optional[List[str]] = None) -> pd.DataFrame:
+        rows = [
+            {
+                "Scenario": scenario,
+                "Phase": phase.name,
+                "Kind": phase.kind,
+                "Start (s)": phase.start,
+                "End (s)": phase.end,
+                "Duration (s)": phase.duration,
+            }
+            for scenario in (scenarios or self.scenarios())
+            for phase in self.phases(scenario)
+        ]
+        return pd.DataFrame(rows)
+
+
+@lru_cache(maxsize=None)
+def get_phase_registry(scripts_dir: str = SCRIPTS_DIR) -> PhaseRegistry:
+    """Registro compartilhado (um por processo)."""
+    return PhaseRegistry(scripts_dir)
+
+
+def monitor_path(run_path) -> Path:
+    """<execução>_monitor.json ao lado do NDJSON (também quando run_path é o cache em .cache/)."""
+    path = Path(run_path)
+    directory = path.parent.parent if path.parent.name == ".cache" else path.parent
+    return directory / f"{path.stem}{MONITOR_SUFFIX}.json"
+
+
+def early_stop_cutoff(run_path) -> Optional[float]:
+    """
+    Segundo em que o monitor sequencial parou o k6 desta execução.
+
+    None se a execução rodou até o fim (sem registro do monitor, ou monitor
+    que não chegou a decidir). Depois do corte não há recuperação/cooldown
+    observados, então as análises por fase e de recuperação marcam o que
+    ficou incompleto.
+    """
+    try:
+        record = json.loads(monitor_path(run_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not record.get("truncated"):
+        return None
+    return float(record["stopped_at_s"])
+
+
+def assign_phases(seconds, phases: List[Phase]) -> pd.Categorical:
+    """
+    Rotula cada ponto com o nome da sua fase.
+
+    Ordena a coluna de tempo uma única vez (ou reaproveita se já ordenada) e
+    localiza as fronteiras das fases com `searchsorted`, de modo que o custo é
+    O(n) para rotular mais O(P log n) para as fronteiras. Pontos além do fim
+    planejado ficam na última fase.
+    """
+    seconds = np.asarray(seconds, dtype=float)
+    categories = list(dict.fromkeys(phase.name for phase in phases))
+    if not phases:
+        return pd.Categorical.from_codes(np.full(len(seconds), -1), categories=[])
+
+    is_sorted = len(seconds) < 2 or bool(np.all(seconds[1:] >= seconds[:-1]))
+    order = None if is_sorted else np.argsort(seconds, kind="stable")
+    sorted_seconds = seconds if order is None else seconds[order]
+
+    starts = np.array([phase.start for phase in phases[1:]])
+    cuts = np.concatenate(([0], np.searchsorted(sorted_seconds, starts, side="left"), [len(seconds)]))
+    phase_codes = np.array([categories.index(phase.name) for phase in phases])
+    sorted_codes = np.repeat(phase_codes, np.diff(cuts))
+
+    if order is None:
+        codes = sorted_codes
+    else:
+        codes = np.empty_like(sorted_codes)
+        codes[order] = sorted_codes
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def summarize_by_phase(requests: pd.DataFrame, phases: List[Phase],
+                       cutoff: Optional[float] = None) -> pd.DataFrame:
+    """
+    Estatísticas por fase em uma única passada agrupada.
+
+    Args:
+        requests: Frame por requisição (ver fast_loader.to_request_frame)
+        phases: Fases do cenário (PhaseRegistry.phases)
+        cutoff: Segundo da parada antecipada (early_stop_cutoff). As fases são
+            cortadas nele: as posteriores somem, a que ele corta fica com a
+            duração observada e a coluna "Truncated" marca as fases (pelo
+            nome) com algum trecho não observado.
+
+    Returns:
+        DataFrame com uma linha por fase, na ordem cronológica da primeira ocorrência.
+    """
+    truncated = set()
+    if cutoff is not None:
+        truncated = {p.name for p in phases if p.end > cutoff}
+        requests = requests[requests["seconds"] <= cutoff]
+        phases = [Phase(p.name, p.kind, p.start, min(p.end, cutoff)) for p in phases if p.start < cutoff]
+    if requests.empty or not phases:
+        return pd.DataFrame()
+
+    latency = requests["latency_ms"]
+    status = requests["status"]
+    labels = assign_phases(requests["seconds"].to_numpy(), phases)
+    frame = pd.DataFrame({
+        "phase": labels,
+        "latency": latency,
+        "success": status.eq("200"),
+        "fallback": status.eq("202"),
+        "total_success": status.isin(["200", "202"]),
+        "failure": status.eq("500"),
+        "cb_open": status.eq("503"),
+        "fast": latency < FAST_THRESHOLD_MS,
+        "slow": latency > SLOW_THRESHOLD_MS,
+    })
+
+    summary = frame.groupby("phase", observed=True, sort=False).agg(
+        requests=("latency", "size"),
+        success=("success", "mean"),
+        fallback=("fallback", "mean"),
+        total_success=("total_success", "mean"),
+        failure=("failure", "mean"),
+        cb_open=("cb_open", "mean"),
+        fast=("fast", "mean"),
+        slow=("slow", "mean"),
+    )
+
+    # Estatísticas de ordem: um único lexsort (fase, latência) para todas as fases
+    profiles = dict(zip(labels.categories,
+                        group_profiles(labels.codes, latency.to_numpy(), len(labels.categories))))
+
+    spans: Dict[str, Dict] = {}
+    for phase in phases:
+        span = spans.setdefault(phase.name, {"Kind": phase.kind, "Start (s)": phase.start, "Duration (s)": 0.0})
+        span["Duration (s)"] += phase.duration
+        if cutoff is not None:
+            span["Truncated"] = phase.name in truncated
+
+    rows = []
+    for name, span in spans.items():
+        if name not in summary.index:
+            continue
+        row = summary.loc[name]
+        profile = profiles[name]
+        p50, p95, p99 = profile.quantile([0.50, 0.95, 0.99])
+        rows.append({
+            "Phase": name,
+            **span,
+            "Requests": int(row["requests"]),
+            "Throughput (req/s)": row["requests"] / span["Duration (s)"] if span["Duration (s)"] else np.nan,
+            "Avg Response (ms)": profile.mean,
+            "P50 (ms)": p50,
+            "P95 (ms)": p95,
+            "P99 (ms)": p99,
+            "Max (ms)": profile.max,
+            "Success Rate (%)": row["success"] * 100,
+            "Fallback Rate (%)": row["fallback"] * 100,
+            "Total Success Rate (%)": row["total_success"] * 100,
+            "API Failure Rate (%)": row["failure"] * 100,
+            "CB Protection Rate (%)": row["cb_open"] * 100,
+            "Fast Requests (%)": row["fast"] * 100,
+            "Slow Requests (%)": row["slow"] * 100,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    registry = get_phase_registry()
+    print("=" * 60)
+    print("  REGISTRO DE FASES DOS CENÁRIOS K6")
+    print("=" * 60)
+    for scenario in registry.scenarios():
+        phases = registry.phases(scenario)
+        if not phases:
+            print(f"\n⚠️  {scenario}: script não encontrado")
+            continue
+        print(f"\n📂 {scenario} ({registry.duration(scenario):.0f}s)")
+        for phase in phases:
+            print(f"   {phase.start:>6.0f}s – {phase.end:>6.0f}s  {phase.kind:<9} {phase.name}")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Intervalos de confiança para quantis de latência (P95/P99) e suas diferenças
+
+- Quantil de uma amostra: limites exatos por estatística de ordem. O número
+  de observações abaixo do quantil verdadeiro segue Binomial(n, q), então o
+  IC é [x_(l), x_(u)] com l, u tirados dos quantis da binomial — sem
+  suposição de distribuição e O(1) sobre o buffer ordenado do LatencyProfile.
+
+- Diferença de quantis entre versões: bootstrap vetorizado sobre os arrays já
+  ordenados. Reamostrar um array ordenado com índices floor(n·U) faz com que a
+  k-ésima estatística de ordem da reamostra seja sorted[floor(n·U_(k))], com
+  U_(k) ~ Beta(k, n + 1 - k); a (k+1)-ésima sai de U_(k) + (1 - U_(k))·Beta(1, n - k).
+  Cada réplica custa O(1) em vez de O(n), e as réplicas são geradas em blocos
+  com Generators derivados de uma SeedSequence (determinístico pela semente).
+"""
+
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from bootstrap import DEFAULT_SEED, percentile_ci
+from histogram_stats import LatencyHistogram
+from latency_profile import LatencyProfile
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 4000
+# Réplicas por bloco (memória de poucos MB por quantil)
+BLOCK_SIZE = 100_000
+
+Sample = Union[np.ndarray, LatencyProfile]
+
+
+def _profile(sample: Sample) -> LatencyProfile:
+    return sample if isinstance(sample, LatencyProfile) else LatencyProfile(sample)
+
+
+def _ranked(sample: Union[Sample, LatencyHistogram]) -> Tuple[int, Callable[[np.ndarray], np.ndarray], float]:
+    """(n, rank 0-based -> valor, quantil) de um perfil ordenado ou de um histograma."""
+    if isinstance(sample, LatencyHistogram):
+        return sample.n, sample.value_at_rank, sample.quantile
+    profile = _profile(sample)
+    return profile.n, profile.sorted.__getitem__, profile.quantile
+
+
+def order_statistic_ranks(n: int, q: float, confidence: float = DEFAULT_CONFIDENCE) -> Tuple[int, int]:
+    """Ranks 1-based (l, u) com P(l <= B < u) >= confidence, B ~ Binomial(n, q)."""
+    from scipy import stats  # import tardio: scipy.stats custa ~1 s a quem só importa o módulo
+
+    alpha = 1 - confidence
+    lower_rank = int(stats.binom.ppf(alpha / 2, n, q))
+    upper_rank = int(stats.binom.ppf(1 - alpha / 2, n, q)) + 1
+    return min(max(lower_rank, 1), n), min(max(upper_rank, 1), n)
+
+
+def order_statistic_ci(sample: Union[Sample, LatencyHistogram], q: float,
+                       confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float]:
+    """
+    IC exato (distribution-free) do quantil q por estatísticas de ordem.
+
+    Cobertura >= confidence (conservador pela discretude da binomial). Aceita
+    também um LatencyHistogram (execução completa, sem materializar o array).
+    """
+    if isinstance(sample, LatencyHistogram):
+        if sample.n == 0:
+            return float("nan"), float("nan")
+        lower_rank, upper_rank = order_statistic_ranks(sample.n, q, confidence)
+        low, high = sample.value_at_rank([lower_rank - 1, upper_rank - 1])
+        return float(low), float(high)
+
+    profile = _profile(sample)
+    if profile.n == 0:
+        return float("nan"), float("nan")
+    lower_rank, upper_rank = order_statistic_ranks(profile.n, q, confidence)
+    return float(profile.sorted[lower_rank - 1]), float(profile.sorted[upper_rank - 1])
+
+
+def _bootstrap_quantile(at_rank: Callable[[np.ndarray], np.ndarray], n: int, q: float,
+                        n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """Réplicas bootstrap do quantil q (interpolação linear) de n valores ordenados (at_rank)."""
+    position = q * (n - 1)
+    k = int(np.floor(position)) + 1          # estatística de ordem inferior (1-based)
+    weight = position - (k - 1)
+
+    replicates = np.empty(n_resamples)
+    for start in range(0, n_resamples, BLOCK_SIZE):
+        size = min(BLOCK_SIZE, n_resamples - start)
+        u_k = rng.beta(k, n + 1 - k, size=size)
+        low = at_rank(np.minimum((n * u_k).astype(np.int64), n - 1))
+        if weight > 0 and k < n:
+            u_next = u_k + (1 - u_k) * rng.beta(1, n - k, size=size)
+            high = at_rank(np.minimum((n * u_next).astype(np.int64), n - 1))
+            low = low * (1 - weight) + high * weight
+        replicates[start:start + size] = low
+    return replicates
+
+
+def quantile_diff_ci(x: Union[Sample, LatencyHistogram], y: Union[Sample, LatencyHistogram], q: float,
+                     confidence: float = DEFAULT_CONFIDENCE,
+                     n_resamples: int = DEFAULT_RESAMPLES,
+                     seed: int = DEFAULT_SEED) -> Tuple[float, float, float]:
+    """
+    Diferença Q_x(q) - Q_y(q) com IC bootstrap percentil.
+
+    x e y podem ser histogramas da ingestão (execução completa, sem
+    materializar os arrays).
+
+    Returns:
+        (diferença observada, limite inferior, limite superior)
+    """
+    (n_x, at_x, quantile_x), (n_y, at_y, quantile_y) = _ranked(x), _ranked(y)
+    if n_x == 0 or n_y == 0:
+        return float("nan"), float("nan"), float("nan")
+    rng_x, rng_y = (np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2))
+    diffs = (_bootstrap_quantile(at_x, n_x, q, n_resamples, rng_x)
+             - _bootstrap_quantile(at_y, n_y, q, n_resamples, rng_y))
+    lower, upper = percentile_ci(diffs, confidence)
+    return float(quantile_x(q) - quantile_y(q)), lower, upper
+
+
+def quantile_ci_columns(profile: LatencyProfile, qs: Iterable[float] = (0.95, 0.99),
+                        confidence: float = DEFAULT_CONFIDENCE) -> Dict[str, float]:
+    """Colunas 'P95 CI Low (ms)' / 'P95 CI High (ms)' ... para uma versão."""
+    columns = {}
+    for q in qs:
+        label = f"P{round(q * 100):d}"
+        low, high = order_statistic_ci(profile, q, confidence)
+        columns[f"{label} CI Low (ms)"] = low
+        columns[f"{label} CI High (ms)"] = high
+    return columns
+
+
+def quantile_diff_columns(profile: LatencyProfile, reference: LatencyProfile,
+                          reference_name: str = "V1", qs: Iterable[float] = (0.95, 0.99),
+                          confidence: float = DEFAULT_CONFIDENCE,
+                          seed: Optional[int] = DEFAULT_SEED) -> Dict[str, float]:
+    """Colunas da diferença de quantis frente à versão de referência, com IC."""
+    columns = {}
+    for q in qs:
+        label = f"P{round(q * 100):d} Diff vs {reference_name}"
+        diff, low, high = quantile_diff_ci(profile, reference, q, confidence, seed=seed)
+        columns[f"{label} (ms)"] = diff
+        columns[f"{label} CI Low (ms)"] = low
+        columns[f"{label} CI High (ms)"] = high
+    return columns
+
+
+def format_with_ci(value: float, low: float, high: float, decimals: int = 1) -> str:
+    """'123.4 [120.1, 126.0]' (usado nas tabelas LaTeX/HTML)."""
+    if np.isnan(value):
+        return "-"
+    if np.isnan(low) or np.isnan(high):
+        return f"{value:.{decimals}f}"
+    return f"{value:.{decimals}f} [{low:.{decimals}f}, {high:.{decimals}f}]"
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(7)
+    v1 = LatencyProfile(rng.lognormal(5.0, 0.9, 500_000))
+    v2 = LatencyProfile(rng.lognormal(4.8, 0.9, 500_000))
+
+    print("=" * 60)
+    print("  IC DE QUANTIS - 2 × 500k")
+    print("=" * 60)
+    for q in (0.95, 0.99):
+        start = time.time()
+        low, high = order_statistic_ci(v1, q)
+        diff, d_low, d_high = quantile_diff_ci(v1, v2, q)
+        print(f"  P{round(q * 100)} V1: {format_with_ci(v1.quantile(q), low, high)} ms")
+        print(f"  P{round(q * 100)} V1 - V2: {format_with_ci(diff, d_low, d_high)} ms "
+              f"({(time.time() - start) * 1000:.0f} ms)")
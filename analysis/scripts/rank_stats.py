@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Estatísticas de rank exatas em O(n log n)
+
+Cliff's delta e Mann-Whitney U dependem da mesma informação: para cada par
+(x_i, y_j), se x_i > y_j, x_i < y_j ou empate. Em vez de comparar todos os
+pares (O(n·m), que obrigava a subamostrar 10.000 valores), ordena-se y uma
+vez e cada x_i é localizado com `searchsorted`:
+
+    menores_que_x_i = searchsorted(y, x_i, 'left')
+    maiores_que_x_i = m - searchsorted(y, x_i, 'right')
+
+As contagens de dominância dão o delta exato, o U de Mann-Whitney e a
+correção de empates (da amostra combinada) para o p-valor assintótico,
+equivalente a `scipy.stats.mannwhitneyu(..., method='asymptotic')`.
+
+A aproximação normal só vale para amostras grandes. `mann_whitney_p` segue a
+escolha de `method='auto'` do scipy: com uma amostra de até EXACT_MAX_N
+valores e sem empates, o p-valor vem da distribuição exata de U (scipy,
+barato nesse tamanho); acima disso, das contagens de dominância.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+
+from latency_profile import LatencyProfile
+
+Sample = Union[np.ndarray, LatencyProfile]
+
+# Limite do p-valor exato (o mesmo de scipy.stats.mannwhitneyu com method='auto')
+EXACT_MAX_N = 8
+
+
+@dataclass(frozen=True)
+class RankComparison:
+    """Contagens de dominância entre duas amostras e estatísticas derivadas."""
+    n_x: int
+    n_y: int
+    greater: int      # pares com x > y
+    less: int         # pares com x < y
+    tie_term: float   # Σ(t³ - t) sobre os grupos de empate da amostra combinada
+
+    @property
+    def pairs(self) -> int:
+        return self.n_x * self.n_y
+
+    @property
+    def ties(self) -> int:
+        return self.pairs - self.greater - self.less
+
+    @property
+    def cliffs_delta(self) -> float:
+        """P(X > Y) - P(X < Y), exato."""
+        return (self.greater - self.less) / self.pairs if self.pairs else float("nan")
+
+    @property
+    def u_statistic(self) -> float:
+        """U de Mann-Whitney de x (mesma convenção de scipy.stats.mannwhitneyu)."""
+        return self.greater + 0.5 * self.ties
+
+    @property
+    def exact_applies(self) -> bool:
+        """Se o p-valor exato se aplica: amostra pequena (<= EXACT_MAX_N) e nenhum empate."""
+        return self.pairs > 0 and min(self.n_x, self.n_y) <= EXACT_MAX_N and self.tie_term == 0
+
+    def mann_whitney_p(self, alternative: str = "two-sided", use_continuity: bool = True) -> float:
+        """p-valor assintótico (aproximação normal com correção de empates)."""
+        n_x, n_y = self.n_x, self.n_y
+        n = n_x + n_y
+        if not self.pairs or n < 2:
+            return float("nan")
+        u1 = self.u_statistic
+        mu = self.pairs / 2.0
+        sigma = np.sqrt(self.pairs / 12.0 * ((n + 1) - self.tie_term / (n * (n - 1))))
+        if sigma == 0:
+            return 1.0
+
+        if alternative == "two-sided":
+            u = max(u1, self.pairs - u1)
+        elif alternative == "greater":
+            u = u1
+        elif alternative == "less":
+            u = self.pairs - u1
+        else:
+            raise ValueError(f"alternative inválida: {alternative}")
+
+        from scipy import stats  # import tardio: rank_stats entra na cadeia do fast_loader
+
+        z = (u - mu - (0.5 if use_continuity else 0.0)) / sigma
+        p = stats.norm.sf(z)
+        if alternative == "two-sided":
+            p *= 2
+        return float(min(p, 1.0))
+
+
+def _sorted(sample: Sample) -> np.ndarray:
+    """Buffer ordenado (reaproveita o de um LatencyProfile, sem reordenar)."""
+    if isinstance(sample, LatencyProfile):
+        return sample.sorted
+    values = np.asarray(sample, dtype=float)
+    return np.sort(values[~np.isnan(values)])
+
+
+def compare_ranks(x: Sample, y: Sample) -> RankComparison:
+    """
+    Contagens de dominância exatas entre x e y em O((n + m) log(n + m)).
+
+    Args:
+        x, y: Arrays de valores ou LatencyProfile (buffer já ordenado)
+    """
+    xs, ys = _sorted(x), _sorted(y)
+    below = np.searchsorted(ys, xs, side="left")
+    not_above = np.searchsorted(ys, xs, side="right")
+    greater = int(below.sum())
+    less = int((len(ys) - not_above).sum())
+
+    # Grupos de empate da amostra combinada (merge de dois arrays ordenados)
+    merged = np.sort(np.concatenate((xs, ys)), kind="mergesort")
+    if merged.size:
+        boundaries = np.flatnonzero(np.diff(merged)) + 1
+        counts = np.diff(np.concatenate(([0], boundaries, [merged.size]))).astype(float)
+        tie_term = float((counts ** 3 - counts).sum())
+    else:
+        tie_term = 0.0
+    return RankComparison(len(xs), len(ys), greater, less, tie_term)
+
+
+def _values(sample) -> np.ndarray:
+    """Valores de uma amostra; histogramas (values/counts) são expandidos."""
+    if hasattr(sample, "counts"):
+        return np.repeat(sample.values, sample.counts)
+    return _sorted(sample)
+
+
+def mann_whitney_p(x, y, comparison: Optional[RankComparison] = None,
+                   alternative: str = "two-sided") -> float:
+    """
+    p-valor de Mann-Whitney com a escolha de método do scipy ('auto').
+
+    Args:
+        x, y: Arrays, LatencyProfile ou histogramas (values/counts)
+        comparison: Contagens já calculadas (compare_ranks/compare_histograms)
+    """
+    comparison = comparison or compare_ranks(x, y)
+    if not comparison.exact_applies:
+        return comparison.mann_whitney_p(alternative)
+    from scipy import stats  # import tardio: rank_stats entra na cadeia do fast_loader
+
+    return float(stats.mannwhitneyu(_values(x), _values(y), alternative=alternative, method="exact").pvalue)
+
+
+def cliffs_delta(x: Sample, y: Sample) -> float:
+    """Cliff's delta exato (sem amostragem)."""
+    return compare_ranks(x, y).cliffs_delta
+
+
+def mann_whitney_u(x: Sample, y: Sample, alternative: str = "two-sided"):
+    """(U, p-valor) de Mann-Whitney, compatível com scipy (method='auto')."""
+    comparison = compare_ranks(x, y)
+    return comparison.u_statistic, mann_whitney_p(x, y, comparison, alternative)
+
+
+if __name__ == "__main__":
+    import time
+
+    from scipy import stats
+
+    rng = np.random.default_rng(42)
+    x = np.round(rng.lognormal(4.6, 0.7, 600_000), 1)
+    y = np.round(rng.lognormal(4.5, 0.7, 550_000), 1)
+
+    start = time.time()
+    comparison = compare_ranks(x, y)
+    elapsed = time.time() - start
+
+    u_ref, p_ref = stats.mannwhitneyu(x, y, alternative="two-sided", method="asymptotic")
+    print("=" * 60)
+    print("  RANK STATS - 600k x 550k (com empates)")
+    print("=" * 60)
+    print(f"  Tempo: {elapsed * 1000:.0f} ms")
+    print(f"  Cliff's delta: {comparison.cliffs_delta:.6f}")
+    print(f"  U: {comparison.u_statistic:.1f} (scipy: {u_ref:.1f})")
+    print(f"  p: {comparison.mann_whitney_p():.3e} (scipy: {p_ref:.3e})")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Renderização paralela de gráficos (usada por generate_final_charts,
+generate_comparison_charts e generate_academic_charts)
+
+Os gráficos finais são independentes entre si e dominados pelo tempo de
+renderização a 300 DPI. O agendador:
+
+- entrega aos workers, no initializer, os registros de resultados já
+  carregados no processo principal (results_registry), então as tabelas de
+  cenário são lidas uma única vez para o lote inteiro;
+- renderiza cada gráfico (`ChartTask`) num pool de processos; cada worker
+  importa o matplotlib uma vez, com backend Agg, e é reaproveitado;
+- isola falhas: um gráfico que levanta exceção é reportado (`ChartResult`)
+  sem abortar o lote.
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional
+
+from results_registry import ResultsRegistry, install
+
+
+@dataclass(frozen=True)
+class ChartTask:
+    """Um gráfico a renderizar: função de nível de módulo (ou método) + argumentos."""
+    name: str
+    func: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ChartResult:
+    name: str
+    ok: bool
+    elapsed_s: float
+    error: Optional[str] = None
+
+
+def _init_worker(registries: List[ResultsRegistry]):
+    """Initializer: backend Agg (sem display) e registros do processo principal."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401  (import único por worker)
+
+    for registry in registries:
+        install(registry)
+
+
+def _render(task: ChartTask) -> ChartResult:
+    """Worker: renderiza um gráfico, convertendo exceções em resultado."""
+    import matplotlib.pyplot as plt
+
+    start = time.time()
+    try:
+        task.func(*task.args, **task.kwargs)
+        return ChartResult(task.name, True, time.time() - start)
+    except Exception:
+        return ChartResult(task.name, False, time.time() - start, traceback.format_exc())
+    finally:
+        plt.close("all")
+
+
+def render_charts(tasks: List[ChartTask], registries: Iterable[ResultsRegistry] = (),
+                  max_workers: Optional[int] = None) -> List[ChartResult]:
+    """
+    Renderiza os gráficos em paralelo (um processo por gráfico, até max_workers).
+
+    Args:
+        tasks: Gráficos a renderizar
+        registries: Registros de resultados já carregados, compartilhados com os workers
+        max_workers: Processos (default: os.cpu_count()); 1 renderiza em série
+
+    Returns:
+        ChartResult por gráfico, na ordem de tasks.
+    """
+    registries = list(registries)
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks)) if tasks else 1
+    if max_workers <= 1:
+        return [_render(task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(registries,)) as pool:
+        return list(pool.map(_render, tasks))
+
+
+def print_render_report(results: List[ChartResult]) -> bool:
+    """Resumo do lote; True se todos os gráficos foram gerados."""
+    failures = [r for r in results if not r.ok]
+    total = sum(r.elapsed_s for r in results)
+    print(f"\n🖼️  {len(results) - len(failures)}/{len(results)} gráficos renderizados "
+          f"({total:.1f}s de renderização somados)")
+    for result in failures:
+        print(f"\n❌ Falha em {result.name}:\n{result.error}")
+    return not failures
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Registro em memória das tabelas de resultados por cenário
+
+Os geradores de gráficos e tabelas (generate_final_charts,
+generate_comparison_charts, export_latex_tables, ...) liam
+`<cenário>_status.csv`, `_response.csv` e `_benefits.csv` dezenas de vezes.
+O registro carrega todas essas tabelas uma vez num único frame "tidy"
+(uma linha por cenário × tabela × versão × métrica) e responde às consultas
+a partir dele:
+
+    registry = get_registry("analysis_results/scenarios/csv")
+    registry.table("catastrofe", "status")           # frame largo, como no CSV
+    registry.value("catastrofe", "status", "Total Success Rate (%)", "V2")
+    registry.frame                                   # tidy, todos os cenários
+
+O registro é memorizado por processo (`get_registry`) e cada consulta via
+`get_registry` revalida as impressões digitais (mtime, tamanho) dos arquivos:
+só arquivos alterados, novos ou removidos são relidos. Outros CSVs do
+diretório (ex.: `summary_analysis.csv`) ficam disponíveis por `read(nome)`,
+com a mesma memorização.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SCENARIO_CSV_DIR = "analysis_results/scenarios/csv"
+TABLE_KINDS = ("status", "response", "benefits")
+# Arquivos com o mesmo padrão de nome que agregam vários cenários
+CONSOLIDATED_PREFIX = "consolidated"
+TIDY_COLUMNS = ["scenario", "kind", "version", "metric", "value"]
+# Versão usada para tabelas sem coluna Version (ex.: benefits)
+NO_VERSION = ""
+
+Fingerprint = Tuple[int, int]
+
+
+def _fingerprint(path: Path) -> Fingerprint:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ResultsRegistry:
+    """Tabelas de resultados de um diretório, num frame tidy memorizado."""
+
+    def __init__(self, csv_dir: str = SCENARIO_CSV_DIR, kinds: Tuple[str, ...] = TABLE_KINDS):
+        self.csv_dir = Path(csv_dir)
+        self.kinds = tuple(kinds)
+        self._fingerprints: Dict[Tuple[str, str], Fingerprint] = {}
+        self._parts: Dict[Tuple[str, str], pd.DataFrame] = {}
+        # Layout original de cada tabela: (colunas, versões na ordem do arquivo)
+        self._layouts: Dict[Tuple[str, str], Tuple[List[str], List[str]]] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self._tables: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._files: Dict[str, Tuple[Fingerprint, pd.DataFrame]] = {}
+        self.refresh()
+
+    def _scan(self) -> Dict[Tuple[str, str], Path]:
+        """(cenário, tabela) -> arquivo, para os CSVs de cenário presentes."""
+        found = {}
+        if not self.csv_dir.is_dir():
+            return found
+        for path in self.csv_dir.glob("*.csv"):
+            scenario, _, kind = path.stem.rpartition("_")
+            if scenario and kind in self.kinds and scenario != CONSOLIDATED_PREFIX:
+                found[(scenario, kind)] = path
+        return found
+
+    @staticmethod
+    def _tidy(df: pd.DataFrame, scenario: str, kind: str) -> pd.DataFrame:
+        versions = (df["Version"].astype(str) if "Version" in df.columns
+                    else pd.Series(NO_VERSION, index=df.index))
+        metrics = [c for c in df.columns if c not in ("Version", "Scenario")]
+        values = df[metrics].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        return pd.DataFrame({
+            "scenario": scenario,
+            "kind": kind,
+            "version": np.repeat(versions.to_numpy(), len(metrics)),
+            "metric": np.tile(metrics, len(df)),
+            "value": values.ravel(),
+        }, columns=TIDY_COLUMNS)
+
+    def refresh(self) -> bool:
+        """Relê apenas as tabelas cuja impressão digital mudou; True se algo mudou."""
+        found = self._scan()
+        changed = False
+        for key in set(self._fingerprints) - set(found):
+            for store in (self._fingerprints, self._parts, self._layouts):
+                store.pop(key, None)
+            changed = True
+        for key, path in found.items():
+            fingerprint = _fingerprint(path)
+            if self._fingerprints.get(key) == fingerprint:
+                continue
+            df = pd.read_csv(path)
+            self._parts[key] = self._tidy(df, *key)
+            versions = df["Version"].astype(str).tolist() if "Version" in df.columns else [NO_VERSION]
+            self._layouts[key] = (list(df.columns), versions)
+            self._fingerprints[key] = fingerprint
+            changed = True
+        if changed:
+            self._frame = None
+            self._tables.clear()
+        return changed
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Frame tidy (scenario, kind, version, metric, value) de todas as tabelas."""
+        if self._frame is None:
+            parts = [self._parts[key] for key in sorted(self._parts)]
+            self._frame = (pd.concat(parts, ignore_index=True) if parts
+                           else pd.DataFrame(columns=TIDY_COLUMNS))
+        return self._frame
+
+    def scenarios(self, kind: str = "status") -> List[str]:
+        return sorted(scenario for scenario, k in self._parts if k == kind)
+
+    def has(self, scenario: str, kind: str) -> bool:
+        return (scenario, kind) in self._parts
+
+    def table(self, scenario: str, kind: str) -> Optional[pd.DataFrame]:
+        """Tabela larga (mesmas colunas e ordem do CSV) ou None se não existe."""
+        key = (scenario, kind)
+        if key not in self._parts:
+            return None
+        if key not in self._tables:
+            columns, versions = self._layouts[key]
+            part = self._parts[key]
+            wide = (part.pivot(index="version", columns="metric", values="value")
+                    .reindex(index=versions)
+                    .reset_index(drop=True)
+                    .rename_axis(columns=None))
+            if "Version" in columns:
+                wide["Version"] = versions
+            if "Scenario" in columns:
+                wide["Scenario"] = scenario
+            self._tables[key] = wide[columns]
+        return self._tables[key].copy()
+
+    def value(self, scenario: str, kind: str, metric: str,
+              version: str = NO_VERSION) -> float:
+        """Um valor (NaN se a tabela, versão ou métrica não existe)."""
+        table = self._parts.get((scenario, kind))
+        if table is None:
+            return float("nan")
+        match = table[(table["version"] == version) & (table["metric"] == metric)]
+        return float(match["value"].iloc[0]) if len(match) else float("nan")
+
+    def read(self, name: str) -> Optional[pd.DataFrame]:
+        """Qualquer outro CSV do diretório, memorizado pela impressão digital."""
+        path = self.csv_dir / name
+        if not path.exists():
+            self._files.pop(name, None)
+            return None
+        fingerprint = _fingerprint(path)
+        cached = self._files.get(name)
+        if cached is None or cached[0] != fingerprint:
+            cached = (fingerprint, pd.read_csv(path))
+            self._files[name] = cached
+        return cached[1].copy()
+
+
+_REGISTRIES: Dict[str, ResultsRegistry] = {}
+
+
+def get_registry(csv_dir: str = SCENARIO_CSV_DIR) -> ResultsRegistry:
+    """Registro compartilhado (um por diretório e processo), revalidado a cada chamada."""
+    key = os.path.abspath(csv_dir)
+    registry = _REGISTRIES.get(key)
+    if registry is None:
+        registry = _REGISTRIES[key] = ResultsRegistry(csv_dir)
+    else:
+        registry.refresh()
+    return registry
+
+
+def install(registry: ResultsRegistry):
+    """Registra um registro já carregado (ex.: recebido por um worker de processo)."""
+    _REGISTRIES[os.path.abspath(registry.csv_dir)] = registry
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.time()
+    registry = get_registry()
+    print("=" * 60)
+    print(f"  REGISTRO DE RESULTADOS - {registry.csv_dir}")
+    print("=" * 60)
+    print(f"  {len(registry.frame):,} valores de {len(registry.scenarios())} cenário(s) "
+          f"em {(time.time() - start) * 1000:.1f} ms")
+    for scenario in registry.scenarios():
+        v1 = registry.value(scenario, "status", "Total Success Rate (%)", "V1")
+        v2 = registry.value(scenario, "status", "Total Success Rate (%)", "V2")
+        print(f"  {scenario:<18} sucesso total V1={v1:6.2f}% | V2={v2:6.2f}%")
+    start = time.time()
+    get_registry()
+    print(f"  Revalidação (sem mudanças): {(time.time() - start) * 1000:.2f} ms")
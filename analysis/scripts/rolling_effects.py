@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Effect sizes em janelas móveis (timeline de Cliff's delta, mediana e disponibilidade)
+
+Um Mann-Whitney/Cliff's delta global dilui o efeito de uma catástrofe de 5
+minutos dentro de um teste de 13. Aqui cada execução é reduzida a uma matriz
+de histogramas por janela base (passo × bins, numa grade de latência comum às
+duas versões); a janela móvel é mantida incrementalmente — soma a janela que
+entra, subtrai a que sai — e cada passo calcula, em O(bins):
+
+- Cliff's delta: Σ cx_i · (y abaixo de i) - Σ cx_i · (y acima de i)
+- diferença de medianas (contagens acumuladas)
+- diferença de disponibilidade (200 + 202) por janela
+
+O tempo é relativo ao primeiro ponto de cada execução (como nos rollups),
+então versões rodadas em momentos diferentes ficam alinhadas pelas fases.
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from histogram_stats import LatencyHistogram
+from rank_stats import RankComparison
+
+DEFAULT_WINDOW_S = 30.0
+DEFAULT_STEP_S = 5.0
+# Largura do bin da grade (ms); valores no mesmo bin contam como empate
+ROLLING_RESOLUTION_MS = 1.0
+# Status contados como sucesso (202 = fallback da V2)
+SUCCESS_STATUSES = ("200", "202")
+
+
+@dataclass(frozen=True)
+class WindowedHistograms:
+    """Histogramas por janela base de uma execução, sobre uma grade comum."""
+    counts: np.ndarray      # (janelas, bins)
+    successes: np.ndarray   # requisições 200/202 por janela
+    step_s: float
+
+    @property
+    def windows(self) -> int:
+        return self.counts.shape[0]
+
+
+def _quantize(latency: np.ndarray, resolution: float) -> np.ndarray:
+    return np.round(np.asarray(latency, dtype=float) / resolution).astype(np.int64)
+
+
+def common_grid(*frames: pd.DataFrame, resolution: float = ROLLING_RESOLUTION_MS) -> np.ndarray:
+    """Bins (inteiros, em unidades de resolution) presentes em qualquer das execuções."""
+    return np.unique(np.concatenate([_quantize(f["latency_ms"], resolution) for f in frames]))
+
+
+def window_histograms(requests: pd.DataFrame, grid: np.ndarray, step_s: float,
+                      n_windows: int, resolution: float = ROLLING_RESOLUTION_MS) -> WindowedHistograms:
+    """
+    Matriz de contagens (janela × bin) de um frame por requisição (to_request_frame).
+
+    Construída com um único bincount sobre o índice linear janela·bins + bin.
+    """
+    bins = len(grid)
+    window = np.minimum((requests["seconds"].to_numpy(dtype=float) // step_s).astype(np.int64),
+                        n_windows - 1)
+    bin_index = np.searchsorted(grid, _quantize(requests["latency_ms"], resolution))
+    counts = np.bincount(window * bins + bin_index, minlength=n_windows * bins)
+    success = np.isin(requests["status"].to_numpy(dtype=object), SUCCESS_STATUSES)
+    successes = np.bincount(window[success], minlength=n_windows)
+    return WindowedHistograms(counts.reshape(n_windows, bins), successes, step_s)
+
+
+def _compare(counts_x: np.ndarray, counts_y: np.ndarray) -> RankComparison:
+    """Contagens de dominância entre dois histogramas na mesma grade (O(bins))."""
+    cum_y = np.cumsum(counts_y)
+    n_y = int(cum_y[-1])
+    greater = int(counts_x @ (cum_y - counts_y))
+    less = int(counts_x @ (n_y - cum_y))
+    ties = (counts_x + counts_y).astype(float)
+    return RankComparison(int(counts_x.sum()), n_y, greater, less, float((ties ** 3 - ties).sum()))
+
+
+def rolling_effects(x: pd.DataFrame, y: pd.DataFrame,
+                    window_s: float = DEFAULT_WINDOW_S, step_s: float = DEFAULT_STEP_S,
+                    resolution: float = ROLLING_RESOLUTION_MS,
+                    labels: Tuple[str, str] = ("x", "y")) -> pd.DataFrame:
+    """
+    Timeline de effect sizes x vs y em janelas de window_s, deslizando de step_s.
+
+    Args:
+        x, y: Frames por requisição (seconds, latency_ms, status)
+        window_s: Largura da janela móvel (arredondada para múltiplo de step_s)
+        step_s: Passo (e largura da janela base)
+        resolution: Largura do bin de latência em ms
+        labels: Nomes das versões usados nas colunas
+
+    Returns:
+        DataFrame com uma linha por posição da janela: início/fim, n de cada
+        versão, Cliff's delta (x vs y), diferença de medianas e de disponibilidade
+        (x - y). Janelas sem requisições de uma das versões ficam com NaN.
+    """
+    columns = ["Window Start (s)", "Window End (s)", f"N {labels[0]}", f"N {labels[1]}",
+               "Cliff's Delta", f"Median Diff {labels[0]}-{labels[1]} (ms)",
+               f"Availability Diff {labels[0]}-{labels[1]} (pp)"]
+    if x.empty or y.empty:
+        return pd.DataFrame(columns=columns)
+
+    span = max(1, int(round(window_s / step_s)))
+    horizon = max(x["seconds"].max(), y["seconds"].max())
+    n_windows = int(horizon // step_s) + 1
+    grid = common_grid(x, y, resolution=resolution)
+    values = grid * resolution
+    hx = window_histograms(x, grid, step_s, n_windows, resolution)
+    hy = window_histograms(y, grid, step_s, n_windows, resolution)
+
+    running_x = hx.counts[:span].sum(axis=0)
+    running_y = hy.counts[:span].sum(axis=0)
+    success_x = np.concatenate(([0], np.cumsum(hx.successes)))
+    success_y = np.concatenate(([0], np.cumsum(hy.successes)))
+
+    rows = []
+    for start in range(max(1, n_windows - span + 1)):
+        if start:
+            end = start + span - 1
+            running_x += hx.counts[end] - hx.counts[start - 1]
+            running_y += hy.counts[end] - hy.counts[start - 1]
+        n_x, n_y = int(running_x.sum()), int(running_y.sum())
+        stop = min(start + span, n_windows)
+
+        delta = median_diff = availability_diff = np.nan
+        if n_x and n_y:
+            delta = _compare(running_x, running_y).cliffs_delta
+            median_diff = (LatencyHistogram(values, running_x).quantile(0.5)
+                           - LatencyHistogram(values, running_y).quantile(0.5))
+            availability_diff = 100 * ((success_x[stop] - success_x[start]) / n_x
+                                       - (success_y[stop] - success_y[start]) / n_y)
+        rows.append([start * step_s, stop * step_s, n_x, n_y, delta, median_diff, availability_diff])
+    return pd.DataFrame(rows, columns=columns)
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(5)
+    seconds = np.sort(rng.uniform(0, 780, 300_000))
+    # y degrada entre 300 e 600 s (catástrofe); x se mantém estável
+    x = pd.DataFrame({"seconds": seconds, "latency_ms": rng.lognormal(4.0, 0.5, seconds.size),
+                      "status": "200"})
+    degraded = (seconds > 300) & (seconds < 600)
+    y_latency = rng.lognormal(4.0, 0.5, seconds.size) * np.where(degraded, 3.0, 1.0)
+    y = pd.DataFrame({"seconds": seconds, "latency_ms": y_latency,
+                      "status": np.where(degraded & (rng.random(seconds.size) < 0.4), "503", "200")})
+
+    start = time.time()
+    timeline = rolling_effects(x, y, labels=("V1", "V2"))
+    print("=" * 60)
+    print(f"  EFFECT SIZE MÓVEL - {len(timeline)} janelas em {time.time() - start:.2f}s")
+    print("=" * 60)
+    print(timeline.iloc[::12].to_string(index=False, float_format=lambda v: f"{v:.3f}"))
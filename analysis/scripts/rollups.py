@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Rollups por segundo dos resultados k6
+
+Reduz o frame por requisição (fast_loader.to_request_frame) a uma linha por
+janela de tempo (default: 1 s) com contagens por status e somas de latência.
+Todas as agregações são feitas com `np.bincount`, sem loops em Python, e o
+índice de janelas é contíguo (janelas sem requisições aparecem com zero), o
+que permite análises vetorizadas de séries temporais (run-length encoding,
+recuperação, amplificação de carga).
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from phases import MONITOR_SUFFIX
+
+K6_RESULTS_DIR = "k6/results"
+
+# Versões reconhecidas nos nomes de arquivo (V1, V2, V3, V2_equilibrado, ...);
+# <execução>_summary e <execução>_monitor (parada antecipada) não são execuções
+VERSION_PATTERN = r"V\d(?:_[a-z]+)?"
+
+# Latência abaixo da qual uma resposta 202/503 é considerada rejeição do CB
+# (o fallback responde sem chamar o adquirente)
+NEAR_ZERO_MS = 50.0
+
+STATUS_COLUMNS = {
+    "200": "status_200",
+    "202": "status_202",
+    "500": "status_500",
+    "503": "status_503",
+}
+
+ROLLUP_COLUMNS = [
+    "start_s", "requests", *STATUS_COLUMNS.values(), "status_other",
+    "rejected_fast", "latency_sum", "latency_max",
+]
+
+
+def build_rollups(requests: pd.DataFrame, bucket_seconds: float = 1.0,
+                  near_zero_ms: float = NEAR_ZERO_MS) -> pd.DataFrame:
+    """
+    Agrega o frame por requisição em janelas fixas de tempo.
+
+    Args:
+        requests: Frame com colunas seconds, latency_ms e status
+        bucket_seconds: Tamanho da janela em segundos
+        near_zero_ms: Limiar de latência para contar rejeições rápidas (202/503)
+
+    Returns:
+        DataFrame indexado pela janela (0..N-1) com as colunas de ROLLUP_COLUMNS.
+    """
+    if requests.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    seconds = requests["seconds"].to_numpy(dtype=float)
+    latency = requests["latency_ms"].to_numpy(dtype=float)
+    status = requests["status"].to_numpy(dtype=object)
+
+    buckets = np.floor(seconds / bucket_seconds).astype(np.int64)
+    size = int(buckets.max()) + 1
+
+    rollups = pd.DataFrame(index=pd.RangeIndex(size, name="bucket"))
+    rollups["start_s"] = rollups.index.to_numpy() * bucket_seconds
+    rollups["requests"] = np.bincount(buckets, minlength=size)
+
+    known = np.zeros(len(status), dtype=bool)
+    for code, column in STATUS_COLUMNS.items():
+        mask = status == code
+        known |= mask
+        rollups[column] = np.bincount(buckets[mask], minlength=size)
+    rollups["status_other"] = np.bincount(buckets[~known], minlength=size)
+
+    rejected = ((status == "202") | (status == "503")) & (latency < near_zero_ms)
+    rollups["rejected_fast"] = np.bincount(buckets[rejected], minlength=size)
+
+    rollups["latency_sum"] = np.bincount(buckets, weights=latency, minlength=size)
+    latency_max = np.zeros(size)
+    np.maximum.at(latency_max, buckets, latency)
+    rollups["latency_max"] = latency_max
+    return rollups
+
+
+def discover_runs(results_dir: str = K6_RESULTS_DIR,
+                  version_pattern: str = VERSION_PATTERN) -> List[Tuple[str, str, Path]]:
+    """
+    Lista (cenário, versão, arquivo) de todas as execuções disponíveis.
+
+    Considera JSONs e caches Parquet em results_dir e results_dir/scenarios,
+    incluindo perfis nomeados (V2_equilibrado, V2_conservador, ...) e o teste
+    completo ({versão}_Completo.json, reportado como cenário "Completo").
+    O arquivo é o NDJSON quando ele existe; para execuções que só existem em
+    cache, é o próprio `.cache/<stem>.parquet` (o FastK6Loader e a sessão
+    aceitam os dois).
+    """
+    scenario_re = re.compile(rf"^(?P<scenario>.+?)_(?P<version>{version_pattern})$")
+    completo_re = re.compile(rf"^(?P<version>{version_pattern})_Completo$")
+
+    base = Path(results_dir)
+    runs = {}
+    for directory in (base, base / "scenarios"):
+        candidates = list(directory.glob("*.json")) + list((directory / ".cache").glob("*.parquet"))
+        for path in sorted(candidates):
+            stem = path.stem
+            if stem.endswith(("_summary", MONITOR_SUFFIX)):
+                continue
+            match = completo_re.match(stem)
+            if match:
+                key = ("Completo", match.group("version"))
+            else:
+                match = scenario_re.match(stem)
+                if not match:
+                    continue
+                key = (match.group("scenario"), match.group("version"))
+            source = directory / f"{stem}.json"
+            runs.setdefault(key, source if source.exists() else path)
+    return [(scenario, version, path) for (scenario, version), path in sorted(runs.items())]
+
+
+def load_run(path: Path, session=None) -> Optional[pd.DataFrame]:
+    """
+    Carrega uma execução e devolve o frame por requisição.
+
+    Passe a mesma `session` (data_session.DataSession) entre chamadas para
+    reaproveitar loaders e frames; o default é a sessão ativa do processo.
+    """
+    from data_session import get_session
+
+    return (session or get_session()).requests(path)
+
+
+def load_request_times(path: Path, session=None,
+                       metric: str = "http_reqs") -> Optional[Tuple[pd.Timestamp, np.ndarray]]:
+    """
+    Lê só as colunas time/metric de uma execução (sem tags/valores).
+
+    Returns:
+        (instante do primeiro ponto, segundos ordenados de cada ponto `metric`)
+        ou None se a execução não tiver dados.
+    """
+    from data_session import get_session
+
+    df = (session or get_session()).columns(path, ["time", "metric"])
+    if df is None or df.empty:
+        return None
+    timestamps = pd.to_datetime(df["time"], utc=True, format="ISO8601")
+    start = timestamps.min()
+    mask = (df["metric"] == metric).to_numpy()
+    seconds = np.sort((timestamps[mask] - start).dt.total_seconds().to_numpy())
+    return start, seconds
+
+
+def count_rollup(seconds: np.ndarray, size: Optional[int] = None,
+                 bucket_seconds: float = 1.0) -> np.ndarray:
+    """Contagem de eventos por janela (np.bincount), com `size` janelas."""
+    buckets = np.floor(np.asarray(seconds) / bucket_seconds).astype(np.int64)
+    if size is not None:
+        buckets = buckets[buckets < size]
+    return np.bincount(buckets, minlength=size or 0)
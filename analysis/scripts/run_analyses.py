@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Todas as análises num único processo, com uma sessão de dados compartilhada
+
+Rodados como scripts separados, analyzer.py, scenario_analyzer.py,
+analyze_recovery_time.py, cb_state_analysis.py e
+load_amplification_analysis.py carregam cada um os mesmos caches Parquet.
+Aqui uma DataSession (data_session.py) é instalada no processo e as análises
+rodam em sequência sobre ela: cada execução k6 é carregada uma vez, e o frame
+por requisição e os rollups são calculados uma vez e reaproveitados pelas
+etapas seguintes.
+
+    python3 analysis/scripts/run_analyses.py                      # todas as etapas
+    python3 analysis/scripts/run_analyses.py catastrofe normal    # só esses cenários
+    python3 analysis/scripts/run_analyses.py --only scenarios recovery
+    python3 analysis/scripts/run_analyses.py --skip complete --interactive
+
+Uma etapa que falha é reportada ao final sem interromper as demais.
+"""
+
+import os
+import sys
+import time
+import traceback
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import analyze_recovery_time
+import cb_state_analysis
+import load_amplification_analysis
+import scenario_analyzer
+from analyzer import K6Analyzer
+from data_session import DataSession, install
+
+K6_RESULTS_DIR = "k6/results"
+ANALYSIS_DIR = "analysis_results"
+
+# Etapas, na ordem de execução
+STEPS = ("complete", "scenarios", "recovery", "cb_state", "load_amplification")
+
+
+def run_scenarios(session: DataSession, scenarios: Optional[List[str]] = None,
+                  interactive: bool = False):
+    """Análise por cenário (scenario_analyzer) + consolidated_benefits.csv."""
+    scenarios = scenarios or scenario_analyzer.discover_scenarios(scenario_analyzer.RESULTS_DIR)
+    all_benefits = []
+    for scenario in scenarios:
+        analyzer = scenario_analyzer.ScenarioAnalyzer(
+            scenario, scenario_analyzer.RESULTS_DIR, scenario_analyzer.OUTPUT_DIR,
+            interactive=interactive, session=session,
+        )
+        analyzer.run_analysis()
+        if analyzer.benefits is not None:
+            all_benefits.append(analyzer.benefits)
+    if all_benefits:
+        scenario_analyzer.save_consolidated_benefits(all_benefits)
+
+
+def run_complete(session: DataSession, interactive: bool = False):
+    """Cenário completo (analyzer.py), se houver <versão>_Completo.json."""
+    if not any(os.path.exists(os.path.join(K6_RESULTS_DIR, f"{v}_Completo.json")) for v in ("V1", "V2", "V3")):
+        print(f"  ⚠️  Nenhum *_Completo.json em {K6_RESULTS_DIR}; etapa ignorada")
+        return
+    K6Analyzer(results_dir=K6_RESULTS_DIR, output_dir=ANALYSIS_DIR,
+               interactive=interactive, session=session).run_analysis()
+
+
+def build_steps(session: DataSession, scenarios: Optional[List[str]],
+                interactive: bool) -> Dict[str, Callable[[], None]]:
+    # max_workers=1: os cenários rodam no próprio processo, sobre a sessão instalada
+    return {
+        "scenarios": lambda: run_scenarios(session, scenarios, interactive),
+        "recovery": lambda: analyze_recovery_time.main(max_workers=1),
+        "cb_state": lambda: cb_state_analysis.analyze_all(),
+        "load_amplification": lambda: load_amplification_analysis.calculate_amplification(max_workers=1),
+        "complete": lambda: run_complete(session, interactive),
+    }
+
+
+def run_all(steps: List[str], scenarios: Optional[List[str]] = None,
+            interactive: bool = False) -> bool:
+    """Roda as etapas pedidas com uma sessão de dados instalada; True se nenhuma falhou."""
+    session = DataSession()
+    install(session)
+    actions = build_steps(session, scenarios, interactive)
+    timings, failures = {}, {}
+    try:
+        for step in steps:
+            print("\n" + "=" * 60)
+            print(f"  ETAPA: {step}")
+            print("=" * 60)
+            start = time.time()
+            try:
+                actions[step]()
+            except Exception:
+                failures[step] = traceback.format_exc()
+            timings[step] = time.time() - start
+    finally:
+        install(None)
+
+    print("\n" + "=" * 60)
+    for step in steps:
+        status = "❌" if step in failures else "✅"
+        print(f"  {status} {step:<20} {timings[step]:7.1f}s")
+    print(f"  {session.report()}")
+    for step, error in failures.items():
+        print(f"\n❌ Falha em {step}:\n{error}")
+    return not failures
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Todas as análises num processo, com os dados carregados uma vez")
+    parser.add_argument("scenarios", nargs="*", help="Cenários da etapa 'scenarios' (default: todos)")
+    parser.add_argument("--only", nargs="+", choices=STEPS, help="Roda só estas etapas")
+    parser.add_argument("--skip", nargs="+", choices=STEPS, default=[], help="Pula estas etapas")
+    parser.add_argument("--interactive", action="store_true",
+                        help="Relatórios HTML interativos (sem PNGs) nas etapas scenarios/complete")
+    args = parser.parse_args()
+
+    selected = [step for step in STEPS if step in (args.only or STEPS) and step not in args.skip]
+    scenarios = [s for s in args.scenarios if s != "all"] or None
+    sys.exit(0 if run_all(selected, scenarios, args.interactive) else 1)
@@ -10,26 +10,35 @@ Gera relatórios comparativos detalhados mostrando:
 4. Cálculo do ganho real do Circuit Breaker
 """
 
+import argparse
 import os
+import sys
 import json
 import time
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from jinja2 import Template
 import numpy as np
 import warnings
-from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import io
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 warnings.filterwarnings('ignore')
 
 # Import do loader otimizado
 try:
-    from fast_loader import FastK6Loader
+    from fast_loader import to_request_frame
+    from data_session import get_session, scenario_path
     USE_FAST_LOADER = True
 except ImportError:
     USE_FAST_LOADER = False
 
+from latency_profile import FAST_THRESHOLD_MS, SLOW_THRESHOLD_MS, LatencyProfile
+from phases import early_stop_cutoff, get_phase_registry, summarize_by_phase
+from quantile_ci import quantile_ci_columns, quantile_diff_columns
+from histogram_stats import LatencyHistogram
+from interactive_report import build_report_data, render_interactive_section
+
 RESULTS_DIR = "k6/results/scenarios"
 OUTPUT_DIR = "analysis_results/scenarios"
 PLOTS_DIR = os.path.join(OUTPUT_DIR, "plots")
@@ -37,19 +46,25 @@ CSV_DIR = os.path.join(OUTPUT_DIR, "csv")
 
 PALETTE = {"V1": "#d62728", "V2": "#2ca02c", "V3": "#1f77b4"}
 
-ESTIMATED_DURATIONS = {
-    "catastrofe": 13 * 60,
-    "degradacao": 13 * 60,
-    "rajadas": 11 * 60,
-    "indisponibilidade": 9 * 60,
-}
-sns.set_style("whitegrid")
+# Estimativa do pico de memória de um worker (--jobs): imports + figuras, mais
+# um fator sobre o tamanho dos NDJSON do cenário (medido: ~7x com Parquet em cache)
+WORKER_BASE_MB = 250
+NDJSON_MEMORY_FACTOR = 8
+# Execuções só com o cache (NDJSON apagado ou vazio): bytes de NDJSON por linha
+# do Parquet (medido: ~260), para a estimativa usar o mesmo fator
+NDJSON_BYTES_PER_CACHED_ROW = 260
+# Fração da memória disponível que os workers podem ocupar juntos
+MEMORY_BUDGET_FRACTION = 0.7
 
 class ScenarioAnalyzer:
     """Analisa cenários críticos comparando V1 vs V2"""
     
-    def __init__(self, scenario_name, results_dir, output_dir):
+    def __init__(self, scenario_name, results_dir, output_dir, interactive=False, session=None):
         self.scenario_name = scenario_name
+        # Sessão de dados compartilhada (data_session); default: a ativa no processo
+        self.session = session or (get_session() if USE_FAST_LOADER else None)
+        # interactive=True: relatório com JSON + gráficos no navegador, sem PNGs
+        self.interactive = interactive
         self.results_dir = results_dir
         self.output_dir = output_dir
         self.plots_dir = os.path.join(output_dir, "plots", scenario_name)
@@ -61,19 +76,28 @@ class ScenarioAnalyzer:
         self.data = {}
         self.summary = {}
         self.test_duration_seconds = None
-        
+        # {versão: segundo da parada antecipada} (ver phases.early_stop_cutoff)
+        self.cutoffs = {}
+        self.phase_df = pd.DataFrame()
+        self.latency_profiles = {}
+        self._request_frames = {}
+        self.benefits = None
+        
+    def _requests(self, version):
+        """Frame por requisição (seconds, latency_ms, status) da versão, calculado uma vez."""
+        if version not in self._request_frames:
+            requests = self.session.requests(scenario_path(self.scenario_name, version, self.results_dir))
+            self._request_frames[version] = requests if requests is not None else to_request_frame(self.data[version])
+        return self._request_frames[version]
+    
     def load_data(self):
-        """Carrega dados do cenário usando FastK6Loader quando disponível."""
+        """Carrega dados do cenário pela sessão de dados (FastK6Loader) quando disponível."""
         start_time = time.time()
         print(f"\n📂 Carregando dados do cenário: {self.scenario_name}")
         
         if USE_FAST_LOADER:
             print("  🚀 Usando FastK6Loader (otimizado)")
-            loader = FastK6Loader(
-                results_dir=self.results_dir,
-                use_cache=True
-            )
-            self.data = loader.load_scenario(self.scenario_name)
+            self.data = self.session.scenario(self.scenario_name, self.results_dir)
         else:
             self._load_data_legacy()
         
@@ -90,6 +114,16 @@ class ScenarioAnalyzer:
         
         self.test_duration_seconds = self._infer_test_duration()
         
+        # Execuções paradas pelo monitor sequencial (EARLY_STOP): sem recuperação/cooldown
+        self.cutoffs = {}
+        for version in self.data:
+            run_path = (scenario_path(self.scenario_name, version, self.results_dir) if USE_FAST_LOADER
+                        else os.path.join(self.results_dir, f"{self.scenario_name}_{version}.json"))
+            cutoff = early_stop_cutoff(run_path)
+            if cutoff is not None:
+                self.cutoffs[version] = cutoff
+                print(f"  ✂️  {version}: parada antecipada em t={cutoff:.0f}s (fases seguintes não observadas)")
+        
         elapsed = time.time() - start_time
         print(f"  ⏱️  Tempo de carregamento: {elapsed:.2f}s")
     
@@ -135,7 +169,8 @@ class ScenarioAnalyzer:
                 durations.append(duration)
         if durations:
             return sum(durations) / len(durations)
-        return ESTIMATED_DURATIONS.get(self.scenario_name)
+        # Sem summary: usa a duração planejada nos stages do script k6
+        return get_phase_registry().duration(self.scenario_name)
 
     def analyze_response_times(self):
         """Analisa tempos de resposta com foco em períodos de falha"""
@@ -149,17 +184,18 @@ class ScenarioAnalyzer:
             if len(req_duration) == 0:
                 continue
             
-            # Estatísticas gerais
-            avg_response = req_duration.mean()
-            p50_response = req_duration.quantile(0.50)
-            p95_response = req_duration.quantile(0.95)
-            p99_response = req_duration.quantile(0.99)
-            max_response = req_duration.max()
+            # Ordena uma vez; média, percentis e limiares saem do mesmo buffer
+            profile = LatencyProfile(req_duration.to_numpy())
+            self.latency_profiles[version] = profile
+            
+            avg_response = profile.mean
+            p50_response, p95_response, p99_response = profile.quantile([0.50, 0.95, 0.99])
+            max_response = profile.max
             
             # Conta requisições rápidas (< 500ms) e lentas (> 2000ms)
-            fast_requests = (req_duration < 500).sum()
-            slow_requests = (req_duration > 2000).sum()
-            total = len(req_duration)
+            fast_requests = profile.count_below(FAST_THRESHOLD_MS)
+            slow_requests = profile.count_above(SLOW_THRESHOLD_MS)
+            total = len(profile)
             
             results.append({
                 'Version': version,
@@ -170,11 +206,45 @@ class ScenarioAnalyzer:
                 'Max (ms)': max_response,
                 'Fast Requests (%)': (fast_requests / total) * 100,
                 'Slow Requests (%)': (slow_requests / total) * 100,
+                # IC 95% exato (estatísticas de ordem) para P95/P99
+                **quantile_ci_columns(profile),
             })
         
+        # Diferença de P95/P99 frente ao V1, com IC bootstrap sobre os buffers ordenados
+        reference = self.latency_profiles.get('V1')
+        if reference is not None:
+            for row in results:
+                if row['Version'] != 'V1':
+                    row.update(quantile_diff_columns(self.latency_profiles[row['Version']], reference))
+        
         self.response_df = pd.DataFrame(results)
         return self.response_df
     
+    def analyze_phases(self):
+        """Analisa latência e status por fase do cenário (aquecimento, falha, recuperação...)"""
+        print(f"\n⏱️  Analisando métricas por fase...")
+        
+        phases = get_phase_registry().phases(self.scenario_name)
+        if not phases or not USE_FAST_LOADER:
+            print(f"  ⚠️  Fases não disponíveis para {self.scenario_name}")
+            self.phase_df = pd.DataFrame()
+            return self.phase_df
+        
+        frames = []
+        for version, df in self.data.items():
+            if 'time' not in df.columns:
+                continue
+            phase_summary = summarize_by_phase(self._requests(version), phases, self.cutoffs.get(version))
+            if not phase_summary.empty:
+                phase_summary.insert(0, 'Version', version)
+                frames.append(phase_summary)
+        
+        self.phase_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if 'Truncated' in self.phase_df.columns:
+            # Só as versões cortadas trazem a coluna; as demais foram observadas por inteiro
+            self.phase_df['Truncated'] = self.phase_df['Truncated'].fillna(False).astype(bool)
+        return self.phase_df
+    
     def analyze_status_codes(self):
         """Analisa distribuição de códigos de status"""
         print(f"\n🔍 Analisando códigos de status...")
@@ -182,9 +252,10 @@ class ScenarioAnalyzer:
         results = []
         
         for version, df in self.data.items():
-            df['status'] = df['tags'].apply(
-                lambda x: str(x.get('status')) if isinstance(x, dict) and x.get('status') is not None else None
-            )
+            if 'status' not in df.columns:
+                df['status'] = df['tags'].apply(
+                    lambda x: str(x.get('status')) if isinstance(x, dict) and x.get('status') is not None else None
+                )
             
             http_reqs = df[df['metric'] == 'http_reqs']
             
@@ -304,6 +375,11 @@ class ScenarioAnalyzer:
     
     def generate_plots(self):
         """Gera gráficos comparativos"""
+        # matplotlib/seaborn só aqui: o modo interativo e o pai do --jobs não pagam o import
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        sns.set_style("whitegrid")
         print(f"\n🎨 Gerando gráficos...")
         
         # 1. Comparação de tempos de resposta
@@ -417,6 +493,8 @@ class ScenarioAnalyzer:
     
     def generate_report(self):
         """Gera relatório HTML"""
+        from jinja2 import Template
+
         print(f"\n📄 Gerando relatório HTML...")
         
         template_str = """
@@ -619,6 +697,11 @@ class ScenarioAnalyzer:
                 <h2>🔍 Distribuição de Status</h2>
                 {{ status_table }}
                 
+                {% if phase_table %}
+                <h2>⏱️ Métricas por Fase</h2>
+                {{ phase_table }}
+                {% endif %}
+                
                 <div class="info-box">
                     <h4>📊 Interpretação dos Status Codes</h4>
                     <ul>
@@ -640,9 +723,13 @@ class ScenarioAnalyzer:
                 {% endif %}
                 
                 <h2>📈 Gráficos Comparativos</h2>
+                {% if interactive_section %}
+                {{ interactive_section }}
+                {% else %}
                 <img src="plots/{{ scenario_name }}/response_comparison.png" alt="Comparação de Latência">
                 <img src="plots/{{ scenario_name }}/status_distribution.png" alt="Distribuição de Status">
                 <img src="plots/{{ scenario_name }}/status_codes_detailed.png" alt="Status Codes Detalhados">
+                {% endif %}
             </div>
         </body>
         </html>
@@ -653,9 +740,11 @@ class ScenarioAnalyzer:
             scenario_name=self.scenario_name,
             response_table=self.response_df.to_html(index=False, classes='table'),
             status_table=self.status_df.to_html(index=False, classes='table'),
+            phase_table=self.phase_df.to_html(index=False, classes='table', float_format='%.2f') if not self.phase_df.empty else None,
             response_df=self.response_df,
             status_df=self.status_df,
-            benefits=self.benefits.iloc[0].to_dict() if self.benefits is not None and len(self.benefits) > 0 else None
+            benefits=self.benefits.iloc[0].to_dict() if self.benefits is not None and len(self.benefits) > 0 else None,
+            interactive_section=self._interactive_section() if self.interactive else None
         )
         
         report_path = os.path.join(self.output_dir, f"{self.scenario_name}_report.html")
@@ -664,6 +753,23 @@ class ScenarioAnalyzer:
         
         print(f"  ✅ Relatório salvo em {report_path}")
     
+    def _interactive_section(self):
+        """Rollups, histogramas, fases e spans do CB embutidos no HTML (sem matplotlib)."""
+        if not USE_FAST_LOADER:
+            print("  ⚠️  Modo interativo requer o FastK6Loader; usando os gráficos estáticos")
+            self.generate_plots()
+            return None
+        versions = [v for v, df in self.data.items() if 'time' in df.columns]
+        data = build_report_data(
+            {v: self._requests(v) for v in versions},
+            self.scenario_name,
+            histograms={v: LatencyHistogram.from_sorted(self.latency_profiles[v].sorted)
+                        for v in versions if v in self.latency_profiles},
+            phases=get_phase_registry().phases(self.scenario_name),
+            colors=PALETTE,
+        )
+        return render_interactive_section(data)
+    
     def run_analysis(self):
         """Executa análise completa"""
         self.load_data()
@@ -674,8 +780,10 @@ class ScenarioAnalyzer:
         
         self.analyze_response_times()
         self.analyze_status_codes()
+        self.analyze_phases()
         self.calculate_cb_benefit()
-        self.generate_plots()
+        if not self.interactive:
+            self.generate_plots()
         self.generate_report()
         
         # Salva CSVs
@@ -687,6 +795,11 @@ class ScenarioAnalyzer:
             os.path.join(self.csv_dir, f"{self.scenario_name}_status.csv"), 
             index=False
         )
+        if not self.phase_df.empty:
+            self.phase_df.to_csv(
+                os.path.join(self.csv_dir, f"{self.scenario_name}_phases.csv"),
+                index=False
+            )
         if self.benefits is not None:
             self.benefits.to_csv(
                 os.path.join(self.csv_dir, f"{self.scenario_name}_benefits.csv"), 
@@ -706,45 +819,200 @@ def discover_scenarios(directory):
     return sorted(names)
 
 
-if __name__ == "__main__":
-    import sys
+def save_consolidated_benefits(all_benefits, csv_dir=CSV_DIR):
+    """Concatena os benefícios por cenário (na ordem recebida) em consolidated_benefits.csv."""
+    print("\n" + "="*60)
+    print("  RESUMO CONSOLIDADO DE TODOS OS CENÁRIOS")
+    print("="*60)
+    
+    consolidated = pd.concat(all_benefits, ignore_index=True)
+    print("\n", consolidated.to_string(index=False))
+    
+    os.makedirs(csv_dir, exist_ok=True)
+    consolidated.to_csv(
+        os.path.join(csv_dir, "consolidated_benefits.csv"),
+        index=False
+    )
     
-    cli_args = sys.argv[1:]
-    available = discover_scenarios(RESULTS_DIR)
+    print(f"\n✅ Análise consolidada salva em {csv_dir}/consolidated_benefits.csv")
+    return consolidated
+
+
+def _cached_rows(parquet_path):
+    """Linhas do cache Parquet, lidas dos metadados (None sem pyarrow ou sem cache)."""
+    try:
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(parquet_path).metadata.num_rows
+    except (ImportError, OSError):
+        return None
+
+
+def estimate_memory_mb(scenario, results_dir=RESULTS_DIR):
+    """
+    Pico de memória estimado (MB) para analisar o cenário num worker.
+
+    Usa o tamanho do NDJSON; sem ele (apagado depois da ingestão ou vazio),
+    converte as linhas do cache Parquet em bytes equivalentes de NDJSON.
+    """
+    ndjson_bytes = 0
+    for version in ["V1", "V2", "V3"]:
+        stem = f"{scenario}_{version}"
+        json_path = os.path.join(results_dir, f"{stem}.json")
+        size = os.path.getsize(json_path) if os.path.exists(json_path) else 0
+        if size == 0:
+            rows = _cached_rows(os.path.join(results_dir, ".cache", f"{stem}.parquet"))
+            size = (rows or 0) * NDJSON_BYTES_PER_CACHED_ROW
+        ndjson_bytes += size
+    return WORKER_BASE_MB + NDJSON_MEMORY_FACTOR * ndjson_bytes / 2 ** 20
+
+
+def available_memory_mb():
+    """Memória disponível (MemAvailable do /proc/meminfo; fallback: memória física)."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 2 ** 20
+
+
+def _analyze_scenario_task(task):
+    """Worker: analisa um cenário com a saída capturada (impressa em ordem pelo processo principal)."""
+    scenario, results_dir, output_dir, interactive = task
+    log = io.StringIO()
+    start = time.time()
+    with contextlib.redirect_stdout(log):
+        benefits, failed = _analyze_scenario(scenario, results_dir, output_dir, interactive)
+    return scenario, benefits, failed, log.getvalue(), time.time() - start
+
+
+def _analyze_scenario(scenario, results_dir, output_dir, interactive):
+    """(benefícios, falhou): a falha é impressa com o traceback e não interrompe os outros cenários."""
+    try:
+        analyzer = ScenarioAnalyzer(scenario, results_dir, output_dir, interactive=interactive)
+        analyzer.run_analysis()
+        return getattr(analyzer, 'benefits', None), False
+    except Exception:
+        print(f"\n❌ Falha ao analisar {scenario}:\n{traceback.format_exc()}")
+        return None, True
+
+
+def run_scenarios_parallel(scenarios, results_dir=RESULTS_DIR, output_dir=OUTPUT_DIR,
+                           max_workers=None, memory_mb=None, interactive=False):
+    """
+    Analisa os cenários em processos separados, respeitando um orçamento de memória.
+
+    Um cenário só começa se a soma das estimativas (estimate_memory_mb) dos que
+    estão rodando couber em memory_mb; um cenário maior que o orçamento roda
+    sozinho. A ordem de início, os logs e o resultado seguem a ordem de
+    `scenarios`, independente de qual worker termina primeiro.
+
+    Args:
+        scenarios: Cenários a analisar
+        max_workers: Processos simultâneos (default: os.cpu_count())
+        memory_mb: Orçamento total (default: MEMORY_BUDGET_FRACTION da memória disponível)
+        interactive: Repassado ao ScenarioAnalyzer
+
+    Returns:
+        (lista de DataFrames de benefícios, cenários que falharam), ambos na
+        ordem de `scenarios`.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    memory_mb = memory_mb or MEMORY_BUDGET_FRACTION * available_memory_mb()
+    estimates = {scenario: estimate_memory_mb(scenario, results_dir) for scenario in scenarios}
+    print(f"  🚀 {len(scenarios)} cenário(s) em até {max_workers} processo(s), "
+          f"orçamento de memória {memory_mb:,.0f} MB")
+
+    pending = list(scenarios)
+    running = {}
+    outputs = {}
+    printed = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            in_use = sum(estimates[scenario] for scenario in running.values())
+            while pending and len(running) < max_workers:
+                scenario = pending[0]
+                if running and in_use + estimates[scenario] > memory_mb:
+                    break
+                pending.pop(0)
+                in_use += estimates[scenario]
+                task = (scenario, results_dir, output_dir, interactive)
+                running[pool.submit(_analyze_scenario_task, task)] = scenario
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                scenario, benefits, failed, log, elapsed = future.result()
+                del running[future]
+                outputs[scenario] = (benefits, failed, log, elapsed)
+
+            # Logs na ordem dos cenários, assim que o prefixo estiver completo
+            while printed < len(scenarios) and scenarios[printed] in outputs:
+                scenario = scenarios[printed]
+                _, _, log, elapsed = outputs[scenario]
+                print(log, end="")
+                print(f"  ⏱️  {scenario}: {elapsed:.1f}s (estimativa {estimates[scenario]:,.0f} MB)")
+                printed += 1
+
+    benefits = [outputs[scenario][0] for scenario in scenarios if outputs[scenario][0] is not None]
+    failures = [scenario for scenario in scenarios if outputs[scenario][1]]
+    return benefits, failures
+
+
+def main(argv=None) -> int:
+    """CLI: [cenários|all] [--jobs N] [--memory-mb M] [--interactive] [--no-consolidated]."""
+    parser = argparse.ArgumentParser(description='Análise por cenário crítico (V1 x V2 x V3)')
+    parser.add_argument('scenarios', nargs='*', help='Cenários (default/all: todos em k6/results/scenarios)')
+    parser.add_argument('--jobs', type=int, default=1, help='Processos (um cenário por processo)')
+    parser.add_argument('--memory-mb', type=float, default=None,
+                        help='Orçamento de memória somado dos processos (default: 70%% da disponível)')
+    parser.add_argument('--interactive', action='store_true',
+                        help='Relatório com gráficos interativos (JSON embutido), sem PNGs')
+    parser.add_argument('--no-consolidated', action='store_true',
+                        help='Não reescreve consolidated_benefits.csv (execução por cenário)')
+    args = parser.parse_intermixed_args(argv)
+    if args.jobs < 1:
+        parser.error('--jobs precisa ser >= 1')
+    if args.memory_mb is not None and args.memory_mb <= 0:
+        parser.error('--memory-mb precisa ser > 0')
     
-    if not cli_args or cli_args == ['all']:
-        scenarios = available or ["catastrofe", "degradacao", "rajadas", "indisponibilidade"]
+    if not args.scenarios or args.scenarios == ['all']:
+        scenarios = discover_scenarios(RESULTS_DIR) or ["catastrofe", "degradacao", "rajadas", "indisponibilidade"]
     else:
-        scenarios = cli_args
+        scenarios = args.scenarios
     
     print("\n" + "="*60)
     print("  ANALISADOR DE CENÁRIOS CRÍTICOS - CIRCUIT BREAKER")
     print("="*60)
     
-    all_benefits = []
+    if args.jobs > 1 and len(scenarios) > 1:
+        all_benefits, failures = run_scenarios_parallel(scenarios, RESULTS_DIR, OUTPUT_DIR, max_workers=args.jobs,
+                                                        memory_mb=args.memory_mb,
+                                                        interactive=args.interactive)
+    else:
+        all_benefits, failures = [], []
+        for scenario in scenarios:
+            benefits, failed = _analyze_scenario(scenario, RESULTS_DIR, OUTPUT_DIR, args.interactive)
+            if failed:
+                failures.append(scenario)
+            elif benefits is not None:
+                all_benefits.append(benefits)
     
-    for scenario in scenarios:
-        analyzer = ScenarioAnalyzer(scenario, RESULTS_DIR, OUTPUT_DIR)
-        analyzer.run_analysis()
-        
-        if analyzer.benefits is not None:
-            all_benefits.append(analyzer.benefits)
+    if failures:
+        # Um consolidado sem os cenários que falharam pareceria completo
+        print(f"\n❌ {len(failures)} cenário(s) com falha: {', '.join(failures)}")
+        print("   consolidated_benefits.csv não foi reescrito")
+        return 1
     
-    if all_benefits:
-        print("\n" + "="*60)
-        print("  RESUMO CONSOLIDADO DE TODOS OS CENÁRIOS")
-        print("="*60)
-        
-        consolidated = pd.concat(all_benefits, ignore_index=True)
-        print("\n", consolidated.to_string(index=False))
-        
-        consolidated.to_csv(
-            os.path.join(CSV_DIR, "consolidated_benefits.csv"),
-            index=False
-        )
-        
-        print(f"\n✅ Análise consolidada salva em {CSV_DIR}/consolidated_benefits.csv")
+    if all_benefits and not args.no_consolidated:
+        save_consolidated_benefits(all_benefits)
     
     print("\n" + "="*60)
     print("  ✨ ANÁLISE COMPLETA FINALIZADA!")
     print("="*60 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
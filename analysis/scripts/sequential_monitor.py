@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Monitor sequencial V1 vs V2 sobre o stream do k6 (parada antecipada)
+
+Lê os NDJSON que o k6 grava (`--out json=...`) enquanto o teste roda e
+avalia continuamente, para latência e disponibilidade (200 + 202), um teste
+sempre válido: mSPRT com mistura normal N(0, τ²) sobre a diferença de médias
+(Johari et al.). A cada passo:
+
+    V = s²_1/n_1 + s²_2/n_2,  Λ = sqrt(V/(V+τ²)) · exp(θ̂²τ² / (2V(V+τ²)))
+    p sempre válido = min(p anterior, 1/Λ)
+
+e a sequência de confiança correspondente (θ: Λ(θ) < 1/α), intersectada ao
+longo do tempo. O erro tipo I é controlado em alpha mesmo olhando os dados a
+todo momento. Decisões por métrica:
+
+- 'diferente': p <= alpha (a sequência de confiança exclui 0)
+- 'equivalente': a sequência de confiança cabe em ±margem
+- 'indeciso': caso contrário
+
+As duas execuções são comparadas sempre na mesma janela de tempo decorrido
+(o V1 já gravado é lido só até onde o V2 chegou), e nenhuma decisão é
+tomada antes do fim da última janela de falha do cenário (registro de
+fases), para a parada antecipada não cortar a parte que diferencia as versões.
+
+A recuperação e o cooldown depois da última falha ficam de fora quando o k6
+é parado. Por isso o registro (<v2>_monitor.json) diz se a execução foi
+cortada (`truncated`), em que segundo (`stopped_at_s`) e quais fases ficaram
+incompletas; a análise por fase e a de recuperação leem esse registro
+(phases.early_stop_cutoff) e marcam o que não foi observado.
+
+Uso (ao lado do k6 do V2, ver run_scenario_tests.sh com EARLY_STOP=true):
+    python sequential_monitor.py k6/results/scenarios/catastrofe_V1.json \\
+        k6/results/scenarios/catastrofe_V2.json --on-decision "pkill -INT k6"
+"""
+
+import argparse
+import json
+import math
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from fast_loader import _parse_line, _status_of
+from phases import get_phase_registry, monitor_path
+from sufficient_stats import SufficientStats
+
+DEFAULT_ALPHA = 0.05
+# Escala da mistura (efeito típico esperado) e margem de equivalência por métrica
+LATENCY_TAU_MS = 50.0
+LATENCY_MARGIN_MS = 10.0
+AVAILABILITY_TAU = 0.05
+AVAILABILITY_MARGIN = 0.01
+# Amostras por versão antes de usar a variância estimada
+MIN_SAMPLES = 1000
+POLL_INTERVAL_S = 5.0
+READ_CHUNK_LINES = 50_000
+# Sem crescimento dos arquivos por este tempo: o teste acabou
+IDLE_TIMEOUT_S = 120.0
+
+LATENCY_METRIC = "http_req_duration"
+SUCCESS_STATUSES = {"200", "202"}
+
+
+@dataclass(frozen=True)
+class SequentialDecision:
+    """Estado do teste sequencial de uma métrica (diferença V1 - V2)."""
+    metric: str
+    estimate: float
+    lower: float
+    upper: float
+    p_value: float
+    n_v1: int
+    n_v2: int
+    elapsed_s: float
+    decision: str = "indeciso"
+
+    @property
+    def decided(self) -> bool:
+        return self.decision != "indeciso"
+
+
+class MixtureSPRT:
+    """mSPRT de duas amostras (mistura normal) com sequência de confiança."""
+
+    def __init__(self, metric: str, tau: float, margin: float,
+                 alpha: float = DEFAULT_ALPHA, min_samples: int = MIN_SAMPLES):
+        self.metric = metric
+        self.tau2 = tau ** 2
+        self.margin = margin
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.p_value = 1.0
+        self.lower, self.upper = -math.inf, math.inf
+
+    def update(self, x: SufficientStats, y: SufficientStats, elapsed_s: float,
+               allow_decision: bool = True) -> SequentialDecision:
+        estimate = x.mean - y.mean if x.n and y.n else float("nan")
+        if min(x.n, y.n) >= self.min_samples:
+            v = x.variance() / x.n + y.variance() / y.n
+            if v > 0:
+                log_lambda = 0.5 * math.log(v / (v + self.tau2)) + \
+                    estimate ** 2 * self.tau2 / (2 * v * (v + self.tau2))
+                self.p_value = min(self.p_value, math.exp(-log_lambda) if log_lambda > 0 else 1.0)
+                # {θ : Λ(θ) < 1/α}
+                radius = math.sqrt(v * (v + self.tau2) / self.tau2 *
+                                   (math.log((v + self.tau2) / v) - 2 * math.log(self.alpha)))
+                self.lower = max(self.lower, estimate - radius)
+                self.upper = min(self.upper, estimate + radius)
+
+        decision = "indeciso"
+        if allow_decision:
+            if self.p_value <= self.alpha:
+                decision = "diferente"
+            elif -self.margin <= self.lower and self.upper <= self.margin:
+                decision = "equivalente"
+        return SequentialDecision(self.metric, float(estimate), self.lower, self.upper,
+                                  self.p_value, x.n, y.n, elapsed_s, decision)
+
+
+class StreamTail:
+    """
+    Leitura incremental de um NDJSON do k6 que ainda está sendo escrito.
+
+    Guarda a posição no arquivo, ignora a última linha incompleta e converte
+    os pontos de latência em (segundos desde o primeiro ponto, latência, sucesso).
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._file = None
+        self._origin: Optional[pd.Timestamp] = None
+        self.frontier = -math.inf   # maior tempo decorrido já lido (s)
+        self.at_eof = False
+        self.size = 0
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def read_chunk(self, max_lines: int = READ_CHUNK_LINES) -> int:
+        """Lê até max_lines linhas completas; retorna quantas foram lidas."""
+        if self._file is None:
+            if not self.path.exists():
+                self.at_eof = True
+                return 0
+            self._file = open(self.path, "rb")
+        times, values, success = [], [], []
+        lines = 0
+        while lines < max_lines:
+            position = self._file.tell()
+            line = self._file.readline()
+            if not line or not line.endswith(b"\n"):
+                self._file.seek(position)   # linha parcial: relê no próximo poll
+                self.at_eof = True
+                break
+            lines += 1
+            parsed = _parse_line(line.decode("utf-8", errors="replace"))
+            if parsed and parsed.get("metric") == LATENCY_METRIC:
+                times.append(parsed.get("time"))
+                values.append(parsed.get("value"))
+                success.append(_status_of(parsed.get("tags")) in SUCCESS_STATUSES)
+        self.size = self._file.tell()
+
+        if times:
+            timestamps = pd.to_datetime(pd.Series(times), utc=True, format="ISO8601")
+            if self._origin is None:
+                self._origin = timestamps.min()
+            seconds = (timestamps - self._origin).dt.total_seconds().to_numpy()
+            self._pending.append((seconds, np.asarray(values, dtype=float), np.asarray(success, dtype=float)))
+            self.frontier = max(self.frontier, float(seconds.max()))
+        return lines
+
+    def take_until(self, horizon: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Remove e devolve (latências, sucesso) dos pontos com tempo <= horizon."""
+        if not self._pending:
+            return np.empty(0), np.empty(0)
+        seconds, values, success = (np.concatenate(parts) for parts in zip(*self._pending))
+        ready = seconds <= horizon
+        self._pending = [(seconds[~ready], values[~ready], success[~ready])] if (~ready).any() else []
+        return values[ready], success[ready]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class SequentialMonitor:
+    """
+    Compara V1 e V2 em tempo real, sempre sobre a mesma janela de tempo decorrido.
+
+    Args:
+        v1_path, v2_path: NDJSON do k6 (podem estar sendo escritos)
+        scenario: Cenário (para o tempo mínimo pelo registro de fases); inferido do nome
+        min_elapsed_s: Tempo decorrido mínimo antes de decidir (default: fim da última falha)
+    """
+
+    def __init__(self, v1_path: str, v2_path: str, scenario: Optional[str] = None,
+                 alpha: float = DEFAULT_ALPHA, min_elapsed_s: Optional[float] = None,
+                 latency_margin_ms: float = LATENCY_MARGIN_MS,
+                 availability_margin: float = AVAILABILITY_MARGIN):
+        self.tails = [StreamTail(v1_path), StreamTail(v2_path)]
+        self.scenario = scenario or Path(v1_path).stem.rsplit("_", 1)[0]
+        if min_elapsed_s is None:
+            windows = get_phase_registry().failure_windows(self.scenario)
+            min_elapsed_s = max((w.end for w in windows), default=0.0)
+        self.min_elapsed_s = min_elapsed_s
+        self.tests = {
+            "latency_ms": MixtureSPRT("latency_ms", LATENCY_TAU_MS, latency_margin_ms, alpha),
+            "availability": MixtureSPRT("availability", AVAILABILITY_TAU, availability_margin, alpha),
+        }
+        self.latency = [SufficientStats(), SufficientStats()]
+        self.availability = [SufficientStats(), SufficientStats()]
+        self.horizon = 0.0
+        self.decisions: Dict[str, SequentialDecision] = {}
+
+    def poll(self) -> Dict[str, SequentialDecision]:
+        """Lê o que houver de novo (até o horizonte comum) e atualiza os testes."""
+        for tail in self.tails:
+            tail.at_eof = False
+        # Avança sempre o stream mais atrasado; o adiantado fica limitado a um chunk
+        while True:
+            behind = min(self.tails, key=lambda t: t.frontier)
+            if behind.at_eof or not behind.read_chunk():
+                break
+
+        horizon = min(tail.frontier for tail in self.tails)
+        if horizon == -math.inf:
+            return self.decisions
+        self.horizon = max(self.horizon, horizon)
+        for i, tail in enumerate(self.tails):
+            latencies, success = tail.take_until(horizon)
+            self.latency[i] = self.latency[i].merge(SufficientStats.from_array(latencies))
+            self.availability[i] = self.availability[i].merge(SufficientStats.from_array(success))
+
+        allow = self.horizon >= self.min_elapsed_s
+        self.decisions = {
+            "latency_ms": self.tests["latency_ms"].update(*self.latency, self.horizon, allow),
+            "availability": self.tests["availability"].update(*self.availability, self.horizon, allow),
+        }
+        return self.decisions
+
+    @property
+    def decided(self) -> bool:
+        return bool(self.decisions) and all(d.decided for d in self.decisions.values())
+
+    def run(self, poll_interval: float = POLL_INTERVAL_S, idle_timeout: float = IDLE_TIMEOUT_S,
+            on_decision: Optional[str] = None, output: Optional[str] = None) -> bool:
+        """
+        Monitora até todas as métricas decidirem ou os arquivos pararem de crescer.
+
+        Returns:
+            True se houve decisão (e on_decision foi executado)
+        """
+        print(f"🔎 Monitor sequencial: {self.scenario} (decisões a partir de {self.min_elapsed_s:.0f}s)")
+        last_sizes, last_growth = None, time.time()
+        try:
+            while True:
+                self.poll()
+                for decision in self.decisions.values():
+                    print(f"  t={decision.elapsed_s:6.0f}s | {decision.metric:<12} Δ={decision.estimate:+.4f} "
+                          f"[{decision.lower:+.4f}, {decision.upper:+.4f}] p={decision.p_value:.4f} "
+                          f"→ {decision.decision}")
+                if self.decided:
+                    break
+                sizes = [tail.size for tail in self.tails]
+                if sizes != last_sizes:
+                    last_sizes, last_growth = sizes, time.time()
+                elif time.time() - last_growth > idle_timeout:
+                    print("⏹️  Arquivos sem crescimento: teste encerrado sem decisão")
+                    return False
+                time.sleep(poll_interval)
+        finally:
+            for tail in self.tails:
+                tail.close()
+
+        print(f"✅ Decisão em t={self.horizon:.0f}s: "
+              + ", ".join(f"{m}={d.decision}" for m, d in self.decisions.items()))
+        if output:
+            # Gravado antes de parar o k6: a análise nunca vê uma execução cortada sem o registro
+            cut = [phase.name for phase in get_phase_registry().phases(self.scenario) if phase.end > self.horizon]
+            with open(output, "w") as f:
+                json.dump({"scenario": self.scenario, "elapsed_s": self.horizon,
+                           "truncated": bool(on_decision), "stopped_at_s": self.horizon,
+                           "cut_phases": cut if on_decision else [],
+                           "decisions": {m: asdict(d) for m, d in self.decisions.items()}}, f, indent=2)
+        if on_decision:
+            print(f"✂️  Parando o k6: fases não observadas a partir de t={self.horizon:.0f}s")
+            subprocess.run(on_decision, shell=True, check=False)
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor sequencial V1 vs V2 (parada antecipada do k6)")
+    parser.add_argument("v1", help="NDJSON do V1 (completo ou em andamento)")
+    parser.add_argument("v2", help="NDJSON do V2 (em andamento)")
+    parser.add_argument("--scenario", help="Cenário (default: inferido do nome do arquivo)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    parser.add_argument("--min-elapsed", type=float, default=None,
+                        help="Segundos antes de permitir decisão (default: fim da última falha)")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL_S, help="Intervalo de leitura (s)")
+    parser.add_argument("--on-decision", help="Comando executado na decisão (ex.: parar o k6)")
+    parser.add_argument("--output", help="JSON com as decisões e o corte (default: <v2>_monitor.json)")
+    args = parser.parse_args()
+
+    monitor = SequentialMonitor(args.v1, args.v2, args.scenario, args.alpha, args.min_elapsed)
+    output = args.output or str(monitor_path(args.v2))
+    decided = monitor.run(args.poll, on_decision=args.on_decision, output=output)
+    sys.exit(0 if decided else 1)
+
+
+if __name__ == "__main__":
+    main()
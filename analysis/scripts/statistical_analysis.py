@@ -9,17 +9,32 @@ Testes implementados:
 - Intervalos de Confiança (95%)
 - Cohen's d (Effect Size)
 - Teste de Shapiro-Wilk (normalidade)
+- Teste de permutação (média e quantis, com parada antecipada)
+
+Os testes paramétricos aceitam arrays ou estatísticas suficientes
+(SufficientStats: n, média, M2), como as gravadas pelo FastK6Loader na
+ingestão (`FastK6Loader.load_stats`), e rodam em O(1) por grupo.
 
 Uso:
-    python statistical_analysis.py --data-dir analysis_results/ --output-dir analysis_results/statistics/
+    python statistical_analysis.py --results-dir k6/results --output-dir analysis_results/statistics/ --jobs 4
+    python statistical_analysis.py --validate   # dados sintéticos
+
+Com dados reais, cada cenário roda em um processo a partir das estatísticas
+suficientes e histogramas gravados pelo FastK6Loader; os resultados ficam em
+cache por impressão digital dos arquivos de entrada e cenários inalterados
+não são recalculados.
 """
 
 import argparse
+import hashlib
 import json
 import os
+import sys
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -27,6 +42,13 @@ import pandas as pd
 import seaborn as sns
 from scipy import stats
 
+from distribution_plots import Distribution, as_histogram, boxplot
+from histogram_stats import LatencyHistogram, compare_histograms
+from permutation_test import permutation_test
+from rank_stats import compare_ranks, mann_whitney_p
+from rollups import K6_RESULTS_DIR, discover_runs
+from sufficient_stats import SufficientStats, merge_all
+
 warnings.filterwarnings('ignore')
 
 # Configuração de estilo para gráficos acadêmicos
@@ -39,18 +61,38 @@ plt.rcParams.update({
     'savefig.dpi': 300,
 })
 
+# Grupo de latências: array bruto ou estatísticas suficientes já acumuladas
+Group = Union[np.ndarray, SufficientStats]
+
+# Shapiro-Wilk é limitado a 5000 amostras
+SHAPIRO_MAX_SAMPLE = 5000
+# Incrementar quando a bateria de testes mudar (invalida o cache por cenário)
+ANALYSIS_CACHE_VERSION = 1
+LATENCY_METRIC = 'http_req_duration'
+
+
+def _as_stats(group: Group) -> SufficientStats:
+    return group if isinstance(group, SufficientStats) else SufficientStats.from_array(group)
+
+
+def _is_normal(values: np.ndarray) -> Optional[bool]:
+    """Shapiro-Wilk (p > 0.05) sobre as primeiras SHAPIRO_MAX_SAMPLE amostras."""
+    sample = np.asarray(values, dtype=float)[:SHAPIRO_MAX_SAMPLE]
+    if len(sample) < 3:
+        return None
+    return bool(stats.shapiro(sample)[1] > 0.05)
+
 
 class StatisticalAnalyzer:
     """Classe para análise estatística dos resultados de experimentos."""
     
-    def __init__(self, data_dir: str, output_dir: str):
-        self.data_dir = Path(data_dir)
+    def __init__(self, output_dir: str):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         (self.output_dir / 'plots').mkdir(exist_ok=True)
         (self.output_dir / 'csv').mkdir(exist_ok=True)
     
-    def t_test(self, group1: np.ndarray, group2: np.ndarray, 
+    def t_test(self, group1: Group, group2: Group,
                group1_name: str = "V1", group2_name: str = "V2") -> Dict:
         """
         Teste t de Student para comparar duas amostras independentes.
@@ -59,18 +101,35 @@ class StatisticalAnalyzer:
         - H0: μ1 = μ2 (não há diferença significativa)
         - H1: μ1 ≠ μ2 (há diferença significativa)
         
+        Aceita arrays ou SufficientStats; com arrays, verifica a normalidade
+        (Shapiro-Wilk) antes de delegar a t_test_from_stats.
+        
         Returns:
             Dict com estatística t, p-value e interpretação
         """
-        # Verificar normalidade primeiro
-        _, p_norm1 = stats.shapiro(group1[:min(len(group1), 5000)])
-        _, p_norm2 = stats.shapiro(group2[:min(len(group2), 5000)])
+        normal = None
+        if not isinstance(group1, SufficientStats) and not isinstance(group2, SufficientStats):
+            # Verificar normalidade primeiro
+            normal = _is_normal(group1) and _is_normal(group2)
         
-        # Teste t
-        t_stat, p_value = stats.ttest_ind(group1, group2)
+        return self.t_test_from_stats(_as_stats(group1), _as_stats(group2),
+                                      group1_name, group2_name, normal)
+    
+    def t_test_from_stats(self, stats1: SufficientStats, stats2: SufficientStats,
+                          group1_name: str = "V1", group2_name: str = "V2",
+                          normal_distribution: Optional[bool] = None) -> Dict:
+        """
+        Teste t a partir de estatísticas suficientes (n, média, M2), em O(1).
+        
+        Mesmo resultado de stats.ttest_ind sobre os arrays completos.
+        """
+        t_stat, p_value = stats.ttest_ind_from_stats(
+            stats1.mean, stats1.std(), stats1.n,
+            stats2.mean, stats2.std(), stats2.n,
+        )
         
         # Effect size (Cohen's d)
-        cohens_d = self.cohens_d(group1, group2)
+        cohens_d = self.cohens_d_from_stats(stats1, stats2)
         
         # Interpretação
         significant = p_value < 0.05
@@ -80,16 +139,16 @@ class StatisticalAnalyzer:
             'test': 't-test',
             'group1': group1_name,
             'group2': group2_name,
-            'group1_mean': float(np.mean(group1)),
-            'group2_mean': float(np.mean(group2)),
-            'group1_std': float(np.std(group1)),
-            'group2_std': float(np.std(group2)),
+            'group1_mean': float(stats1.mean),
+            'group2_mean': float(stats2.mean),
+            'group1_std': float(stats1.std(ddof=0)),
+            'group2_std': float(stats2.std(ddof=0)),
             't_statistic': float(t_stat),
             'p_value': float(p_value),
             'cohens_d': float(cohens_d),
             'effect_size': effect_interpretation,
             'significant': significant,
-            'normal_distribution': p_norm1 > 0.05 and p_norm2 > 0.05,
+            'normal_distribution': normal_distribution,
             'interpretation': f"{'Há' if significant else 'Não há'} diferença estatisticamente significativa entre {group1_name} e {group2_name} (p={p_value:.4f}). Tamanho do efeito: {effect_interpretation} (d={cohens_d:.3f})"
         }
     
@@ -99,10 +158,14 @@ class StatisticalAnalyzer:
         Teste Mann-Whitney U para comparação não-paramétrica.
         Usar quando dados não seguem distribuição normal.
         """
-        u_stat, p_value = stats.mannwhitneyu(group1, group2, alternative='two-sided')
+        # Contagens de dominância exatas (O(n log n)), compartilhadas com o Cliff's delta;
+        # p-valor exato (scipy) para amostras pequenas sem empates, aproximação normal acima
+        comparison = compare_ranks(group1, group2)
+        u_stat = comparison.u_statistic
+        p_value = mann_whitney_p(group1, group2, comparison, 'two-sided')
         
         # Effect size: rank-biserial correlation
-        n1, n2 = len(group1), len(group2)
+        n1, n2 = comparison.n_x, comparison.n_y
         r = 1 - (2 * u_stat) / (n1 * n2)
         
         return {
@@ -112,11 +175,12 @@ class StatisticalAnalyzer:
             'u_statistic': float(u_stat),
             'p_value': float(p_value),
             'effect_size_r': float(r),
+            'cliffs_delta': float(comparison.cliffs_delta),
             'significant': p_value < 0.05,
             'interpretation': f"{'Há' if p_value < 0.05 else 'Não há'} diferença significativa (p={p_value:.4f})"
         }
     
-    def anova(self, groups: List[np.ndarray], group_names: List[str]) -> Dict:
+    def anova(self, groups: List[Group], group_names: List[str]) -> Dict:
         """
         ANOVA (Análise de Variância) para comparar 3+ grupos.
         
@@ -124,16 +188,30 @@ class StatisticalAnalyzer:
         - H0: μ1 = μ2 = μ3 = ... (todas as médias são iguais)
         - H1: Pelo menos uma média é diferente
         """
-        # ANOVA one-way
-        f_stat, p_value = stats.f_oneway(*groups)
+        return self.anova_from_stats([_as_stats(g) for g in groups], group_names)
+    
+    def anova_from_stats(self, group_stats: List[SufficientStats], group_names: List[str]) -> Dict:
+        """
+        ANOVA one-way a partir de (n, média, M2) de cada grupo, em O(k).
+        
+        SS_within = Σ M2 e SS_between = Σ n·(média - média_geral)²,
+        equivalente a stats.f_oneway sobre os arrays completos.
+        """
+        total = merge_all(group_stats)
+        k, n_total = len(group_stats), total.n
+        
+        ss_between = sum(g.n * (g.mean - total.mean) ** 2 for g in group_stats)
+        ss_within = sum(g.m2 for g in group_stats)
+        df_between, df_within = k - 1, n_total - k
+        if df_between > 0 and df_within > 0 and ss_within > 0:
+            f_stat = (ss_between / df_between) / (ss_within / df_within)
+            p_value = float(stats.f.sf(f_stat, df_between, df_within))
+        else:
+            f_stat, p_value = float('nan'), float('nan')
         
         # Effect size: Eta-squared
         # η² = SS_between / SS_total
-        all_data = np.concatenate(groups)
-        grand_mean = np.mean(all_data)
-        
-        ss_between = sum(len(g) * (np.mean(g) - grand_mean)**2 for g in groups)
-        ss_total = sum((x - grand_mean)**2 for x in all_data)
+        ss_total = total.m2
         eta_squared = ss_between / ss_total if ss_total > 0 else 0
         
         # Interpretação do η²
@@ -154,24 +232,22 @@ class StatisticalAnalyzer:
             'eta_squared': float(eta_squared),
             'effect_size': eta_interpretation,
             'significant': p_value < 0.05,
-            'group_means': {name: float(np.mean(g)) for name, g in zip(group_names, groups)},
-            'group_stds': {name: float(np.std(g)) for name, g in zip(group_names, groups)},
+            'group_means': {name: float(g.mean) for name, g in zip(group_names, group_stats)},
+            'group_stds': {name: float(g.std(ddof=0)) for name, g in zip(group_names, group_stats)},
             'interpretation': f"{'Há' if p_value < 0.05 else 'Não há'} diferença significativa entre os grupos (F={f_stat:.2f}, p={p_value:.4f}). η²={eta_squared:.3f} ({eta_interpretation})"
         }
         
         # Post-hoc Tukey HSD se significativo
-        if p_value < 0.05 and len(groups) > 2:
-            result['post_hoc'] = self._tukey_hsd(groups, group_names)
+        if p_value < 0.05 and k > 2:
+            result['post_hoc'] = self._tukey_hsd(group_stats, group_names)
         
         return result
     
-    def _tukey_hsd(self, groups: List[np.ndarray], group_names: List[str]) -> List[Dict]:
+    def _tukey_hsd(self, groups: List[Group], group_names: List[str]) -> List[Dict]:
         """Teste post-hoc Tukey HSD para identificar quais grupos diferem."""
-        from itertools import combinations
-        
         results = []
         for (i, name1), (j, name2) in combinations(enumerate(group_names), 2):
-            t_result = self.t_test(groups[i], groups[j], name1, name2)
+            t_result = self.t_test_from_stats(_as_stats(groups[i]), _as_stats(groups[j]), name1, name2)
             # Correção de Bonferroni para múltiplas comparações
             n_comparisons = len(list(combinations(range(len(groups)), 2)))
             adjusted_alpha = 0.05 / n_comparisons
@@ -185,19 +261,49 @@ class StatisticalAnalyzer:
         
         return results
     
-    def confidence_interval(self, data: np.ndarray, confidence: float = 0.95) -> Tuple[float, float, float]:
+    def permutation_test(self, group1, group2, statistic: str = "mean",
+                         group1_name: str = "V1", group2_name: str = "V2", **kwargs) -> Dict:
+        """
+        Teste de permutação bilateral (livre de distribuição) para média ou quantil.
+        
+        Args:
+            group1, group2: Arrays ou LatencyHistogram da execução completa
+            statistic: 'mean', 'median', 'p95', 'p99', ...
+            **kwargs: alpha, max_permutations, min_permutations, seed, n_workers
+        """
+        result = permutation_test(group1, group2, statistic, **kwargs)
+        return {
+            'test': f'Permutação ({statistic})',
+            'group1': group1_name,
+            'group2': group2_name,
+            'difference': result.observed,
+            'p_value': result.p_value,
+            'p_value_ci': (result.p_lower, result.p_upper),
+            'n_permutations': result.n_permutations,
+            'stopped_early': result.stopped_early,
+            'elapsed_s': result.elapsed_s,
+            'significant': result.significant,
+            'interpretation': f"{'Há' if result.significant else 'Não há'} diferença significativa em {statistic} "
+                              f"(Δ={result.observed:.2f}, p={result.p_value:.4f}, {result.n_permutations:,} permutações "
+                              f"em {result.elapsed_s:.2f}s)"
+        }
+    
+    def confidence_interval(self, data: Group, confidence: float = 0.95) -> Tuple[float, float, float]:
         """
         Calcula intervalo de confiança para a média.
         
         Returns:
             Tuple (média, limite_inferior, limite_superior)
         """
-        mean = np.mean(data)
-        sem = stats.sem(data)  # Standard error of mean
-        ci = stats.t.interval(confidence, len(data)-1, loc=mean, scale=sem)
-        return mean, ci[0], ci[1]
+        return self.confidence_interval_from_stats(_as_stats(data), confidence)
+    
+    def confidence_interval_from_stats(self, group: SufficientStats,
+                                       confidence: float = 0.95) -> Tuple[float, float, float]:
+        """IC t da média a partir de (n, média, M2)."""
+        ci = stats.t.interval(confidence, group.n - 1, loc=group.mean, scale=group.sem)
+        return group.mean, ci[0], ci[1]
     
-    def cohens_d(self, group1: np.ndarray, group2: np.ndarray) -> float:
+    def cohens_d(self, group1: Group, group2: Group) -> float:
         """
         Calcula Cohen's d - medida do tamanho do efeito.
         
@@ -207,16 +313,21 @@ class StatisticalAnalyzer:
         - 0.5 ≤ |d| < 0.8: médio
         - |d| ≥ 0.8: grande
         """
-        n1, n2 = len(group1), len(group2)
-        var1, var2 = np.var(group1, ddof=1), np.var(group2, ddof=1)
+        return self.cohens_d_from_stats(_as_stats(group1), _as_stats(group2))
+    
+    def cohens_d_from_stats(self, stats1: SufficientStats, stats2: SufficientStats) -> float:
+        """Cohen's d com desvio padrão agrupado, a partir de (n, média, M2)."""
+        n1, n2 = stats1.n, stats2.n
+        if n1 + n2 <= 2:
+            return 0.0
         
-        # Pooled standard deviation
-        pooled_std = np.sqrt(((n1-1)*var1 + (n2-1)*var2) / (n1+n2-2))
+        # Pooled standard deviation: ((n1-1)·s1² + (n2-1)·s2²) = M2_1 + M2_2
+        pooled_std = np.sqrt((stats1.m2 + stats2.m2) / (n1 + n2 - 2))
         
         if pooled_std == 0:
             return 0.0
         
-        return (np.mean(group1) - np.mean(group2)) / pooled_std
+        return (stats1.mean - stats2.mean) / pooled_std
     
     def _interpret_cohens_d(self, d: float) -> str:
         """Interpreta o tamanho do efeito de Cohen's d."""
@@ -238,8 +349,7 @@ class StatisticalAnalyzer:
         - H0: Os dados seguem distribuição normal
         - H1: Os dados não seguem distribuição normal
         """
-        # Shapiro-Wilk é limitado a 5000 amostras
-        sample = data[:min(len(data), 5000)]
+        sample = data[:min(len(data), SHAPIRO_MAX_SAMPLE)]
         stat, p_value = stats.shapiro(sample)
         
         return {
@@ -251,13 +361,14 @@ class StatisticalAnalyzer:
             'interpretation': f"Os dados {'seguem' if p_value > 0.05 else 'NÃO seguem'} distribuição normal (p={p_value:.4f})"
         }
     
-    def generate_boxplot(self, groups: List[np.ndarray], group_names: List[str],
+    def generate_boxplot(self, groups: List[Distribution], group_names: List[str],
                          title: str, ylabel: str, filename: str):
-        """Gera box plot comparativo com anotações estatísticas."""
+        """Gera box plot comparativo (grupos: arrays ou LatencyHistogram) com anotações estatísticas."""
         fig, ax = plt.subplots(figsize=(10, 6))
         
-        # Box plot
-        bp = ax.boxplot(groups, labels=group_names, patch_artist=True)
+        # Box plot a partir dos histogramas (Axes.bxp)
+        groups = [as_histogram(g) for g in groups]
+        bp = boxplot(ax, groups, group_names, patch_artist=True)
         
         # Cores
         colors = plt.cm.Set2(np.linspace(0, 1, len(groups)))
@@ -266,7 +377,7 @@ class StatisticalAnalyzer:
             patch.set_alpha(0.7)
         
         # Adicionar médias
-        means = [np.mean(g) for g in groups]
+        means = [g.mean for g in groups]
         ax.scatter(range(1, len(groups)+1), means, color='red', marker='D', s=50, zorder=3, label='Média')
         
         ax.set_ylabel(ylabel)
@@ -307,12 +418,75 @@ class StatisticalAnalyzer:
         plt.close()
         print(f"✅ Gráfico de IC salvo: {filename}")
     
-    def run_full_analysis(self, data: Dict[str, Dict[str, np.ndarray]]) -> pd.DataFrame:
+    def analyze_scenario(self, scenario: str, groups: Dict[str, Group],
+                         normality: Optional[Dict[str, Optional[bool]]] = None,
+                         histograms: Optional[Dict[str, LatencyHistogram]] = None) -> List[Dict]:
+        """
+        Bateria completa de um cenário: ANOVA, t-tests pairwise (com Cohen's d),
+        Mann-Whitney (se houver histogramas) e IC 95% da média de cada versão.
+        
+        Args:
+            groups: {versão: array | SufficientStats}
+            normality: {versão: resultado do Shapiro-Wilk}, calculado uma vez por grupo
+            histograms: {versão: LatencyHistogram} para o Mann-Whitney em O(bins)
+        """
+        normality = normality or {}
+        histograms = histograms or {}
+        version_names = list(groups.keys())
+        version_stats = [_as_stats(groups[v]) for v in version_names]
+        results = []
+        
+        # ANOVA se há 3+ grupos
+        if len(version_stats) >= 3:
+            anova_result = self.anova_from_stats(version_stats, version_names)
+            results.append(anova_result)
+        
+        # t-tests pairwise
+        for (n1, s1), (n2, s2) in combinations(zip(version_names, version_stats), 2):
+            normal = None
+            if normality.get(n1) is not None and normality.get(n2) is not None:
+                normal = normality[n1] and normality[n2]
+            results.append(self.t_test_from_stats(s1, s2, n1, n2, normal))
+            
+            if n1 in histograms and n2 in histograms:
+                comparison = compare_histograms(histograms[n1], histograms[n2])
+                p_value = mann_whitney_p(histograms[n1], histograms[n2], comparison, 'two-sided')
+                results.append({
+                    'test': 'Mann-Whitney U',
+                    'group1': n1,
+                    'group2': n2,
+                    'u_statistic': float(comparison.u_statistic),
+                    'p_value': float(p_value),
+                    'effect_size_r': float(1 - 2 * comparison.u_statistic / comparison.pairs),
+                    'cliffs_delta': float(comparison.cliffs_delta),
+                    'significant': p_value < 0.05,
+                    'interpretation': f"{'Há' if p_value < 0.05 else 'Não há'} diferença significativa (p={p_value:.4f})"
+                })
+        
+        # Intervalos de confiança
+        for name, group in zip(version_names, version_stats):
+            mean, ci_lower, ci_upper = self.confidence_interval_from_stats(group)
+            results.append({
+                'test': 'CI 95%',
+                'group1': name,
+                'n': group.n,
+                'mean': float(mean),
+                'ci_lower': float(ci_lower),
+                'ci_upper': float(ci_upper),
+            })
+        
+        for result in results:
+            result['scenario'] = scenario
+            if 'significant' in result:
+                result['significant'] = bool(result['significant'])
+        return results
+    
+    def run_full_analysis(self, data: Dict[str, Dict[str, Group]]) -> pd.DataFrame:
         """
         Executa análise estatística completa.
         
         Args:
-            data: Dict no formato {scenario: {version: values}}
+            data: Dict no formato {scenario: {version: values | SufficientStats}}
         
         Returns:
             DataFrame com todos os resultados
@@ -320,22 +494,63 @@ class StatisticalAnalyzer:
         all_results = []
         
         for scenario, versions in data.items():
-            version_names = list(versions.keys())
-            version_data = [versions[v] for v in version_names]
-            
-            # ANOVA se há 3+ grupos
-            if len(version_data) >= 3:
-                anova_result = self.anova(version_data, version_names)
-                anova_result['scenario'] = scenario
-                all_results.append(anova_result)
-            
-            # t-tests pairwise
-            from itertools import combinations
-            for (n1, v1), (n2, v2) in combinations(zip(version_names, version_data), 2):
-                t_result = self.t_test(v1, v2, n1, n2)
-                t_result['scenario'] = scenario
-                all_results.append(t_result)
+            # Normalidade uma vez por grupo (não a cada par)
+            normality = {name: _is_normal(values) for name, values in versions.items()
+                         if not isinstance(values, SufficientStats)}
+            all_results.extend(self.analyze_scenario(scenario, versions, normality))
+        
+        return self._save_results(all_results)
+    
+    def run_real_data_analysis(self, results_dir: str = K6_RESULTS_DIR,
+                               max_workers: Optional[int] = None,
+                               use_cache: bool = True) -> pd.DataFrame:
+        """
+        Bateria completa sobre os resultados reais do k6, um processo por cenário.
         
+        Cada cenário usa as estatísticas suficientes e o histograma de latência
+        da execução completa (FastK6Loader.load_stats/load_histogram). O
+        resultado é guardado em <output_dir>/cache/<cenário>.json junto com a
+        impressão digital das entradas; cenários inalterados são reaproveitados.
+        """
+        by_scenario: Dict[str, List[Tuple[str, str]]] = {}
+        for scenario, version, path in discover_runs(results_dir):
+            by_scenario.setdefault(scenario, []).append((version, str(path)))
+        if not by_scenario:
+            print(f"⚠️  Nenhum resultado encontrado em {results_dir}")
+            return pd.DataFrame()
+        
+        cache_dir = self.output_dir / 'cache'
+        cache_dir.mkdir(exist_ok=True)
+        
+        results_by_scenario: Dict[str, List[Dict]] = {}
+        tasks = []
+        for scenario, runs in sorted(by_scenario.items()):
+            fingerprint = _input_fingerprint(runs)
+            cached = _read_cached_results(cache_dir / f"{scenario}.json", fingerprint) if use_cache else None
+            if cached is not None:
+                print(f"  ♻️  {scenario}: entradas inalteradas (cache)")
+                results_by_scenario[scenario] = cached
+            else:
+                tasks.append((scenario, runs, str(self.output_dir), fingerprint))
+        
+        if tasks:
+            workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+            print(f"  🚀 {len(tasks)} cenário(s) em {workers} processo(s)")
+            if workers <= 1:
+                outputs = [_analyze_scenario_task(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    outputs = list(pool.map(_analyze_scenario_task, tasks))
+            for (scenario, _, _, fingerprint), results in zip(tasks, outputs):
+                results_by_scenario[scenario] = results
+                with open(cache_dir / f"{scenario}.json", 'w') as f:
+                    json.dump({'fingerprint': fingerprint, 'results': results}, f, default=_json_default)
+                print(f"  ✅ {scenario}: {len(results)} resultado(s)")
+        
+        all_results = [row for scenario in sorted(results_by_scenario) for row in results_by_scenario[scenario]]
+        return self._save_results(all_results)
+    
+    def _save_results(self, all_results: List[Dict]) -> pd.DataFrame:
         # Salvar resultados
         df = pd.DataFrame(all_results)
         df.to_csv(self.output_dir / 'csv' / 'statistical_tests_results.csv', index=False)
@@ -390,15 +605,87 @@ class StatisticalAnalyzer:
         return md_content
 
 
-def main():
+def _input_fingerprint(runs: List[Tuple[str, str]]) -> str:
+    """
+    Hash de (nome, tamanho, mtime) da fonte de cada versão, mais ANALYSIS_CACHE_VERSION.
+
+    A fonte é o NDJSON; o cache Parquet só entra quando é a única cópia
+    (NDJSON apagado ou vazio). Como o worker grava o Parquet e os sidecars
+    durante a ingestão, incluí-los mudaria a impressão digital depois da
+    primeira execução e o cache de resultados nunca seria aproveitado.
+    """
+    digest = hashlib.sha1(f"v{ANALYSIS_CACHE_VERSION}".encode())
+    for version, path in sorted(runs):
+        source = _source_file(Path(path))
+        if source is not None:
+            st = source.stat()
+            digest.update(f"{version}|{source.name}|{st.st_size}|{st.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def _source_file(path: Path) -> Optional[Path]:
+    """NDJSON da execução se existir e não estiver vazio; senão o cache Parquet (None se nenhum)."""
+    if path.suffix == '.json' and path.exists() and path.stat().st_size > 0:
+        return path
+    directory = path.parent.parent if path.parent.name == '.cache' else path.parent
+    cache = directory / '.cache' / f"{path.stem}.parquet"
+    return cache if cache.exists() else None
+
+
+def _read_cached_results(cache_path: Path, fingerprint: str) -> Optional[List[Dict]]:
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cached.get('results') if cached.get('fingerprint') == fingerprint else None
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"tipo não serializável: {type(value).__name__}")
+
+
+def _analyze_scenario_task(task: Tuple[str, List[Tuple[str, str]], str, str]) -> List[Dict]:
+    """Worker: carrega estatísticas/histogramas de um cenário e roda a bateria completa."""
+    from fast_loader import FastK6Loader, source_path
+    
+    scenario, runs, output_dir, _ = task
+    analyzer = StatisticalAnalyzer(output_dir)
+    loaders: Dict[Path, FastK6Loader] = {}
+    groups, normality, histograms = {}, {}, {}
+    for version, path in sorted(runs):
+        path = source_path(path)
+        if path.parent not in loaders:
+            loaders[path.parent] = FastK6Loader(results_dir=str(path.parent), use_cache=True)
+        loader = loaders[path.parent]
+        stats_by_key = loader.load_stats(str(path))
+        if not stats_by_key or 'all' not in stats_by_key:
+            continue
+        groups[version] = stats_by_key['all']
+        histograms[version] = loader.load_histogram(str(path))
+        
+        frame = loader.load_columns(str(path), ['metric', 'value'])
+        if frame is not None:
+            latencies = frame.loc[frame['metric'] == LATENCY_METRIC, 'value'].to_numpy(dtype=float)
+            normality[version] = _is_normal(latencies)
+    
+    histograms = {v: h for v, h in histograms.items() if h is not None and h.bins}
+    return analyzer.analyze_scenario(scenario, groups, normality, histograms)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description='Análise estatística para TCC')
-    parser.add_argument('--data-dir', default='analysis_results', help='Diretório com dados')
+    parser.add_argument('--results-dir', default=K6_RESULTS_DIR, help='Diretório com os resultados do k6')
+    parser.add_argument('--jobs', type=int, default=None, help='Processos (default: um por cenário, até os núcleos)')
+    parser.add_argument('--no-cache', action='store_true', help='Recalcula todos os cenários')
     parser.add_argument('--output-dir', default='analysis_results/statistics', help='Diretório de saída')
     parser.add_argument('--validate', action='store_true', help='Executar validação com dados de exemplo')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
-    analyzer = StatisticalAnalyzer(args.data_dir, args.output_dir)
+    analyzer = StatisticalAnalyzer(args.output_dir)
     
     if args.validate:
         print("\n🧪 Executando validação com dados de exemplo...\n")
@@ -415,6 +702,12 @@ def main():
         print(f"   {t_result['interpretation']}")
         print()
         
+        # Permutação (P95)
+        print("📊 Teste de permutação P95 (V1 vs V2):")
+        perm_result = analyzer.permutation_test(v1_latency, v2_latency, "p95")
+        print(f"   {perm_result['interpretation']}")
+        print()
+        
         # ANOVA
         print("📊 ANOVA (V1 vs V2 vs V3):")
         anova_result = analyzer.anova(
@@ -442,16 +735,20 @@ def main():
         )
         
         print("\n✅ Validação concluída!")
-        return
+        return 0
     
     print(f"\n📊 Análise estatística")
-    print(f"📁 Dados: {args.data_dir}")
+    print(f"📁 Dados: {args.results_dir}")
     print(f"📁 Saída: {args.output_dir}\n")
     
-    # Aqui você pode adicionar lógica para carregar dados reais
-    print("ℹ️ Use --validate para testar com dados de exemplo")
-    print("ℹ️ Integre com seus dados reais modificando a função main()")
+    df = analyzer.run_real_data_analysis(args.results_dir, max_workers=args.jobs,
+                                         use_cache=not args.no_cache)
+    if df.empty:
+        print("⚠️  Nenhum resultado estatístico gerado")
+        return 1
+    analyzer.generate_summary_table(df)
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
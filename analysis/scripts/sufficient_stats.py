@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Estatísticas suficientes (n, média, M2) para testes paramétricos
+
+t-test, Cohen's d, IC da média e ANOVA dependem só de n, média e soma dos
+quadrados dos desvios (M2) de cada grupo. Essas três grandezas podem ser
+acumuladas durante a ingestão (Welford por valor, Chan et al. para juntar
+blocos) e combinadas entre arquivos/processos, então os testes rodam em O(1)
+por grupo, sobre os dados completos (sem reservoir sampling) e sem manter os
+arrays de latência em memória.
+
+O FastK6Loader grava essas estatísticas ao ingerir cada arquivo
+(`<cache>/<arquivo>.stats.json`); veja `FastK6Loader.load_stats`.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+# Valores acumulados em buffer antes de cada merge (custo amortizado O(1))
+STREAM_BUFFER_SIZE = 65536
+
+
+@dataclass(frozen=True)
+class SufficientStats:
+    """n, média e M2 (soma dos quadrados dos desvios) de um grupo."""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    @classmethod
+    def from_array(cls, values: Union[np.ndarray, Iterable[float]]) -> "SufficientStats":
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return cls()
+        mean = float(values.mean())
+        return cls(int(values.size), mean, float(((values - mean) ** 2).sum()),
+                   float(values.min()), float(values.max()))
+
+    def add(self, value: float) -> "SufficientStats":
+        """Atualização de Welford com um único valor."""
+        n = self.n + 1
+        delta = value - self.mean
+        mean = self.mean + delta / n
+        return SufficientStats(n, mean, self.m2 + delta * (value - mean),
+                               min(self.min, value), max(self.max, value))
+
+    def merge(self, other: "SufficientStats") -> "SufficientStats":
+        """Combinação paralela de Chan et al. (exata, numericamente estável)."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.n / n
+        m2 = self.m2 + other.m2 + delta ** 2 * self.n * other.n / n
+        return SufficientStats(n, mean, m2, min(self.min, other.min), max(self.max, other.max))
+
+    __add__ = merge
+
+    def variance(self, ddof: int = 1) -> float:
+        return self.m2 / (self.n - ddof) if self.n > ddof else float("nan")
+
+    def std(self, ddof: int = 1) -> float:
+        return math.sqrt(self.variance(ddof)) if self.n > ddof else float("nan")
+
+    @property
+    def sem(self) -> float:
+        """Erro padrão da média (ddof=1, como scipy.stats.sem)."""
+        return self.std(1) / math.sqrt(self.n) if self.n > 1 else float("nan")
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"n": self.n, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, float]) -> "SufficientStats":
+        return cls(int(data["n"]), float(data["mean"]), float(data["m2"]),
+                   float(data.get("min", math.inf)), float(data.get("max", -math.inf)))
+
+
+def merge_all(items: Iterable[SufficientStats]) -> SufficientStats:
+    """Combina várias estatísticas (ex.: repetições ou chunks)."""
+    result = SufficientStats()
+    for item in items:
+        result = result.merge(item)
+    return result
+
+
+def grouped_stats(keys: np.ndarray, values: np.ndarray) -> Dict[str, SufficientStats]:
+    """Estatísticas por chave em uma passada vetorizada (bincount)."""
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    keys, values = keys[valid], values[valid]
+    if values.size == 0:
+        return {}
+    labels, codes = np.unique(keys.astype(str), return_inverse=True)
+    counts = np.bincount(codes)
+    means = np.bincount(codes, weights=values) / counts
+    m2 = np.bincount(codes, weights=(values - means[codes]) ** 2)
+    mins = np.full(len(labels), np.inf)
+    maxs = np.full(len(labels), -np.inf)
+    np.minimum.at(mins, codes, values)
+    np.maximum.at(maxs, codes, values)
+    return {
+        str(label): SufficientStats(int(c), float(mu), float(s), float(lo), float(hi))
+        for label, c, mu, s, lo, hi in zip(labels, counts, means, m2, mins, maxs)
+    }
+
+
+class StreamingStats:
+    """
+    Acumulador por chave para uso durante a ingestão (um valor por vez).
+
+    Os valores ficam num buffer curto e são consolidados em blocos
+    (from_array + merge), então o custo por valor é O(1) amortizado e a
+    memória é limitada a STREAM_BUFFER_SIZE valores por chave.
+    """
+
+    def __init__(self, buffer_size: int = STREAM_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._stats: Dict[str, SufficientStats] = {}
+        self._buffers: Dict[str, List[float]] = {}
+
+    def push(self, key: str, value: float):
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append(value)
+        if len(buffer) >= self.buffer_size:
+            self._flush(key)
+
+    def update(self, key: str, values: np.ndarray):
+        """Consolida um bloco de valores de uma vez."""
+        self._stats[key] = self._stats.get(key, SufficientStats()).merge(SufficientStats.from_array(values))
+
+    def _flush(self, key: str):
+        buffer = self._buffers.get(key)
+        if buffer:
+            self.update(key, np.asarray(buffer, dtype=float))
+            buffer.clear()
+
+    def result(self) -> Dict[str, SufficientStats]:
+        for key in list(self._buffers):
+            self._flush(key)
+        return dict(self._stats)
+
+
+def save_stats(path: Path, stats_by_key: Dict[str, SufficientStats]):
+    with open(path, "w") as f:
+        json.dump({key: s.to_dict() for key, s in stats_by_key.items()}, f)
+
+
+def load_stats(path: Path) -> Optional[Dict[str, SufficientStats]]:
+    try:
+        with open(path) as f:
+            return {key: SufficientStats.from_dict(d) for key, d in json.load(f).items()}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(4, 1, 1_000_000)
+
+    # Ingestão em streaming (um valor por vez) vs. array completo
+    stream = StreamingStats()
+    for value in data[:200_000]:
+        stream.push("all", value)
+    streamed = stream.result()["all"].merge(SufficientStats.from_array(data[200_000:]))
+    full = SufficientStats.from_array(data)
+
+    print("=" * 60)
+    print("  SUFFICIENT STATS - 1M amostras")
+    print("=" * 60)
+    print(f"  n: {streamed.n:,} | média: {streamed.mean:.6f} (numpy: {data.mean():.6f})")
+    print(f"  std: {streamed.std():.6f} (numpy: {data.std(ddof=1):.6f})")
+    assert np.isclose(streamed.m2, full.m2) and np.isclose(streamed.mean, full.mean)
+    print("\n✅ Welford/Chan idênticos ao cálculo direto")
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+tcc-analysis: ponto de entrada único do pós-processamento
+
+Cada script de analysis/scripts importava pandas, matplotlib, seaborn, scipy
+e jinja2 no topo, mesmo para tarefas pequenas (data_volume_report.py só lê
+metadados de arquivos). Este módulo só importa a biblioteca padrão; cada
+subcomando importa o script de que precisa dentro da própria função, então
+`tcc-analysis volume` não carrega pandas e `tcc-analysis --help` responde na
+hora.
+
+    ./tcc-analysis ingest                       # caches Parquet + estatísticas + histogramas
+    ./tcc-analysis scenarios catastrofe --jobs 2
+    ./tcc-analysis stats --jobs 4
+    ./tcc-analysis charts --only final comparison
+    ./tcc-analysis latex
+    ./tcc-analysis volume
+    ./tcc-analysis importtime --check           # orçamento de tempo de import
+
+`importtime` roda `python -X importtime -c "import <módulo>"` para os módulos
+de IMPORT_BUDGETS, guarda os relatórios brutos em
+analysis_results/importtime/<módulo>.txt e, com --check, falha se algum
+módulo passar do orçamento, carregar uma biblioteca proibida para ele ou
+regredir em relação à linha de base versionada
+(analysis_results/importtime/baseline.json, regravada com --update-baseline).
+Os orçamentos fixos pegam desastres; a linha de base pega a regressão lenta
+de um import pesado novo que ainda cabe no orçamento.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+K6_RESULTS_DIR = "k6/results"
+IMPORTTIME_DIR = "analysis_results/importtime"
+IMPORTTIME_BASELINE = "analysis_results/importtime/baseline.json"
+# Regressão = acima da linha de base em mais de 50% E em mais de 50 ms (ruído de módulos pequenos)
+BASELINE_TOLERANCE = 0.5
+BASELINE_SLACK_MS = 50.0
+
+# Bibliotecas que um módulo leve não pode carregar no import
+HEAVY = ("numpy", "pandas", "pyarrow", "scipy", "matplotlib", "seaborn", "jinja2")
+PLOTTING = ("scipy", "matplotlib", "seaborn", "jinja2")
+
+
+@dataclass(frozen=True)
+class ImportBudget:
+    """Orçamento de import de um módulo: tempo acumulado e bibliotecas proibidas."""
+
+    module: str
+    max_ms: float
+    forbidden: Tuple[str, ...] = ()
+
+
+# Medido (melhor de 3) com os caches do SO quentes; folga de ~2x para ruído de máquina
+IMPORT_BUDGETS = (
+    ImportBudget("tcc_analysis", 100, HEAVY),
+    ImportBudget("data_volume_report", 150, HEAVY),
+    ImportBudget("rollups", 1000, PLOTTING),
+    ImportBudget("fast_loader", 1000, PLOTTING),
+    ImportBudget("data_session", 1000, PLOTTING),
+    ImportBudget("analysis_daemon", 1000, PLOTTING),
+    ImportBudget("scenario_analyzer", 1500, PLOTTING),
+    ImportBudget("analyzer", 1500, PLOTTING),
+)
+
+
+# ----------------------------------------------------------------------
+# Subcomandos (cada um importa o que usa)
+# ----------------------------------------------------------------------
+
+def cmd_ingest(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="tcc-analysis ingest",
+                                     description="Gera cache Parquet, estatísticas e histogramas dos NDJSON do k6")
+    parser.add_argument("files", nargs="*", help="NDJSON do k6 (default: todas as execuções de --results-dir)")
+    parser.add_argument("--results-dir", default=K6_RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    from fast_loader import warm_cache
+    from rollups import discover_runs
+
+    files = args.files or [str(path) for _, _, path in discover_runs(args.results_dir) if path.exists()]
+    if not files:
+        print(f"⚠️  Nenhum NDJSON em {args.results_dir}")
+        return 1
+    failed = [path for path in files if not warm_cache(path)]
+    for path in failed:
+        print(f"❌ Não foi possível carregar {path}")
+    print(f"✅ {len(files) - len(failed)}/{len(files)} arquivo(s) com cache pronto")
+    return 1 if failed else 0
+
+
+def _delegate(script_main: Callable[..., Optional[int]], *args) -> int:
+    """Roda o main() de um script (com `args`: argv ou parâmetros) e devolve o código de saída dele.
+
+    argparse e sys.exit() dentro do script levantam SystemExit; o código vem
+    dali (None = 0, texto = mensagem de erro impressa e código 1, como no
+    próprio interpretador).
+    """
+    try:
+        code = script_main(*args)
+    except SystemExit as exit_:
+        code = exit_.code
+        if isinstance(code, str):
+            print(code, file=sys.stderr)
+            return 1
+    return int(code or 0)
+
+
+def cmd_scenarios(argv: List[str]) -> int:
+    import scenario_analyzer
+
+    return _delegate(scenario_analyzer.main, argv)
+
+
+def cmd_stats(argv: List[str]) -> int:
+    import statistical_analysis
+
+    return _delegate(statistical_analysis.main, argv)
+
+
+CHART_SETS = ("final", "comparison", "academic", "advanced")
+
+
+def cmd_charts(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="tcc-analysis charts", description="Gráficos consolidados")
+    parser.add_argument("--only", nargs="+", choices=CHART_SETS, default=list(CHART_SETS))
+    parser.add_argument("--jobs", type=int, default=None, help="Processos de renderização (default: CPUs)")
+    args = parser.parse_args(argv)
+
+    # Todos os conjuntos pedidos rodam; qualquer falha de renderização vira código != 0
+    code = 0
+    if "final" in args.only:
+        import generate_final_charts
+        code = max(code, _delegate(generate_final_charts.main, args.jobs))
+    if "comparison" in args.only:
+        import generate_comparison_charts
+        code = max(code, _delegate(generate_comparison_charts.main, args.jobs))
+    if "academic" in args.only:
+        import generate_academic_charts
+        code = max(code, _delegate(generate_academic_charts.main,
+                                   [] if args.jobs is None else ["--jobs", str(args.jobs)]))
+    if "advanced" in args.only:
+        import generate_advanced_visualizations
+        generate_advanced_visualizations.generate_cb_state_chart()
+        generate_advanced_visualizations.generate_correlation_heatmap()
+    return code
+
+
+def cmd_latex(argv: List[str]) -> int:
+    argparse.ArgumentParser(prog="tcc-analysis latex", description="Tabelas LaTeX").parse_args(argv)
+    import export_latex_tables
+
+    export_latex_tables.export_comprehensive_results()
+    export_latex_tables.export_tail_latency_table()
+    return 0
+
+
+def cmd_volume(argv: List[str]) -> int:
+    import data_volume_report
+
+    return _delegate(data_volume_report.main, argv)
+
+
+# ----------------------------------------------------------------------
+# Orçamento de import (python -X importtime)
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ImportEntry:
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(report: str) -> List[ImportEntry]:
+    """Linhas `import time: self | cumulative | pacote` (a indentação do nome é a profundidade)."""
+    entries = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append(ImportEntry(name.strip(), depth, int(parts[0]), int(parts[1])))
+    return entries
+
+
+def measure_import(module: str, repeat: int = 3) -> Tuple[float, List[ImportEntry], str]:
+    """(ms acumulados, entradas, relatório bruto) do melhor de `repeat` imports em processos novos."""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=SCRIPTS_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} falhou:\n{result.stderr.strip().splitlines()[-1]}")
+        entries = parse_importtime(result.stderr)
+        total = next(e.cumulative_us for e in reversed(entries) if e.name == module and e.depth == 0)
+        if best is None or total < best[0]:
+            best = (total, entries, result.stderr)
+    total, entries, report = best
+    return total / 1000, entries, report
+
+
+def load_baseline(path: str = IMPORTTIME_BASELINE) -> Dict[str, dict]:
+    """{módulo: {"total_ms", "imports"}} da linha de base versionada ({} se não existir)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("modules", {})
+
+
+def save_baseline(measured: Dict[str, dict], path: str = IMPORTTIME_BASELINE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {"python": sys.version.split()[0], "modules": measured}
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def direct_imports(entries: List[ImportEntry], module: str) -> List[ImportEntry]:
+    """Imports diretos do módulo medido (profundidade 1 logo antes da linha dele).
+
+    O relatório é pós-ordem: os filhos aparecem antes do pai, e a inicialização
+    do interpretador (site, encodings) vem antes, em outras subárvores.
+    """
+    end = max(i for i, e in enumerate(entries) if e.name == module and e.depth == 0)
+    start = max((i for i, e in enumerate(entries[:end]) if e.depth == 0), default=-1) + 1
+    return [e for e in entries[start:end] if e.depth == 1]
+
+
+def compare_baseline(module: str, total_ms: float, imports: Dict[str, float],
+                     baseline: Dict[str, dict]) -> List[str]:
+    """Violações contra a linha de base: tempo acima da tolerância, com os imports diretos novos."""
+    reference = baseline.get(module)
+    if reference is None:
+        return []
+    limit = max(reference["total_ms"] * (1 + BASELINE_TOLERANCE), reference["total_ms"] + BASELINE_SLACK_MS)
+    if total_ms <= limit:
+        return []
+    new = sorted(set(imports) - set(reference.get("imports", {})), key=lambda name: -imports[name])
+    detail = f" (imports novos: {', '.join(f'{n} {imports[n]:.0f} ms' for n in new[:3])})" if new else ""
+    return [f"{module}: {total_ms:.0f} ms > linha de base de {reference['total_ms']:.0f} ms "
+            f"(limite {limit:.0f} ms){detail}"]
+
+
+def check_budget(budget: ImportBudget, repeat: int = 3,
+                 output_dir: Optional[str] = IMPORTTIME_DIR,
+                 baseline: Optional[Dict[str, dict]] = None,
+                 measured: Optional[Dict[str, dict]] = None) -> List[str]:
+    """Mede um módulo, grava o relatório bruto e devolve as violações do orçamento e da linha de base."""
+    total_ms, entries, report = measure_import(budget.module, repeat)
+    children = direct_imports(entries, budget.module)
+    imports = {e.name: round(e.cumulative_us / 1000, 1) for e in children}
+    if measured is not None:
+        measured[budget.module] = {"total_ms": round(total_ms, 1), "imports": imports}
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        Path(output_dir, f"{budget.module}.txt").write_text(report, encoding="utf-8")
+
+    loaded = {e.name for e in entries}
+    leaked = sorted({f for f in budget.forbidden
+                     if any(name == f or name.startswith(f + ".") for name in loaded)})
+    heaviest = sorted(children, key=lambda e: -e.cumulative_us)[:3]
+
+    problems = []
+    if total_ms > budget.max_ms:
+        problems.append(f"{budget.module}: {total_ms:.0f} ms > orçamento de {budget.max_ms:.0f} ms")
+    if leaked:
+        problems.append(f"{budget.module}: carrega {', '.join(leaked)} no import")
+    problems += compare_baseline(budget.module, total_ms, imports, baseline or {})
+    status = "❌" if problems else "✅"
+    top = ", ".join(f"{e.name} {e.cumulative_us / 1000:.0f}" for e in heaviest)
+    reference = (baseline or {}).get(budget.module)
+    base = f" / base {reference['total_ms']:5.0f} ms" if reference else ""
+    print(f"  {status} {budget.module:<22} {total_ms:7.0f} ms / {budget.max_ms:5.0f} ms{base}  ({top})")
+    return problems
+
+
+def cmd_importtime(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="tcc-analysis importtime",
+                                     description="Tempo de import dos módulos contra IMPORT_BUDGETS")
+    parser.add_argument("modules", nargs="*", help="Só estes módulos (default: todos os orçados)")
+    parser.add_argument("--check", action="store_true", help="Código de saída 1 se algum orçamento estourar")
+    parser.add_argument("--repeat", type=int, default=3, help="Imports por módulo (vale o melhor)")
+    parser.add_argument("--output-dir", default=IMPORTTIME_DIR, help="Relatórios brutos de -X importtime")
+    parser.add_argument("--baseline", default=IMPORTTIME_BASELINE, help="Linha de base versionada (JSON)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Regrava a linha de base com as medições atuais (depois de uma mudança intencional)")
+    args = parser.parse_args(argv)
+
+    budgets = [b for b in IMPORT_BUDGETS if not args.modules or b.module in args.modules]
+    baseline = {} if args.update_baseline else load_baseline(args.baseline)
+    if not baseline and not args.update_baseline:
+        print(f"⚠️  Sem linha de base em {args.baseline}; só os orçamentos fixos serão verificados")
+    print(f"⏱️  python -X importtime (melhor de {args.repeat}) — ms acumulados / orçamento (imports mais pesados)")
+    measured: Dict[str, dict] = {}
+    problems = [p for budget in budgets
+                for p in check_budget(budget, args.repeat, args.output_dir, baseline, measured)]
+    print(f"  Relatórios em {args.output_dir}/")
+    if args.update_baseline:
+        # Módulos não medidos nesta chamada mantêm a linha de base anterior
+        save_baseline({**load_baseline(args.baseline), **measured}, args.baseline)
+        print(f"  💾 Linha de base gravada em {args.baseline}")
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    return 1 if problems and args.check else 0
+
+
+COMMANDS: Dict[str, Tuple[Callable[[List[str]], int], str]] = {
+    "ingest": (cmd_ingest, "Cache Parquet, estatísticas e histogramas dos NDJSON (fast_loader)"),
+    "scenarios": (cmd_scenarios, "Análise por cenário (scenario_analyzer; argumentos repassados)"),
+    "stats": (cmd_stats, "Bateria estatística (statistical_analysis; argumentos repassados)"),
+    "charts": (cmd_charts, "Gráficos consolidados, comparativos, acadêmicos e avançados"),
+    "latex": (cmd_latex, "Tabelas LaTeX (export_latex_tables)"),
+    "volume": (cmd_volume, "Relatório de volume de dados (data_volume_report; argumentos repassados)"),
+    "importtime": (cmd_importtime, "Tempo de import dos módulos contra o orçamento"),
+}
+
+
+def usage() -> str:
+    lines = ["uso: tcc-analysis <comando> [argumentos]", "", "comandos:"]
+    lines += [f"  {name:<12} {description}" for name, (_, description) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    if argv[0] not in COMMANDS:
+        print(f"❌ Comando desconhecido: {argv[0]}\n\n{usage()}")
+        return 2
+    command, _ = COMMANDS[argv[0]]
+    start = time.time()
+    code = command(argv[1:])
+    print(f"\n⏱️  tcc-analysis {argv[0]}: {time.time() - start:.1f}s")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Testes da API do daemon de análise (analysis_daemon.py) contra um servidor
+em processo, com um NDJSON sintético de `rajadas` (fases lidas dos scripts
+k6 reais em k6/scripts).
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "analysis" / "scripts"))
+
+from analysis_daemon import AnalysisService, make_server, query  # noqa: E402
+
+# Rajadas (k6/scripts/cenario-rajadas-intermitentes.js): três janelas de falha
+BURSTS = [(180.0, 240.0), (360.0, 420.0), (540.0, 600.0)]
+DURATION_S = 780
+
+
+def _write_run(path: Path):
+    """Uma requisição por segundo: 503 nas rajadas, 200 fora delas."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    lines = []
+    for second in range(DURATION_S):
+        status = "503" if any(low <= second < high for low, high in BURSTS) else "200"
+        timestamp = (start + timedelta(seconds=second)).isoformat().replace("+00:00", "Z")
+        lines.append(json.dumps({
+            "type": "Point", "metric": "http_req_duration",
+            "data": {"time": timestamp, "value": 5.0 if status == "503" else 40.0, "tags": {"status": status}},
+        }, separators=(",", ":")))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.fixture(scope="module")
+def daemon(tmp_path_factory):
+    results_dir = tmp_path_factory.mktemp("results")
+    _write_run(results_dir / "scenarios" / "rajadas_V2.json")
+    # O registro de fases lê k6/scripts relativo ao diretório de trabalho
+    cwd = os.getcwd()
+    os.chdir(REPO_ROOT)
+    service = AnalysisService(str(results_dir))
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.chdir(cwd)
+
+
+def test_status_mix_start_end(daemon):
+    mix = query("status_mix", {"scenario": "rajadas", "version": "V2", "start": 120, "end": 300}, port=daemon)
+    assert mix["windows"] == [[120.0, 300.0]]
+    assert mix["counts"] == {"200": 120, "503": 60}
+    assert mix["availability_pct"] == pytest.approx(100 * 120 / 180, abs=1e-3)
+
+
+def test_phase_window_is_union_of_matching_phases(daemon):
+    mix = query("status_mix", {"scenario": "rajadas", "version": "V2", "phase": "failure"}, port=daemon)
+    assert mix["windows"] == [list(window) for window in BURSTS]
+    # Só as rajadas: os trechos normais entre elas (240–360, 420–540) ficam de fora
+    assert mix["counts"] == {"503": 180}
+
+
+def test_phase_window_by_name(daemon):
+    latency = query("latency", {"scenario": "rajadas", "version": "V2", "phase": "bursts_2"}, port=daemon)
+    assert latency["windows"] == [[360.0, 420.0]]
+    assert latency["n"] == 60
+    assert latency["mean_ms"] == pytest.approx(5.0)
+
+
+def test_rollups_follow_phase_windows(daemon):
+    rollups = query("rollups", {"scenario": "rajadas", "version": "V2", "phase": "failure", "bucket": 60},
+                    port=daemon)
+    start_s = [row[rollups["columns"].index("start_s")] for row in rollups["rows"]]
+    assert start_s == [low for low, _ in BURSTS]
+
+
+@pytest.mark.parametrize("endpoint, params, status", [
+    ("rollups", {"scenario": "rajadas", "version": "V2", "bucket": "abc"}, 400),
+    ("rollups", {"scenario": "rajadas", "version": "V2", "bucket": "0"}, 400),
+    ("status_mix", {"scenario": "rajadas", "version": "V2", "start": "x"}, 400),
+    ("status_mix", {"scenario": "rajadas", "version": "V2", "start": "300", "end": "100"}, 400),
+    ("latency", {"scenario": "rajadas", "version": "V2", "q": "p95"}, 400),
+    ("latency", {"scenario": "rajadas", "version": "V2", "q": "0.5,1.5"}, 400),
+    ("latency", {"scenario": "rajadas", "version": "V2", "q": "-0.1"}, 400),
+    ("latency", {"scenario": "rajadas", "version": "V2", "q": "nan"}, 400),
+    ("status_mix", {"version": "V2"}, 400),
+    ("status_mix", {"scenario": "rajadas", "version": "V2", "phase": "nope"}, 404),
+    ("status_mix", {"scenario": "rajadas", "version": "V9"}, 404),
+    ("nope", {}, 404),
+])
+def test_bad_parameters_are_client_errors(daemon, endpoint, params, status):
+    with pytest.raises(RuntimeError, match=rf"^{status}: "):
+        query(endpoint, params, port=daemon)
+
+
+def test_unix_socket(tmp_path, daemon):
+    socket_path = str(tmp_path / "daemon.sock")
+    server = make_server(AnalysisService(), unix_socket=socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert query("health", unix_socket=socket_path)["queries"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
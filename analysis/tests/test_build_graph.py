@@ -0,0 +1,35 @@
+"""
+Saídas declaradas pelos alvos `cache:<arquivo>` do build_graph contra o que
+a ingestão (fast_loader) de fato grava.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "analysis" / "scripts"))
+
+from build_graph import _cache_outputs  # noqa: E402
+from fast_loader import warm_cache  # noqa: E402
+
+
+def _write_run(path: Path, metric: str, seconds: int = 30):
+    lines = [json.dumps({
+        "type": "Point", "metric": metric,
+        "data": {"time": f"2025-01-01T00:00:{s:02d}Z", "value": 10.0 + s, "tags": {"status": "200"}},
+    }, separators=(",", ":")) for s in range(seconds)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("metric", ["http_req_duration", "http_reqs"])
+def test_cache_target_outputs_are_written(tmp_path, metric):
+    # http_reqs: execução sem nenhuma amostra de latência (histograma e estatísticas vazios)
+    run = tmp_path / "scenarios" / "foo_V1.json"
+    run.parent.mkdir()
+    _write_run(run, metric)
+    assert warm_cache(str(run))
+    missing = [output for output in _cache_outputs(str(run)) if not Path(output).exists()]
+    assert missing == []
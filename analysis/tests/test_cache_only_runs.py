@@ -0,0 +1,46 @@
+"""
+Execuções que só existem no cache Parquet (NDJSON apagado depois da ingestão):
+discover_runs devolve o próprio cache e o loader/sessão o aceitam.
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "analysis" / "scripts"))
+
+from data_session import DataSession  # noqa: E402
+from fast_loader import warm_cache  # noqa: E402
+from rollups import discover_runs, load_run  # noqa: E402
+
+
+def _write_run(path: Path, seconds: int = 30):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    lines = [json.dumps({
+        "type": "Point", "metric": "http_req_duration",
+        "data": {"time": (start + timedelta(seconds=s)).isoformat().replace("+00:00", "Z"),
+                 "value": 10.0 + s, "tags": {"status": "200"}},
+    }, separators=(",", ":")) for s in range(seconds)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_cache_only_run_is_discovered_and_loaded(tmp_path):
+    run = tmp_path / "scenarios" / "catastrofe_V1.json"
+    run.parent.mkdir()
+    _write_run(run)
+    assert discover_runs(str(tmp_path)) == [("catastrofe", "V1", run)]
+    assert warm_cache(str(run))
+
+    run.unlink()
+    [(scenario, version, path)] = discover_runs(str(tmp_path))
+    assert path == run.parent / ".cache" / "catastrofe_V1.parquet"
+    assert path.exists()
+
+    requests = load_run(path, DataSession())
+    assert len(requests) == 30
+    assert requests["latency_ms"].max() == 39.0
+    # A sessão também resolve o NDJSON ausente para o cache
+    assert len(DataSession().requests(run)) == 30
+    assert warm_cache(str(path))
@@ -0,0 +1,41 @@
+"""
+Box plots e violinos a partir de histogramas (distribution_plots.py) com um
+cenário sem amostras de latência na figura.
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "analysis" / "scripts"))
+
+from distribution_plots import as_histogram, boxplot, violinplot  # noqa: E402
+
+SAMPLES = [np.array([10.0, 12.0, 15.0, 40.0]), np.empty(0), np.array([5.0, 6.0, 7.0])]
+
+
+def test_empty_histogram_keeps_box_positions():
+    fig, ax = plt.subplots()
+    try:
+        bp = boxplot(ax, [as_histogram(s) for s in SAMPLES], ["V1", "V2", "V3"], patch_artist=True)
+        assert len(bp["boxes"]) == 3
+        fig.savefig(io.BytesIO(), format="png")
+    finally:
+        plt.close(fig)
+
+
+def test_empty_histogram_keeps_violin_positions():
+    fig, ax = plt.subplots()
+    try:
+        parts = violinplot(ax, [as_histogram(s) for s in SAMPLES], positions=[1, 2, 3])
+        assert len(parts["bodies"]) == 3
+        fig.savefig(io.BytesIO(), format="png")
+    finally:
+        plt.close(fig)
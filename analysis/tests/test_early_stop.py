@@ -0,0 +1,86 @@
+"""
+Testes do corte por parada antecipada (sequential_monitor → <v2>_monitor.json)
+nas análises por fase e de recuperação.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "analysis" / "scripts"))
+
+from analyze_recovery_time import recovery_for_run  # noqa: E402
+from phases import Phase, early_stop_cutoff, monitor_path, summarize_by_phase  # noqa: E402
+from rollups import discover_runs  # noqa: E402
+
+PHASES = [
+    Phase("warmup", "warmup", 0.0, 60.0),
+    Phase("catastrophe", "failure", 60.0, 120.0),
+    Phase("recovery", "recovery", 120.0, 240.0),
+    Phase("cooldown", "cooldown", 240.0, 300.0),
+]
+
+
+def _requests(duration_s: int) -> pd.DataFrame:
+    """Uma requisição por segundo: 500 na falha, 200 fora dela."""
+    seconds = np.arange(duration_s, dtype=float)
+    failing = (seconds >= 60) & (seconds < 120)
+    return pd.DataFrame({
+        "seconds": seconds,
+        "latency_ms": np.where(failing, 900.0, 40.0),
+        "status": np.where(failing, "500", "200"),
+    })
+
+
+def _write_monitor(run_path: Path, stopped_at: float, truncated: bool = True):
+    monitor_path(run_path).write_text(json.dumps({"truncated": truncated, "stopped_at_s": stopped_at}))
+
+
+def test_cutoff_read_from_monitor_record(tmp_path):
+    run = tmp_path / "catastrofe_V2.json"
+    run.write_text("")
+    assert early_stop_cutoff(run) is None
+    _write_monitor(run, 150.0)
+    assert early_stop_cutoff(run) == 150.0
+    # O cache em .cache/ aponta para o mesmo registro
+    assert early_stop_cutoff(tmp_path / ".cache" / "catastrofe_V2.parquet") == 150.0
+    _write_monitor(run, 150.0, truncated=False)
+    assert early_stop_cutoff(run) is None
+
+
+def test_monitor_record_is_not_a_run(tmp_path):
+    (tmp_path / "catastrofe_V2.json").write_text("")
+    _write_monitor(tmp_path / "catastrofe_V2.json", 150.0)
+    assert [(s, v) for s, v, _ in discover_runs(str(tmp_path))] == [("catastrofe", "V2")]
+
+
+def test_phase_summary_marks_cut_phase():
+    summary = summarize_by_phase(_requests(155), PHASES, cutoff=150.0).set_index("Phase")
+    assert list(summary.index) == ["warmup", "catastrophe", "recovery"]
+    assert not summary.loc["catastrophe", "Truncated"]
+    assert summary.loc["recovery", "Truncated"]
+    assert summary.loc["recovery", "Duration (s)"] == 30.0
+    assert summary.loc["recovery", "Requests"] == 31
+
+
+def test_phase_summary_without_cutoff_is_unchanged():
+    summary = summarize_by_phase(_requests(300), PHASES)
+    assert "Truncated" not in summary.columns
+    assert list(summary["Phase"]) == [p.name for p in PHASES]
+
+
+def test_recovery_flags_truncated_horizon():
+    window = [PHASES[1]]
+    rows, curve = recovery_for_run(_requests(155), window, "catastrofe", "V2", test_end=300.0, cutoff=150.0)
+    assert rows[0]["Status"] == "Truncated (early stop)"
+    assert rows[0]["Truncated At (s)"] == 150.0
+    assert rows[0]["Horizon (s)"] == 30
+    assert curve["offset_s"].max() == 29
+
+    rows, _ = recovery_for_run(_requests(300), window, "catastrofe", "V1", test_end=300.0)
+    assert rows[0]["Status"] == "Recovered"
+    assert np.isnan(rows[0]["Truncated At (s)"])
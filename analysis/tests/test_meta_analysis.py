@@ -0,0 +1,50 @@
+"""
+Testes da meta-análise de repetições (meta_analysis.py): erro padrão da
+disponibilidade nos extremos e seu efeito no efeito combinado.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "analysis" / "scripts"))
+
+from meta_analysis import RunSummary, random_effects  # noqa: E402
+from sufficient_stats import SufficientStats  # noqa: E402
+
+
+def _summary(availability: float, n_requests: int) -> RunSummary:
+    return RunSummary("01", "catastrofe", "V2", SufficientStats.from_array([1.0, 2.0]),
+                      p95=2.0, p95_se=0.1, availability=availability, n_requests=n_requests)
+
+
+@pytest.mark.parametrize("availability", [0.0, 1.0])
+def test_availability_se_is_positive_at_the_extremes(availability):
+    se = _summary(availability, 1000).availability_se
+    assert 0 < se < 0.001
+
+
+def test_availability_se_close_to_wald_in_the_middle():
+    assert _summary(0.5, 10_000).availability_se == pytest.approx(np.sqrt(0.25 / 10_000), rel=1e-3)
+
+
+def _availability_effects(pairs, n_requests=200):
+    """Diferença V2 - V1 da disponibilidade por repetição e sua variância."""
+    effects = np.array([v2 - v1 for v1, v2 in pairs])
+    variances = np.array([_summary(v1, n_requests).availability_se ** 2
+                          + _summary(v2, n_requests).availability_se ** 2 for v1, v2 in pairs])
+    return effects, variances
+
+
+def test_perfect_repetition_keeps_a_bounded_weight():
+    # Última repetição: 100% nas duas versões (diferença 0)
+    effects, variances = _availability_effects([(0.90, 0.97), (0.92, 0.985), (0.88, 0.96), (1.0, 1.0)])
+    assert variances[-1] > 0
+    # Peso comparável ao das demais (antes: variância 0, presa em 1e-12 → peso ~10^9 vezes maior)
+    assert variances[:-1].min() / variances[-1] < 100
+    unsmoothed = variances.copy()
+    unsmoothed[-1] = 0.0
+    assert random_effects(effects, variances).q < random_effects(effects, unsmoothed).q
@@ -0,0 +1,43 @@
+"""
+Mann-Whitney de rank_stats contra scipy.stats.mannwhitneyu(method='auto'):
+p exato para amostras pequenas sem empates, aproximação normal acima.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy import stats
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "analysis" / "scripts"))
+
+from histogram_stats import LatencyHistogram, mann_whitney_histograms  # noqa: E402
+from rank_stats import compare_ranks, mann_whitney_u  # noqa: E402
+
+
+@pytest.mark.parametrize("n_x, n_y, decimals", [
+    (5, 7, None),     # exato
+    (8, 40, None),    # exato (uma amostra no limite)
+    (9, 9, None),     # assintótico
+    (6, 6, 0),        # empates: assintótico
+    (300, 250, 1),
+])
+def test_matches_scipy_auto(n_x, n_y, decimals):
+    rng = np.random.default_rng(n_x * 100 + n_y)
+    x = rng.lognormal(4.6, 0.5, n_x)
+    y = rng.lognormal(4.8, 0.5, n_y)
+    if decimals is not None:
+        x, y = np.round(x, decimals), np.round(y, decimals)
+    reference = stats.mannwhitneyu(x, y, alternative="two-sided", method="auto")
+
+    assert mann_whitney_u(x, y) == pytest.approx((reference.statistic, reference.pvalue), rel=1e-9)
+    histograms = LatencyHistogram.from_values(x), LatencyHistogram.from_values(y)
+    assert mann_whitney_histograms(*histograms) == pytest.approx((reference.statistic, reference.pvalue), rel=1e-9)
+
+
+def test_exact_only_without_ties():
+    assert compare_ranks(np.array([1.0, 2.0, 3.0]), np.array([4.0, 5.0])).exact_applies
+    assert not compare_ranks(np.array([1.0, 2.0, 4.0]), np.array([4.0, 5.0])).exact_applies
+    assert not compare_ranks(np.arange(9.0), np.arange(9.0) + 0.5).exact_applies
@@ -0,0 +1,62 @@
+"""
+Testes da comparação de tempo de import (tcc_analysis importtime) contra a
+linha de base versionada e dos códigos de saída dos subcomandos.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "analysis" / "scripts"))
+
+from tcc_analysis import cmd_charts, compare_baseline, direct_imports, parse_importtime  # noqa: E402
+
+REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:       200 |        300 | encodings
+import time:     50000 |      50000 |     pandas.core
+import time:     10000 |      60000 |   pandas
+import time:      5000 |       5000 |   json
+import time:      1000 |      66000 | analyzer
+"""
+
+
+def test_direct_imports_skip_interpreter_startup():
+    children = direct_imports(parse_importtime(REPORT), "analyzer")
+    assert [e.name for e in children] == ["pandas", "json"]
+
+
+def test_baseline_regression_lists_new_imports():
+    baseline = {"analyzer": {"total_ms": 400.0, "imports": {"pandas": 350.0}}}
+    problems = compare_baseline("analyzer", 1400.0, {"pandas": 350.0, "scipy.stats": 950.0}, baseline)
+    assert len(problems) == 1
+    assert "linha de base de 400 ms" in problems[0]
+    assert "scipy.stats 950 ms" in problems[0]
+
+
+def test_baseline_tolerates_noise_and_unknown_modules():
+    baseline = {"tcc_analysis": {"total_ms": 40.0, "imports": {}}}
+    # +75% mas só +30 ms: ruído de módulo pequeno
+    assert compare_baseline("tcc_analysis", 70.0, {}, baseline) == []
+    assert compare_baseline("novo_modulo", 9999.0, {}, baseline) == []
+
+
+@pytest.mark.parametrize("final_code, comparison_code, expected", [(0, 0, 0), (1, 0, 1), (0, 1, 1)])
+def test_charts_propagates_render_failures(monkeypatch, final_code, comparison_code, expected):
+    calls = []
+
+    def fake_main(name, code):
+        def main(max_workers=None):
+            calls.append((name, max_workers))
+            return code
+        return main
+
+    for name, code in (("generate_final_charts", final_code), ("generate_comparison_charts", comparison_code)):
+        monkeypatch.setitem(sys.modules, name, types.SimpleNamespace(main=fake_main(name, code)))
+    assert cmd_charts(["--only", "final", "comparison", "--jobs", "2"]) == expected
+    # Uma falha em um conjunto não impede os seguintes
+    assert calls == [("generate_final_charts", 2), ("generate_comparison_charts", 2)]
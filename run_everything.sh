@@ -21,6 +21,12 @@ done
 
 SKIP_COMPLETE_SCENARIO="${SKIP_COMPLETE_SCENARIO:-false}"
 SKIP_ACADEMIC="${SKIP_ACADEMIC:-false}"
+# true: análises via build incremental (só reconstrói artefatos desatualizados)
+INCREMENTAL_BUILD="${INCREMENTAL_BUILD:-false}"
+# Processos do scenario_analyzer.py (um cenário por processo, com orçamento de memória)
+ANALYSIS_JOBS="${ANALYSIS_JOBS:-1}"
+# true: todas as análises num único processo (run_analyses.py), carregando cada NDJSON uma vez
+SHARED_SESSION="${SHARED_SESSION:-false}"
 INCLUDE_V3="${INCLUDE_V3:-true}"
 export INCLUDE_V3
 export PARALLEL_MODE
@@ -85,31 +91,59 @@ if [ "$SKIP_COMPLETE_SCENARIO" != "true" ]; then
     bash ./run_all_tests.sh
   fi
 
-  echo "=== Analisando cenário completo (analysis/scripts/analyzer.py) ==="
-  "$PYTHON" analysis/scripts/analyzer.py
+  if [ "$INCREMENTAL_BUILD" != "true" ] && [ "$SHARED_SESSION" != "true" ]; then
+    echo "=== Analisando cenário completo (analysis/scripts/analyzer.py) ==="
+    "$PYTHON" analysis/scripts/analyzer.py
+  fi
 fi
 
 # 2) Cenários críticos + análise por cenário
 echo "=== Executando cenários críticos (SCENARIOS=${SCENARIOS}) ==="
 bash ./run_scenario_tests.sh "$SCENARIOS"
 
-echo "=== Analisando cenários críticos (analysis/scripts/scenario_analyzer.py) ==="
-if [ "$SCENARIOS" = "all" ]; then
-  "$PYTHON" analysis/scripts/scenario_analyzer.py
+if [ "$INCREMENTAL_BUILD" = "true" ]; then
+  echo "=== Build incremental das análises (analysis/scripts/build_graph.py) ==="
+  if [ "$SCENARIOS" = "all" ]; then
+    "$PYTHON" analysis/scripts/build_graph.py
+  else
+    # Só os alvos dos cenários selecionados (e os caches de que dependem)
+    BUILD_TARGETS=()
+    for scenario in ${SCENARIOS//,/ }; do
+      BUILD_TARGETS+=("scenario:${scenario}")
+    done
+    "$PYTHON" analysis/scripts/build_graph.py "${BUILD_TARGETS[@]}"
+  fi
+  echo "Estado do build em analysis_results/.build_state.json"
 else
-  "$PYTHON" analysis/scripts/scenario_analyzer.py "$SCENARIOS"
-fi
+  if [ "$SHARED_SESSION" = "true" ]; then
+    echo "=== Análises com sessão de dados compartilhada (analysis/scripts/run_analyses.py) ==="
+    "$PYTHON" analysis/scripts/run_analyses.py "$SCENARIOS"
+  else
+    echo "=== Analisando cenários críticos (analysis/scripts/scenario_analyzer.py) ==="
+    if [ "$SCENARIOS" = "all" ]; then
+      "$PYTHON" analysis/scripts/scenario_analyzer.py --jobs "$ANALYSIS_JOBS"
+    else
+      "$PYTHON" analysis/scripts/scenario_analyzer.py "$SCENARIOS"
+    fi
+  fi
 
-echo "=== Gerando gráficos consolidados finais (analysis/scripts/generate_final_charts.py) ==="
-"$PYTHON" analysis/scripts/generate_final_charts.py
+  echo "=== Gerando gráficos consolidados finais (analysis/scripts/generate_final_charts.py) ==="
+  "$PYTHON" analysis/scripts/generate_final_charts.py
+fi
 
 # 3) Estatística + charts acadêmicos
 if [ "$SKIP_ACADEMIC" != "true" ]; then
   echo "=== Análise estatística (analysis/scripts/statistical_analysis.py) ==="
+  # --validate: confere a bateria com dados sintéticos antes de rodar nos resultados reais
   "$PYTHON" analysis/scripts/statistical_analysis.py \
-    --data-dir analysis_results \
     --output-dir analysis_results/statistics \
     --validate
+  # No build incremental a análise nos resultados reais é o alvo `statistics` do build_graph
+  if [ "$INCREMENTAL_BUILD" != "true" ]; then
+    "$PYTHON" analysis/scripts/statistical_analysis.py \
+      --results-dir k6/results \
+      --output-dir analysis_results/statistics
+  fi
 
   echo "=== Gráficos acadêmicos (analysis/scripts/generate_academic_charts.py) ==="
   "$PYTHON" analysis/scripts/generate_academic_charts.py \
@@ -8,6 +8,9 @@
 #   ./run_scenario_tests.sh [all|catastrofe|degradacao|rajadas|indisponibilidade|normal]
 #
 # Cada cenário roda para V1 e V2, salvando resultados separados.
+# EARLY_STOP=true interrompe o V2 quando o monitor sequencial decide a
+# diferença V1 vs V2 (analysis/scripts/sequential_monitor.py); o corte fica em
+# <cenario>_V2_monitor.json e as análises de fase/recuperação o marcam.
 ###############################################################################
 
 set -e
@@ -16,6 +19,9 @@ SCENARIO=${1:-all}
 RESULTS_DIR="k6/results/scenarios"
 SCRIPTS_DIR="k6/scripts"
 INCLUDE_V3=${INCLUDE_V3:-false}
+# Monitor sequencial: interrompe o V2 assim que a diferença V1 vs V2 estiver decidida
+EARLY_STOP=${EARLY_STOP:-false}
+PYTHON=${PYTHON:-python3}
 
 # Cores para output
 RED='\033[0;31m'
@@ -238,6 +244,21 @@ run_scenario() {
     docker-compose up -d --no-deps k6-tester
     sleep 2
     
+    # Monitor sequencial (opcional): lê V1 (completo) e V2 (ao vivo) e para o k6 na decisão.
+    # Ao parar, grava ${scenario_name}_V2_monitor.json com o corte (a recuperação e o
+    # cooldown ficam de fora, e as análises por fase/recuperação marcam isso); o registro
+    # de uma execução anterior é apagado para não marcar como cortada uma execução completa.
+    local monitor_pid=""
+    rm -f "$RESULTS_DIR/${scenario_name}_V2_monitor.json"
+    if [ "${EARLY_STOP}" = "true" ]; then
+        rm -f "$RESULTS_DIR/${scenario_name}_V2.json"
+        "$PYTHON" analysis/scripts/sequential_monitor.py \
+            "$RESULTS_DIR/${scenario_name}_V1.json" \
+            "$RESULTS_DIR/${scenario_name}_V2.json" \
+            --on-decision "docker-compose exec -T k6-tester pkill -INT k6" &
+        monitor_pid=$!
+    fi
+    
     # Executa k6 (|| true ignora falhas de threshold)
     docker-compose exec -T k6-tester k6 run \
         --out json="/scripts/results/scenarios/${scenario_name}_V2.json" \
@@ -245,6 +266,10 @@ run_scenario() {
         -e PAYMENT_BASE_URL=http://servico-pagamento:8080 \
         "/scripts/$script_file" || echo "⚠️  Threshold falhou mas dados foram coletados"
     
+    if [ -n "$monitor_pid" ]; then
+        kill "$monitor_pid" 2>/dev/null || true
+    fi
+    
     echo -e "\n${GREEN}✅ V2 concluído${NC}\n"
 
     # V3 - Retry com Backoff Exponencial (opcional)